@@ -6,7 +6,6 @@ import os
 import json
 import threading
 import time
-import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -16,18 +15,27 @@ current_dir = Path(__file__).resolve().parent
 backend_dir = current_dir.parent
 sys.path.append(str(backend_dir))
 
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, g, Response
 from flask_cors import CORS
 import pytz
 
 from config.settings import (
-    API_HOST, API_PORT, CORS_ORIGINS, PREDICTIONS_FILE,
+    API_HOST, API_PORT, CORS_ORIGINS, API_PROFILING_ENABLED, PROFILE_TOP_N, PREDICTIONS_FILE,
     PREDICTION_HISTORY_FILE, MODELS_DIR, DEFAULT_TIMEZONE,
-    UPCOMING_MATCHES_FILE, PLAYER_STATS_FILE
+    UPCOMING_MATCHES_FILE, PLAYER_STATS_FILE,
+    SSE_POLL_INTERVAL, SSE_KEEPALIVE_INTERVAL, SSE_STREAM_TIMEOUT, SSE_RETRY, SSE_MAX_STREAMS,
+    SSE_BUSY_RETRY_AFTER
 )
 from config.logging_config import get_api_logger
 from utils.logging import log_execution_time, log_exceptions
+from utils.metrics import metrics, PROMETHEUS_CONTENT_TYPE
+from utils.profiling import CProfileProfiler
+from utils.snapshots import load_json_snapshot, snapshots
 from core.models.registry import ModelRegistry, ScoreModelRegistry
+from services.refresh_jobs import RefreshJobManager
+from services.refresh_scheduler import RefreshScheduler
+from services.evaluation_service import load_evaluation_stats
+from services.events import event_log
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -36,6 +44,216 @@ CORS(app, origins=CORS_ORIGINS)
 # Initialize logger
 logger = get_api_logger()
 
+# Refresh job queue shared by the API and the scheduled refresh
+refresh_jobs = RefreshJobManager()
+
+# Open event streams of this process, limited so that they leave request threads for other requests
+event_streams = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
+# Metrics shared by the worker processes of the production server (None for this process's metrics only)
+shared_metrics = None
+
+# Model registries shared by the requests, by registry class
+_registries = {}
+_registries_lock = threading.Lock()
+
+# Request metrics, labelled by route pattern rather than URL to keep the label set bounded
+REQUESTS = metrics.counter("http_requests_total", "HTTP requests handled", ("method", "endpoint", "status"))
+REQUEST_DURATION = metrics.histogram("http_request_duration_seconds", "Duration of HTTP requests",
+                                     ("method", "endpoint"))
+REQUESTS_IN_PROGRESS = metrics.gauge("http_requests_in_progress", "HTTP requests being handled")
+
+
+@app.before_request
+def start_request_timer():
+    """
+    Record the start time of a request.
+    """
+    g.request_start = time.perf_counter()
+    g.request_in_progress = True
+    REQUESTS_IN_PROGRESS.inc()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """
+    Record the outcome and duration of a request.
+
+    Args:
+        response (flask.Response): Response
+
+    Returns:
+        flask.Response: The response, unchanged
+    """
+    start_time = g.pop("request_start", None)
+    if start_time is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        REQUEST_DURATION.observe(time.perf_counter() - start_time, method=request.method, endpoint=endpoint)
+        REQUESTS.inc(method=request.method, endpoint=endpoint, status=str(response.status_code))
+    return response
+
+
+@app.teardown_request
+def finish_request(exception=None):
+    """
+    Mark a request as finished, including requests that raised.
+
+    Args:
+        exception (Exception): Unhandled exception, if any
+    """
+    if g.pop("request_in_progress", False):
+        REQUESTS_IN_PROGRESS.inc(-1)
+
+
+@app.before_request
+def start_request_profile():
+    """
+    Profile the request when profiling is enabled and it asks for it with ?profile=1.
+    """
+    if API_PROFILING_ENABLED and request.args.get('profile', '').lower() in ('1', 'true', 'yes'):
+        profiler = CProfileProfiler()
+        try:
+            profiler.start()
+        except ValueError as e:
+            # Another profiler is already active in this thread
+            logger.warning(f"Cannot profile request: {str(e)}")
+            return
+        g.request_profiler = profiler
+
+
+@app.after_request
+def return_request_profile(response):
+    """
+    Replace the response of a profiled request with its profile.
+
+    Args:
+        response (flask.Response): Response
+
+    Returns:
+        flask.Response: The profile, or the response unchanged if the request was not profiled
+    """
+    profiler = g.pop("request_profiler", None)
+    if profiler is None:
+        return response
+
+    profiler.stop()
+    return jsonify({
+        "endpoint": request.path,
+        "response_status": response.status_code,
+        "response_bytes": response.calculate_content_length(),
+        "duration": profiler.duration,
+        "profile": profiler.top(int(request.args.get('profile_top', PROFILE_TOP_N)))
+    })
+
+
+def get_model_registry(registry_class):
+    """
+    Get the registry shared by the requests, reloaded when its file changes.
+
+    Args:
+        registry_class (type): ModelRegistry or ScoreModelRegistry
+
+    Returns:
+        ModelRegistry: Registry
+    """
+    with _registries_lock:
+        registry = _registries.get(registry_class)
+        if registry is None:
+            registry = _registries[registry_class] = registry_class(MODELS_DIR)
+        else:
+            registry.reload_if_changed()
+        return registry
+
+
+def preload_state():
+    """
+    Load everything the requests read ahead of the first request.
+
+    The production server calls this before forking its workers, so they
+    share the loaded modules and data copy-on-write.
+
+    Returns:
+        dict: What was loaded
+    """
+    # The refresh service imports the model libraries
+    import services.refresh_service  # noqa: F401
+
+    loaded = {
+        "snapshots": snapshots.preload([PREDICTIONS_FILE, UPCOMING_MATCHES_FILE, PLAYER_STATS_FILE,
+                                        PREDICTION_HISTORY_FILE]),
+        "registries": [],
+        "evaluation_stats": load_evaluation_stats() is not None
+    }
+    for registry_class in (ModelRegistry, ScoreModelRegistry):
+        registry = get_model_registry(registry_class)
+        loaded["registries"].append(f"{registry_class.__name__} ({len(registry.list_models())} models)")
+
+    logger.info(f"Preloaded {loaded['snapshots']} data files, {', '.join(loaded['registries'])} "
+                f"and {'the' if loaded['evaluation_stats'] else 'no'} evaluation statistics")
+    return loaded
+
+
+def build_stats(predictions, include_players=False):
+    """
+    Calculate the prediction statistics served by /api/stats.
+
+    Args:
+        predictions (list): Predictions for upcoming matches
+        include_players (bool): Whether to include the per-player evaluation breakdown
+
+    Returns:
+        dict: Statistics
+    """
+    # Calculate statistics
+    total_matches = len(predictions)
+    home_wins_predicted = sum(1 for match in predictions if match.get("prediction", {}).get("predicted_winner") == "home")
+    away_wins_predicted = total_matches - home_wins_predicted
+
+    # Calculate average confidence
+    confidences = [match.get("prediction", {}).get("confidence", 0) for match in predictions]
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+
+    # Prefer the accuracy of evaluated predictions, live before backfilled
+    model_accuracy = 0.5  # Default value
+    accuracy_source = "default"
+    evaluation = load_evaluation_stats()
+    for source in ("live", "backfill"):
+        overall = (evaluation or {}).get("overall", {}).get(source)
+        if overall and overall.get("accuracy") is not None:
+            model_accuracy = overall["accuracy"]
+            accuracy_source = source
+            break
+
+    # Fall back to the training accuracy from the registry
+    if accuracy_source == "default":
+        try:
+            registry = get_model_registry(ModelRegistry)
+            best_model = registry.get_best_model_info()
+            if best_model:
+                model_accuracy = best_model.get("accuracy", 0.5)
+                accuracy_source = "training"
+        except Exception as e:
+            logger.error(f"Error retrieving model accuracy: {str(e)}")
+
+    stats = {
+        "total_matches": total_matches,
+        "home_wins_predicted": home_wins_predicted,
+        "away_wins_predicted": away_wins_predicted,
+        "avg_confidence": avg_confidence,
+        "model_accuracy": model_accuracy,
+        "accuracy_source": accuracy_source,
+        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+    # Evaluation aggregates; the per-player breakdown is large, so it is opt-in
+    if evaluation:
+        stats["evaluation"] = {
+            key: value for key, value in evaluation.items()
+            if key != "players" or include_players
+        }
+
+    return stats
+
 
 @app.route('/api/predictions', methods=['GET'])
 @log_execution_time(logger)
@@ -48,27 +266,27 @@ def get_predictions():
         flask.Response: JSON response with predictions
     """
     try:
-        # Check if predictions file exists
-        if not Path(PREDICTIONS_FILE).exists():
+        # Read predictions from the file's snapshot
+        predictions = load_json_snapshot(PREDICTIONS_FILE)
+        if predictions is None:
             # Return empty list if file doesn't exist
             logger.warning(f"Predictions file not found: {PREDICTIONS_FILE}")
             return jsonify([])
-
-        # Read predictions from file
-        with open(PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
-            predictions = json.load(f)
-            logger.info(f"Loaded {len(predictions)} predictions from {PREDICTIONS_FILE}")
+        logger.info(f"Loaded {len(predictions)} predictions from {PREDICTIONS_FILE}")
 
         # Add debug information about match dates
+        fetched_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        response = []
         for match in predictions:
             logger.info(f"Match {match.get('fixtureId')}: {match.get('fixtureStart')}")
 
             # Add a timestamp to each prediction to indicate when it was fetched
-            match['fetched_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # (to a copy, the snapshot is shared between requests)
+            response.append(dict(match, fetched_at=fetched_at))
 
         # Return all matches with their timezone information
-        logger.info(f"Returning {len(predictions)} matches")
-        return jsonify(predictions)
+        logger.info(f"Returning {len(response)} matches")
+        return jsonify(response)
     except Exception as e:
         logger.error(f"Error retrieving predictions: {str(e)}")
         # Return empty list on error
@@ -86,8 +304,9 @@ def get_score_predictions():
         flask.Response: JSON response with score predictions
     """
     try:
-        # Check if predictions file exists
-        if not Path(PREDICTIONS_FILE).exists():
+        # Read predictions from the file's snapshot
+        predictions = load_json_snapshot(PREDICTIONS_FILE)
+        if predictions is None:
             # Return empty list if file doesn't exist
             logger.warning(f"Predictions file not found: {PREDICTIONS_FILE}")
             return jsonify({
@@ -96,11 +315,7 @@ def get_score_predictions():
                     "model_accuracy": 10.0  # Default value
                 }
             })
-
-        # Read predictions from file
-        with open(PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
-            predictions = json.load(f)
-            logger.info(f"Loaded {len(predictions)} predictions from {PREDICTIONS_FILE}")
+        logger.info(f"Loaded {len(predictions)} predictions from {PREDICTIONS_FILE}")
 
         # For demo purposes, return all matches regardless of date
         logger.info(f"Returning {len(predictions)} matches")
@@ -108,7 +323,7 @@ def get_score_predictions():
         # Get score model accuracy from registry
         score_model_accuracy = 10.0  # Default value
         try:
-            registry = ScoreModelRegistry(MODELS_DIR)
+            registry = get_model_registry(ScoreModelRegistry)
             best_model = registry.get_best_model_info()
             if best_model:
                 score_model_accuracy = best_model.get("total_score_mae", 10.0)
@@ -144,16 +359,13 @@ def get_upcoming_matches():
         flask.Response: JSON response with upcoming matches
     """
     try:
-        # Check if upcoming matches file exists
-        if not Path(UPCOMING_MATCHES_FILE).exists():
+        # Read upcoming matches from the file's snapshot
+        upcoming_matches = load_json_snapshot(UPCOMING_MATCHES_FILE)
+        if upcoming_matches is None:
             # Return empty list if file doesn't exist
             logger.warning(f"Upcoming matches file not found: {UPCOMING_MATCHES_FILE}")
             return jsonify([])
-
-        # Read upcoming matches from file
-        with open(UPCOMING_MATCHES_FILE, 'r', encoding='utf-8') as f:
-            upcoming_matches = json.load(f)
-            logger.info(f"Loaded {len(upcoming_matches)} upcoming matches from {UPCOMING_MATCHES_FILE}")
+        logger.info(f"Loaded {len(upcoming_matches)} upcoming matches from {UPCOMING_MATCHES_FILE}")
 
         # For demo purposes, return all matches regardless of date
         logger.info(f"Returning {len(upcoming_matches)} matches")
@@ -179,17 +391,14 @@ def get_prediction_history():
         player_filter = request.args.get('player', '')
         date_filter = request.args.get('date', '')
 
-        # Check if prediction history file exists
-        if not Path(PREDICTION_HISTORY_FILE).exists():
+        # Read prediction history from the file's snapshot
+        predictions = load_json_snapshot(PREDICTION_HISTORY_FILE)
+        if predictions is None:
             # Return empty list if file doesn't exist
             return jsonify({
                 "predictions": []
             })
 
-        # Read prediction history from file
-        with open(PREDICTION_HISTORY_FILE, 'r', encoding='utf-8') as f:
-            predictions = json.load(f)
-
         # Apply filters
         filtered_predictions = predictions
         if player_filter:
@@ -227,8 +436,9 @@ def get_stats():
         flask.Response: JSON response with statistics
     """
     try:
-        # Check if predictions file exists
-        if not Path(PREDICTIONS_FILE).exists():
+        # Read predictions from the file's snapshot
+        predictions = load_json_snapshot(PREDICTIONS_FILE)
+        if predictions is None:
             # Return default stats if file doesn't exist
             return jsonify({
                 "total_matches": 0,
@@ -239,37 +449,8 @@ def get_stats():
                 "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             })
 
-        # Read predictions from file
-        with open(PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
-            predictions = json.load(f)
-
-        # Calculate statistics
-        total_matches = len(predictions)
-        home_wins_predicted = sum(1 for match in predictions if match.get("prediction", {}).get("predicted_winner") == "home")
-        away_wins_predicted = total_matches - home_wins_predicted
-
-        # Calculate average confidence
-        confidences = [match.get("prediction", {}).get("confidence", 0) for match in predictions]
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-
-        # Get model accuracy from registry
-        model_accuracy = 0.5  # Default value
-        try:
-            registry = ModelRegistry(MODELS_DIR)
-            best_model = registry.get_best_model_info()
-            if best_model:
-                model_accuracy = best_model.get("accuracy", 0.5)
-        except Exception as e:
-            logger.error(f"Error retrieving model accuracy: {str(e)}")
-
-        return jsonify({
-            "total_matches": total_matches,
-            "home_wins_predicted": home_wins_predicted,
-            "away_wins_predicted": away_wins_predicted,
-            "avg_confidence": avg_confidence,
-            "model_accuracy": model_accuracy,
-            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
+        include_players = request.args.get('players', '').lower() in ('1', 'true', 'yes')
+        return jsonify(build_stats(predictions, include_players))
     except Exception as e:
         logger.error(f"Error retrieving stats: {str(e)}")
         # Return default stats on error
@@ -294,23 +475,19 @@ def get_player_stats():
         flask.Response: JSON response with player statistics
     """
     try:
-        # Check if player stats file exists
-        if not Path(PLAYER_STATS_FILE).exists():
+        # Read player stats from the file's snapshot
+        player_stats = load_json_snapshot(PLAYER_STATS_FILE)
+        if player_stats is None:
             # Return empty list if file doesn't exist
             logger.warning(f"Player stats file not found: {PLAYER_STATS_FILE}")
             return jsonify([])
-
-        # Read player stats from file
-        with open(PLAYER_STATS_FILE, 'r', encoding='utf-8') as f:
-            player_stats = json.load(f)
-            logger.info(f"Loaded statistics for {len(player_stats)} players from {PLAYER_STATS_FILE}")
+        logger.info(f"Loaded statistics for {len(player_stats)} players from {PLAYER_STATS_FILE}")
 
         # Convert to list of player stats
         stats_list = []
         for player_id, stats in player_stats.items():
-            # Add player ID to stats
-            stats['id'] = player_id
-            stats_list.append(stats)
+            # Add player ID to a copy of the stats, the snapshot is shared between requests
+            stats_list.append(dict(stats, id=player_id))
 
         # Sort by win rate (descending)
         stats_list.sort(key=lambda x: x.get('win_rate', 0), reverse=True)
@@ -330,140 +507,199 @@ def refresh_data():
     """
     Trigger data refresh and prediction update.
 
+    The refresh runs in the background on the in-process job queue. Requests
+    made while a refresh is already waiting to run are merged into it.
+
     Returns:
-        flask.Response: JSON response with refresh status
+        flask.Response: JSON response with the refresh job
     """
     try:
-        # Run the prediction refresh process
-        # In a real implementation, this would call a function to refresh predictions
-        # For now, we'll just return a success message
-
-        # Create a temporary script to run the refresh process
-        script_path = Path(__file__).parent / "refresh_script.py"
-        with open(script_path, 'w', encoding='utf-8') as f:
-            f.write("""
-import sys
-import os
-import traceback
-import time
+        force = request.args.get('force', '').lower() in ('1', 'true', 'yes')
+        job = refresh_jobs.submit(force=force)
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-# Import refresh function and logging
-from services.refresh_service import refresh_predictions
-from config.logging_config import get_prediction_refresh_logger
-
-# Initialize logger
-logger = get_prediction_refresh_logger()
-
-try:
-    # Log start time
-    start_time = time.time()
-    logger.info(f"Refresh script started with PID: {os.getpid()}")
-
-    # Run refresh
-    success = refresh_predictions()
-
-    # Log completion
-    end_time = time.time()
-    duration = end_time - start_time
-
-    if success:
-        logger.info(f"Refresh completed successfully in {duration:.2f} seconds")
-    else:
-        logger.error(f"Refresh failed after {duration:.2f} seconds")
-
-    # Exit with appropriate code
-    sys.exit(0 if success else 1)
-except Exception as e:
-    # Log any unhandled exceptions
-    logger.error(f"Unhandled exception in refresh script: {str(e)}")
-    logger.error(traceback.format_exc())
-    sys.exit(1)
-            """)
-
-        # Run the script in a separate process
-        process = subprocess.Popen(
-            ["python", str(script_path)],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        # Log the process ID for debugging
-        logger.info(f"Started refresh process with PID: {process.pid}")
-
-        # Create a background thread to monitor the process
-        def monitor_process():
-            try:
-                # Wait for the process to complete (with a timeout)
-                try:
-                    stdout, stderr = process.communicate(timeout=5)
-                    if stdout:
-                        logger.info(f"Refresh process stdout: {stdout}")
-                    if stderr:
-                        logger.error(f"Refresh process stderr: {stderr}")
-                except subprocess.TimeoutExpired:
-                    # Process is still running, which is expected for longer refreshes
-                    logger.info(f"Refresh process {process.pid} is still running (expected)")
-
-                # Check if the process is still running after the timeout
-                if process.poll() is None:
-                    logger.info(f"Refresh process {process.pid} is running in the background")
-                else:
-                    # Process completed quickly
-                    exit_code = process.returncode
-                    logger.info(f"Refresh process completed with exit code: {exit_code}")
-
-                    # Check if there was any output
-                    stdout, stderr = process.communicate()
-                    if stdout:
-                        logger.info(f"Refresh process stdout: {stdout}")
-                    if stderr:
-                        logger.error(f"Refresh process stderr: {stderr}")
-            except Exception as e:
-                logger.error(f"Error monitoring refresh process: {str(e)}")
-
-        # Start the monitoring thread
-        monitor_thread = threading.Thread(target=monitor_process)
-        monitor_thread.daemon = True
-        monitor_thread.start()
-
-        return jsonify({"status": "success", "message": "Refresh process started"})
+        logger.info(f"Refresh request served by job {job.job_id} ({job.status})")
+        return jsonify({
+            "status": "success",
+            "message": "Refresh job queued",
+            "job": job.to_dict()
+        }), 202
     except Exception as e:
         logger.error(f"Error refreshing data: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route('/api/refresh/<job_id>', methods=['GET'])
+@log_exceptions(logger)
+def get_refresh_job(job_id):
+    """
+    Get the status of a refresh job.
+
+    Args:
+        job_id (str): Refresh job ID
+
+    Returns:
+        flask.Response: JSON response with the job status and per-stage timings
+    """
+    job = refresh_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Refresh job {job_id} not found"}), 404
+
+    return jsonify(job.to_dict())
+
+
+def format_event(event, data, event_id=None):
+    """
+    Format a server-sent event.
+
+    Args:
+        event (str): Event type
+        data (dict): Event data
+        event_id (int): Event ID, omitted for events that cannot be resumed from
+
+    Returns:
+        str: Event in the text/event-stream format
+    """
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def stream_events(last_id):
+    """
+    Generate the server-sent events published after an event.
+
+    Args:
+        last_id (int): ID of the last event the client received, or None to start with the next event
+
+    Yields:
+        str: Formatted events and keep-alive comments
+    """
+    yield f"retry: {SSE_RETRY}\n\n"
+    if last_id is None:
+        last_id = event_log.last_id()
+        yield format_event("ready", {"last_event_id": last_id}, last_id)
+
+    deadline = time.monotonic() + SSE_STREAM_TIMEOUT
+    last_write = time.monotonic()
+    while time.monotonic() < deadline:
+        events, complete = event_log.events_since(last_id)
+        if not complete:
+            # Events the client missed are gone, it has to reload everything
+            last_id = events[-1]["id"] if events else 0
+            events = []
+            yield format_event("reset", {"last_event_id": last_id}, last_id)
+            last_write = time.monotonic()
+
+        for event in events:
+            yield format_event(event["event"], event["data"], event["id"])
+            last_id = event["id"]
+            last_write = time.monotonic()
+
+        if any(event["event"] in ("predictions", "evaluation") for event in events):
+            yield format_event("stats", build_stats(load_json_snapshot(PREDICTIONS_FILE, [])))
+
+        if time.monotonic() - last_write >= SSE_KEEPALIVE_INTERVAL:
+            yield ": keep-alive\n\n"
+            last_write = time.monotonic()
+
+        time.sleep(SSE_POLL_INTERVAL)
+
+
+@app.route('/api/events', methods=['GET'])
+@log_exceptions(logger)
+def get_events():
+    """
+    Stream update events (server-sent events).
+
+    The refresh pipelines publish the upcoming matches, predictions and
+    prediction history entries that were added, changed or removed, and the
+    evaluation aggregates when they change; prediction and evaluation events
+    are followed by the new /api/stats statistics. A client resumes after
+    the last event it received with the Last-Event-ID header, which browsers
+    send when they reconnect, or the last_event_id parameter; without either
+    the stream starts with the next event. A "reset" event means events the
+    client missed are gone and it has to reload everything.
+
+    The stream ends after SSE_STREAM_TIMEOUT seconds, and browsers reconnect
+    on their own. Every open stream takes a request thread, so a process
+    serves at most SSE_MAX_STREAMS streams at a time; beyond that the
+    request is answered with 503 and a Retry-After header.
+
+    Returns:
+        flask.Response: Event stream
+    """
+    if not event_streams.acquire(blocking=False):
+        logger.warning("Event stream refused, too many open streams")
+        return jsonify({"status": "error", "message": "Too many open event streams, retry later"}), 503, {
+            "Retry-After": str(SSE_BUSY_RETRY_AFTER)
+        }
+
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        # Resuming from an unknown event, which makes the stream start with a reset
+        last_id = -1
+
+    try:
+        response = Response(stream_events(last_id), content_type="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    except Exception:
+        event_streams.release()
+        raise
+
+    # Free the slot when the server closes the stream, also if the client went away before it started
+    response.call_on_close(event_streams.release)
+    return response
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Get the API and refresh metrics.
+
+    Under the production server these are the metrics of all its workers.
+
+    Returns:
+        flask.Response: Metrics in the Prometheus text exposition format
+    """
+    text = metrics.render() if shared_metrics is None else shared_metrics.render()
+    return Response(text, content_type=PROMETHEUS_CONTENT_TYPE)
+
+
 def refresh_predictions_periodically():
     """
     Periodically refresh predictions in the background.
+
+    Refresh times follow the fixture calendar (see RefreshScheduler) and go
+    through the refresh job queue, so scheduled and manual refreshes never overlap.
     """
-    import time
-    while True:
-        try:
-            # Wait for 1 hour
-            time.sleep(3600)
+    scheduler = RefreshScheduler(refresh_jobs)
+    scheduler.run_forever()
 
-            logger.info("Starting scheduled prediction refresh")
 
-            # Run the prediction refresh process
-            # In a real implementation, this would call a function to refresh predictions
-            # For now, we'll just log a message
-            logger.info("Scheduled prediction refresh completed")
+def start_refresh_thread():
+    """
+    Start the background refresh thread.
 
-        except Exception as e:
-            logger.error(f"Error in refresh cycle: {e}")
+    Returns:
+        threading.Thread: Refresh thread
+    """
+    refresh_thread = threading.Thread(target=refresh_predictions_periodically, name="refresh-scheduler", daemon=True)
+    refresh_thread.start()
+    return refresh_thread
 
 
 def run_api_server():
     """
     Run the API server.
+
+    This is the development server, handling requests in a single process;
+    app/serve.py runs the API with several worker processes.
     """
     # Start the background refresh thread
-    refresh_thread = threading.Thread(target=refresh_predictions_periodically, daemon=True)
-    refresh_thread.start()
+    start_refresh_thread()
 
     # Run the Flask app
     app.run(host=API_HOST, port=API_PORT)
@@ -5,7 +5,9 @@ Command-line interface for the 2K Flash application.
 import argparse
 import sys
 import os
+import runpy
 import subprocess
+from datetime import datetime
 from pathlib import Path
 
 # Add parent directory to path
@@ -14,8 +16,16 @@ backend_dir = current_dir.parent
 sys.path.append(str(backend_dir))
 
 from config.logging_config import get_data_fetcher_logger
-from config.settings import DEFAULT_RANDOM_STATE
+from config.settings import (
+    DEFAULT_RANDOM_STATE, BACKTEST_WINDOW_DAYS, BACKTEST_RETRAIN_EVERY, BACKTEST_REFIT_EVERY,
+    BACKTEST_MIN_TRAIN_MATCHES, BACKFILL_WORKERS, BACKFILL_CHUNK_SIZE, MODEL_COMPARISON_HOLDOUT_DAYS,
+    MODEL_COMPARISON_WORKERS, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_N, MEMORY_TOP_N,
+    MEMORY_TRACE_FRAMES
+)
 from utils.logging import log_execution_time, log_exceptions
+from utils.instrumentation import dump_summary
+from utils.profiling import PROFILERS, create_profiler, save_profile
+from utils.memory import MemoryTracker, memory_stage, save_memory_report
 from core.data.fetchers import TokenFetcher
 from core.data.fetchers.match_history import MatchHistoryFetcher
 from core.data.fetchers.upcoming_matches import UpcomingMatchesFetcher
@@ -23,9 +33,38 @@ from core.data.processors.player_stats import PlayerStatsProcessor
 from core.models.winner_prediction import WinnerPredictionModel
 from core.models.score_prediction import ScorePredictionModel
 from core.models.registry import ModelRegistry, ScoreModelRegistry
+from core.models.backtest import WalkForwardBacktester, save_backtest_report
+from core.models.tournament import ModelTournament
+from services.backfill_service import BackfillService
+from services.refresh_service import RefreshService
 
 logger = get_data_fetcher_logger()
 
+# Whether scripts run in this process instead of a subprocess (set while profiling)
+_run_scripts_in_process = False
+
+
+def run_script(cmd):
+    """
+    Run a Python script command, in a subprocess or, while profiling, in this process.
+
+    Args:
+        cmd (list): Command (interpreter, script path and arguments)
+    """
+    print(f"Running command: {' '.join(cmd)}")
+    if not _run_scripts_in_process:
+        subprocess.run(cmd)
+        return
+
+    saved_argv = sys.argv
+    sys.argv = cmd[1:]
+    try:
+        runpy.run_path(cmd[1], run_name="__main__")
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = saved_argv
+
 
 @log_execution_time(logger)
 @log_exceptions(logger)
@@ -103,7 +142,8 @@ def train_winner_model(args):
     """
     # Load match history
     match_fetcher = MatchHistoryFetcher()
-    matches = match_fetcher.load_from_file()
+    with memory_stage("load_match_history"):
+        matches = match_fetcher.load_from_file()
 
     if not matches:
         print("No match history data found. Please fetch match history first.")
@@ -111,7 +151,8 @@ def train_winner_model(args):
 
     # Load player stats
     processor = PlayerStatsProcessor()
-    player_stats = processor.load_from_file()
+    with memory_stage("load_player_stats"):
+        player_stats = processor.load_from_file()
 
     if not player_stats:
         print("No player statistics found. Please calculate player statistics first.")
@@ -119,10 +160,12 @@ def train_winner_model(args):
 
     # Train model
     model = WinnerPredictionModel()
-    model.train(player_stats, matches)
+    with memory_stage("train"):
+        model.train(player_stats, matches)
 
     # Save model
-    model_path, info_path = model.save()
+    with memory_stage("save"):
+        model_path, info_path = model.save()
 
     # Register model
     registry = ModelRegistry()
@@ -143,7 +186,8 @@ def train_score_model(args):
     """
     # Load match history
     match_fetcher = MatchHistoryFetcher()
-    matches = match_fetcher.load_from_file()
+    with memory_stage("load_match_history"):
+        matches = match_fetcher.load_from_file()
 
     if not matches:
         print("No match history data found. Please fetch match history first.")
@@ -151,7 +195,8 @@ def train_score_model(args):
 
     # Load player stats
     processor = PlayerStatsProcessor()
-    player_stats = processor.load_from_file()
+    with memory_stage("load_player_stats"):
+        player_stats = processor.load_from_file()
 
     if not player_stats:
         print("No player statistics found. Please calculate player statistics first.")
@@ -159,10 +204,12 @@ def train_score_model(args):
 
     # Train model
     model = ScorePredictionModel()
-    model.train(player_stats, matches)
+    with memory_stage("train"):
+        model.train(player_stats, matches)
 
     # Save model
-    model_path, info_path = model.save()
+    with memory_stage("save"):
+        model_path, info_path = model.save()
 
     # Register model
     registry = ScoreModelRegistry()
@@ -224,8 +271,7 @@ def optimize_score_model(args):
         "--random-state", str(args.random_state)
     ]
 
-    print(f"Running command: {' '.join(cmd)}")
-    subprocess.run(cmd)
+    run_script(cmd)
 
 
 @log_execution_time(logger)
@@ -248,8 +294,7 @@ def optimize_winner_model(args):
         "--random-state", str(args.random_state)
     ]
 
-    print(f"Running command: {' '.join(cmd)}")
-    subprocess.run(cmd)
+    run_script(cmd)
 
 
 @log_execution_time(logger)
@@ -273,13 +318,171 @@ def clean_model_registry(args):
     if args.keep_files:
         cmd.append("--keep-files")
 
-    print(f"Running command: {' '.join(cmd)}")
-    subprocess.run(cmd)
+    run_script(cmd)
 
 
-def main():
+@log_execution_time(logger)
+@log_exceptions(logger)
+def run_backtest(args):
     """
-    Main entry point for the CLI.
+    Run a walk-forward backtest over the match history.
+
+    Args:
+        args (argparse.Namespace): Command-line arguments
+    """
+    # Load match history
+    match_fetcher = MatchHistoryFetcher()
+    matches = match_fetcher.load_from_file()
+
+    if not matches:
+        print("No match history data found. Please fetch match history first.")
+        return
+
+    backtester = WalkForwardBacktester(
+        window_days=args.window_days,
+        retrain_every=args.retrain_every,
+        refit_every=args.refit_every,
+        min_train_matches=args.min_train_matches,
+        model_types=args.models,
+        random_state=args.random_state
+    )
+    report = backtester.run(
+        matches,
+        start=datetime.strptime(args.start, "%Y-%m-%d") if args.start else None,
+        end=datetime.strptime(args.end, "%Y-%m-%d") if args.end else None
+    )
+    report_path = save_backtest_report(report)
+
+    print(f"{'Window start':<20} {'Matches':>7} {'Training':>8} {'Accuracy':>8} {'Total MAE':>9} {'Seconds':>7}")
+    for window in report["windows"]:
+        accuracy = window.get("winner_accuracy")
+        mae = window.get("total_score_mae")
+        print(f"{window['start'][:16]:<20} {window['matches']:>7} {window['training'] or '-':>8} "
+              f"{'-' if accuracy is None else f'{accuracy:.4f}':>8} {'-' if mae is None else f'{mae:.2f}':>9} "
+              f"{window['train_seconds'] + window['predict_seconds']:>7.2f}")
+
+    summary = report["summary"]
+    print(f"Scored {summary['matches']} matches in {summary['windows']} windows "
+          f"({report['timing']['total_seconds']:.1f} seconds)")
+    if "winner_accuracy" in summary:
+        print(f"Winner accuracy: {summary['winner_accuracy']:.4f}, Brier score: {summary['winner_brier']:.4f}")
+    if "total_score_mae" in summary:
+        print(f"Total score MAE: {summary['total_score_mae']:.2f}")
+    print(f"Report saved to {report_path}")
+
+
+@log_execution_time(logger)
+@log_exceptions(logger)
+def backfill_prediction_history(args):
+    """
+    Backfill the prediction history with the best models' predictions for completed matches.
+
+    Args:
+        args (argparse.Namespace): Command-line arguments
+    """
+    # Load match history
+    match_fetcher = MatchHistoryFetcher()
+    matches = match_fetcher.load_from_file()
+
+    if not matches:
+        print("No match history data found. Please fetch match history first.")
+        return
+
+    service = BackfillService(workers=args.workers, chunk_size=args.chunk_size)
+    summary = service.backfill(
+        matches,
+        start=datetime.strptime(args.start, "%Y-%m-%d") if args.start else None,
+        end=datetime.strptime(args.end, "%Y-%m-%d") if args.end else None
+    )
+
+    if summary is None:
+        print("No trained models found. Please train the winner and score models first.")
+        return
+
+    print(f"Backfilled {summary['predictions']} predictions in {summary['seconds']:.1f} seconds")
+    if summary['predictions']:
+        print(f"Accuracy: {summary['accuracy']:.4f}, total score MAE: {summary['total_score_mae']:.2f}")
+
+
+@log_execution_time(logger)
+@log_exceptions(logger)
+def compare_models(args):
+    """
+    Score every registered model on a common holdout window and store the metrics in the registries.
+
+    Args:
+        args (argparse.Namespace): Command-line arguments
+    """
+    # Load match history
+    match_fetcher = MatchHistoryFetcher()
+    matches = match_fetcher.load_from_file()
+
+    if not matches:
+        print("No match history data found. Please fetch match history first.")
+        return
+
+    tournament = ModelTournament(holdout_days=args.holdout_days, workers=args.workers, model_types=args.models)
+    report = tournament.run(
+        matches,
+        start=datetime.strptime(args.start, "%Y-%m-%d") if args.start else None,
+        end=datetime.strptime(args.end, "%Y-%m-%d") if args.end else None,
+        promote=args.promote
+    )
+
+    window = report["window"]
+    print(f"Holdout: {window['matches']} matches from {window['start']} to {window['end']}")
+
+    for model_type, models in report["models"].items():
+        metric = "Accuracy" if model_type == "winner" else "Total MAE"
+        print(f"\n{model_type.capitalize()} models:")
+        print(f"{'Model ID':<15} {metric:>9} {'Brier/MAE':>9} {'Batch ms':>9} {'Single ms':>9}")
+        for m in models:
+            if "error" in m:
+                print(f"{m['model_id']:<15} {m['error']}")
+            elif model_type == "winner":
+                print(f"{m['model_id']:<15} {m['accuracy']:>9.4f} {m['brier_score']:>9.4f} "
+                      f"{m['batch_ms_per_match']:>9.4f} {m['single_match_ms']:>9.3f}")
+            else:
+                print(f"{m['model_id']:<15} {m['total_score_mae']:>9.2f} {m['home_score_mae']:>9.2f} "
+                      f"{m['batch_ms_per_match']:>9.4f} {m['single_match_ms']:>9.3f}")
+        if model_type in report["best"]:
+            action = "promoted to best model" if args.promote else "best on the holdout"
+            print(f"{report['best'][model_type]} {action}")
+
+    print(f"\nCompared in {report['timing']['total_seconds']:.1f} seconds "
+          f"({report['timing']['feature_seconds']:.1f} seconds extracting features)")
+
+
+@log_execution_time(logger)
+@log_exceptions(logger)
+def refresh(args):
+    """
+    Refresh data and predictions through the refresh pipelines.
+
+    Args:
+        args (argparse.Namespace): Command-line arguments
+    """
+    service = RefreshService()
+
+    if not args.predictions_only and not service.refresh_data(force=args.force):
+        print("Data refresh failed, see the prediction refresh log for details")
+        return
+
+    if not args.data_only and not service.refresh_predictions(force=args.force):
+        print("Prediction refresh failed, see the prediction refresh log for details")
+        return
+
+    for pipeline in (service.data_pipeline, service.prediction_pipeline):
+        for stage in pipeline.last_report:
+            print(f"{pipeline.name}.{stage['stage']}: {stage['status']} ({stage.get('duration', 0):.2f} seconds)")
+
+
+def build_parser():
+    """
+    Build the command-line parser.
+
+    Returns:
+        argparse.ArgumentParser: Parser
     """
     parser = argparse.ArgumentParser(description='2K Flash CLI')
     subparsers = parser.add_subparsers(dest='command', help='Command to run')
@@ -326,8 +529,66 @@ def main():
     clean_registry_parser.add_argument('--min-samples', type=int, default=100, help='Minimum number of samples required for a model to be considered valid')
     clean_registry_parser.add_argument('--keep-files', action='store_true', help='Keep model files on disk')
 
-    args = parser.parse_args()
+    # Walk-forward backtest
+    backtest_parser = subparsers.add_parser('backtest', help='Run a walk-forward backtest over the match history')
+    backtest_parser.add_argument('--window-days', type=float, default=BACKTEST_WINDOW_DAYS, help='Days of matches scored per step')
+    backtest_parser.add_argument('--retrain-every', type=int, default=BACKTEST_RETRAIN_EVERY, help='Windows between full retrains')
+    backtest_parser.add_argument('--refit-every', type=int, default=BACKTEST_REFIT_EVERY, help='Windows between refits that keep the feature selection (0 to disable)')
+    backtest_parser.add_argument('--min-train-matches', type=int, default=BACKTEST_MIN_TRAIN_MATCHES, help='Matches played before the first scored window')
+    backtest_parser.add_argument('--models', nargs='+', choices=['winner', 'score'], default=['winner', 'score'], help='Models to backtest')
+    backtest_parser.add_argument('--start', help='Start of the first scored window (YYYY-MM-DD)')
+    backtest_parser.add_argument('--end', help='End of the backtest (YYYY-MM-DD)')
+    backtest_parser.add_argument('--random-state', type=int, default=DEFAULT_RANDOM_STATE, help='Random state for reproducibility')
+
+    # Prediction history backfill
+    backfill_parser = subparsers.add_parser('backfill-history', help='Backfill prediction history for completed matches')
+    backfill_parser.add_argument('--start', help='First fixture date to backfill (YYYY-MM-DD)')
+    backfill_parser.add_argument('--end', help='Fixture date to stop before (YYYY-MM-DD)')
+    backfill_parser.add_argument('--workers', type=int, default=BACKFILL_WORKERS, help='Worker processes')
+    backfill_parser.add_argument('--chunk-size', type=int, default=BACKFILL_CHUNK_SIZE, help='Matches predicted per chunk')
+
+    # Model comparison
+    compare_parser = subparsers.add_parser('compare-models', help='Score every registered model on a common holdout window')
+    compare_parser.add_argument('--holdout-days', type=float, default=MODEL_COMPARISON_HOLDOUT_DAYS, help='Days of most recent matches in the holdout')
+    compare_parser.add_argument('--start', help='Start of the holdout (YYYY-MM-DD), overrides --holdout-days')
+    compare_parser.add_argument('--end', help='End of the holdout (YYYY-MM-DD)')
+    compare_parser.add_argument('--models', nargs='+', choices=['winner', 'score'], default=['winner', 'score'], help='Models to compare')
+    compare_parser.add_argument('--workers', type=int, default=MODEL_COMPARISON_WORKERS, help='Worker processes')
+    compare_parser.add_argument('--promote', action='store_true', help='Make the best model on the holdout the best model in the registry')
+
+    # Refresh pipelines
+    refresh_parser = subparsers.add_parser('refresh', help='Refresh data and predictions')
+    refresh_parser.add_argument('--force', action='store_true', help='Rerun stages whose inputs are unchanged')
+    refresh_scope = refresh_parser.add_mutually_exclusive_group()
+    refresh_scope.add_argument('--data-only', action='store_true', help='Only refresh the data')
+    refresh_scope.add_argument('--predictions-only', action='store_true', help='Only refresh the predictions')
+
+    # Profiler wrapper
+    profile_parser = subparsers.add_parser('profile', help='Run another command under a profiler')
+    profile_parser.add_argument('--profiler', choices=PROFILERS, default='sampling', help='Sampling profiler (all threads, collapsed stacks) or cProfile (calling thread, .prof file)')
+    profile_parser.add_argument('--interval', type=float, default=PROFILE_SAMPLE_INTERVAL, help='Seconds between samples of the sampling profiler')
+    profile_parser.add_argument('--top', type=int, default=PROFILE_TOP_N, help='Functions in the top-N table')
+    profile_parser.add_argument('--output-dir', default=str(PROFILE_DIR), help='Directory for the profile files')
+    profile_parser.add_argument('profiled_command', nargs=argparse.REMAINDER, help='Command to profile, with its arguments')
+
+    # Memory accounting wrapper
+    memory_parser = subparsers.add_parser('memory', help='Run another command with per-stage memory accounting')
+    memory_parser.add_argument('--top', type=int, default=MEMORY_TOP_N, help='Allocation sites reported per stage')
+    memory_parser.add_argument('--frames', type=int, default=MEMORY_TRACE_FRAMES, help='Stack frames recorded per allocation')
+    memory_parser.add_argument('--output-dir', default=str(PROFILE_DIR), help='Directory for the memory report')
+    memory_parser.add_argument('profiled_command', nargs=argparse.REMAINDER, help='Command to measure, with its arguments')
+
+    return parser
+
+
+def run_command(parser, args):
+    """
+    Run the command selected on the command line.
 
+    Args:
+        parser (argparse.ArgumentParser): Parser, for printing help
+        args (argparse.Namespace): Command-line arguments
+    """
     if args.command == 'fetch-token':
         fetch_token(args)
     elif args.command == 'fetch-history':
@@ -348,9 +609,96 @@ def main():
         optimize_winner_model(args)
     elif args.command == 'clean-model-registry':
         clean_model_registry(args)
+    elif args.command == 'backtest':
+        run_backtest(args)
+    elif args.command == 'backfill-history':
+        backfill_prediction_history(args)
+    elif args.command == 'compare-models':
+        compare_models(args)
+    elif args.command == 'refresh':
+        refresh(args)
+    elif args.command == 'profile':
+        profile_command(parser, args)
+    elif args.command == 'memory':
+        memory_command(parser, args)
     else:
         parser.print_help()
 
 
+def profile_command(parser, args):
+    """
+    Run another command under a profiler and write its profile.
+
+    Commands that run a script (the optimizers and the registry cleaner) run it
+    in this process while profiling, so that the script itself is profiled.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser, for parsing the profiled command
+        args (argparse.Namespace): Command-line arguments of the profile command
+    """
+    global _run_scripts_in_process
+
+    profiled_args = parser.parse_args(args.profiled_command)
+    if profiled_args.command in (None, 'profile', 'memory'):
+        parser.error("profile needs a command to profile, e.g. profile train-score-model")
+
+    profiler = create_profiler(args.profiler, args.interval)
+    _run_scripts_in_process = True
+    profiler.start()
+    try:
+        run_command(parser, profiled_args)
+    finally:
+        profiler.stop()
+        _run_scripts_in_process = False
+
+    paths = save_profile(profiler, profiled_args.command, args.output_dir, args.top)
+    print(profiler.table(args.top))
+    print(f"Profile of {profiled_args.command} ({profiler.duration:.1f} seconds) written to:")
+    for path in paths:
+        print(f"  {path}")
+
+
+def memory_command(parser, args):
+    """
+    Run another command with per-stage memory accounting and write the report.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser, for parsing the measured command
+        args (argparse.Namespace): Command-line arguments of the memory command
+    """
+    global _run_scripts_in_process
+
+    measured_args = parser.parse_args(args.profiled_command)
+    if measured_args.command in (None, 'profile', 'memory'):
+        parser.error("memory needs a command to measure, e.g. memory train-score-model")
+
+    tracker = MemoryTracker(args.top, args.frames)
+    _run_scripts_in_process = True
+    tracker.start()
+    try:
+        with memory_stage(measured_args.command):
+            run_command(parser, measured_args)
+    finally:
+        tracker.stop()
+        _run_scripts_in_process = False
+
+    paths = save_memory_report(tracker, measured_args.command, args.output_dir)
+    print(tracker.table())
+    print(f"Memory report of {measured_args.command} written to:")
+    for path in paths:
+        print(f"  {path}")
+
+
+def main():
+    """
+    Main entry point for the CLI.
+    """
+    parser = build_parser()
+    args = parser.parse_args()
+    run_command(parser, args)
+
+    dump_summary(logger, title=f"Instrumentation summary of {args.command}")
+
+
 if __name__ == '__main__':
     main()
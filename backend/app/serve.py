@@ -0,0 +1,198 @@
+"""
+Production server for the 2K Flash API.
+
+Runs the API under gunicorn with several worker processes, each handling
+requests on a pool of threads:
+
+    python app/serve.py                          # API_WORKERS workers on API_HOST:API_PORT
+    python app/serve.py --workers 4 --threads 8
+
+The master process imports the application, including the model libraries,
+and preloads the data files, model registries and evaluation statistics
+before it forks the workers, so they start ready and share that memory
+copy-on-write. The preloaded objects are frozen out of the garbage collector,
+whose bookkeeping would otherwise write to, and so copy, their pages. A
+worker parses a data file again only after a refresh rewrites it.
+
+Exactly one worker runs the refresh scheduler: the first to lock
+SCHEDULER_LOCK_FILE. The lock is released when that worker exits, and the
+worker started in its place takes the scheduler over. A refresh requested
+through the API runs in the worker that received the request, after any
+refresh running in another worker. Job records are shared through
+REFRESH_JOBS_FILE, so every worker answers status queries for every job.
+
+Every worker writes its metrics to METRICS_DIR every METRICS_WRITE_INTERVAL
+seconds, and /api/metrics merges those of all workers, so any worker serves
+the metrics of the whole server.
+
+Event streams (/api/events) hold a request thread each while they are open,
+so a worker serves at most SSE_MAX_STREAMS of them, and never more than half
+of its threads, leaving the rest to the other requests.
+
+gunicorn does not run on Windows; use python app/api.py there.
+"""
+
+import argparse
+import gc
+import sys
+import threading
+from pathlib import Path
+
+# Add the parent directory to the Python path so we can import our modules
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+
+from config.settings import (
+    API_HOST, API_PORT, API_WORKERS, API_THREADS, API_WORKER_TIMEOUT, SCHEDULER_LOCK_FILE, REFRESH_LOCK_FILE,
+    REFRESH_JOBS_FILE, METRICS_DIR, METRICS_WRITE_INTERVAL, SSE_MAX_STREAMS
+)
+from config.logging_config import get_api_logger
+from utils.locking import FileLock
+from utils.metrics import SharedMetrics, metrics
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # Windows, or gunicorn not installed
+    BaseApplication = object
+
+logger = get_api_logger()
+
+# Lock held by the worker running the refresh scheduler
+scheduler_lock = FileLock(SCHEDULER_LOCK_FILE)
+
+
+def load_application(threads=API_THREADS):
+    """
+    Import the API and load its state, ready to fork the workers.
+
+    Args:
+        threads (int): Request threads per worker
+
+    Returns:
+        flask.Flask: WSGI application
+    """
+    from app import api
+
+    max_streams = max(1, min(SSE_MAX_STREAMS, threads // 2))
+    if max_streams < SSE_MAX_STREAMS:
+        logger.warning(f"Limiting event streams to {max_streams} per worker, half of its {threads} threads")
+    api.event_streams = threading.BoundedSemaphore(max_streams)
+
+    api.refresh_jobs.lock_file = REFRESH_LOCK_FILE
+    api.refresh_jobs.jobs_file = REFRESH_JOBS_FILE
+    api.shared_metrics = SharedMetrics(metrics, METRICS_DIR, METRICS_WRITE_INTERVAL)
+    api.shared_metrics.clear()
+    api.preload_state()
+
+    # Keep the workers' garbage collectors away from the preloaded objects
+    gc.collect()
+    gc.freeze()
+    return api.app
+
+
+def post_worker_init(worker):
+    """
+    Start the metrics writer in a new worker, and the refresh scheduler unless another worker runs it.
+
+    Args:
+        worker (gunicorn.workers.base.Worker): Worker that has just started
+    """
+    from app import api
+
+    api.shared_metrics.start()
+    if scheduler_lock.acquire(blocking=False):
+        logger.info(f"Worker {worker.pid} runs the refresh scheduler")
+        api.start_refresh_thread()
+
+
+def worker_exit(server, worker):
+    """
+    Write the final metrics of an exiting worker.
+
+    Args:
+        server (gunicorn.arbiter.Arbiter): gunicorn master
+        worker (gunicorn.workers.base.Worker): Worker that is exiting
+    """
+    from app import api
+
+    try:
+        api.shared_metrics.write()
+    except OSError as e:
+        logger.error(f"Error writing metrics of worker {worker.pid}: {str(e)}")
+
+
+class ApiServer(BaseApplication):
+    """
+    gunicorn application serving the API.
+    """
+
+    def __init__(self, host=API_HOST, port=API_PORT, workers=API_WORKERS, threads=API_THREADS,
+                 timeout=API_WORKER_TIMEOUT):
+        """
+        Initialize the server.
+
+        Args:
+            host (str): Interface to listen on
+            port (int): Port to listen on
+            workers (int): Worker processes
+            threads (int): Request threads per worker
+            timeout (int): Seconds before a silent worker is restarted
+        """
+        self.options = {
+            "bind": f"{host}:{port}",
+            "workers": workers,
+            "threads": threads,
+            "worker_class": "gthread",
+            "timeout": timeout,
+            "preload_app": True,
+            "post_worker_init": post_worker_init,
+            "worker_exit": worker_exit
+        }
+        super().__init__()
+
+    def load_config(self):
+        """
+        Apply the options to the gunicorn configuration.
+        """
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        """
+        Load the application.
+
+        Returns:
+            flask.Flask: WSGI application
+        """
+        return load_application(self.options["threads"])
+
+
+def main():
+    """
+    Run the production server.
+
+    Returns:
+        int: Exit code
+    """
+    parser = argparse.ArgumentParser(description="Production server for the 2K Flash API")
+    parser.add_argument("--host", default=API_HOST, help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=API_PORT, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Worker processes")
+    parser.add_argument("--threads", type=int, default=API_THREADS, help="Request threads per worker")
+    parser.add_argument("--timeout", type=int, default=API_WORKER_TIMEOUT,
+                        help="Seconds before a silent worker is restarted")
+    args = parser.parse_args()
+
+    if BaseApplication is object:
+        logger.error("gunicorn is not available; install it, or run the development server with python app/api.py")
+        return 1
+
+    logger.info(f"Starting API server on {args.host}:{args.port} with {args.workers} workers "
+                f"of {args.threads} threads")
+    ApiServer(args.host, args.port, args.workers, args.threads, args.timeout).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Benchmarks of every API endpoint through the Flask test client.
+
+The endpoints read the files of the synthetic league and registries of the
+benchmark models instead of the output and models directories, and refresh
+jobs run against an idle service rather than the H2H GG League API.
+"""
+
+import functools
+
+import pytest
+
+from app import api
+from core.models.registry import ModelRegistry, ScoreModelRegistry
+from services.evaluation_service import PredictionEvaluator, load_evaluation_stats
+from services.refresh_jobs import RefreshJobManager
+
+
+class _IdleRefreshService:
+    """
+    Refresh service that does nothing, so refresh jobs only cost the queueing.
+    """
+
+    class _Pipeline:
+        last_report = []
+
+    def __init__(self):
+        self.data_pipeline = self._Pipeline()
+        self.prediction_pipeline = self._Pipeline()
+        self.last_change_set = None
+
+    def refresh_data(self, force=False):
+        return True
+
+    def refresh_predictions(self, force=False):
+        return True
+
+
+@pytest.fixture(scope="module")
+def client(league, match_history, winner_model, score_model, models_dir, tmp_path_factory):
+    """
+    Test client of the API serving the synthetic league.
+    """
+    output_dir = tmp_path_factory.mktemp("output")
+    files = league.write(output_dir)
+
+    winner_registry_file = models_dir / "model_registry.json"
+    score_registry_file = models_dir / "score_model_registry.json"
+    ModelRegistry(models_dir, winner_registry_file).register_model(winner_model.get_info())
+    ScoreModelRegistry(models_dir, score_registry_file).register_model(score_model.get_info())
+
+    stats_file = output_dir / "evaluation_stats.json"
+    PredictionEvaluator(files["prediction_history.json"], output_dir / "evaluation_state.json",
+                        stats_file, output_dir / "prediction_history.lock").update(match_history)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(api, "PREDICTIONS_FILE", files["upcoming_match_predictions.json"])
+        patch.setattr(api, "PREDICTION_HISTORY_FILE", files["prediction_history.json"])
+        patch.setattr(api, "UPCOMING_MATCHES_FILE", files["upcoming_matches.json"])
+        patch.setattr(api, "PLAYER_STATS_FILE", files["player_stats.json"])
+        patch.setattr(api, "ModelRegistry", functools.partial(ModelRegistry, registry_file=winner_registry_file))
+        patch.setattr(api, "ScoreModelRegistry",
+                      functools.partial(ScoreModelRegistry, registry_file=score_registry_file))
+        patch.setattr(api, "load_evaluation_stats", functools.partial(load_evaluation_stats, stats_file))
+        patch.setattr(api, "refresh_jobs", RefreshJobManager(service_factory=_IdleRefreshService))
+        yield api.app.test_client()
+
+
+def _get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response
+
+
+def bench_api_predictions(benchmark, client, upcoming_matches):
+    response = benchmark(_get, client, "/api/predictions")
+    assert len(response.get_json()) == len(upcoming_matches)
+
+
+def bench_api_score_predictions(benchmark, client, upcoming_matches):
+    response = benchmark(_get, client, "/api/score-predictions")
+    assert len(response.get_json()["predictions"]) == len(upcoming_matches)
+
+
+def bench_api_upcoming_matches(benchmark, client, upcoming_matches):
+    response = benchmark(_get, client, "/api/upcoming-matches")
+    assert len(response.get_json()) == len(upcoming_matches)
+
+
+def bench_api_prediction_history(benchmark, client):
+    response = benchmark(_get, client, "/api/prediction-history")
+    assert response.get_json()["predictions"]
+
+
+def bench_api_prediction_history_filtered(benchmark, client, upcoming_matches):
+    player = upcoming_matches[0]["homePlayer"]["name"]
+    response = benchmark(_get, client, f"/api/prediction-history?player={player}")
+    assert response.get_json()["predictions"]
+
+
+def bench_api_stats(benchmark, client):
+    response = benchmark(_get, client, "/api/stats?players=1")
+    assert "evaluation" in response.get_json()
+
+
+def bench_api_player_stats(benchmark, client, league):
+    response = benchmark(_get, client, "/api/player-stats")
+    assert len(response.get_json()) == league.players
+
+
+def bench_api_refresh(benchmark, client):
+    response = benchmark(client.post, "/api/refresh")
+    assert response.status_code == 202
+
+
+def bench_api_refresh_status(benchmark, client):
+    job_id = client.post("/api/refresh").get_json()["job"]["job_id"]
+    response = benchmark(_get, client, f"/api/refresh/{job_id}")
+    assert response.get_json()["job_id"] == job_id
+
+
+def bench_api_metrics(benchmark, client):
+    response = benchmark(_get, client, "/api/metrics")
+    assert b"http_requests_total" in response.data
@@ -0,0 +1,36 @@
+"""
+Benchmarks of feature extraction.
+"""
+
+from core.models.feature_engineering import FeatureEngineer
+from core.models.feature_state import FeatureState
+
+
+def bench_extract_features_winner(benchmark, player_stats, match_history):
+    X, y = benchmark.pedantic(FeatureEngineer().extract_features, args=(player_stats, match_history),
+                              kwargs={"for_score_prediction": False}, rounds=3)
+    assert len(X) == len(match_history)
+
+
+def bench_extract_features_score(benchmark, player_stats, match_history):
+    X, y_home, y_away = benchmark.pedantic(FeatureEngineer().extract_features, args=(player_stats, match_history),
+                                           rounds=3)
+    assert len(X) == len(match_history)
+
+
+def bench_extract_features_point_in_time(benchmark, match_history):
+    X, y_home, y_away = benchmark.pedantic(FeatureEngineer().extract_features, args=(None, match_history),
+                                           kwargs={"point_in_time": True}, rounds=3)
+    assert len(X) == len(match_history)
+
+
+def bench_extract_live_features(benchmark, player_stats, match_history, upcoming_matches):
+    engineer = FeatureEngineer()
+    feature_state = FeatureState.from_matches(match_history)
+    features = benchmark(engineer.extract_live_features, player_stats, upcoming_matches[0], feature_state)
+    assert features.shape[1] == len(engineer.feature_names)
+
+
+def bench_feature_state_from_matches(benchmark, match_history):
+    feature_state = benchmark.pedantic(FeatureState.from_matches, args=(match_history,), rounds=3)
+    assert feature_state.total_matches == len(match_history)
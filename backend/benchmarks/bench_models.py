@@ -0,0 +1,87 @@
+"""
+Benchmarks of model training and inference.
+"""
+
+from core.models.feature_engineering import FeatureEngineer
+from core.models.feature_state import FeatureState
+from core.models.prediction_cache import PredictionCache
+from core.models.winner_prediction import WinnerPredictionModel
+from core.models.score_prediction import ScorePredictionModel
+
+
+def bench_train_winner_model(benchmark, player_stats, match_history):
+    model = benchmark.pedantic(lambda: WinnerPredictionModel().train(player_stats, match_history), rounds=1)
+    assert 0 <= model.model_info["accuracy"] <= 1
+
+
+def bench_train_score_model(benchmark, player_stats, match_history):
+    model = benchmark.pedantic(lambda: ScorePredictionModel().train(player_stats, match_history), rounds=1)
+    assert model.model_info["total_score_mae"] > 0
+
+
+def bench_winner_predict(benchmark, winner_model, player_stats, upcoming_matches):
+    # Without the prediction cache, so every call runs the model
+    winner_model.prediction_cache = None
+    prediction = benchmark(winner_model.predict, player_stats, upcoming_matches[0])
+    assert 0 <= prediction["home_win_probability"] <= 1
+
+
+def bench_winner_predict_live(benchmark, winner_model, player_stats, match_history, upcoming_matches):
+    winner_model.prediction_cache = None
+    feature_state = FeatureState.from_matches(match_history)
+    prediction = benchmark(winner_model.predict, player_stats, upcoming_matches[0], feature_state=feature_state)
+    assert 0 <= prediction["home_win_probability"] <= 1
+
+
+def bench_winner_predict_cache_miss(benchmark, winner_model, player_stats, upcoming_matches):
+    # A fresh cache and a fresh player stats snapshot every round: key, prediction and store
+    def setup():
+        winner_model.prediction_cache = PredictionCache(cache_file=None)
+        return (dict(player_stats), upcoming_matches[0]), {}
+
+    prediction = benchmark.pedantic(winner_model.predict, setup=setup, rounds=50)
+    assert winner_model.prediction_cache.get_stats()["misses"] == 1
+    assert 0 <= prediction["home_win_probability"] <= 1
+
+
+def bench_winner_predict_cache_hit(benchmark, winner_model, player_stats, upcoming_matches):
+    # The player fingerprints of the snapshot are computed by the first, untimed call
+    winner_model.prediction_cache = PredictionCache(cache_file=None)
+    winner_model.predict(player_stats, upcoming_matches[0])
+    prediction = benchmark(winner_model.predict, player_stats, upcoming_matches[0])
+    assert winner_model.prediction_cache.get_stats()["misses"] == 1
+    assert 0 <= prediction["home_win_probability"] <= 1
+
+
+def bench_score_predict(benchmark, score_model, player_stats, upcoming_matches):
+    score_model.prediction_cache = None
+    prediction = benchmark(score_model.predict, player_stats, upcoming_matches[0])
+    assert prediction["total_score"] > 0
+
+
+def bench_winner_predict_batch(benchmark, winner_model, player_stats, match_history):
+    X, y = FeatureEngineer(winner_model.feature_engineer.feature_config).extract_features(
+        player_stats, match_history, for_score_prediction=False
+    )
+    probabilities = benchmark(winner_model.predict_batch, X)
+    assert len(probabilities) == len(X)
+
+
+def bench_score_predict_batch(benchmark, score_model, player_stats, match_history):
+    X, y_home, y_away = FeatureEngineer(score_model.feature_engineer.feature_config).extract_features(
+        player_stats, match_history
+    )
+    home_scores, away_scores = benchmark(score_model.predict_batch, X)
+    assert len(home_scores) == len(X)
+
+
+def bench_load_winner_model(benchmark, winner_model):
+    model = benchmark(WinnerPredictionModel.load, winner_model.model_info["model_path"],
+                      winner_model.model_info["info_path"])
+    assert model.model_id == winner_model.model_id
+
+
+def bench_load_score_model(benchmark, score_model):
+    model = benchmark(ScorePredictionModel.load, score_model.model_info["model_path"],
+                      score_model.model_info["info_path"])
+    assert model.model_id == score_model.model_id
@@ -0,0 +1,12 @@
+"""
+Benchmarks of the player statistics processor.
+"""
+
+from core.data.processors.player_stats import PlayerStatsProcessor
+
+
+def bench_calculate_player_stats(benchmark, league, match_history):
+    processor = PlayerStatsProcessor()
+    player_stats = benchmark.pedantic(processor.calculate_player_stats, args=(match_history,),
+                                      kwargs={"save_to_file": False}, rounds=3)
+    assert len(player_stats) == league.players
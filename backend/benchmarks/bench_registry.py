@@ -0,0 +1,53 @@
+"""
+Benchmarks of the model registry.
+"""
+
+import pytest
+
+from core.models.registry import ModelRegistry
+
+# Models in the benchmarked registry
+REGISTRY_SIZE = 200
+
+
+@pytest.fixture
+def registry(winner_model, models_dir, tmp_path):
+    """
+    Registry of REGISTRY_SIZE copies of the trained winner model.
+    """
+    registry = ModelRegistry(models_dir, tmp_path / "model_registry.json")
+    info = winner_model.get_info()
+    registry.registry["models"] = [
+        dict(info, model_id=f"{info['model_id']}_{i}", accuracy=info["accuracy"] - i / 10000)
+        for i in range(REGISTRY_SIZE)
+    ]
+    registry.registry["best_model_id"] = registry.registry["models"][0]["model_id"]
+    registry.save_registry()
+    return registry
+
+
+def bench_registry_load(benchmark, registry, models_dir):
+    loaded = benchmark(ModelRegistry, models_dir, registry.registry_file)
+    assert len(loaded.list_models()) == REGISTRY_SIZE
+
+
+def bench_registry_save(benchmark, registry):
+    assert benchmark(registry.save_registry)
+
+
+def bench_registry_register_model(benchmark, registry, winner_model):
+    info = dict(winner_model.get_info(), model_id="benchmark")
+    assert benchmark(registry.register_model, info)
+
+
+def bench_registry_get_best_model_info(benchmark, registry):
+    assert benchmark(registry.get_best_model_info) is not None
+
+
+def bench_registry_set_best_model(benchmark, registry):
+    assert benchmark(registry.set_best_model, registry.list_models()[-1]["model_id"])
+
+
+def bench_registry_update_model_metrics(benchmark, registry):
+    metrics = {m["model_id"]: {"accuracy": 0.5} for m in registry.list_models()}
+    assert benchmark(registry.update_model_metrics, metrics, "holdout_evaluation")
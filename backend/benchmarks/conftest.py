@@ -0,0 +1,111 @@
+"""
+Shared fixtures of the benchmark suite.
+
+The benchmarks run on a seeded synthetic league whose size is set on the
+command line, and never touch the output and models directories:
+
+    pytest benchmarks --league-matches 100000 --league-players 200
+
+Every run is saved as JSON under .benchmarks/ (pytest-benchmark's
+--benchmark-autosave), with the league it ran on. Compare a run against a
+saved baseline with --benchmark-compare=<run id> and fail on regressions
+with e.g. --benchmark-compare-fail=mean:10%.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Time the code rather than its per-call log lines, unless asked otherwise
+os.environ.setdefault("INSTRUMENTATION", "off")
+
+# Add the parent directory to the Python path so we can import our modules
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+sys.path.append(str(current_dir))
+
+from synthetic import SyntheticLeague
+from core.models.winner_prediction import WinnerPredictionModel
+from core.models.score_prediction import ScorePredictionModel
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("league", "Synthetic league of the benchmarks")
+    group.addoption("--league-matches", type=int, default=1000, help="Completed matches (default 1000)")
+    group.addoption("--league-players", type=int, default=40, help="Players (default 40)")
+    group.addoption("--league-teams", type=int, default=30, help="Teams (default 30)")
+    group.addoption("--league-seed", type=int, default=42, help="Random seed (default 42)")
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    # Runs are only comparable on the same league, so record it with the results
+    output_json["league"] = _league_parameters(config)
+
+
+def _league_parameters(config):
+    return {
+        "matches": config.getoption("league_matches"),
+        "players": config.getoption("league_players"),
+        "teams": config.getoption("league_teams"),
+        "seed": config.getoption("league_seed")
+    }
+
+
+@pytest.fixture(scope="session")
+def league(pytestconfig):
+    """
+    Synthetic league of the run.
+    """
+    parameters = _league_parameters(pytestconfig)
+    return SyntheticLeague(parameters["matches"], parameters["players"], parameters["teams"],
+                           seed=parameters["seed"])
+
+
+@pytest.fixture(scope="session")
+def match_history(league):
+    return league.match_history()
+
+
+@pytest.fixture(scope="session")
+def upcoming_matches(league):
+    return league.upcoming_matches()
+
+
+@pytest.fixture(scope="session")
+def player_stats(league):
+    return league.player_stats()
+
+
+@pytest.fixture(scope="session")
+def models_dir(tmp_path_factory):
+    """
+    Directory for the models and registries written by the benchmarks.
+    """
+    return tmp_path_factory.mktemp("models")
+
+
+@pytest.fixture(scope="session")
+def winner_model(match_history, player_stats, models_dir):
+    """
+    Winner model trained on the league, saved to the benchmark models directory.
+    """
+    model = WinnerPredictionModel()
+    model.train(player_stats, match_history)
+    model.save(models_dir / f"winnerpredictionmodel_{model.model_id}.pkl",
+               models_dir / f"winnerpredictionmodel_info_{model.model_id}.json")
+    return model
+
+
+@pytest.fixture(scope="session")
+def score_model(match_history, player_stats, models_dir):
+    """
+    Score model trained on the league, saved to the benchmark models directory.
+    """
+    model = ScorePredictionModel()
+    model.train(player_stats, match_history)
+    model.save(models_dir / f"scorepredictionmodel_{model.model_id}.pkl",
+               models_dir / f"scorepredictionmodel_info_{model.model_id}.json")
+    return model
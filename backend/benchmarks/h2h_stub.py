@@ -0,0 +1,430 @@
+"""
+Offline stand-in for the H2H GG League API.
+
+Serves /schedule responses from a synthetic league or from responses
+recorded from the live API, with configurable latency, error rates and
+payload sizes, so the fetchers and the refresh pipelines can be exercised
+and load-tested without network access. The fetchers reach it through the
+H2H_BASE_URL, H2H_TOKEN_FETCHER and H2H_TOKEN environment variables
+(H2H_TOKEN_FETCHER=static replaces the browser-based token acquisition with
+the configured token):
+
+    python benchmarks/h2h_stub.py serve --matches 20000 --latency 0.2 --port 8765
+    H2H_BASE_URL=http://127.0.0.1:8765/v1 H2H_TOKEN_FETCHER=static H2H_TOKEN=stub-token python app/cli.py refresh
+
+Recording the live API for later replay needs a valid token:
+
+    python benchmarks/h2h_stub.py record --output-dir recordings/2025-04
+    python benchmarks/h2h_stub.py serve --recording-dir recordings/2025-04
+
+Both synthetic and recorded fixtures are anchored so that the last completed
+match has just ended, and requests are filtered by their from/to window like
+the live API.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import pytz
+
+# Add the parent directory to the Python path so we can import our modules
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+sys.path.append(str(current_dir))
+
+from config.settings import (
+    H2H_BASE_URL, H2H_DEFAULT_TOURNAMENT_ID, API_DATE_FORMAT, DEFAULT_TIMEZONE, MATCH_HISTORY_DAYS
+)
+from synthetic import SyntheticLeague, FIXTURE_SPACING_MINUTES
+
+# Token the stub accepts by default
+STUB_TOKEN = "stub-token"
+
+# Schedule types of the API
+SCHEDULE_TYPES = ("match", "fixture")
+
+# Recorded response file per schedule type
+RECORDING_FILES = {schedule_type: f"schedule_{schedule_type}.json" for schedule_type in SCHEDULE_TYPES}
+
+# Format of the fixture times in the API
+FIXTURE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _parse_fixture_time(value):
+    """
+    Parse a fixture time of the API.
+
+    Args:
+        value (str): ISO 8601 UTC time
+
+    Returns:
+        datetime: Naive UTC time
+    """
+    return datetime.strptime(value, FIXTURE_TIME_FORMAT)
+
+
+def _shift_fixture(fixture, delta):
+    """
+    Move a fixture in time.
+
+    Args:
+        fixture (dict): Raw fixture
+        delta (timedelta): Shift
+
+    Returns:
+        dict: Shifted copy of the fixture
+    """
+    shifted = dict(fixture)
+    for key in ("fixtureStart", "startDate"):
+        if shifted.get(key):
+            shifted[key] = (_parse_fixture_time(shifted[key]) + delta).strftime(FIXTURE_TIME_FORMAT)
+    return shifted
+
+
+def anchored_league(matches=1000, players=40, teams=30, upcoming=30, predicted=200, seed=42, now=None):
+    """
+    Build a synthetic league whose last completed match has just ended.
+
+    Args:
+        matches (int): Completed matches
+        players (int): Players
+        teams (int): Teams
+        upcoming (int): Upcoming matches
+        predicted (int): Completed matches in the prediction history
+        seed (int): Random seed
+        now (datetime): Current naive UTC time (default: now)
+
+    Returns:
+        SyntheticLeague: League
+    """
+    now = now or datetime.utcnow().replace(second=0, microsecond=0)
+    # Keep every completed match inside the window the match history fetcher asks for
+    spacing = min(FIXTURE_SPACING_MINUTES, MATCH_HISTORY_DAYS * 24 * 60 * 0.9 / max(matches, 1))
+    return SyntheticLeague(matches, players, teams, upcoming, predicted, seed,
+                           start=now - timedelta(minutes=spacing * matches), spacing=spacing)
+
+
+def league_schedule(league):
+    """
+    Get the schedule responses of a synthetic league.
+
+    Args:
+        league (SyntheticLeague): League
+
+    Returns:
+        dict: Schedule type -> raw fixtures
+    """
+    return {schedule_type: league.schedule(schedule_type) for schedule_type in SCHEDULE_TYPES}
+
+
+def load_recording(recording_dir, now=None):
+    """
+    Load recorded schedule responses, shifted so the last completed match has just ended.
+
+    Args:
+        recording_dir (str or Path): Directory written by record_schedule
+        now (datetime): Current naive UTC time (default: now)
+
+    Returns:
+        dict: Schedule type -> raw fixtures
+    """
+    recording_dir = Path(recording_dir)
+    schedule = {}
+    for schedule_type, file_name in RECORDING_FILES.items():
+        with open(recording_dir / file_name, "r", encoding="utf-8") as f:
+            schedule[schedule_type] = json.load(f)
+
+    starts = [_parse_fixture_time(f["fixtureStart"]) for f in schedule["match"] if f.get("fixtureStart")]
+    if starts:
+        delta = (now or datetime.utcnow()) - max(starts)
+        schedule = {
+            schedule_type: [_shift_fixture(f, delta) for f in fixtures]
+            for schedule_type, fixtures in schedule.items()
+        }
+    return schedule
+
+
+def record_schedule(output_dir, headers, base_url=H2H_BASE_URL, days_back=MATCH_HISTORY_DAYS):
+    """
+    Record the schedule responses of the live API.
+
+    Args:
+        output_dir (str or Path): Directory for the recorded responses
+        headers (dict): Authentication headers
+        base_url (str): Base URL of the API
+        days_back (int): Days of completed matches to record
+
+    Returns:
+        dict: Schedule type -> number of recorded fixtures
+    """
+    import requests
+
+    timezone = pytz.timezone(DEFAULT_TIMEZONE)
+    now = datetime.now(timezone)
+    windows = {
+        "match": (now - timedelta(days=days_back), now, "desc"),
+        "fixture": (now, now + timedelta(hours=24), "asc")
+    }
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    for schedule_type, (start, end, order) in windows.items():
+        response = requests.get(f"{base_url}/schedule", headers=headers, params={
+            "schedule-type": schedule_type,
+            "from": start.strftime(API_DATE_FORMAT),
+            "to": end.strftime(API_DATE_FORMAT),
+            "order": order,
+            "tournament-id": H2H_DEFAULT_TOURNAMENT_ID
+        })
+        response.raise_for_status()
+        fixtures = sorted(response.json(), key=lambda f: f.get("fixtureStart") or "")
+        with open(output_dir / RECORDING_FILES[schedule_type], "w", encoding="utf-8") as f:
+            json.dump(fixtures, f, indent=2)
+        counts[schedule_type] = len(fixtures)
+    return counts
+
+
+class H2HStubServer:
+    """
+    Local HTTP server answering /schedule requests like the H2H GG League API.
+    """
+
+    def __init__(self, schedule, host="127.0.0.1", port=0, token=STUB_TOKEN, latency=0.0, jitter=0.0,
+                 error_rate=0.0, unauthorized_rate=0.0, padding=0, seed=42):
+        """
+        Initialize the server.
+
+        Args:
+            schedule (dict): Schedule type -> raw fixtures, oldest first
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 for any free port)
+            token (str): Bearer token requests must carry (None to accept any)
+            latency (float): Seconds added to every response
+            jitter (float): Maximum random seconds added on top of the latency
+            error_rate (float): Fraction of requests answered with a 503
+            unauthorized_rate (float): Fraction of requests answered with a 401, as for an expired token
+            padding (int): Bytes of filler added to every fixture, to inflate payloads
+            seed (int): Random seed of the latency jitter and the errors
+        """
+        self.host = host
+        self.port = port
+        self.token = token
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.unauthorized_rate = unauthorized_rate
+        self.padding = padding
+        self.requests = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+        filler = "x" * padding
+        self.schedule = {}
+        for schedule_type, fixtures in schedule.items():
+            entries = []
+            for fixture in fixtures:
+                if filler:
+                    fixture = dict(fixture, padding=filler)
+                entries.append((_parse_fixture_time(fixture["fixtureStart"]), fixture))
+            self.schedule[schedule_type] = entries
+
+    @property
+    def url(self):
+        """
+        Base URL of the stub, to use as H2H_BASE_URL.
+
+        Returns:
+            str: Base URL
+        """
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self):
+        """
+        Start serving in a background thread.
+
+        Returns:
+            H2HStubServer: The server
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body = stub.respond(self.path, self.headers.get("authorization"))
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="h2h-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _count(self, outcome):
+        with self._lock:
+            self.requests[outcome] = self.requests.get(outcome, 0) + 1
+
+    def respond(self, path, authorization):
+        """
+        Answer a request.
+
+        Args:
+            path (str): Request path with query string
+            authorization (str): Authorization header
+
+        Returns:
+            tuple: (HTTP status, JSON body)
+        """
+        with self._lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            draw = self._rng.random()
+        if delay:
+            time.sleep(delay)
+
+        url = urlparse(path)
+        if url.path.rstrip("/") != "/v1/schedule":
+            self._count("not_found")
+            return 404, {"error": "Not found"}
+
+        if self.token is not None and authorization != f"Bearer {self.token}":
+            self._count("unauthorized")
+            return 401, {"error": "Invalid token"}
+        if draw < self.unauthorized_rate:
+            self._count("unauthorized")
+            return 401, {"error": "Token expired"}
+        if draw < self.unauthorized_rate + self.error_rate:
+            self._count("error")
+            return 503, {"error": "Service unavailable"}
+
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        schedule_type = params.get("schedule-type", "match")
+        if schedule_type not in self.schedule:
+            self._count("bad_request")
+            return 400, {"error": f"Unknown schedule type {schedule_type}"}
+
+        fixtures = self._window(self.schedule[schedule_type], params.get("from"), params.get("to"))
+        if params.get("order") == "desc":
+            fixtures.reverse()
+        if params.get("limit"):
+            fixtures = fixtures[:int(params["limit"])]
+
+        self._count("ok")
+        return 200, fixtures
+
+    @staticmethod
+    def _window(entries, from_date, to_date):
+        """
+        Select the fixtures starting inside a request's date window.
+
+        Args:
+            entries (list): (naive UTC start, fixture) tuples, oldest first
+            from_date (str): Start of the window in the API date format and timezone
+            to_date (str): End of the window in the API date format and timezone
+
+        Returns:
+            list: Fixtures, oldest first
+        """
+        timezone = pytz.timezone(DEFAULT_TIMEZONE)
+
+        def to_utc(value):
+            local = timezone.localize(datetime.strptime(value, API_DATE_FORMAT))
+            return local.astimezone(pytz.utc).replace(tzinfo=None)
+
+        start = to_utc(from_date) if from_date else datetime.min
+        end = to_utc(to_date) if to_date else datetime.max
+        return [fixture for fixture_start, fixture in entries if start <= fixture_start <= end]
+
+
+def main():
+    """
+    Serve the stand-in API, or record the live API for replay.
+    """
+    parser = argparse.ArgumentParser(description="Offline stand-in for the H2H GG League API")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser("serve", help="Serve synthetic or recorded schedule responses")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    serve_parser.add_argument("--token", default=STUB_TOKEN, help="Bearer token to accept")
+    serve_parser.add_argument("--recording-dir", help="Replay responses recorded with the record command")
+    serve_parser.add_argument("--matches", type=int, default=1000, help="Completed matches of the synthetic league")
+    serve_parser.add_argument("--players", type=int, default=40, help="Players of the synthetic league")
+    serve_parser.add_argument("--teams", type=int, default=30, help="Teams of the synthetic league")
+    serve_parser.add_argument("--upcoming", type=int, default=30, help="Upcoming matches of the synthetic league")
+    serve_parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    serve_parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    serve_parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random seconds added to the latency")
+    serve_parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 responses")
+    serve_parser.add_argument("--unauthorized-rate", type=float, default=0.0, help="Fraction of 401 responses")
+    serve_parser.add_argument("--padding", type=int, default=0, help="Bytes of filler per fixture")
+
+    record_parser = subparsers.add_parser("record", help="Record the live API's schedule responses")
+    record_parser.add_argument("--output-dir", required=True, help="Directory for the recorded responses")
+    record_parser.add_argument("--days", type=int, default=MATCH_HISTORY_DAYS, help="Days of completed matches")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        from core.data.fetchers import TokenFetcher
+        counts = record_schedule(args.output_dir, TokenFetcher().get_auth_headers(), days_back=args.days)
+        for schedule_type, count in counts.items():
+            print(f"Recorded {count} {schedule_type} fixtures to {args.output_dir}")
+    elif args.command == "serve":
+        if args.recording_dir:
+            schedule = load_recording(args.recording_dir)
+        else:
+            schedule = league_schedule(anchored_league(args.matches, args.players, args.teams, args.upcoming,
+                                                       seed=args.seed))
+
+        stub = H2HStubServer(schedule, args.host, args.port, args.token, args.latency, args.jitter,
+                             args.error_rate, args.unauthorized_rate, args.padding, args.seed)
+        stub.start()
+        print(f"Serving {len(schedule['match'])} matches and {len(schedule['fixture'])} fixtures at {stub.url}")
+        print(f"Use H2H_BASE_URL={stub.url} H2H_TOKEN_FETCHER=static H2H_TOKEN={args.token}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            stub.stop()
+            print(f"Requests served: {stub.requests}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""
+Load test of the API with the request mix of the frontend.
+
+Concurrent clients open frontend pages at random, weighted by a mix, and
+issue the API requests each page makes. Optionally a forced refresh is
+requested in the background every few seconds. For every endpoint the run
+reports throughput, latency percentiles and error rate, and checks them
+against the given service level objectives:
+
+    python benchmarks/load_test.py --clients 20 --duration 60 --matches 20000
+    python benchmarks/load_test.py --mix live --refresh-interval 10 --slo-p95 250 --slo-error-rate 0.01
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --clients 50
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --job-polls 40
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --streams 16 --slo-p95 250
+
+By default the API runs in this process on the Flask development server,
+serving a synthetic league from a temporary output directory, with refreshes
+fetching from the offline API stand-in (h2h_stub.py). Clients and server then
+share one interpreter, so the numbers understate a separate server process;
+start the server separately and pass --url to compare serving setups.
+
+With --streams, that many event streams (/api/events) are kept open during
+the run, as browser tabs would, while the other endpoints are measured; a
+stream refused by the server's stream limit is retried after its Retry-After.
+
+With --job-polls, the run ends by requesting a refresh and polling its job
+status over a new connection every time, so that against app/serve.py the
+polls are spread over its workers; every poll must find the job.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+# Add the parent directory to the Python path so we can import our modules
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+sys.path.append(str(current_dir))
+
+# Requests of the frontend pages: (endpoint name, URL path)
+PAGES = {
+    "live": [
+        ("GET /api/predictions", "/api/predictions"),
+        ("GET /api/upcoming-matches", "/api/upcoming-matches"),
+        ("GET /api/score-predictions", "/api/score-predictions")
+    ],
+    "predictions": [("GET /api/predictions", "/api/predictions?timestamp={timestamp}")],
+    "scores": [("GET /api/score-predictions", "/api/score-predictions")],
+    "history": [
+        ("GET /api/prediction-history", "/api/prediction-history"),
+        ("GET /api/prediction-history?player", "/api/prediction-history?player={player}")
+    ],
+    "dashboard": [("GET /api/stats", "/api/stats")],
+    "players": [("GET /api/player-stats", "/api/player-stats")]
+}
+
+# Page weights of the request mixes
+MIXES = {
+    "frontend": {"live": 40, "predictions": 20, "scores": 15, "history": 10, "dashboard": 10, "players": 5},
+    "live": {"live": 1},
+    "uniform": {page: 1 for page in PAGES}
+}
+
+# Refresh job states after which a job no longer changes
+FINISHED_JOB_STATES = ("succeeded", "failed")
+
+
+def _percentile(values, percent):
+    """
+    Get a percentile of sorted values (nearest rank).
+
+    Args:
+        values (list): Sorted values
+        percent (float): Percentile between 0 and 100
+
+    Returns:
+        float: Percentile, or None without values
+    """
+    if not values:
+        return None
+    rank = max(int(round(percent / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+class LoadResults:
+    """
+    Latencies and errors of the requests made during a load test, per endpoint.
+    """
+
+    def __init__(self):
+        """
+        Initialize the results.
+        """
+        self.latencies = {}
+        self.errors = {}
+        self.refresh_jobs = []
+        self.streams = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, latency, error):
+        """
+        Record a request.
+
+        Args:
+            endpoint (str): Endpoint name
+            latency (float): Seconds until the response was read
+            error (bool): Whether the request failed
+        """
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(latency)
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + int(error)
+
+    def record_refresh(self, job):
+        """
+        Record a finished refresh job.
+
+        Args:
+            job (dict): Job status returned by the API
+        """
+        with self._lock:
+            self.refresh_jobs.append(job)
+
+    def record_stream(self, status_code):
+        """
+        Record an event stream request.
+
+        Args:
+            status_code (int): HTTP status of the response (0 if the request failed)
+        """
+        with self._lock:
+            self.streams[status_code] = self.streams.get(status_code, 0) + 1
+
+    def summary(self, duration, slo_p95=None, slo_error_rate=None):
+        """
+        Summarize the results per endpoint.
+
+        Args:
+            duration (float): Seconds the load was applied
+            slo_p95 (float): 95th percentile latency objective in milliseconds
+            slo_error_rate (float): Error rate objective
+
+        Returns:
+            list: Endpoint summaries, followed by the total
+        """
+        with self._lock:
+            endpoints = {endpoint: sorted(self.latencies[endpoint]) for endpoint in sorted(self.latencies)}
+            errors = dict(self.errors)
+        endpoints["total"] = sorted(latency for latencies in endpoints.values() for latency in latencies)
+        errors["total"] = sum(errors.values())
+
+        summary = []
+        for endpoint, latencies in endpoints.items():
+            count = len(latencies)
+            entry = {
+                "endpoint": endpoint,
+                "requests": count,
+                "errors": errors[endpoint],
+                "error_rate": errors[endpoint] / count if count else 0.0,
+                "throughput": count / duration if duration else 0.0,
+                "mean_ms": sum(latencies) / count * 1000 if count else None,
+                "p50_ms": None,
+                "p95_ms": None,
+                "p99_ms": None,
+                "max_ms": latencies[-1] * 1000 if count else None
+            }
+            for percent in (50, 95, 99):
+                value = _percentile(latencies, percent)
+                entry[f"p{percent}_ms"] = value * 1000 if value is not None else None
+
+            violations = []
+            if slo_p95 is not None and entry["p95_ms"] is not None and entry["p95_ms"] > slo_p95:
+                violations.append(f"p95 {entry['p95_ms']:.1f} ms > {slo_p95:g} ms")
+            if slo_error_rate is not None and entry["error_rate"] > slo_error_rate:
+                violations.append(f"error rate {entry['error_rate']:.2%} > {slo_error_rate:.2%}")
+            entry["slo_violations"] = violations
+            summary.append(entry)
+        return summary
+
+
+def _request(session, method, url, results, endpoint, record):
+    """
+    Make a request and record its outcome.
+
+    Args:
+        session (requests.Session): Client session
+        method (str): HTTP method
+        url (str): URL
+        results (LoadResults): Results to record to
+        endpoint (str): Endpoint name
+        record (bool): Whether to record the request (False while warming up)
+
+    Returns:
+        requests.Response: Response, or None if the request failed
+    """
+    start_time = time.perf_counter()
+    try:
+        response = session.request(method, url, timeout=30)
+        response.content
+        error = response.status_code >= 400
+    except requests.RequestException:
+        response = None
+        error = True
+    if record:
+        results.record(endpoint, time.perf_counter() - start_time, error)
+    return response
+
+
+def run_client(base_url, pages, weights, players, results, stop, measure_from, think_time, seed):
+    """
+    Open frontend pages until stopped.
+
+    Args:
+        base_url (str): API URL
+        pages (list): Page names to choose from
+        weights (list): Page weights
+        players (list): Player names for filtered requests
+        results (LoadResults): Results to record to
+        stop (threading.Event): Set to stop the client
+        measure_from (float): perf_counter time from which requests are recorded
+        think_time (float): Mean seconds between pages
+        seed (int): Random seed of the client
+    """
+    rng = random.Random(seed)
+    with requests.Session() as session:
+        while not stop.is_set():
+            page = rng.choices(pages, weights)[0]
+            for endpoint, path in PAGES[page]:
+                url = base_url + path.format(timestamp=int(time.time() * 1000),
+                                             player=rng.choice(players) if players else "")
+                _request(session, "GET", url, results, endpoint, time.perf_counter() >= measure_from)
+            if think_time:
+                stop.wait(think_time * rng.uniform(0.5, 1.5))
+
+
+def run_refresher(base_url, interval, results, stop, measure_from):
+    """
+    Request a forced refresh, wait for it to finish, and repeat after an interval until stopped.
+
+    Args:
+        base_url (str): API URL
+        interval (float): Seconds between the end of a refresh and the next request
+        results (LoadResults): Results to record to
+        stop (threading.Event): Set to stop the refresher
+        measure_from (float): perf_counter time from which requests are recorded
+    """
+    with requests.Session() as session:
+        while not stop.wait(interval):
+            response = _request(session, "POST", f"{base_url}/api/refresh?force=1", results, "POST /api/refresh",
+                                time.perf_counter() >= measure_from)
+            if response is None or response.status_code != 202:
+                continue
+
+            job_id = response.json()["job"]["job_id"]
+            while not stop.wait(0.5):
+                job = _request(session, "GET", f"{base_url}/api/refresh/{job_id}", results,
+                               "GET /api/refresh/<job_id>", time.perf_counter() >= measure_from)
+                if job is not None and job.ok and job.json()["status"] in FINISHED_JOB_STATES:
+                    results.record_refresh(job.json())
+                    break
+
+
+def run_stream(base_url, results, stop):
+    """
+    Keep an event stream open until stopped, reconnecting when it ends.
+
+    Args:
+        base_url (str): API URL
+        results (LoadResults): Results to record to
+        stop (threading.Event): Set to stop the stream
+    """
+    while not stop.is_set():
+        try:
+            with requests.get(f"{base_url}/api/events", stream=True, timeout=(30, 60)) as response:
+                results.record_stream(response.status_code)
+                if response.status_code != 200:
+                    stop.wait(float(response.headers.get("Retry-After", 5)))
+                    continue
+                for _ in response.iter_lines():
+                    if stop.is_set():
+                        break
+        except requests.RequestException:
+            results.record_stream(0)
+            stop.wait(5)
+
+
+def check_job_status(base_url, polls):
+    """
+    Request a refresh and poll its job status, each time over a new connection.
+
+    Args:
+        base_url (str): API URL
+        polls (int): Status requests to make
+
+    Returns:
+        dict: Number of status responses by HTTP status code (0 for failed requests)
+    """
+    response = requests.post(f"{base_url}/api/refresh", headers={"Connection": "close"}, timeout=30)
+    response.raise_for_status()
+    job_id = response.json()["job"]["job_id"]
+
+    status_codes = {}
+    for _ in range(polls):
+        try:
+            status_code = requests.get(f"{base_url}/api/refresh/{job_id}", headers={"Connection": "close"},
+                                       timeout=30).status_code
+        except requests.RequestException:
+            status_code = 0
+        status_codes[status_code] = status_codes.get(status_code, 0) + 1
+    return status_codes
+
+
+def _serve_synthetic_league(args):
+    """
+    Start the API in this process, serving a synthetic league.
+
+    Args:
+        args (argparse.Namespace): Command line arguments
+
+    Returns:
+        tuple: (API URL, function stopping the API and the stub)
+    """
+    # Settings are read at import, so the environment must be set up before any of our modules load
+    work_dir = Path(tempfile.mkdtemp(prefix="load_test_"))
+    os.environ["OUTPUT_DIR"] = str(work_dir / "output")
+    os.environ["MODELS_DIR"] = str(work_dir / "models")
+    os.environ.setdefault("INSTRUMENTATION", "off")
+
+    from h2h_stub import H2HStubServer, STUB_TOKEN, anchored_league, league_schedule
+    os.environ["H2H_TOKEN_FETCHER"] = "static"
+    os.environ["H2H_TOKEN"] = STUB_TOKEN
+
+    from werkzeug.serving import make_server
+    from config.settings import OUTPUT_DIR
+    from services.evaluation_service import PredictionEvaluator
+    from services.refresh_service import RefreshService
+    from app import api
+
+    league = anchored_league(args.matches, args.players, args.teams, args.upcoming, args.predicted, args.seed)
+    league.write(OUTPUT_DIR)
+    PredictionEvaluator().update(league.match_history())
+    print(f"Serving a league of {args.matches} matches, {args.players} players and {args.predicted} "
+          f"predicted matches from {OUTPUT_DIR}")
+
+    stub = H2HStubServer(league_schedule(league), latency=args.api_latency, seed=args.seed).start()
+    if args.refresh_interval or args.job_polls:
+        from refresh_e2e import _train_models
+        _train_models(league)
+
+        def create_service():
+            service = RefreshService()
+            service.match_history_fetcher.base_url = stub.url
+            service.upcoming_matches_fetcher.base_url = stub.url
+            return service
+
+        api.refresh_jobs.service_factory = create_service
+
+    server = make_server(args.host, args.port, api.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="api", daemon=True)
+    thread.start()
+
+    def shutdown():
+        server.shutdown()
+        thread.join()
+        stub.stop()
+
+    return f"http://{args.host}:{server.server_port}", shutdown
+
+
+def _print_summary(summary, results, duration):
+    """
+    Print the summary of a load test.
+
+    Args:
+        summary (list): Endpoint summaries
+        results (LoadResults): Results
+        duration (float): Seconds the load was applied
+    """
+    def ms(value):
+        return f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+
+    print(f"\n{'Endpoint':<36} {'Requests':>9} {'Req/s':>8} {'Errors':>7} {'Mean ms':>8} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'p99 ms':>8} {'Max ms':>8}  SLO")
+    for entry in summary:
+        slo = "; ".join(entry["slo_violations"]) or "ok"
+        print(f"{entry['endpoint']:<36} {entry['requests']:>9} {entry['throughput']:>8.1f} "
+              f"{entry['error_rate']:>7.2%} {ms(entry['mean_ms'])} {ms(entry['p50_ms'])} {ms(entry['p95_ms'])} "
+              f"{ms(entry['p99_ms'])} {ms(entry['max_ms'])}  {slo}")
+
+    if results.refresh_jobs:
+        durations = [job["duration"] for job in results.refresh_jobs if job.get("duration") is not None]
+        statuses = {}
+        for job in results.refresh_jobs:
+            statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+        print(f"\nRefresh jobs: {statuses}, mean duration "
+              f"{sum(durations) / len(durations) if durations else 0:.2f} seconds")
+    if results.streams:
+        print(f"Event stream requests by HTTP status: {results.streams}")
+    print(f"Measured for {duration:.1f} seconds")
+
+
+def main():
+    """
+    Run the load test.
+    """
+    parser = argparse.ArgumentParser(description="Load test of the API with the request mix of the frontend")
+    parser.add_argument("--url", help="API to load instead of one started in this process")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface of the API started in this process")
+    parser.add_argument("--port", type=int, default=0, help="Port of the API started in this process")
+    parser.add_argument("--matches", type=int, default=1000, help="Completed matches of the synthetic league")
+    parser.add_argument("--players", type=int, default=40, help="Players of the synthetic league")
+    parser.add_argument("--teams", type=int, default=30, help="Teams of the synthetic league")
+    parser.add_argument("--upcoming", type=int, default=30, help="Upcoming matches of the synthetic league")
+    parser.add_argument("--predicted", type=int, default=200, help="Completed matches in the prediction history")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="frontend", help="Page mix of the clients")
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to measure")
+    parser.add_argument("--warmup", type=float, default=2, help="Seconds of load before measuring")
+    parser.add_argument("--think-time", type=float, default=0, help="Mean seconds a client waits between pages")
+    parser.add_argument("--refresh-interval", type=float, default=0,
+                        help="Seconds between forced background refreshes (0 for none)")
+    parser.add_argument("--api-latency", type=float, default=0.0,
+                        help="Seconds the API stand-in adds to every response during refreshes")
+    parser.add_argument("--slo-p95", type=float, help="95th percentile latency objective in milliseconds")
+    parser.add_argument("--slo-error-rate", type=float, help="Error rate objective, e.g. 0.01")
+    parser.add_argument("--streams", type=int, default=0, help="Event streams kept open during the run")
+    parser.add_argument("--job-polls", type=int, default=0,
+                        help="Status polls of a refresh job requested after the load, each of which must find it")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    shutdown = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        base_url, shutdown = _serve_synthetic_league(args)
+
+    upcoming = requests.get(f"{base_url}/api/upcoming-matches", timeout=30).json()
+    players = sorted({match[side]["name"] for match in upcoming for side in ("homePlayer", "awayPlayer")
+                      if match.get(side, {}).get("name")})
+
+    mix = MIXES[args.mix]
+    results = LoadResults()
+    stop = threading.Event()
+    measure_from = time.perf_counter() + args.warmup
+    threads = [threading.Thread(target=run_client, name=f"client-{i}", daemon=True,
+                                args=(base_url, list(mix), list(mix.values()), players, results, stop, measure_from,
+                                      args.think_time, args.seed + i))
+               for i in range(args.clients)]
+    if args.refresh_interval:
+        threads.append(threading.Thread(target=run_refresher, name="refresher", daemon=True,
+                                        args=(base_url, args.refresh_interval, results, stop, measure_from)))
+
+    # Streams block in reads until the server sends something, so they are not waited for
+    streams = [threading.Thread(target=run_stream, name=f"stream-{i}", daemon=True, args=(base_url, results, stop))
+               for i in range(args.streams)]
+
+    print(f"Loading {base_url} with {args.clients} clients ({args.mix} mix) and {args.streams} event streams "
+          f"for {args.duration:g} seconds")
+    for thread in streams + threads:
+        thread.start()
+    time.sleep(args.warmup + args.duration)
+    stop.set()
+    duration = time.perf_counter() - measure_from
+    for thread in threads:
+        thread.join()
+
+    job_status_codes = check_job_status(base_url, args.job_polls) if args.job_polls else {}
+    if shutdown is not None:
+        shutdown()
+
+    summary = results.summary(duration, args.slo_p95, args.slo_error_rate)
+    _print_summary(summary, results, duration)
+    if job_status_codes:
+        print(f"Refresh job status polls by HTTP status: {job_status_codes}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "parameters": vars(args),
+                "duration": duration,
+                "endpoints": summary,
+                "refresh_jobs": [{key: job.get(key) for key in ("job_id", "status", "duration", "stages")}
+                                 for job in results.refresh_jobs],
+                "stream_status_codes": results.streams,
+                "job_status_codes": job_status_codes
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if any(entry["slo_violations"] for entry in summary):
+        sys.exit(1)
+    if any(status_code != 200 for status_code in job_status_codes):
+        print("Refresh job status polls failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+End-to-end benchmark of the refresh pipelines against the offline API stand-in.
+
+Serves a synthetic league from the H2H stub, trains and registers a winner
+and a score model on it, then runs refresh_data and refresh_predictions
+repeatedly with output and models in a temporary directory, and reports the
+duration of every pipeline stage:
+
+    python benchmarks/refresh_e2e.py --matches 20000 --runs 3 --latency 0.2 --error-rate 0.05
+
+Every run after the first is forced, so unchanged stages are not skipped;
+pass --incremental to measure the skipping instead.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the parent directory to the Python path so we can import our modules
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+sys.path.append(str(current_dir))
+
+
+def _train_models(league):
+    """
+    Train and register a winner and a score model on a league.
+
+    Args:
+        league (SyntheticLeague): League
+
+    Returns:
+        tuple: (winner model ID, score model ID)
+    """
+    from config.settings import MODELS_DIR
+    from core.models.registry import ModelRegistry, ScoreModelRegistry
+    from core.models.winner_prediction import WinnerPredictionModel
+    from core.models.score_prediction import ScorePredictionModel
+
+    match_history = league.match_history()
+    player_stats = league.player_stats()
+
+    model_ids = []
+    for model_class, registry_class in ((WinnerPredictionModel, ModelRegistry),
+                                        (ScorePredictionModel, ScoreModelRegistry)):
+        model = model_class()
+        model.train(player_stats, match_history)
+        name = model_class.__name__.lower()
+        model.save(MODELS_DIR / f"{name}_{model.model_id}.pkl", MODELS_DIR / f"{name}_info_{model.model_id}.json")
+        registry_class().register_model(model.get_info())
+        model_ids.append(model.model_id)
+    return tuple(model_ids)
+
+
+def _summarize(runs):
+    """
+    Summarize the stage durations of several refresh runs.
+
+    Args:
+        runs (list): Pipeline reports, one per run
+
+    Returns:
+        list: Stage summaries in pipeline order
+    """
+    durations = {}
+    statuses = {}
+    for report in runs:
+        for stage in report:
+            # Failed stages have no duration
+            values = durations.setdefault(stage["stage"], [])
+            if "duration" in stage:
+                values.append(stage["duration"])
+            statuses.setdefault(stage["stage"], {}).setdefault(stage["status"], 0)
+            statuses[stage["stage"]][stage["status"]] += 1
+
+    return [{
+        "stage": name,
+        "runs": len(values),
+        "mean": statistics.mean(values) if values else None,
+        "min": min(values, default=None),
+        "max": max(values, default=None),
+        "statuses": statuses[name]
+    } for name, values in durations.items()]
+
+
+def main():
+    """
+    Run the end-to-end refresh benchmark.
+    """
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of the refresh pipelines")
+    parser.add_argument("--matches", type=int, default=1000, help="Completed matches of the synthetic league")
+    parser.add_argument("--players", type=int, default=40, help="Players of the synthetic league")
+    parser.add_argument("--teams", type=int, default=30, help="Teams of the synthetic league")
+    parser.add_argument("--upcoming", type=int, default=30, help="Upcoming matches of the synthetic league")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--recording-dir", help="Replay recorded responses instead of the synthetic league")
+    parser.add_argument("--runs", type=int, default=3, help="Refresh runs")
+    parser.add_argument("--incremental", action="store_true", help="Do not force the runs after the first")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every API response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random seconds added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 API responses")
+    parser.add_argument("--unauthorized-rate", type=float, default=0.0, help="Fraction of 401 API responses")
+    parser.add_argument("--padding", type=int, default=0, help="Bytes of filler per fixture")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    # Settings are read at import, so the environment must be set up before any of our modules load
+    work_dir = Path(tempfile.mkdtemp(prefix="refresh_e2e_"))
+    os.environ["OUTPUT_DIR"] = str(work_dir / "output")
+    os.environ["MODELS_DIR"] = str(work_dir / "models")
+    os.environ.setdefault("INSTRUMENTATION", "off")
+
+    from h2h_stub import H2HStubServer, STUB_TOKEN, anchored_league, league_schedule, load_recording
+    os.environ["H2H_TOKEN_FETCHER"] = "static"
+    os.environ["H2H_TOKEN"] = STUB_TOKEN
+
+    from services.refresh_service import RefreshService
+
+    league = anchored_league(args.matches, args.players, args.teams, args.upcoming, seed=args.seed)
+    schedule = load_recording(args.recording_dir) if args.recording_dir else league_schedule(league)
+
+    print(f"Working directory: {work_dir}")
+    start_time = time.perf_counter()
+    winner_model_id, score_model_id = _train_models(league)
+    print(f"Trained winner model {winner_model_id} and score model {score_model_id} "
+          f"on {args.matches} matches in {time.perf_counter() - start_time:.2f} seconds")
+
+    stub = H2HStubServer(schedule, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                         unauthorized_rate=args.unauthorized_rate, padding=args.padding, seed=args.seed)
+    results = {"refresh_data": [], "refresh_predictions": []}
+    totals = {"refresh_data": [], "refresh_predictions": []}
+    failures = 0
+    with stub:
+        service = RefreshService()
+        service.match_history_fetcher.base_url = stub.url
+        service.upcoming_matches_fetcher.base_url = stub.url
+
+        for run in range(args.runs):
+            force = run > 0 and not args.incremental
+            for name, refresh, pipeline in (("refresh_data", service.refresh_data, service.data_pipeline),
+                                            ("refresh_predictions", service.refresh_predictions,
+                                             service.prediction_pipeline)):
+                start_time = time.perf_counter()
+                success = refresh(force=force)
+                totals[name].append(time.perf_counter() - start_time)
+                results[name].append(pipeline.last_report)
+                if not success:
+                    failures += 1
+                print(f"Run {run + 1} {name}: {'ok' if success else 'FAILED'} in {totals[name][-1]:.2f} seconds")
+
+    print(f"\n{'Stage':<45} {'Runs':>5} {'Mean s':>9} {'Min s':>9} {'Max s':>9}  Statuses")
+    summary = {}
+    for name, runs in results.items():
+        summary[name] = _summarize(runs)
+        print(f"{name:<45} {len(totals[name]):>5} {statistics.mean(totals[name]):>9.3f} "
+              f"{min(totals[name]):>9.3f} {max(totals[name]):>9.3f}")
+        for stage in summary[name]:
+            timings = " ".join("        -" if stage[key] is None else f"{stage[key]:>9.3f}"
+                               for key in ("mean", "min", "max"))
+            print(f"  {stage['stage']:<43} {stage['runs']:>5} {timings}  {stage['statuses']}")
+    print(f"\nAPI requests: {stub.requests}")
+    print(f"Failed refreshes: {failures}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "parameters": vars(args),
+                "totals": totals,
+                "stages": summary,
+                "api_requests": stub.requests,
+                "failed_refreshes": failures
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+"""
+Seeded synthetic league generator for the benchmarks.
+
+Generates match history, upcoming matches, player statistics, predictions
+and prediction history in the exact schemas of the files in the output
+directory, for any number of players, teams and matches. Each player has a
+hidden skill and each team a hidden strength, so the scores carry a signal
+the models can learn. The same parameters and seed always give the same
+data.
+
+Usage:
+    python benchmarks/synthetic.py --matches 100000 --players 200 --output-dir /tmp/league
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the parent directory to the Python path so we can import our modules
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+
+from core.data.processors.player_stats import PlayerStatsProcessor
+
+# Team names and abbreviations of the league
+NBA_TEAMS = [
+    ("Atlanta Hawks", "ATL"), ("Boston Celtics", "BOS"), ("Brooklyn Nets", "BKN"),
+    ("Charlotte Hornets", "CHA"), ("Chicago Bulls", "CHI"), ("Cleveland Cavaliers", "CLE"),
+    ("Dallas Mavericks", "DAL"), ("Denver Nuggets", "DEN"), ("Detroit Pistons", "DET"),
+    ("Golden State Warriors", "GSW"), ("Houston Rockets", "HOU"), ("Indiana Pacers", "IND"),
+    ("LA Clippers", "LAC"), ("Los Angeles Lakers", "LAL"), ("Memphis Grizzlies", "MEM"),
+    ("Miami Heat", "MIA"), ("Milwaukee Bucks", "MIL"), ("Minnesota Timberwolves", "MIN"),
+    ("New Orleans Pelicans", "NOP"), ("New York Knicks", "NYK"), ("Oklahoma City Thunder", "OKC"),
+    ("Orlando Magic", "ORL"), ("Philadelphia 76ers", "PHI"), ("Phoenix Suns", "PHX"),
+    ("Portland Trail Blazers", "POR"), ("Sacramento Kings", "SAC"), ("San Antonio Spurs", "SAS"),
+    ("Toronto Raptors", "TOR"), ("Utah Jazz", "UTA"), ("Washington Wizards", "WAS")
+]
+
+# Minutes between consecutive fixtures (several streams run in parallel in the real league)
+FIXTURE_SPACING_MINUTES = 4
+
+# First fixture ID, above the IDs of the real league
+FIRST_FIXTURE_ID = 1000000
+
+
+class SyntheticLeague:
+    """
+    Seeded generator of league data.
+    """
+
+    def __init__(self, matches=1000, players=40, teams=30, upcoming=30, predicted=200, seed=42,
+                 start=datetime(2025, 1, 1), spacing=FIXTURE_SPACING_MINUTES):
+        """
+        Initialize the generator.
+
+        Args:
+            matches (int): Completed matches in the match history
+            players (int): Players in the league
+            teams (int): Teams in the league
+            upcoming (int): Upcoming matches
+            predicted (int): Completed matches with a prediction in the prediction history
+            seed (int): Random seed
+            start (datetime): Start time of the first match
+            spacing (float): Minutes between consecutive fixtures
+        """
+        if players < 2:
+            raise ValueError("A league needs at least 2 players")
+
+        self.matches = matches
+        self.players = players
+        self.teams = teams
+        self.upcoming = upcoming
+        self.predicted = min(predicted, matches)
+        self.seed = seed
+        self.start = start
+        self.spacing = spacing
+
+        rng = random.Random(seed)
+        self._players = [
+            {"id": 100 + i, "name": f"PLAYER{i + 1:04d}", "external_id": str(3000 + i), "skill": rng.gauss(0, 6)}
+            for i in range(players)
+        ]
+        self._teams = [
+            {
+                "id": i + 1,
+                "name": NBA_TEAMS[i][0] if i < len(NBA_TEAMS) else f"Team {i + 1}",
+                "abbreviation": NBA_TEAMS[i][1] if i < len(NBA_TEAMS) else f"T{i + 1:02d}",
+                "strength": rng.gauss(0, 3)
+            }
+            for i in range(teams)
+        ]
+        self._completed = None
+        self._match_history = None
+        self._upcoming_matches = None
+        self._player_stats = None
+
+    def parameters(self):
+        """
+        Get the parameters of the league.
+
+        Returns:
+            dict: Parameters
+        """
+        return {
+            "matches": self.matches,
+            "players": self.players,
+            "teams": self.teams,
+            "upcoming": self.upcoming,
+            "predicted": self.predicted,
+            "seed": self.seed
+        }
+
+    def _fixtures(self, rng, count, first_index):
+        """
+        Draw fixtures.
+
+        Args:
+            rng (random.Random): Random number generator
+            count (int): Number of fixtures
+            first_index (int): Index of the first fixture in the league calendar
+
+        Yields:
+            tuple: (fixture ID, start time, home player, away player, home team, away team)
+        """
+        for index in range(first_index, first_index + count):
+            home_player, away_player = rng.sample(self._players, 2)
+            home_team, away_team = rng.sample(self._teams, 2) if self.teams > 1 else (self._teams[0],) * 2
+            start = self.start + timedelta(minutes=self.spacing * index)
+            yield FIRST_FIXTURE_ID + index, start, home_player, away_player, home_team, away_team
+
+    @staticmethod
+    def _format_time(value):
+        """
+        Format a fixture time like the H2H GG League API.
+
+        Args:
+            value (datetime): Time
+
+        Returns:
+            str: ISO 8601 UTC time
+        """
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def raw_fixture(self, fixture_id, start, home_player, away_player, home_team, away_team):
+        """
+        Build a fixture as returned by the H2H GG League schedule API.
+
+        Args:
+            fixture_id (int): Fixture ID
+            start (datetime): Start time
+            home_player (dict): Home player
+            away_player (dict): Away player
+            home_team (dict): Home team
+            away_team (dict): Away team
+
+        Returns:
+            dict: Raw fixture
+        """
+        external_id = f"NB{fixture_id:09d}"
+        return {
+            "sport": "NBA",
+            "avaStreamId": f"sis-nba-{fixture_id % 4 + 1}",
+            "leagueName": None,
+            "awayParticipantId": away_player["id"],
+            "tournamentName": "Ebasketball H2H GG League",
+            "homeParticipantExternalId": home_player["external_id"],
+            "fixtureStart": self._format_time(start),
+            "homeTeamId": home_team["id"],
+            "groupId": None,
+            "awayTeamName": away_team["name"],
+            "homeParticipantId": home_player["id"],
+            "homeTeamLogo": f"teams/{home_team['name'].replace(' ', '_')}.svg",
+            "awayTeamExternalId": None,
+            "roundName": "Ebasketball H2H GG League round 1",
+            "roundId": 1,
+            "homeTeamName": home_team["name"],
+            "awayParticipantLogo": "participants/default-player-profile.png",
+            "externalId": external_id,
+            "homeParticipantName": home_player["name"],
+            "awayTeamAbbreviation": away_team["abbreviation"],
+            "groupName": None,
+            "leagueId": None,
+            "fixtureExternalId": external_id,
+            "homeTeamExternalId": None,
+            "tournamentId": 1,
+            "fixtureId": fixture_id,
+            "awayParticipantName": away_player["name"],
+            "awayParticipantExternalId": away_player["external_id"],
+            "homeTeamAbbreviation": home_team["abbreviation"],
+            "startDate": self._format_time(start),
+            "leagueLogo": None,
+            "awayTeamId": away_team["id"],
+            "awayTeamLogo": f"teams/{away_team['name'].replace(' ', '_')}.svg",
+            "streamName": f"Ebasketball {fixture_id % 4 + 1}",
+            "homeParticipantLogo": f"participants/{home_player['name']}.png"
+        }
+
+    @staticmethod
+    def _match(fixture_id, start, home_player, away_player, home_team, away_team):
+        """
+        Build the part of a match common to the match history and the upcoming matches.
+
+        Returns:
+            dict: Match data dictionary
+        """
+        return {
+            "id": fixture_id,
+            "homePlayer": {"id": home_player["id"], "name": home_player["name"]},
+            "awayPlayer": {"id": away_player["id"], "name": away_player["name"]},
+            "homeTeam": {"id": home_team["id"], "name": home_team["name"]},
+            "awayTeam": {"id": away_team["id"], "name": away_team["name"]},
+            "fixtureStart": SyntheticLeague._format_time(start)
+        }
+
+    def _completed_fixtures(self):
+        """
+        Draw the completed fixtures and their scores, oldest first.
+
+        Returns:
+            list: (fixture, home score, away score) tuples
+        """
+        if self._completed is None:
+            rng = random.Random(self.seed + 1)
+            completed = []
+            for fixture in self._fixtures(rng, self.matches, 0):
+                _, _, home_player, away_player, home_team, away_team = fixture
+                home_score = round(rng.gauss(60 + home_player["skill"] + home_team["strength"], 8))
+                away_score = round(rng.gauss(59 + away_player["skill"] + away_team["strength"], 8))
+                if home_score == away_score:
+                    # No draws in basketball
+                    home_score += 1 if rng.random() < 0.5 else -1
+                completed.append((fixture, home_score, away_score))
+            self._completed = completed
+        return self._completed
+
+    def match_history(self):
+        """
+        Generate the match history, newest first like the match history fetcher saves it.
+
+        Returns:
+            list: List of match data dictionaries
+        """
+        if self._match_history is None:
+            matches = []
+            for fixture, home_score, away_score in reversed(self._completed_fixtures()):
+                match = self._match(*fixture)
+                match["homeScore"] = home_score
+                match["awayScore"] = away_score
+                match["result"] = "home" if home_score > away_score else "away"
+                matches.append(match)
+            self._match_history = matches
+        return self._match_history
+
+    def schedule(self, schedule_type):
+        """
+        Generate fixtures as returned by the schedule API, oldest first.
+
+        Args:
+            schedule_type (str): "match" for the completed matches, "fixture" for the upcoming ones
+
+        Returns:
+            list: Raw fixtures
+        """
+        if schedule_type == "match":
+            fixtures = []
+            for fixture, home_score, away_score in self._completed_fixtures():
+                raw = self.raw_fixture(*fixture)
+                raw["homeScore"] = home_score
+                raw["awayScore"] = away_score
+                raw["result"] = "home" if home_score > away_score else "away"
+                fixtures.append(raw)
+            return fixtures
+        if schedule_type == "fixture":
+            return [match["raw_data"] for match in self.upcoming_matches()]
+        raise ValueError(f"Unknown schedule type {schedule_type}")
+
+    def upcoming_matches(self):
+        """
+        Generate the upcoming matches, scheduled after the match history.
+
+        Returns:
+            list: List of upcoming match data dictionaries
+        """
+        if self._upcoming_matches is None:
+            rng = random.Random(self.seed + 2)
+            matches = []
+            for fixture in self._fixtures(rng, self.upcoming, self.matches):
+                match = self._match(*fixture)
+                match["raw_data"] = self.raw_fixture(*fixture)
+                matches.append(match)
+            self._upcoming_matches = matches
+        return self._upcoming_matches
+
+    def player_stats(self):
+        """
+        Calculate the player statistics of the match history with the real processor.
+
+        Returns:
+            dict: Player statistics dictionary
+        """
+        if self._player_stats is None:
+            self._player_stats = PlayerStatsProcessor().calculate_player_stats(self.match_history(),
+                                                                               save_to_file=False)
+        return self._player_stats
+
+    def _prediction(self, match, generated_at):
+        """
+        Build a prediction of a match from the players' win rates.
+
+        Args:
+            match (dict): Match data dictionary
+            generated_at (str): Generation time
+
+        Returns:
+            dict: Prediction in the schema of the predictions file
+        """
+        player_stats = self.player_stats()
+        home_stats = player_stats.get(str(match["homePlayer"]["id"]), {})
+        away_stats = player_stats.get(str(match["awayPlayer"]["id"]), {})
+        home_rate = home_stats.get("win_rate", 0.5)
+        away_rate = away_stats.get("win_rate", 0.5)
+        home_probability = home_rate / (home_rate + away_rate) if home_rate + away_rate else 0.5
+        home_score = round(home_stats.get("avg_score", 60))
+        away_score = round(away_stats.get("avg_score", 60))
+
+        return {
+            "fixtureId": match["id"],
+            "homePlayer": match["homePlayer"],
+            "awayPlayer": match["awayPlayer"],
+            "homeTeam": match["homeTeam"],
+            "awayTeam": match["awayTeam"],
+            "fixtureStart": match["fixtureStart"],
+            "prediction": {
+                "home_win_probability": home_probability,
+                "away_win_probability": 1 - home_probability,
+                "predicted_winner": "home" if home_probability > 0.5 else "away",
+                "confidence": max(home_probability, 1 - home_probability),
+                "prediction_method": "fallback_win_rates"
+            },
+            "score_prediction": {
+                "home_score": home_score,
+                "away_score": away_score,
+                "total_score": home_score + away_score,
+                "score_diff": home_score - away_score
+            },
+            "generated_at": generated_at
+        }
+
+    def predictions(self):
+        """
+        Generate the predictions of the upcoming matches.
+
+        Returns:
+            list: Predictions in the schema of the predictions file
+        """
+        generated_at = (self.start + timedelta(minutes=self.spacing * self.matches)).strftime(
+            "%Y-%m-%d %H:%M:%S")
+        return [self._prediction(match, generated_at) for match in self.upcoming_matches()]
+
+    def prediction_history(self):
+        """
+        Generate the prediction history: the most recent completed matches, then the upcoming ones.
+
+        Returns:
+            list: Predictions in the schema of the prediction history file
+        """
+        history = []
+        completed = self.match_history()[:self.predicted]
+        for match in reversed(completed):
+            generated_at = match["fixtureStart"].replace("T", " ").rstrip("Z")
+            prediction = self._prediction(match, generated_at)
+            prediction["saved_at"] = generated_at
+            history.append(prediction)
+        for prediction in self.predictions():
+            history.append(dict(prediction, saved_at=prediction["generated_at"]))
+        return history
+
+    def write(self, output_dir):
+        """
+        Write every generated file to a directory, named like the output directory's files.
+
+        Args:
+            output_dir (str or Path): Output directory
+
+        Returns:
+            dict: File name -> path
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        files = {
+            "match_history.json": self.match_history(),
+            "upcoming_matches.json": self.upcoming_matches(),
+            "player_stats.json": self.player_stats(),
+            "upcoming_match_predictions.json": self.predictions(),
+            "prediction_history.json": self.prediction_history()
+        }
+        paths = {}
+        for name, data in files.items():
+            paths[name] = output_dir / name
+            with open(paths[name], "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        return paths
+
+
+def main():
+    """
+    Write a synthetic league to a directory.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic league")
+    parser.add_argument("--matches", type=int, default=1000, help="Completed matches")
+    parser.add_argument("--players", type=int, default=40, help="Players")
+    parser.add_argument("--teams", type=int, default=30, help="Teams")
+    parser.add_argument("--upcoming", type=int, default=30, help="Upcoming matches")
+    parser.add_argument("--predicted", type=int, default=200, help="Completed matches in the prediction history")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output-dir", required=True, help="Directory for the generated files")
+    args = parser.parse_args()
+
+    league = SyntheticLeague(args.matches, args.players, args.teams, args.upcoming, args.predicted, args.seed)
+    for name, path in league.write(args.output_dir).items():
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
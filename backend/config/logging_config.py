@@ -1,10 +1,21 @@
 """
 Logging configuration for the 2K Flash application.
+
+Loggers only enqueue their records on a bounded queue; a single listener
+thread writes them to each logger's file and console handlers, so logging
+does not block request handlers and training loops on disk or console I/O.
+When the queue is full, records below WARNING are dropped (and counted),
+while warnings and errors wait briefly for space. Debug records can be
+sampled per logger.
 """
 
+import atexit
 import logging
 import logging.handlers
+import multiprocessing.util
 import os
+import queue
+import threading
 from pathlib import Path
 
 # Base log directory
@@ -29,10 +40,220 @@ MAX_LOG_SIZE = 10 * 1024 * 1024
 # Number of backup log files
 BACKUP_COUNT = 5
 
+# Whether records are written by a background listener ("0" to write them synchronously)
+LOG_ASYNC = os.environ.get("LOG_ASYNC", "1") == "1"
+
+# Maximum number of records waiting to be written
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+# Seconds a WARNING or higher record waits for space in a full queue before it is dropped
+LOG_QUEUE_BLOCK_TIMEOUT = 0.1
+
+# Level of the configured loggers (e.g. "DEBUG")
+LOG_LEVEL = os.environ.get("LOG_LEVEL")
+
+# Debug sampling: keep one in every N debug records, per logger, e.g. "20" or "data_fetcher=100,*=10"
+LOG_DEBUG_SAMPLING = os.environ.get("LOG_DEBUG_SAMPLING", "")
+
+
+def _parse_debug_sampling(value):
+    """
+    Parse the debug sampling setting.
+
+    Args:
+        value (str): "N" or comma-separated "logger=N" entries, "*" being the default
+
+    Returns:
+        dict: Logger name (or "*") -> keep one in every N debug records
+    """
+    rates = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        name, _, every = entry.rpartition("=")
+        try:
+            rates[name or "*"] = max(1, int(every))
+        except ValueError:
+            pass
+    return rates
+
+
+DEBUG_SAMPLE_EVERY = _parse_debug_sampling(LOG_DEBUG_SAMPLING)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Keeps one in every N DEBUG (and lower) records of a logger.
+    """
+
+    def __init__(self, every):
+        """
+        Initialize the filter.
+
+        Args:
+            every (int): Keep one in every N debug records
+        """
+        super().__init__()
+        self.every = every
+        self._seen = 0
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        self._seen += 1
+        return (self._seen - 1) % self.every == 0
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the caller on a full queue for long.
+
+    Records below WARNING are dropped at once when the queue is full;
+    warnings and errors wait up to LOG_QUEUE_BLOCK_TIMEOUT seconds first. The
+    number of dropped records is reported with the next record that fits.
+    """
+
+    def __init__(self, log_queue):
+        """
+        Initialize the handler.
+
+        Args:
+            log_queue (queue.Queue): Bounded record queue
+        """
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=LOG_QUEUE_BLOCK_TIMEOUT)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            return
+
+        if self.dropped:
+            with self._dropped_lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                notice = logging.LogRecord(record.name, logging.WARNING, __file__, 0,
+                                           f"Dropped {dropped} log records because the log queue was full",
+                                           None, None)
+                try:
+                    self.queue.put_nowait(notice)
+                except queue.Full:
+                    with self._dropped_lock:
+                        self.dropped += dropped
+
+
+class _LoggerRouter(logging.Handler):
+    """
+    Listener-side handler that passes each record to its own logger's handlers.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.routes = {}
+
+    def handle(self, record):
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+
+class _AsyncLogging:
+    """
+    The shared record queue, its listener and the per-logger handlers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.router = _LoggerRouter()
+        self.queue_handlers = {}
+        self.queue = None
+        self.listener = None
+        self._fork_handlers = []
+
+    def start(self):
+        """
+        Create the queue and start the listener.
+        """
+        self.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        for handler in self.queue_handlers.values():
+            handler.queue = self.queue
+        self.listener = logging.handlers.QueueListener(self.queue, self.router)
+        self.listener.start()
+
+    def ensure_started(self):
+        """
+        Start the listener on first use.
+        """
+        if self.listener is None:
+            self.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Write the queued records and stop the listener.
+        """
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def before_fork(self):
+        """
+        Hold the handlers' locks while forking, so that no stream is copied
+        into the child in the middle of a write.
+        """
+        self.lock.acquire()
+        self._fork_handlers = [h for handlers in self.router.routes.values() for h in handlers]
+        for handler in self._fork_handlers:
+            handler.acquire()
+
+    def after_fork_in_parent(self):
+        """
+        Release the locks taken before forking.
+        """
+        for handler in reversed(self._fork_handlers):
+            handler.release()
+        self._fork_handlers = []
+        self.lock.release()
+
+    def restart_in_child(self):
+        """
+        Replace the queue and listener in a forked child, whose copy of the
+        listener thread does not run and whose queue locks may be held.
+        """
+        self._fork_handlers = []
+        self.lock = threading.Lock()
+        for handler in self.queue_handlers.values():
+            handler.dropped = 0
+        if self.listener is not None:
+            self.start()
+            # Worker processes skip atexit handlers but run multiprocessing finalizers
+            multiprocessing.util.Finalize(None, self.stop, exitpriority=-100)
+
+
+_async_logging = _AsyncLogging()
+if LOG_ASYNC and hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_async_logging.before_fork,
+                        after_in_parent=_async_logging.after_fork_in_parent,
+                        after_in_child=_async_logging.restart_in_child)
+
+
 
 def configure_logger(name, log_file, level=logging.INFO):
     """
     Configure a logger with file and console handlers.
+
+    Configuring a logger again replaces its handlers. With asynchronous logging
+    the handlers are attached to the listener and the logger gets a queue
+    handler; handlers for an unchanged file are kept instead of reopened.
     
     Args:
         name (str): Logger name
@@ -42,13 +263,59 @@ def configure_logger(name, log_file, level=logging.INFO):
     Returns:
         logging.Logger: Configured logger
     """
+    if LOG_LEVEL:
+        level = getattr(logging, LOG_LEVEL.upper(), level)
+
     logger = logging.getLogger(name)
     logger.setLevel(level)
     
-    # Remove existing handlers if any
+    # Remove existing handlers and filters if any
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    for log_filter in logger.filters[:]:
+        logger.removeFilter(log_filter)
+
+    # Sample high-frequency debug records
+    sample_every = DEBUG_SAMPLE_EVERY.get(name, DEBUG_SAMPLE_EVERY.get("*", 1))
+    if sample_every > 1:
+        logger.addFilter(DebugSamplingFilter(sample_every))
+
+    if not LOG_ASYNC:
+        for handler in _create_handlers(log_file, level):
+            logger.addHandler(handler)
+        return logger
+
+    # The logger only enqueues; the listener writes to its handlers
+    with _async_logging.lock:
+        handlers = _async_logging.router.routes.get(name)
+        if handlers and handlers[0].baseFilename == os.path.abspath(log_file):
+            for handler in handlers:
+                handler.setLevel(level)
+        else:
+            for handler in handlers or ():
+                handler.close()
+            _async_logging.router.routes[name] = _create_handlers(log_file, level)
+
+        _async_logging.ensure_started()
+        queue_handler = _async_logging.queue_handlers.get(name)
+        if queue_handler is None:
+            queue_handler = _async_logging.queue_handlers[name] = DroppingQueueHandler(_async_logging.queue)
+    logger.addHandler(queue_handler)
     
+    return logger
+
+
+def _create_handlers(log_file, level):
+    """
+    Create the file and console handlers of a logger.
+
+    Args:
+        log_file (Path): Log file path
+        level (int): Logging level
+
+    Returns:
+        list: [file handler, console handler]
+    """
     # Create formatters
     formatter = logging.Formatter(DEFAULT_LOG_FORMAT)
     
@@ -63,12 +330,8 @@ def configure_logger(name, log_file, level=logging.INFO):
     console_handler = logging.StreamHandler()
     console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
+
+    return [file_handler, console_handler]
 
 
 # Configure loggers for different components
@@ -7,12 +7,12 @@ from pathlib import Path
 
 # Base directories
 BASE_DIR = Path(__file__).resolve().parent.parent
-OUTPUT_DIR = BASE_DIR.parent / "output"
-MODELS_DIR = BASE_DIR.parent / "models"
+OUTPUT_DIR = Path(os.environ.get("OUTPUT_DIR", BASE_DIR.parent / "output"))
+MODELS_DIR = Path(os.environ.get("MODELS_DIR", BASE_DIR.parent / "models"))
 
 # Ensure directories exist
-OUTPUT_DIR.mkdir(exist_ok=True)
-MODELS_DIR.mkdir(exist_ok=True)
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
 # Data files
 MATCH_HISTORY_FILE = OUTPUT_DIR / "match_history.json"
@@ -20,14 +20,47 @@ PLAYER_STATS_FILE = OUTPUT_DIR / "player_stats.json"
 UPCOMING_MATCHES_FILE = OUTPUT_DIR / "upcoming_matches.json"
 PREDICTIONS_FILE = OUTPUT_DIR / "upcoming_match_predictions.json"
 PREDICTION_HISTORY_FILE = OUTPUT_DIR / "prediction_history.json"
+PREDICTION_HISTORY_LOCK_FILE = OUTPUT_DIR / "prediction_history.lock"
+PIPELINE_STATE_FILE = OUTPUT_DIR / "pipeline_state.json"
+PREDICTION_STATE_FILE = OUTPUT_DIR / "prediction_state.json"
+PREDICTION_CACHE_FILE = OUTPUT_DIR / "prediction_cache.json"
+FEATURE_STATE_FILE = OUTPUT_DIR / "feature_state.json"
+BACKTEST_DIR = OUTPUT_DIR / "backtests"
+EVALUATION_STATE_FILE = OUTPUT_DIR / "evaluation_state.json"
+EVALUATION_STATS_FILE = OUTPUT_DIR / "evaluation_stats.json"
+PROFILE_DIR = OUTPUT_DIR / "profiles"
+SCHEDULER_LOCK_FILE = OUTPUT_DIR / "scheduler.lock"
+REFRESH_LOCK_FILE = OUTPUT_DIR / "refresh.lock"
+REFRESH_JOBS_FILE = OUTPUT_DIR / "refresh_jobs.json"
+EVENTS_FILE = OUTPUT_DIR / "events.jsonl"
+EVENTS_LOCK_FILE = OUTPUT_DIR / "events.lock"
+METRICS_DIR = OUTPUT_DIR / "metrics"
 
 # API settings
 API_HOST = os.environ.get("API_HOST", "0.0.0.0")
 API_PORT = int(os.environ.get("API_PORT", 5000))
 CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "*").split(",")
+API_PROFILING_ENABLED = os.environ.get("API_PROFILING_ENABLED", "0") == "1"  # allow ?profile=1 on API requests
+
+# Production server settings (app/serve.py)
+API_WORKERS = int(os.environ.get("API_WORKERS", os.cpu_count() or 1))  # worker processes
+API_THREADS = int(os.environ.get("API_THREADS", 16))  # request threads per worker
+API_WORKER_TIMEOUT = int(os.environ.get("API_WORKER_TIMEOUT", 120))  # seconds before a silent worker is restarted
+METRICS_WRITE_INTERVAL = 5  # seconds between the metrics snapshots each worker writes to METRICS_DIR
+
+# Server-sent events settings (/api/events)
+EVENTS_MAX = 200  # events kept for clients resuming with Last-Event-ID
+SSE_POLL_INTERVAL = 1.0  # seconds between checks for new events
+SSE_KEEPALIVE_INTERVAL = 15  # seconds between keep-alive comments
+SSE_STREAM_TIMEOUT = int(os.environ.get("SSE_STREAM_TIMEOUT", 60))  # seconds before a stream is closed
+SSE_RETRY = 5000  # milliseconds clients wait before reconnecting
+# Open streams per process; each holds a request thread, so the production server
+# allows at most half of API_THREADS
+SSE_MAX_STREAMS = int(os.environ.get("SSE_MAX_STREAMS", 4))
+SSE_BUSY_RETRY_AFTER = 30  # seconds a client turned away by the stream limit should wait
 
 # H2H GG League API settings
-H2H_BASE_URL = "https://api-sis-stats.hudstats.com/v1"
+H2H_BASE_URL = os.environ.get("H2H_BASE_URL", "https://api-sis-stats.hudstats.com/v1")
 H2H_WEBSITE_URL = "https://www.h2hggl.com/en/ebasketball/players/"
 H2H_TOKEN_LOCALSTORAGE_KEY = "sis-hudstats-token"
 H2H_DEFAULT_TOURNAMENT_ID = 1
@@ -35,14 +68,50 @@ H2H_DEFAULT_TOURNAMENT_ID = 1
 # Selenium settings
 SELENIUM_HEADLESS = True
 SELENIUM_TIMEOUT = 10  # seconds
+# Keep one headless browser alive between token acquisitions
+SELENIUM_PERSISTENT_SESSION = os.environ.get("SELENIUM_PERSISTENT_SESSION", "0") == "1"
+SELENIUM_POLL_FREQUENCY = 0.1  # seconds between localStorage polls
 
 # Model settings
 DEFAULT_RANDOM_STATE = 42
 MODEL_REGISTRY_FILE = MODELS_DIR / "model_registry.json"
 SCORE_MODEL_REGISTRY_FILE = MODELS_DIR / "score_model_registry.json"
+FEATURE_STATE_WINDOW = 10  # recent matches kept per player for live feature extraction
+PREDICTION_CACHE_ENABLED = os.environ.get("PREDICTION_CACHE_ENABLED", "1") == "1"
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 10000))  # entries kept in memory and on disk
+
+# Instrumentation of the timing and exception decorators: "log" (one line per call),
+# "aggregate" (per-function histograms, summarized per CLI command and refresh) or "off"
+INSTRUMENTATION = os.environ.get("INSTRUMENTATION", "log")
+
+# Profiling settings
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between samples of the sampling profiler
+PROFILE_TOP_N = 30  # functions in profile tables
+MEMORY_TOP_N = 10  # allocation sites reported per stage by the memory profiler
+MEMORY_TRACE_FRAMES = 1  # stack frames recorded per allocation (more groups allocations by caller, slower)
+
+# Backtest settings
+BACKTEST_WINDOW_DAYS = 1  # days of matches scored per walk-forward step
+BACKTEST_RETRAIN_EVERY = 7  # windows between full retrains (feature selection included)
+BACKTEST_REFIT_EVERY = 1  # windows between refits with the feature selection kept (0 to disable)
+BACKTEST_MIN_TRAIN_MATCHES = 200  # matches before the first scored window
+
+# Backfill settings
+BACKFILL_WORKERS = int(os.environ.get("BACKFILL_WORKERS", os.cpu_count() or 1))  # processes predicting chunks
+BACKFILL_CHUNK_SIZE = int(os.environ.get("BACKFILL_CHUNK_SIZE", 2000))  # matches per chunk
+
+# Model comparison settings
+MODEL_COMPARISON_HOLDOUT_DAYS = 7  # days of most recent matches every registered model is scored on
+MODEL_COMPARISON_WORKERS = int(os.environ.get("MODEL_COMPARISON_WORKERS", os.cpu_count() or 1))  # scoring processes
 
 # Refresh settings
-REFRESH_INTERVAL = 3600  # seconds (1 hour)
+REFRESH_INTERVAL = 3600  # seconds (1 hour), used when the fixture calendar is unavailable
+REFRESH_MIN_INTERVAL = int(os.environ.get("REFRESH_MIN_INTERVAL", 300))  # seconds
+REFRESH_MAX_INTERVAL = int(os.environ.get("REFRESH_MAX_INTERVAL", 3 * 3600))  # seconds
+REFRESH_DENSE_WINDOW = 3600  # seconds ahead to look when measuring fixture density
+REFRESH_JITTER = 0.1  # fraction of the delay added or removed at random
+FIXTURE_DURATION = 20 * 60  # seconds, estimated length of a fixture
+FIXTURE_RESULT_DELAY = 120  # seconds after a fixture ends before its result is expected
 MATCH_HISTORY_DAYS = 90  # days of match history to fetch
 UPCOMING_MATCHES_DAYS = 30  # days of upcoming matches to fetch
 
@@ -12,7 +12,7 @@ from config.logging_config import get_data_fetcher_logger
 from utils.time import format_api_date_range
 from utils.logging import log_execution_time, log_exceptions
 from utils.validation import validate_match_data
-from core.data.fetchers import TokenFetcher
+from core.data.fetchers import TokenFetcher, request_with_retry, FIXTURES
 
 logger = get_data_fetcher_logger()
 
@@ -56,9 +56,6 @@ class MatchHistoryFetcher:
         # Get date range for API request
         from_date, to_date = format_api_date_range(self.days_back)
 
-        # Get authentication headers
-        headers = self.token_fetcher.get_auth_headers()
-
         # Prepare request parameters
         params = {
             'schedule-type': 'match',
@@ -73,8 +70,7 @@ class MatchHistoryFetcher:
         logger.debug(f"Making API request to {url} with params: {params}")
 
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
+            response = request_with_retry("match_history", self.token_fetcher, url, params)
 
             # Parse response
             data = response.json()
@@ -115,6 +111,7 @@ class MatchHistoryFetcher:
                     logger.warning(f"Skipping invalid match data: {match.get('id', match.get('fixtureId', 'unknown'))}")
 
             logger.info(f"Successfully fetched {len(matches)} matches")
+            FIXTURES.inc(len(matches), fetcher="match_history")
 
             # Save to file if requested
             if save_to_file:
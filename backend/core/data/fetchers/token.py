@@ -2,28 +2,79 @@
 Token fetcher for the H2H GG League API.
 """
 
+import atexit
+import threading
 import time
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
-from config.settings import H2H_WEBSITE_URL, H2H_TOKEN_LOCALSTORAGE_KEY, SELENIUM_HEADLESS, SELENIUM_TIMEOUT
+from config.settings import (
+    H2H_WEBSITE_URL, H2H_TOKEN_LOCALSTORAGE_KEY, SELENIUM_HEADLESS, SELENIUM_TIMEOUT,
+    SELENIUM_PERSISTENT_SESSION, SELENIUM_POLL_FREQUENCY
+)
 from config.logging_config import get_data_fetcher_logger
 from utils.logging import log_execution_time, log_exceptions
 
 logger = get_data_fetcher_logger()
 
 
-class TokenFetcher:
+def _create_driver(headless):
     """
-    Fetches authentication token from H2H GG League website using Selenium.
+    Create a Chrome driver configured for token retrieval.
+
+    Args:
+        headless (bool): Whether to run Chrome in headless mode
+
+    Returns:
+        selenium.webdriver.Chrome: Chrome driver
+    """
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+
+    return webdriver.Chrome(options=chrome_options)
+
+
+def _wait_for_token(driver, token_key, timeout):
+    """
+    Poll local storage until the website has stored the token.
+
+    Args:
+        driver (selenium.webdriver.Chrome): Chrome driver
+        token_key (str): LocalStorage key for the token
+        timeout (int): Timeout in seconds for waiting for token
+
+    Returns:
+        str: Authentication token
+    """
+    wait = WebDriverWait(driver, timeout, poll_frequency=SELENIUM_POLL_FREQUENCY)
+    try:
+        return wait.until(
+            lambda d: d.execute_script("return window.localStorage.getItem(arguments[0]);", token_key)
+        )
+    except TimeoutException:
+        logger.error("Failed to retrieve token from local storage")
+        raise ValueError("Token not found in local storage")
+
+
+class BrowserSession:
+    """
+    Long-lived headless browser used to re-acquire tokens without a cold start.
+
+    The first acquisition loads the website; later acquisitions drop the stored
+    token and reload the already-open page. If the browser crashes the driver is
+    discarded and a fresh one is started on the next attempt.
     """
     
     def __init__(self, website_url=H2H_WEBSITE_URL, token_key=H2H_TOKEN_LOCALSTORAGE_KEY, 
                  headless=SELENIUM_HEADLESS, timeout=SELENIUM_TIMEOUT):
         """
-        Initialize the TokenFetcher.
+        Initialize the browser session.
         
         Args:
             website_url (str): URL of the website to fetch token from
@@ -35,6 +86,130 @@ class TokenFetcher:
         self.token_key = token_key
         self.headless = headless
         self.timeout = timeout
+        self._driver = None
+        self._lock = threading.Lock()
+
+    @log_exceptions(logger)
+    def fetch_token(self, retries=1):
+        """
+        Acquire a fresh token from the warm browser.
+
+        Args:
+            retries (int): Number of times to restart a crashed browser before giving up
+
+        Returns:
+            str: Authentication token
+        """
+        with self._lock:
+            for attempt in range(retries + 1):
+                try:
+                    if self._driver is None:
+                        logger.info("Starting persistent browser session")
+                        self._driver = _create_driver(self.headless)
+                        self._driver.get(self.website_url)
+                    else:
+                        # Drop the stored token so the page issues a new one on reload
+                        self._driver.execute_script(
+                            "window.localStorage.removeItem(arguments[0]);", self.token_key
+                        )
+                        self._driver.refresh()
+
+                    return _wait_for_token(self._driver, self.token_key, self.timeout)
+
+                except WebDriverException as e:
+                    logger.warning(f"Browser session failed (attempt {attempt + 1}): {str(e)}")
+                    self._discard_driver()
+                    if attempt >= retries:
+                        raise
+
+    def close(self):
+        """
+        Shut down the browser if it is running.
+        """
+        with self._lock:
+            self._discard_driver()
+
+    def _discard_driver(self):
+        """
+        Quit the current driver, ignoring errors from an already-dead browser.
+        """
+        if self._driver is None:
+            return
+
+        try:
+            self._driver.quit()
+        except WebDriverException as e:
+            logger.debug(f"Error while quitting browser: {str(e)}")
+        finally:
+            self._driver = None
+
+
+# Browser session shared by every TokenFetcher in the process
+_browser_session = None
+_browser_session_lock = threading.Lock()
+
+
+def get_browser_session(website_url=H2H_WEBSITE_URL, token_key=H2H_TOKEN_LOCALSTORAGE_KEY,
+                        headless=SELENIUM_HEADLESS, timeout=SELENIUM_TIMEOUT):
+    """
+    Get the process-wide browser session, creating it on first use.
+
+    Args:
+        website_url (str): URL of the website to fetch token from
+        token_key (str): LocalStorage key for the token
+        headless (bool): Whether to run Chrome in headless mode
+        timeout (int): Timeout in seconds for waiting for token
+
+    Returns:
+        BrowserSession: Shared browser session
+    """
+    global _browser_session
+
+    with _browser_session_lock:
+        if _browser_session is None:
+            _browser_session = BrowserSession(website_url, token_key, headless, timeout)
+        return _browser_session
+
+
+def shutdown_browser_session():
+    """
+    Close the process-wide browser session if one was started.
+    """
+    global _browser_session
+
+    with _browser_session_lock:
+        if _browser_session is not None:
+            logger.info("Shutting down persistent browser session")
+            _browser_session.close()
+            _browser_session = None
+
+
+atexit.register(shutdown_browser_session)
+
+
+class TokenFetcher:
+    """
+    Fetches authentication token from H2H GG League website using Selenium.
+    """
+
+    def __init__(self, website_url=H2H_WEBSITE_URL, token_key=H2H_TOKEN_LOCALSTORAGE_KEY,
+                 headless=SELENIUM_HEADLESS, timeout=SELENIUM_TIMEOUT,
+                 persistent_session=SELENIUM_PERSISTENT_SESSION):
+        """
+        Initialize the TokenFetcher.
+
+        Args:
+            website_url (str): URL of the website to fetch token from
+            token_key (str): LocalStorage key for the token
+            headless (bool): Whether to run Chrome in headless mode
+            timeout (int): Timeout in seconds for waiting for token
+            persistent_session (bool): Whether to reuse a warm browser between fetches
+        """
+        self.website_url = website_url
+        self.token_key = token_key
+        self.headless = headless
+        self.timeout = timeout
+        self.persistent_session = persistent_session
         self.token = None
         self.token_timestamp = None
     
@@ -59,41 +234,37 @@ class TokenFetcher:
         
         logger.info("Fetching new authentication token")
         
-        # Set up Chrome options
-        chrome_options = Options()
-        if self.headless:
-            chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
+        if self.persistent_session:
+            session = get_browser_session(self.website_url, self.token_key, self.headless, self.timeout)
+            token = session.fetch_token()
+        else:
+            token = self._fetch_token_cold()
         
+        logger.info("Successfully retrieved authentication token")
+        self.token = token
+        self.token_timestamp = time.time()
+
+        return token
+
+    @log_exceptions(logger)
+    def _fetch_token_cold(self):
+        """
+        Start a throwaway browser, read the token and shut the browser down.
+
+        Returns:
+            str: Authentication token
+        """
         driver = None
         try:
             # Initialize Chrome driver
-            driver = webdriver.Chrome(options=chrome_options)
+            driver = _create_driver(self.headless)
             
             # Visit the website
             logger.debug(f"Navigating to {self.website_url}")
             driver.get(self.website_url)
             
-            # Wait for page to load
-            wait = WebDriverWait(driver, self.timeout)
-            
-            # Wait a bit for JavaScript to execute and set the token
-            time.sleep(5)
-            
-            # Get token from local storage
-            token = driver.execute_script(f"return localStorage.getItem('{self.token_key}')")
-            
-            if not token:
-                logger.error("Failed to retrieve token from local storage")
-                raise ValueError("Token not found in local storage")
-            
-            logger.info("Successfully retrieved authentication token")
-            self.token = token
-            self.token_timestamp = time.time()
-            
-            return token
+            # Wait for JavaScript to execute and set the token
+            return _wait_for_token(driver, self.token_key, self.timeout)
             
         except (TimeoutException, WebDriverException) as e:
             logger.error(f"Error during token retrieval: {str(e)}")
@@ -103,14 +274,17 @@ class TokenFetcher:
                 driver.quit()
     
     @log_exceptions(logger)
-    def get_auth_headers(self):
+    def get_auth_headers(self, force_refresh=False):
         """
         Get the authentication headers for API requests.
+
+        Args:
+            force_refresh (bool): Whether to force a token refresh
         
         Returns:
             dict: Headers dictionary with authentication token
         """
-        token = self.get_token()
+        token = self.get_token(force_refresh=force_refresh)
         return {
             'accept': 'application/json, text/plain, */*',
             'accept-language': 'en-US,en;q=0.9',
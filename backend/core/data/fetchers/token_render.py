@@ -41,14 +41,17 @@ class TokenFetcher:
         return self.token
     
     @log_exceptions(logger)
-    def get_auth_headers(self):
+    def get_auth_headers(self, force_refresh=False):
         """
         Get the authentication headers for API requests.
         
+        Args:
+            force_refresh (bool): Whether to force a token refresh (ignored in this implementation)
+            
         Returns:
             dict: Headers dictionary with authentication token
         """
-        token = self.get_token()
+        token = self.get_token(force_refresh=force_refresh)
         return {
             'accept': 'application/json, text/plain, */*',
             'accept-language': 'en-US,en;q=0.9',
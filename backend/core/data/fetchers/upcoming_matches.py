@@ -12,7 +12,7 @@ from config.logging_config import get_data_fetcher_logger
 from utils.time import format_datetime, get_current_time
 from utils.logging import log_execution_time, log_exceptions
 from utils.validation import validate_match_data
-from core.data.fetchers import TokenFetcher
+from core.data.fetchers import TokenFetcher, request_with_retry, FIXTURES
 
 logger = get_data_fetcher_logger()
 
@@ -68,9 +68,6 @@ class UpcomingMatchesFetcher:
 
         logger.info(f"Using date range format: from {from_date} (now) to {to_date} (24 hours from now)")
 
-        # Get authentication headers
-        headers = self.token_fetcher.get_auth_headers()
-
         # Prepare request parameters
         params = {
             'schedule-type': 'fixture',  # Changed from 'match' to 'fixture' to match the official website
@@ -89,8 +86,7 @@ class UpcomingMatchesFetcher:
         logger.debug(f"Making API request to {url} with params: {params}")
 
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
+            response = request_with_retry("upcoming_matches", self.token_fetcher, url, params)
 
             # Parse response
             data = response.json()
@@ -139,6 +135,7 @@ class UpcomingMatchesFetcher:
                     logger.warning(f"Skipping invalid match data: {match.get('id', match.get('fixtureId', 'unknown'))}")
 
             logger.info(f"Successfully fetched {len(matches)} upcoming matches")
+            FIXTURES.inc(len(matches), fetcher="upcoming_matches")
 
             # Save to file if requested
             if save_to_file:
@@ -0,0 +1,322 @@
+"""
+Point-in-time (as-of) player statistics.
+
+player_stats.json is computed over all history, so features built from it
+for a past match leak results played after that match. This module keeps
+cumulative per-player, per-player-and-team and per-player-and-opponent sums
+over time-sorted matches, so the statistics of any player as of any time
+are a bisect away, and the statistics as of every match of a training set
+are produced in a single sweep over the history.
+
+Statistics "as of" a time only include matches that started strictly
+before it.
+"""
+
+from bisect import bisect_left
+from datetime import datetime
+
+import numpy as np
+
+from config.logging_config import get_data_fetcher_logger
+from utils.logging import log_execution_time, log_exceptions
+
+logger = get_data_fetcher_logger()
+
+# Cumulative columns of the per-player sums
+PLAYER_MATCHES, PLAYER_WINS, PLAYER_SCORE, PLAYER_SCORE_SQUARES = range(4)
+
+# Cumulative columns of the per-player-and-team sums
+TEAM_MATCHES, TEAM_WINS, TEAM_SCORE = range(3)
+
+# Cumulative columns of the per-player-and-opponent sums
+OPPONENT_MATCHES, OPPONENT_WINS, OPPONENT_SCORE, OPPONENT_SCORE_AGAINST = range(4)
+
+
+def parse_match_date(match):
+    """
+    Get the start time of a match.
+
+    Args:
+        match (dict): Match data dictionary
+
+    Returns:
+        datetime: Match start time (naive), or None if it is missing or invalid
+    """
+    try:
+        if 'fixtureStart' in match:
+            return datetime.strptime(match['fixtureStart'][:19], "%Y-%m-%dT%H:%M:%S")
+        if 'date' in match:
+            return datetime.strptime(match['date'], "%Y-%m-%d")
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def _match_events(match):
+    """
+    Get the contributions of a completed match to the cumulative sums.
+
+    Args:
+        match (dict): Match data dictionary
+
+    Returns:
+        list: (store, key, values) tuples, store being "players", "teams" or "opponents"
+    """
+    home_player_id = str(match['homePlayer']['id'])
+    away_player_id = str(match['awayPlayer']['id'])
+    home_team_id = str(match['homeTeam']['id'])
+    away_team_id = str(match['awayTeam']['id'])
+    home_score = match['homeScore']
+    away_score = match['awayScore']
+    home_win = 1 if home_score > away_score else 0
+
+    return [
+        ("players", home_player_id, (1, home_win, home_score, home_score * home_score)),
+        ("players", away_player_id, (1, 1 - home_win, away_score, away_score * away_score)),
+        ("teams", (home_player_id, home_team_id), (1, home_win, home_score)),
+        ("teams", (away_player_id, away_team_id), (1, 1 - home_win, away_score)),
+        ("opponents", (home_player_id, away_player_id), (1, home_win, home_score, away_score)),
+        ("opponents", (away_player_id, home_player_id), (1, 1 - home_win, away_score, home_score))
+    ]
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator > 0 else 0
+
+
+class AsOfStats:
+    """
+    Cumulative player statistics over time, queryable as of any time.
+    """
+
+    def __init__(self, matches, dates, stores):
+        """
+        Initialize the statistics. Use from_matches to build them.
+
+        Args:
+            matches (list): Completed matches sorted by start time
+            dates (list): Start time of each match
+            stores (dict): Store name -> key -> (sorted times, cumulative sums with a
+                leading zero row)
+        """
+        self.matches = matches
+        self.dates = dates
+        self.stores = stores
+
+        # Teams and opponents of each player, for assembling full statistics
+        self.player_teams = {}
+        self.player_opponents = {}
+        for player_id, team_id in stores["teams"]:
+            self.player_teams.setdefault(player_id, []).append(team_id)
+        for player_id, opponent_id in stores["opponents"]:
+            self.player_opponents.setdefault(player_id, []).append(opponent_id)
+
+    @classmethod
+    @log_execution_time(logger)
+    @log_exceptions(logger)
+    def from_matches(cls, matches, parse_date=parse_match_date):
+        """
+        Build the cumulative statistics from match data.
+
+        Args:
+            matches (list): List of match data dictionaries (incomplete matches and
+                matches without a start time are ignored)
+            parse_date (callable): Returns the start time of a match
+
+        Returns:
+            AsOfStats: Point-in-time statistics
+        """
+        completed = []
+        for position, match in enumerate(matches):
+            if 'homeScore' not in match or 'awayScore' not in match:
+                continue
+            date = parse_date(match)
+            if date is not None:
+                completed.append((date, position, match))
+
+        skipped = sum(1 for m in matches if 'homeScore' in m and 'awayScore' in m) - len(completed)
+        if skipped:
+            logger.warning(f"Ignoring {skipped} completed matches without a start time")
+
+        completed.sort(key=lambda entry: entry[:2])
+
+        events = {"players": {}, "teams": {}, "opponents": {}}
+        for date, _, match in completed:
+            for store, key, values in _match_events(match):
+                times, rows = events[store].setdefault(key, ([], []))
+                times.append(date)
+                rows.append(values)
+
+        stores = {
+            store: {
+                key: (times, np.vstack([np.zeros(len(rows[0])), np.cumsum(rows, axis=0)]))
+                for key, (times, rows) in keys.items()
+            }
+            for store, keys in events.items()
+        }
+
+        logger.info(f"Built point-in-time statistics from {len(completed)} matches "
+                    f"for {len(stores['players'])} players")
+        return cls([m for _, _, m in completed], [d for d, _, _ in completed], stores)
+
+    def _cumulative(self, store, key, as_of):
+        """
+        Get the cumulative sums of a key over the matches before a time.
+
+        Args:
+            store (str): Store name
+            key: Player ID, or (player ID, team or opponent ID)
+            as_of (datetime): Cutoff time (exclusive)
+
+        Returns:
+            numpy.ndarray: Cumulative sums, or None if the key has no matches at all
+        """
+        entry = self.stores[store].get(key)
+        if entry is None:
+            return None
+
+        times, sums = entry
+        return sums[bisect_left(times, as_of)]
+
+    def player_stats(self, player_id, as_of):
+        """
+        Get a player's statistics as of a time.
+
+        The statistics have the summary fields of PlayerStatsProcessor, including
+        the per-team and per-opponent breakdowns.
+
+        Args:
+            player_id (str): Player ID
+            as_of (datetime): Cutoff time (exclusive)
+
+        Returns:
+            dict: Player statistics, or None if the player has no matches before the cutoff
+        """
+        player_id = str(player_id)
+        sums = self._cumulative("players", player_id, as_of)
+        if sums is None or sums[PLAYER_MATCHES] == 0:
+            return None
+
+        matches = int(sums[PLAYER_MATCHES])
+        wins = int(sums[PLAYER_WINS])
+        total_score = sums[PLAYER_SCORE]
+
+        # Scores are integers, so the numerator is exact and zero variance stays zero
+        variance = (matches * sums[PLAYER_SCORE_SQUARES] - total_score * total_score) / (matches * matches)
+        variance = float(variance) if matches > 1 else 0
+
+        stats = {
+            'total_matches': matches,
+            'wins': wins,
+            'losses': matches - wins,
+            'total_score': float(total_score),
+            'win_rate': wins / matches,
+            'avg_score': float(total_score) / matches,
+            'score_variance': variance,
+            'score_std': variance ** 0.5,
+            'teams_used': {},
+            'opponents_faced': {}
+        }
+
+        for team_id in self.player_teams.get(player_id, []):
+            team = self._cumulative("teams", (player_id, team_id), as_of)
+            if team[TEAM_MATCHES] == 0:
+                continue
+            team_matches = int(team[TEAM_MATCHES])
+            stats['teams_used'][team_id] = {
+                'matches': team_matches,
+                'wins': int(team[TEAM_WINS]),
+                'losses': team_matches - int(team[TEAM_WINS]),
+                'total_score': float(team[TEAM_SCORE]),
+                'win_rate': team[TEAM_WINS] / team_matches,
+                'avg_score': team[TEAM_SCORE] / team_matches
+            }
+
+        for opponent_id in self.player_opponents.get(player_id, []):
+            opponent = self._cumulative("opponents", (player_id, opponent_id), as_of)
+            if opponent[OPPONENT_MATCHES] == 0:
+                continue
+            opponent_matches = int(opponent[OPPONENT_MATCHES])
+            stats['opponents_faced'][opponent_id] = {
+                'matches': opponent_matches,
+                'wins': int(opponent[OPPONENT_WINS]),
+                'losses': opponent_matches - int(opponent[OPPONENT_WINS]),
+                'total_score': float(opponent[OPPONENT_SCORE]),
+                'win_rate': opponent[OPPONENT_WINS] / opponent_matches,
+                'avg_score': opponent[OPPONENT_SCORE] / opponent_matches,
+                'avg_score_against': opponent[OPPONENT_SCORE_AGAINST] / opponent_matches
+            }
+
+        return stats
+
+    def stats_as_of(self, as_of, player_ids=None):
+        """
+        Get the statistics of several players as of a time.
+
+        Args:
+            as_of (datetime): Cutoff time (exclusive)
+            player_ids (iterable): Player IDs (default: every player)
+
+        Returns:
+            dict: Player ID -> player statistics, for players with matches before the cutoff
+        """
+        player_ids = self.stores["players"] if player_ids is None else player_ids
+        snapshot = {}
+        for player_id in player_ids:
+            stats = self.player_stats(player_id, as_of)
+            if stats is not None:
+                snapshot[str(player_id)] = stats
+        return snapshot
+
+    @log_execution_time(logger)
+    def row_stats(self, rows):
+        """
+        Materialize the statistics as of each row in a single sweep over the history.
+
+        Rows are visited in time order while the matches played before each row
+        are folded into running sums, so the cost is one pass over the history
+        plus one sort of the rows.
+
+        Args:
+            rows (list): (start time, home player ID, away player ID, home team ID,
+                away team ID) per row
+
+        Returns:
+            tuple: (home players, away players, home teams, away teams, home head-to-head,
+                away head-to-head) arrays of shape (rows, 3), with the column layouts
+                [win rate, average score, matches] for players and teams and
+                [win rate, matches, average score] for head-to-head
+        """
+        num_rows = len(rows)
+        tables = [np.zeros((num_rows, 3)) for _ in range(6)]
+        home_players, away_players, home_teams, away_teams, home_h2h, away_h2h = tables
+
+        running = {"players": {}, "teams": {}, "opponents": {}}
+        empty = (0, 0, 0, 0)
+        applied = 0
+
+        for i in sorted(range(num_rows), key=lambda r: rows[r][0]):
+            date, home_player_id, away_player_id, home_team_id, away_team_id = rows[i]
+
+            # Fold in every match that started before this row
+            while applied < len(self.matches) and self.dates[applied] < date:
+                for store, key, values in _match_events(self.matches[applied]):
+                    sums = running[store].get(key, empty)
+                    running[store][key] = tuple(a + b for a, b in zip(sums, values))
+                applied += 1
+
+            for players, teams, h2h, player_id, team_id, opponent_id in (
+                (home_players, home_teams, home_h2h, home_player_id, home_team_id, away_player_id),
+                (away_players, away_teams, away_h2h, away_player_id, away_team_id, home_player_id)
+            ):
+                matches, wins, score, _ = running["players"].get(player_id, empty)
+                players[i] = [_ratio(wins, matches), _ratio(score, matches), matches]
+
+                matches, wins, score = running["teams"].get((player_id, team_id), empty)[:3]
+                teams[i] = [_ratio(wins, matches), _ratio(score, matches), matches]
+
+                matches, wins, score, _ = running["opponents"].get((player_id, opponent_id), empty)
+                h2h[i] = [_ratio(wins, matches), matches, _ratio(score, matches)]
+
+        logger.info(f"Materialized point-in-time statistics for {num_rows} rows")
+        return tuple(tables)
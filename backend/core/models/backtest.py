@@ -0,0 +1,298 @@
+"""
+Walk-forward backtesting for the prediction models.
+
+History is replayed in consecutive time windows. Before each window the
+models are retrained (or refitted with their feature selection kept) on
+every match played before it, on the configured schedule, and then score
+the window's matches. Features are point-in-time: every row only sees
+results from before its own start, exactly as the live feature state does,
+so they are computed once for the whole history in a single sweep and
+reused by every step instead of being recomputed from scratch.
+"""
+
+import json
+import time
+from bisect import bisect_left
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+
+from config.settings import (
+    BACKTEST_DIR, BACKTEST_WINDOW_DAYS, BACKTEST_RETRAIN_EVERY, BACKTEST_REFIT_EVERY,
+    BACKTEST_MIN_TRAIN_MATCHES, DEFAULT_RANDOM_STATE
+)
+from config.logging_config import get_model_tuning_logger
+from utils.logging import log_execution_time, log_exceptions
+from core.models.feature_engineering import FeatureEngineer
+from core.models.winner_prediction import WinnerPredictionModel
+from core.models.score_prediction import ScorePredictionModel
+
+logger = get_model_tuning_logger()
+
+# Model types that can be backtested
+MODEL_TYPES = ("winner", "score")
+
+
+class WalkForwardBacktester:
+    """
+    Replays match history window by window, retraining the models on a schedule.
+    """
+
+    def __init__(self, window_days=BACKTEST_WINDOW_DAYS, retrain_every=BACKTEST_RETRAIN_EVERY,
+                 refit_every=BACKTEST_REFIT_EVERY, min_train_matches=BACKTEST_MIN_TRAIN_MATCHES,
+                 model_types=MODEL_TYPES, feature_config=None, random_state=DEFAULT_RANDOM_STATE,
+                 cv_folds=3):
+        """
+        Initialize the backtester.
+
+        Args:
+            window_days (float): Days of matches scored per step
+            retrain_every (int): Windows between full retrains, feature selection included
+            refit_every (int): Windows between refits that keep the fitted feature selection
+                (0 to disable)
+            min_train_matches (int): Matches played before the first scored window (the
+                winner model needs at least 100)
+            model_types (tuple): Models to backtest ("winner" and/or "score")
+            feature_config (dict): Feature configuration dictionary
+            random_state (int): Random state for reproducibility
+            cv_folds (int): Cross-validation folds of the winner model's training
+        """
+        unknown = [model_type for model_type in model_types if model_type not in MODEL_TYPES]
+        if unknown:
+            raise ValueError(f"Unknown model types: {', '.join(unknown)}")
+        if retrain_every < 1:
+            raise ValueError("retrain_every must be at least 1")
+
+        self.window_days = window_days
+        self.retrain_every = retrain_every
+        self.refit_every = refit_every
+        self.min_train_matches = min_train_matches
+        self.model_types = tuple(model_types)
+        self.feature_config = feature_config
+        self.random_state = random_state
+        self.cv_folds = cv_folds
+
+    @log_execution_time(logger)
+    @log_exceptions(logger)
+    def run(self, matches, start=None, end=None):
+        """
+        Run the backtest.
+
+        Args:
+            matches (list): List of match data dictionaries
+            start (datetime): Start of the first scored window (default: after
+                min_train_matches matches)
+            end (datetime): End of the backtest (default: after the last match)
+
+        Returns:
+            dict: Backtest report with the configuration, one entry per window and a summary
+        """
+        run_start = time.perf_counter()
+        feature_engineer = FeatureEngineer(self.feature_config)
+
+        # Completed matches in time order; every one of them becomes a row
+        completed = [m for m in matches if 'homeScore' in m and 'awayScore' in m]
+        completed.sort(key=feature_engineer._parse_match_date)
+        dates = [feature_engineer._parse_match_date(m) for m in completed]
+
+        if len(completed) <= self.min_train_matches:
+            raise ValueError(f"Not enough matches to backtest: {len(completed)} <= {self.min_train_matches}")
+
+        logger.info(f"Backtesting {', '.join(self.model_types)} models on {len(completed)} matches")
+
+        # Point-in-time features for the whole history, computed once
+        feature_start = time.perf_counter()
+        X, y_home, y_away = feature_engineer.extract_features(
+            None, completed, for_score_prediction=True, point_in_time=True
+        )
+        y_winner = (y_home > y_away).astype(int)
+        feature_seconds = time.perf_counter() - feature_start
+        logger.info(f"Extracted {X.shape[1]} point-in-time features for {len(X)} matches "
+                    f"in {feature_seconds:.2f} seconds")
+
+        window = timedelta(days=self.window_days)
+        window_start = start or dates[self.min_train_matches]
+        end = end or dates[-1] + timedelta(microseconds=1)
+
+        models = {}
+        windows = []
+        index = 0
+        while window_start < end:
+            window_end = min(window_start + window, end)
+            lo = bisect_left(dates, window_start)
+            hi = bisect_left(dates, window_end)
+
+            if hi > lo and lo >= self.min_train_matches:
+                training = self._training_step(index)
+                report = {
+                    "start": window_start.isoformat(),
+                    "end": window_end.isoformat(),
+                    "train_matches": lo,
+                    "matches": hi - lo,
+                    "training": training
+                }
+
+                train_start = time.perf_counter()
+                if training:
+                    models = self._train_models(models, training, completed[:lo], X[:lo], y_winner[:lo],
+                                                y_home[:lo], y_away[:lo])
+                report["train_seconds"] = time.perf_counter() - train_start
+
+                predict_start = time.perf_counter()
+                report.update(self._score_window(models, X[lo:hi], y_winner[lo:hi], y_home[lo:hi], y_away[lo:hi]))
+                report["predict_seconds"] = time.perf_counter() - predict_start
+
+                windows.append(report)
+                index += 1
+
+            window_start = window_end
+
+        result = {
+            "config": {
+                "window_days": self.window_days,
+                "retrain_every": self.retrain_every,
+                "refit_every": self.refit_every,
+                "min_train_matches": self.min_train_matches,
+                "model_types": list(self.model_types),
+                "feature_config": feature_engineer.feature_config,
+                "random_state": self.random_state
+            },
+            "windows": windows,
+            "summary": self._summarize(windows),
+            "timing": {
+                "feature_seconds": feature_seconds,
+                "train_seconds": sum(w["train_seconds"] for w in windows),
+                "predict_seconds": sum(w["predict_seconds"] for w in windows),
+                "total_seconds": time.perf_counter() - run_start
+            }
+        }
+
+        logger.info(f"Backtest scored {result['summary']['matches']} matches in {len(windows)} windows")
+        return result
+
+    def _training_step(self, index):
+        """
+        Get the training done before a scored window.
+
+        Args:
+            index (int): Index of the scored window
+
+        Returns:
+            str: "retrain", "refit" or None to keep the current models
+        """
+        if index % self.retrain_every == 0:
+            return "retrain"
+        if self.refit_every and index % self.refit_every == 0:
+            return "refit"
+        return None
+
+    def _train_models(self, models, training, matches, X, y_winner, y_home, y_away):
+        """
+        Train or refit the models on the rows before a window.
+
+        Args:
+            models (dict): Current models by type
+            training (str): "retrain" or "refit"
+            matches (list): Matches the training rows were extracted from
+            X (numpy.ndarray): Training features
+            y_winner (numpy.ndarray): Home win labels
+            y_home (numpy.ndarray): Home scores
+            y_away (numpy.ndarray): Away scores
+
+        Returns:
+            dict: Trained models by type
+        """
+        refit = training == "refit"
+        trained = {}
+
+        if "winner" in self.model_types:
+            model = models.get("winner") if refit else None
+            if model is None:
+                model = WinnerPredictionModel(random_state=self.random_state, feature_config=self.feature_config)
+            model.train(None, matches, cv_folds=self.cv_folds, freeze_selector=refit, features=(X, y_winner))
+            trained["winner"] = model
+
+        if "score" in self.model_types:
+            model = models.get("score") if refit else None
+            if model is None:
+                model = ScorePredictionModel(random_state=self.random_state, feature_config=self.feature_config)
+            model.train(None, matches, freeze_selectors=refit, features=(X, y_home, y_away))
+            trained["score"] = model
+
+        return trained
+
+    @staticmethod
+    def _score_window(models, X, y_winner, y_home, y_away):
+        """
+        Score the models on a window's matches.
+
+        Args:
+            models (dict): Trained models by type
+            X (numpy.ndarray): Window features
+            y_winner (numpy.ndarray): Home win labels
+            y_home (numpy.ndarray): Home scores
+            y_away (numpy.ndarray): Away scores
+
+        Returns:
+            dict: Window metrics
+        """
+        metrics = {}
+
+        if "winner" in models:
+            probabilities = models["winner"].predict_batch(X)
+            metrics["winner_correct"] = int(((probabilities > 0.5).astype(int) == y_winner).sum())
+            metrics["winner_accuracy"] = metrics["winner_correct"] / len(X)
+            metrics["winner_brier"] = float(np.mean((probabilities - y_winner) ** 2))
+
+        if "score" in models:
+            home_scores, away_scores = models["score"].predict_batch(X)
+            metrics["home_score_mae"] = float(np.mean(np.abs(home_scores - y_home)))
+            metrics["away_score_mae"] = float(np.mean(np.abs(away_scores - y_away)))
+            metrics["total_score_mae"] = float(np.mean(np.abs((home_scores + away_scores) - (y_home + y_away))))
+
+        return metrics
+
+    @staticmethod
+    def _summarize(windows):
+        """
+        Aggregate the window metrics, weighting each window by its number of matches.
+
+        Args:
+            windows (list): Window reports
+
+        Returns:
+            dict: Overall metrics
+        """
+        total = sum(w["matches"] for w in windows)
+        summary = {"windows": len(windows), "matches": total}
+        if total == 0:
+            return summary
+
+        for key in ("winner_accuracy", "winner_brier", "home_score_mae", "away_score_mae", "total_score_mae"):
+            if windows and key in windows[0]:
+                summary[key] = sum(w[key] * w["matches"] for w in windows) / total
+        return summary
+
+
+@log_exceptions(logger)
+def save_backtest_report(report, output_dir=BACKTEST_DIR):
+    """
+    Save a backtest report.
+
+    Args:
+        report (dict): Backtest report
+        output_dir (str or Path): Output directory
+
+    Returns:
+        Path: Report file
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report_path = output_dir / f"backtest_{int(time.time())}.json"
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    logger.info(f"Saved backtest report to {report_path}")
+    return report_path
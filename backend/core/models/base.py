@@ -13,6 +13,8 @@ from abc import ABC, abstractmethod
 from config.settings import MODELS_DIR, DEFAULT_RANDOM_STATE
 from config.logging_config import get_model_tuning_logger
 from utils.logging import log_execution_time, log_exceptions
+from core.models.prediction_cache import get_prediction_cache
+from core.models.feature_engineering import FEATURE_VERSION
 
 logger = get_model_tuning_logger()
 
@@ -47,10 +49,12 @@ class BaseModel(ABC):
         self.model_id = model_id or f"{int(time.time())}"
         self.random_state = random_state
         self.model = None
+        self.prediction_cache = get_prediction_cache()
         self.model_info = {
             "model_id": self.model_id,
             "model_type": self.__class__.__name__,
             "training_time": None,
+            "feature_version": FEATURE_VERSION,
             "data_files": {},
             "parameters": {},
             "metrics": {}
@@ -144,7 +148,7 @@ class BaseModel(ABC):
         # Save model
         logger.info(f"Saving model to {model_path}")
         with open(model_path, 'wb') as f:
-            pickle.dump(self.model, f)
+            pickle.dump(self._get_artifacts(), f)
 
         # Save model info
         logger.info(f"Saving model info to {info_path}")
@@ -189,13 +193,43 @@ class BaseModel(ABC):
 
         # Create instance
         instance = cls()
-        instance.model = model_obj
+        instance._set_artifacts(model_obj)
         instance.model_info = model_info
         instance.model_id = model_info.get("model_id", model_path.stem)
 
+        # Selector masks refer to the features of the configuration the model was trained with
+        feature_config = model_info.get("parameters", {}).get("feature_config")
+        if feature_config and hasattr(instance, "feature_engineer"):
+            instance.feature_engineer = instance.feature_engineer.__class__(feature_config)
+
+        # Models saved before feature versions were recorded used the first version
+        feature_version = model_info.get("feature_version", 1)
+        if hasattr(instance, "feature_engineer") and feature_version != FEATURE_VERSION:
+            logger.warning(f"Model {instance.model_id} was trained with feature version {feature_version}, "
+                           f"but features are now computed with version {FEATURE_VERSION}; its predictions "
+                           f"are unreliable until it is retrained")
+
         logger.info(f"Successfully loaded model {instance.model_id}")
         return instance
 
+    def _get_artifacts(self):
+        """
+        Get the fitted objects to persist when saving the model.
+
+        Returns:
+            object: Picklable fitted objects
+        """
+        return self.model
+
+    def _set_artifacts(self, artifacts):
+        """
+        Restore the fitted objects read from a saved model.
+
+        Args:
+            artifacts (object): Fitted objects returned by _get_artifacts
+        """
+        self.model = artifacts
+
     def get_info(self):
         """
         Get model information.
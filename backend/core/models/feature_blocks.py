@@ -0,0 +1,283 @@
+"""
+Precomputed feature blocks for prediction models.
+
+The basic, team and head-to-head feature groups only depend on player
+statistics and entity IDs. They are materialized once per player statistics
+snapshot as NumPy tables (per player, per player and team, and a sparse
+per player and opponent table) so that the rows for any batch of matches can
+be assembled with index gathers instead of dictionary lookups per match.
+The gathered rows (RowStats) are turned into feature groups with array
+arithmetic.
+"""
+
+import numpy as np
+
+from config.logging_config import get_model_tuning_logger
+from utils.logging import log_execution_time, log_exceptions
+
+logger = get_model_tuning_logger()
+
+# Column layout of the player table
+PLAYER_WIN_RATE, PLAYER_AVG_SCORE, PLAYER_TOTAL_MATCHES = range(3)
+
+# Column layout of the (player, team) table
+TEAM_WIN_RATE, TEAM_AVG_SCORE, TEAM_MATCHES = range(3)
+
+# Column layout of the (player, opponent) table
+H2H_WIN_RATE, H2H_MATCHES, H2H_AVG_SCORE = range(3)
+
+
+class FeatureBlocks:
+    """
+    Player statistics materialized as arrays for vectorized feature assembly.
+    """
+
+    def __init__(self, player_index, team_index, players, teams, h2h_keys, h2h_values):
+        """
+        Initialize the feature blocks. Use from_player_stats to build them.
+
+        Args:
+            player_index (dict): Row of each player ID in the tables
+            team_index (dict): Column of each team ID in the team table
+            players (numpy.ndarray): Player table, shape (players, 3)
+            teams (numpy.ndarray): (player, team) table, shape (players, teams + 1, 3);
+                the last team column is all zeros and stands in for unknown teams
+            h2h_keys (numpy.ndarray): Sorted player * num_players + opponent keys
+            h2h_values (numpy.ndarray): (player, opponent) values aligned with h2h_keys, shape (pairs, 3)
+        """
+        self.player_index = player_index
+        self.team_index = team_index
+        self.players = players
+        self.teams = teams
+        self.h2h_keys = h2h_keys
+        self.h2h_values = h2h_values
+
+    @classmethod
+    @log_execution_time(logger)
+    @log_exceptions(logger)
+    def from_player_stats(cls, player_stats):
+        """
+        Build the feature blocks from player statistics.
+
+        Args:
+            player_stats (dict): Player statistics dictionary
+
+        Returns:
+            FeatureBlocks: Feature blocks
+        """
+        player_index = {player_id: i for i, player_id in enumerate(player_stats)}
+        team_index = {}
+        for stats in player_stats.values():
+            for team_id in stats.get('teams_used', {}):
+                team_index.setdefault(team_id, len(team_index))
+
+        num_players = len(player_index)
+        players = np.zeros((num_players, 3))
+        teams = np.zeros((num_players, len(team_index) + 1, 3))
+        h2h = {}
+
+        for player_id, i in player_index.items():
+            stats = player_stats[player_id]
+            players[i] = [stats.get('win_rate', 0), stats.get('avg_score', 0), stats.get('total_matches', 0)]
+
+            for team_id, team_stats in stats.get('teams_used', {}).items():
+                teams[i, team_index[team_id]] = [
+                    team_stats.get('win_rate', 0), team_stats.get('avg_score', 0), team_stats.get('matches', 0)
+                ]
+
+            for opponent_id, opponent_stats in stats.get('opponents_faced', {}).items():
+                j = player_index.get(opponent_id)
+                if j is None:
+                    continue
+                matches = opponent_stats.get('matches', 0)
+                avg_score = opponent_stats.get('total_score', 0) / matches if matches > 0 else 0
+                h2h[i * num_players + j] = [opponent_stats.get('win_rate', 0), matches, avg_score]
+
+        h2h_keys = np.array(sorted(h2h), dtype=np.int64)
+        h2h_values = np.array([h2h[key] for key in h2h_keys]).reshape(-1, 3)
+
+        logger.info(f"Built feature blocks for {num_players} players, {len(team_index)} teams "
+                    f"and {len(h2h_keys)} head-to-head pairs")
+        return cls(player_index, team_index, players, teams, h2h_keys, h2h_values)
+
+    def index_rows(self, home_player_ids, away_player_ids, home_team_ids, away_team_ids):
+        """
+        Translate entity IDs into table indices.
+
+        Args:
+            home_player_ids (list): Home player IDs (must be in the player statistics)
+            away_player_ids (list): Away player IDs (must be in the player statistics)
+            home_team_ids (list): Home team IDs
+            away_team_ids (list): Away team IDs
+
+        Returns:
+            tuple: Index arrays (home players, away players, home teams, away teams)
+        """
+        unknown_team = len(self.team_index)
+        return (
+            np.array([self.player_index[p] for p in home_player_ids], dtype=np.int64),
+            np.array([self.player_index[p] for p in away_player_ids], dtype=np.int64),
+            np.array([self.team_index.get(t, unknown_team) for t in home_team_ids], dtype=np.int64),
+            np.array([self.team_index.get(t, unknown_team) for t in away_team_ids], dtype=np.int64)
+        )
+
+    def gather(self, home, away, home_team, away_team):
+        """
+        Gather the statistics of each row's players, teams and head-to-head pairs.
+
+        Args:
+            home (numpy.ndarray): Home player indices
+            away (numpy.ndarray): Away player indices
+            home_team (numpy.ndarray): Home team indices
+            away_team (numpy.ndarray): Away team indices
+
+        Returns:
+            RowStats: Statistics per row
+        """
+        return RowStats(
+            self.players[home], self.players[away],
+            self.teams[home, home_team], self.teams[away, away_team],
+            self._gather_h2h(home, away), self._gather_h2h(away, home)
+        )
+
+    def _gather_h2h(self, players, opponents):
+        """
+        Gather (player, opponent) values, zero for pairs that never met.
+
+        Args:
+            players (numpy.ndarray): Player indices
+            opponents (numpy.ndarray): Opponent indices
+
+        Returns:
+            numpy.ndarray: Head-to-head values, shape (rows, 3)
+        """
+        values = np.zeros((len(players), 3))
+        if len(self.h2h_keys) == 0:
+            return values
+
+        keys = players * len(self.player_index) + opponents
+        positions = np.minimum(np.searchsorted(self.h2h_keys, keys), len(self.h2h_keys) - 1)
+        found = self.h2h_keys[positions] == keys
+        values[found] = self.h2h_values[positions[found]]
+        return values
+
+
+class RowStats:
+    """
+    Player, team and head-to-head statistics gathered for a batch of matches.
+
+    Each table has one row per match and uses the column layout of the
+    corresponding FeatureBlocks table. The rows can come from a single player
+    statistics snapshot (FeatureBlocks.gather) or from statistics as of each
+    match (point-in-time extraction).
+    """
+
+    def __init__(self, home_players, away_players, home_teams, away_teams, home_h2h, away_h2h):
+        """
+        Initialize the row statistics.
+
+        Args:
+            home_players (numpy.ndarray): Home player statistics, shape (rows, 3)
+            away_players (numpy.ndarray): Away player statistics, shape (rows, 3)
+            home_teams (numpy.ndarray): Home player's statistics with the home team, shape (rows, 3)
+            away_teams (numpy.ndarray): Away player's statistics with the away team, shape (rows, 3)
+            home_h2h (numpy.ndarray): Home player's statistics against the away player, shape (rows, 3)
+            away_h2h (numpy.ndarray): Away player's statistics against the home player, shape (rows, 3)
+        """
+        self.home_players = home_players
+        self.away_players = away_players
+        self.home_teams = home_teams
+        self.away_teams = away_teams
+        self.home_h2h = home_h2h
+        self.away_h2h = away_h2h
+
+    def basic_features(self):
+        """
+        Compute the basic player features.
+
+        Returns:
+            numpy.ndarray: Basic player features, shape (rows, 6)
+        """
+        home_players = self.home_players
+        away_players = self.away_players
+        return np.column_stack([
+            home_players[:, PLAYER_WIN_RATE],
+            away_players[:, PLAYER_WIN_RATE],
+            home_players[:, PLAYER_AVG_SCORE],
+            away_players[:, PLAYER_AVG_SCORE],
+            home_players[:, PLAYER_TOTAL_MATCHES],
+            away_players[:, PLAYER_TOTAL_MATCHES]
+        ])
+
+    def team_features(self):
+        """
+        Compute the team-specific features.
+
+        Returns:
+            numpy.ndarray: Team-specific features, shape (rows, 12)
+        """
+        home_players = self.home_players
+        away_players = self.away_players
+        home_teams = self.home_teams
+        away_teams = self.away_teams
+
+        return np.column_stack([
+            # Team-specific stats
+            home_teams[:, TEAM_WIN_RATE],
+            away_teams[:, TEAM_WIN_RATE],
+            home_teams[:, TEAM_AVG_SCORE],
+            away_teams[:, TEAM_AVG_SCORE],
+            home_teams[:, TEAM_MATCHES],
+            away_teams[:, TEAM_MATCHES],
+
+            # Team experience ratio
+            home_teams[:, TEAM_MATCHES] / np.maximum(home_players[:, PLAYER_TOTAL_MATCHES], 1),
+            away_teams[:, TEAM_MATCHES] / np.maximum(away_players[:, PLAYER_TOTAL_MATCHES], 1),
+
+            # Team performance relative to overall
+            home_teams[:, TEAM_WIN_RATE] - home_players[:, PLAYER_WIN_RATE],
+            away_teams[:, TEAM_WIN_RATE] - away_players[:, PLAYER_WIN_RATE],
+            home_teams[:, TEAM_AVG_SCORE] - home_players[:, PLAYER_AVG_SCORE],
+            away_teams[:, TEAM_AVG_SCORE] - away_players[:, PLAYER_AVG_SCORE]
+        ])
+
+    def h2h_features(self):
+        """
+        Compute the head-to-head features.
+
+        Returns:
+            numpy.ndarray: Head-to-head features, shape (rows, 8)
+        """
+        home_h2h = self.home_h2h
+        away_h2h = self.away_h2h
+
+        return np.column_stack([
+            home_h2h[:, H2H_WIN_RATE],
+            away_h2h[:, H2H_WIN_RATE],
+            home_h2h[:, H2H_MATCHES],
+            away_h2h[:, H2H_MATCHES],
+            home_h2h[:, H2H_AVG_SCORE],
+            away_h2h[:, H2H_AVG_SCORE],
+            home_h2h[:, H2H_WIN_RATE] - away_h2h[:, H2H_WIN_RATE],
+            home_h2h[:, H2H_AVG_SCORE] - away_h2h[:, H2H_AVG_SCORE]
+        ])
+
+    def advanced_features(self):
+        """
+        Compute the advanced features that only depend on player statistics.
+
+        Returns:
+            numpy.ndarray: Win rate, average score, experience, team win rate,
+                team average score and team experience differences, shape (rows, 6)
+        """
+        player_diff = self.home_players - self.away_players
+        team_diff = self.home_teams - self.away_teams
+
+        return np.column_stack([
+            player_diff[:, PLAYER_WIN_RATE],
+            player_diff[:, PLAYER_AVG_SCORE],
+            player_diff[:, PLAYER_TOTAL_MATCHES],
+            team_diff[:, TEAM_WIN_RATE],
+            team_diff[:, TEAM_AVG_SCORE],
+            team_diff[:, TEAM_MATCHES]
+        ])
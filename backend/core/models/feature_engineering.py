@@ -8,9 +8,109 @@ from collections import defaultdict
 
 from config.logging_config import get_model_tuning_logger
 from utils.logging import log_execution_time, log_exceptions
+from core.data.processors.as_of_stats import AsOfStats
+from core.models.feature_blocks import FeatureBlocks, RowStats
+from core.models.match_index import MatchIndex
 
 logger = get_model_tuning_logger()
 
+# Version of the feature definitions, recorded with every trained model. Bump it
+# whenever a feature's values change for the same input, as models trained with
+# other versions see different features than the ones they are served with.
+#   1: match dates were only read from 'date' and 'startTime', so fixtures fell
+#      back to the current time
+#   2: match dates are read from 'fixtureStart'
+FEATURE_VERSION = 2
+
+# Feature names by feature group, in column order. Features computed from
+# player statistics are gathered from the feature blocks per group; the
+# others depend on match history and are computed one by one, on demand.
+FEATURE_GROUPS = [
+    ("use_basic_features", "basic", [
+        "home_win_rate", "away_win_rate", "home_avg_score", "away_avg_score",
+        "home_total_matches", "away_total_matches"
+    ]),
+    ("use_team_features", "team", [
+        "home_team_win_rate", "away_team_win_rate", "home_team_avg_score", "away_team_avg_score",
+        "home_team_matches", "away_team_matches", "home_team_exp_ratio", "away_team_exp_ratio",
+        "home_team_rel_win_rate", "away_team_rel_win_rate", "home_team_rel_avg_score",
+        "away_team_rel_avg_score"
+    ]),
+    ("use_h2h_features", "h2h", [
+        "home_h2h_win_rate", "away_h2h_win_rate", "home_h2h_matches", "away_h2h_matches",
+        "home_h2h_avg_score", "away_h2h_avg_score", "h2h_win_rate_diff", "h2h_score_diff"
+    ]),
+    ("use_recent_form", "recent_form", [
+        "home_recent_win_rate", "away_recent_win_rate", "home_recent_avg_score", "away_recent_avg_score",
+        "home_recent_score_var", "away_recent_score_var", "home_momentum", "away_momentum"
+    ]),
+    ("use_advanced_features", "advanced", [
+        "win_rate_diff", "avg_score_diff", "exp_diff", "team_win_rate_diff", "team_avg_score_diff",
+        "team_exp_diff", "home_advantage", "home_consistency", "away_consistency"
+    ]),
+    ("use_temporal_features", "temporal", [
+        "day_of_week", "month", "is_weekend"
+    ])
+]
+
+# Features gathered from the feature blocks: name -> (block group, column in the block)
+BLOCK_FEATURES = {
+    name: (group, position)
+    for _, group, names in FEATURE_GROUPS if group in ("basic", "team", "h2h")
+    for position, name in enumerate(names)
+}
+BLOCK_FEATURES.update({
+    name: ("advanced", position)
+    for position, name in enumerate(FEATURE_GROUPS[4][2][:6])
+})
+
+
+class MatchHistory:
+    """
+    History of a single match, computed lazily and shared by its history-dependent features.
+    """
+
+    def __init__(self, engineer, home_player_id, away_player_id, match_date,
+                 recent_matches, home_advantage, player_consistency):
+        """
+        Initialize the match history.
+
+        Args:
+            engineer (FeatureEngineer): Feature engineer computing the features
+            home_player_id (str): Home player ID
+            away_player_id (str): Away player ID
+            match_date (datetime): Match date
+            recent_matches (callable): Returns a player's recent matches given their ID,
+                most recent first
+            home_advantage (callable): Returns the home court advantage
+            player_consistency (callable): Returns a player's consistency given their ID
+        """
+        self.engineer = engineer
+        self.home_player_id = home_player_id
+        self.away_player_id = away_player_id
+        self.match_date = match_date
+        self._recent_matches = recent_matches
+        self._home_advantage = home_advantage
+        self._player_consistency = player_consistency
+        self._cache = {}
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def recent_matches(self, player_id):
+        return self._cached(("recent", player_id), lambda: self._recent_matches(player_id))
+
+    def home_advantage(self):
+        return self._cached("home_advantage", self._home_advantage)
+
+    def player_consistency(self, player_id):
+        return self._cached(("consistency", player_id), lambda: self._player_consistency(player_id))
+
+    def temporal(self):
+        return self._cached("temporal", lambda: self.engineer._extract_temporal_features(self.match_date, []))
+
 
 class FeatureEngineer:
     """
@@ -33,22 +133,108 @@ class FeatureEngineer:
             "use_temporal_features": True,
             "recent_matches_window": 5
         }
+        self.feature_names = [
+            name for config_key, _, names in FEATURE_GROUPS if self.feature_config[config_key]
+            for name in names
+        ]
+        self.history_features = self._register_history_features()
+        self._blocks = None
+        self._blocks_source = None
+    
+    def _register_history_features(self):
+        """
+        Register the features that depend on match history.
+        
+        Returns:
+            dict: Feature name -> function of a MatchHistory returning the feature value
+        """
+        def recent(calculate, side):
+            def feature(history):
+                player_id = history.home_player_id if side == "home" else history.away_player_id
+                return calculate(player_id, history.recent_matches(player_id))
+            return feature
+        
+        return {
+            # Recent form
+            "home_recent_win_rate": recent(self._calculate_recent_win_rate, "home"),
+            "away_recent_win_rate": recent(self._calculate_recent_win_rate, "away"),
+            "home_recent_avg_score": recent(self._calculate_recent_avg_score, "home"),
+            "away_recent_avg_score": recent(self._calculate_recent_avg_score, "away"),
+            "home_recent_score_var": recent(self._calculate_recent_score_variance, "home"),
+            "away_recent_score_var": recent(self._calculate_recent_score_variance, "away"),
+            "home_momentum": recent(self._calculate_momentum, "home"),
+            "away_momentum": recent(self._calculate_momentum, "away"),
+            
+            # Advanced
+            "home_advantage": lambda history: history.home_advantage(),
+            "home_consistency": lambda history: history.player_consistency(history.home_player_id),
+            "away_consistency": lambda history: history.player_consistency(history.away_player_id),
+            
+            # Temporal
+            "day_of_week": lambda history: history.temporal()[0],
+            "month": lambda history: history.temporal()[1],
+            "is_weekend": lambda history: history.temporal()[2]
+        }
+    
+    def selected_features(self, selector):
+        """
+        Get the names of the features kept by a fitted feature selector.
+        
+        Args:
+            selector (sklearn.feature_selection.SelectFromModel): Selector fitted on this
+                engineer's full feature matrix
+            
+        Returns:
+            list: Selected feature names, in column order
+        """
+        support = selector.get_support()
+        if len(support) != len(self.feature_names):
+            raise ValueError(
+                f"Feature selector was fitted on {len(support)} features, "
+                f"feature configuration has {len(self.feature_names)}"
+            )
+        return [name for name, keep in zip(self.feature_names, support) if keep]
+    
+    def column_positions(self, columns):
+        """
+        Get the positions of features in this engineer's full feature matrix.
+        
+        Args:
+            columns (list): Feature names
+            
+        Returns:
+            list: Column index of each feature
+        """
+        positions = {name: i for i, name in enumerate(self.feature_names)}
+        return [positions[name] for name in self._resolve_columns(columns)]
     
     @log_execution_time(logger)
     @log_exceptions(logger)
-    def extract_features(self, player_stats, matches, for_score_prediction=True):
+    def extract_features(self, player_stats, matches, for_score_prediction=True, columns=None,
+                         point_in_time=False):
         """
         Extract features from match data.
         
         Args:
-            player_stats (dict): Player statistics dictionary
+            player_stats (dict): Player statistics dictionary; matches of players without
+                statistics are skipped (with point_in_time, None keeps every match)
             matches (list): List of match data dictionaries
             for_score_prediction (bool): Whether to extract features for score prediction
+            columns (list): Names of the features to extract (default: all enabled features);
+                features that are not requested are not computed
+            point_in_time (bool): Whether to compute the player, team and head-to-head
+                features from the statistics as of each match (built from matches)
+                instead of from player_stats, which also covers later matches
             
         Returns:
             tuple: Features and labels
         """
-        features = []
+        columns = self._resolve_columns(columns)
+        rows = []
+        histories = []
+        
+        # Built on first use, so only if a requested feature needs previous matches
+        match_index = MatchIndex(matches, self._parse_match_date)
         
         if for_score_prediction:
             home_scores = []
@@ -67,65 +253,18 @@ class FeatureEngineer:
             away_player_id = str(match['awayPlayer']['id'])
             
             # Skip if player stats not available
-            if home_player_id not in player_stats or away_player_id not in player_stats:
+            if player_stats is not None and (home_player_id not in player_stats or away_player_id not in player_stats):
                 continue
             
-            home_player = player_stats[home_player_id]
-            away_player = player_stats[away_player_id]
-            
             home_team_id = str(match['homeTeam']['id'])
             away_team_id = str(match['awayTeam']['id'])
             
             # Get match date
             match_date = self._parse_match_date(match)
             
-            # Get previous matches before this one
-            prev_matches = self._get_previous_matches(matches, match, match_date)
-            
-            # Extract features
-            match_features = []
-            
-            # Basic player features
-            if self.feature_config["use_basic_features"]:
-                basic_features = self._extract_basic_features(home_player, away_player)
-                match_features.extend(basic_features)
-            
-            # Team-specific features
-            if self.feature_config["use_team_features"]:
-                team_features = self._extract_team_features(
-                    home_player, away_player, home_team_id, away_team_id
-                )
-                match_features.extend(team_features)
-            
-            # Head-to-head features
-            if self.feature_config["use_h2h_features"]:
-                h2h_features = self._extract_h2h_features(
-                    home_player, away_player, home_player_id, away_player_id
-                )
-                match_features.extend(h2h_features)
-            
-            # Recent form features
-            if self.feature_config["use_recent_form"]:
-                recent_form_features = self._extract_recent_form_features(
-                    home_player_id, away_player_id, prev_matches, 
-                    self.feature_config["recent_matches_window"]
-                )
-                match_features.extend(recent_form_features)
-            
-            # Advanced features
-            if self.feature_config["use_advanced_features"]:
-                advanced_features = self._extract_advanced_features(
-                    home_player, away_player, home_team_id, away_team_id,
-                    home_player_id, away_player_id, prev_matches
-                )
-                match_features.extend(advanced_features)
-            
-            # Temporal features
-            if self.feature_config["use_temporal_features"]:
-                temporal_features = self._extract_temporal_features(match_date, prev_matches)
-                match_features.extend(temporal_features)
-            
-            features.append(match_features)
+            # Previous matches are only looked up if a requested feature needs them
+            rows.append((home_player_id, away_player_id, home_team_id, away_team_id))
+            histories.append(self._match_history(match_index, match_date, home_player_id, away_player_id))
             
             # Extract labels
             if for_score_prediction:
@@ -138,288 +277,210 @@ class FeatureEngineer:
                 label = 1 if home_score > away_score else 0
                 labels.append(label)
         
+        if not rows:
+            features = np.array([])
+        elif point_in_time:
+            as_of_stats = AsOfStats.from_matches(matches, self._parse_match_date)
+            dated_rows = [(history.match_date,) + row for row, history in zip(rows, histories)]
+            features = self._assemble_features(
+                lambda: RowStats(*as_of_stats.row_stats(dated_rows)), histories, columns
+            )
+        else:
+            features = self._assemble_features(
+                lambda: self._gather_row_stats(player_stats, rows), histories, columns
+            )
+        
         if for_score_prediction:
-            return np.array(features), np.array(home_scores), np.array(away_scores)
+            return features, np.array(home_scores), np.array(away_scores)
         else:
-            return np.array(features), np.array(labels)
+            return features, np.array(labels)
     
     @log_exceptions(logger)
-    def _parse_match_date(self, match):
+    def extract_live_features(self, player_stats, match, feature_state, columns=None):
         """
-        Parse match date from match data.
+        Extract features for a match that has not been played yet.
+        
+        History-dependent features are read from the live feature state instead
+        of being recomputed from the full match history, so the cost does not
+        grow with the amount of history.
         
         Args:
-            match (dict): Match data dictionary
+            player_stats (dict): Player statistics dictionary
+            match (dict): Upcoming match data dictionary
+            feature_state (FeatureState): Live feature state built from completed matches
+            columns (list): Names of the features to extract (default: all enabled features)
             
         Returns:
-            datetime: Match date
-        """
-        try:
-            # Try to parse date from match data
-            if 'date' in match:
-                return datetime.strptime(match['date'], "%Y-%m-%d")
-            elif 'startTime' in match:
-                return datetime.strptime(match['startTime'].split('T')[0], "%Y-%m-%d")
-            else:
-                # Default to current date if not available
-                return datetime.now()
-        except (ValueError, TypeError):
-            # Default to current date if parsing fails
-            return datetime.now()
+            numpy.ndarray: Feature matrix with a single row (empty if player stats are missing)
+        """
+        columns = self._resolve_columns(columns)
+        window_size = self.feature_config["recent_matches_window"]
+        if window_size > feature_state.window:
+            raise ValueError(
+                f"Recent matches window {window_size} exceeds feature state window {feature_state.window}"
+            )
+        
+        home_player_id = str(match['homePlayer']['id'])
+        away_player_id = str(match['awayPlayer']['id'])
+        
+        if home_player_id not in player_stats or away_player_id not in player_stats:
+            return np.array([])
+        
+        history = MatchHistory(
+            self, home_player_id, away_player_id, self._parse_match_date(match),
+            lambda player_id: self._get_player_recent_matches(
+                player_id, feature_state.recent_matches(home_player_id, away_player_id), window_size
+            ),
+            feature_state.home_advantage,
+            lambda player_id: self._normalize_consistency(*feature_state.score_variance(player_id))
+        )
+        
+        row = (home_player_id, away_player_id, str(match['homeTeam']['id']), str(match['awayTeam']['id']))
+        return self._assemble_features(lambda: self._gather_row_stats(player_stats, [row]), [history], columns)
     
-    @log_exceptions(logger)
-    def _get_previous_matches(self, all_matches, current_match, current_date):
+    def get_feature_blocks(self, player_stats):
         """
-        Get previous matches before the current match.
+        Get the feature blocks of a player statistics snapshot, building them on first use.
+        
+        The blocks are cached against the identity of the statistics dictionary
+        (which is kept referenced so the identity cannot be reused), so the
+        dictionary must not be modified in place between calls.
         
         Args:
-            all_matches (list): List of all match data dictionaries
-            current_match (dict): Current match data dictionary
-            current_date (datetime): Current match date
+            player_stats (dict): Player statistics dictionary
             
         Returns:
-            list: List of previous match data dictionaries
+            FeatureBlocks: Feature blocks
         """
-        prev_matches = []
-        
-        for match in all_matches:
-            # Skip matches without scores
-            if 'homeScore' not in match or 'awayScore' not in match:
-                continue
-            
-            # Skip the current match
-            if match == current_match:
-                continue
-            
-            # Get match date
-            match_date = self._parse_match_date(match)
-            
-            # Only include matches before the current match
-            if match_date < current_date:
-                prev_matches.append(match)
-        
-        return prev_matches
+        if self._blocks is None or self._blocks_source is not player_stats:
+            self._blocks = FeatureBlocks.from_player_stats(player_stats)
+            self._blocks_source = player_stats
+        return self._blocks
     
-    @log_exceptions(logger)
-    def _extract_basic_features(self, home_player, away_player):
+    def _resolve_columns(self, columns):
         """
-        Extract basic player features.
+        Validate the requested feature names.
         
         Args:
-            home_player (dict): Home player statistics dictionary
-            away_player (dict): Away player statistics dictionary
+            columns (list): Requested feature names, or None for all enabled features
             
         Returns:
-            list: Basic player features
+            list: Feature names to extract
         """
-        return [
-            # Player overall stats
-            home_player.get('win_rate', 0),
-            away_player.get('win_rate', 0),
-            home_player.get('avg_score', 0),
-            away_player.get('avg_score', 0),
-            home_player.get('total_matches', 0),
-            away_player.get('total_matches', 0)
-        ]
+        if columns is None:
+            return self.feature_names
+        
+        unknown = [name for name in columns if name not in self.feature_names]
+        if unknown:
+            raise ValueError(f"Unknown or disabled features: {', '.join(unknown)}")
+        return list(columns)
     
-    @log_exceptions(logger)
-    def _extract_team_features(self, home_player, away_player, home_team_id, away_team_id):
+    def _match_history(self, match_index, match_date, home_player_id, away_player_id):
         """
-        Extract team-specific features.
+        Create the lazily computed history of a match from the matches played before it.
         
         Args:
-            home_player (dict): Home player statistics dictionary
-            away_player (dict): Away player statistics dictionary
-            home_team_id (str): Home team ID
-            away_team_id (str): Away team ID
+            match_index (MatchIndex): Index of the completed matches
+            match_date (datetime): Match date
+            home_player_id (str): Home player ID
+            away_player_id (str): Away player ID
             
         Returns:
-            list: Team-specific features
-        """
-        # Get team stats
-        home_team_win_rate = self._get_team_win_rate(home_player, home_team_id)
-        away_team_win_rate = self._get_team_win_rate(away_player, away_team_id)
-        home_team_avg_score = self._get_team_avg_score(home_player, home_team_id)
-        away_team_avg_score = self._get_team_avg_score(away_player, away_team_id)
-        home_team_matches = self._get_team_matches(home_player, home_team_id)
-        away_team_matches = self._get_team_matches(away_player, away_team_id)
-        
-        # Calculate team experience ratio (how often the player uses this team)
-        home_team_exp_ratio = home_team_matches / max(home_player.get('total_matches', 1), 1)
-        away_team_exp_ratio = away_team_matches / max(away_player.get('total_matches', 1), 1)
-        
-        # Calculate team performance relative to overall performance
-        home_team_rel_win_rate = home_team_win_rate - home_player.get('win_rate', 0)
-        away_team_rel_win_rate = away_team_win_rate - away_player.get('win_rate', 0)
-        home_team_rel_avg_score = home_team_avg_score - home_player.get('avg_score', 0)
-        away_team_rel_avg_score = away_team_avg_score - away_player.get('avg_score', 0)
-        
-        return [
-            # Team-specific stats
-            home_team_win_rate,
-            away_team_win_rate,
-            home_team_avg_score,
-            away_team_avg_score,
-            home_team_matches,
-            away_team_matches,
-            
-            # Team experience ratio
-            home_team_exp_ratio,
-            away_team_exp_ratio,
-            
-            # Team performance relative to overall
-            home_team_rel_win_rate,
-            away_team_rel_win_rate,
-            home_team_rel_avg_score,
-            away_team_rel_avg_score
-        ]
+            MatchHistory: Match history
+        """
+        window_size = self.feature_config["recent_matches_window"]
+        return MatchHistory(
+            self, home_player_id, away_player_id, match_date,
+            lambda player_id: match_index.recent_matches(player_id, match_date, window_size),
+            lambda: match_index.home_advantage(match_date),
+            lambda player_id: self._calculate_player_consistency(
+                match_index.player_scores_before(player_id, match_date)
+            )
+        )
     
-    @log_exceptions(logger)
-    def _extract_h2h_features(self, home_player, away_player, home_player_id, away_player_id):
+    def _gather_row_stats(self, player_stats, rows):
         """
-        Extract head-to-head features.
+        Gather the player, team and head-to-head statistics of each row from a
+        player statistics snapshot.
         
         Args:
-            home_player (dict): Home player statistics dictionary
-            away_player (dict): Away player statistics dictionary
-            home_player_id (str): Home player ID
-            away_player_id (str): Away player ID
+            player_stats (dict): Player statistics dictionary
+            rows (list): (home player ID, away player ID, home team ID, away team ID) per row
             
         Returns:
-            list: Head-to-head features
+            RowStats: Statistics per row
         """
-        # Get head-to-head stats
-        home_h2h_win_rate = self._get_h2h_win_rate(home_player, away_player_id)
-        away_h2h_win_rate = self._get_h2h_win_rate(away_player, home_player_id)
-        home_h2h_matches = self._get_h2h_matches(home_player, away_player_id)
-        away_h2h_matches = self._get_h2h_matches(away_player, home_player_id)
-        
-        # Calculate head-to-head score stats
-        home_h2h_avg_score = self._get_avg_score_against(home_player, away_player_id)
-        away_h2h_avg_score = self._get_avg_score_against(away_player, home_player_id)
-        
-        # Calculate head-to-head win rate difference
-        h2h_win_rate_diff = home_h2h_win_rate - away_h2h_win_rate
-        
-        # Calculate head-to-head score difference
-        h2h_score_diff = home_h2h_avg_score - away_h2h_avg_score
-        
-        return [
-            # Head-to-head stats
-            home_h2h_win_rate,
-            away_h2h_win_rate,
-            home_h2h_matches,
-            away_h2h_matches,
-            home_h2h_avg_score,
-            away_h2h_avg_score,
-            h2h_win_rate_diff,
-            h2h_score_diff
-        ]
+        blocks = self.get_feature_blocks(player_stats)
+        return blocks.gather(*blocks.index_rows(*zip(*rows)))
     
-    @log_exceptions(logger)
-    def _extract_recent_form_features(self, home_player_id, away_player_id, prev_matches, window_size=5):
+    def _assemble_features(self, row_stats, histories, columns):
         """
-        Extract recent form features.
+        Assemble the feature matrix for the requested features.
+        
+        Features that only depend on player statistics are computed from the
+        gathered row statistics for all rows at once; history-dependent
+        features are computed per row, and only if requested.
         
         Args:
-            home_player_id (str): Home player ID
-            away_player_id (str): Away player ID
-            prev_matches (list): List of previous match data dictionaries
-            window_size (int): Number of recent matches to consider
+            row_stats (callable): Returns the RowStats of the rows
+            histories (list): MatchHistory per row
+            columns (list): Names of the features to extract
             
         Returns:
-            list: Recent form features
-        """
-        # Get recent matches for each player
-        home_recent_matches = self._get_player_recent_matches(home_player_id, prev_matches, window_size)
-        away_recent_matches = self._get_player_recent_matches(away_player_id, prev_matches, window_size)
-        
-        # Calculate recent win rates
-        home_recent_win_rate = self._calculate_recent_win_rate(home_player_id, home_recent_matches)
-        away_recent_win_rate = self._calculate_recent_win_rate(away_player_id, away_recent_matches)
-        
-        # Calculate recent average scores
-        home_recent_avg_score = self._calculate_recent_avg_score(home_player_id, home_recent_matches)
-        away_recent_avg_score = self._calculate_recent_avg_score(away_player_id, away_recent_matches)
-        
-        # Calculate recent score variance (consistency)
-        home_recent_score_var = self._calculate_recent_score_variance(home_player_id, home_recent_matches)
-        away_recent_score_var = self._calculate_recent_score_variance(away_player_id, away_recent_matches)
-        
-        # Calculate momentum (trend in recent performance)
-        home_momentum = self._calculate_momentum(home_player_id, home_recent_matches)
-        away_momentum = self._calculate_momentum(away_player_id, away_recent_matches)
+            numpy.ndarray: Feature matrix
+        """
+        if not columns:
+            return np.zeros((len(histories), 0))
+        
+        stats = None
+        gathered = {}
+        feature_columns = []
+        
+        for name in columns:
+            if name in BLOCK_FEATURES:
+                group, position = BLOCK_FEATURES[name]
+                if group not in gathered:
+                    stats = stats or row_stats()
+                    if group == "basic":
+                        gathered[group] = stats.basic_features()
+                    elif group == "team":
+                        gathered[group] = stats.team_features()
+                    elif group == "h2h":
+                        gathered[group] = stats.h2h_features()
+                    else:
+                        gathered[group] = stats.advanced_features()
+                feature_columns.append(gathered[group][:, position])
+            else:
+                feature = self.history_features[name]
+                feature_columns.append(np.array([feature(history) for history in histories], dtype=float))
         
-        return [
-            # Recent form stats
-            home_recent_win_rate,
-            away_recent_win_rate,
-            home_recent_avg_score,
-            away_recent_avg_score,
-            home_recent_score_var,
-            away_recent_score_var,
-            home_momentum,
-            away_momentum
-        ]
+        return np.column_stack(feature_columns)
     
     @log_exceptions(logger)
-    def _extract_advanced_features(self, home_player, away_player, home_team_id, away_team_id, 
-                                  home_player_id, away_player_id, prev_matches):
+    def _parse_match_date(self, match):
         """
-        Extract advanced features.
+        Parse match date from match data.
         
         Args:
-            home_player (dict): Home player statistics dictionary
-            away_player (dict): Away player statistics dictionary
-            home_team_id (str): Home team ID
-            away_team_id (str): Away team ID
-            home_player_id (str): Home player ID
-            away_player_id (str): Away player ID
-            prev_matches (list): List of previous match data dictionaries
+            match (dict): Match data dictionary
             
         Returns:
-            list: Advanced features
+            datetime: Match date
         """
-        # Calculate win rate difference
-        win_rate_diff = home_player.get('win_rate', 0) - away_player.get('win_rate', 0)
-        
-        # Calculate average score difference
-        avg_score_diff = home_player.get('avg_score', 0) - away_player.get('avg_score', 0)
-        
-        # Calculate experience difference (total matches)
-        exp_diff = home_player.get('total_matches', 0) - away_player.get('total_matches', 0)
-        
-        # Calculate team win rate difference
-        team_win_rate_diff = (self._get_team_win_rate(home_player, home_team_id) - 
-                             self._get_team_win_rate(away_player, away_team_id))
-        
-        # Calculate team average score difference
-        team_avg_score_diff = (self._get_team_avg_score(home_player, home_team_id) - 
-                              self._get_team_avg_score(away_player, away_team_id))
-        
-        # Calculate team experience difference
-        team_exp_diff = (self._get_team_matches(home_player, home_team_id) - 
-                        self._get_team_matches(away_player, away_team_id))
-        
-        # Calculate home court advantage
-        home_advantage = self._calculate_home_advantage(prev_matches)
-        
-        # Calculate player consistency (variance in scores)
-        home_consistency = self._calculate_player_consistency(home_player_id, prev_matches)
-        away_consistency = self._calculate_player_consistency(away_player_id, prev_matches)
-        
-        return [
-            # Advanced stats
-            win_rate_diff,
-            avg_score_diff,
-            exp_diff,
-            team_win_rate_diff,
-            team_avg_score_diff,
-            team_exp_diff,
-            home_advantage,
-            home_consistency,
-            away_consistency
-        ]
+        try:
+            # Try to parse date from match data
+            if 'fixtureStart' in match:
+                return datetime.strptime(match['fixtureStart'][:19], "%Y-%m-%dT%H:%M:%S")
+            elif 'date' in match:
+                return datetime.strptime(match['date'], "%Y-%m-%d")
+            elif 'startTime' in match:
+                return datetime.strptime(match['startTime'].split('T')[0], "%Y-%m-%d")
+            else:
+                # Default to current date if not available
+                return datetime.now()
+        except (ValueError, TypeError):
+            # Default to current date if parsing fails
+            return datetime.now()
     
     @log_exceptions(logger)
     def _extract_temporal_features(self, match_date, prev_matches):
@@ -449,111 +510,6 @@ class FeatureEngineer:
             is_weekend
         ]
     
-    @log_exceptions(logger)
-    def _get_team_win_rate(self, player, team_id):
-        """
-        Get a player's win rate with a specific team.
-        
-        Args:
-            player (dict): Player statistics dictionary
-            team_id (str): Team ID
-            
-        Returns:
-            float: Win rate
-        """
-        teams_used = player.get('teams_used', {})
-        if team_id in teams_used:
-            return teams_used[team_id].get('win_rate', 0)
-        return 0
-    
-    @log_exceptions(logger)
-    def _get_team_avg_score(self, player, team_id):
-        """
-        Get a player's average score with a specific team.
-        
-        Args:
-            player (dict): Player statistics dictionary
-            team_id (str): Team ID
-            
-        Returns:
-            float: Average score
-        """
-        teams_used = player.get('teams_used', {})
-        if team_id in teams_used:
-            return teams_used[team_id].get('avg_score', 0)
-        return 0
-    
-    @log_exceptions(logger)
-    def _get_team_matches(self, player, team_id):
-        """
-        Get a player's number of matches with a specific team.
-        
-        Args:
-            player (dict): Player statistics dictionary
-            team_id (str): Team ID
-            
-        Returns:
-            int: Number of matches
-        """
-        teams_used = player.get('teams_used', {})
-        if team_id in teams_used:
-            return teams_used[team_id].get('matches', 0)
-        return 0
-    
-    @log_exceptions(logger)
-    def _get_h2h_win_rate(self, player, opponent_id):
-        """
-        Get a player's win rate against a specific opponent.
-        
-        Args:
-            player (dict): Player statistics dictionary
-            opponent_id (str): Opponent player ID
-            
-        Returns:
-            float: Win rate
-        """
-        opponents_faced = player.get('opponents_faced', {})
-        if opponent_id in opponents_faced:
-            return opponents_faced[opponent_id].get('win_rate', 0)
-        return 0
-    
-    @log_exceptions(logger)
-    def _get_h2h_matches(self, player, opponent_id):
-        """
-        Get a player's number of matches against a specific opponent.
-        
-        Args:
-            player (dict): Player statistics dictionary
-            opponent_id (str): Opponent player ID
-            
-        Returns:
-            int: Number of matches
-        """
-        opponents_faced = player.get('opponents_faced', {})
-        if opponent_id in opponents_faced:
-            return opponents_faced[opponent_id].get('matches', 0)
-        return 0
-    
-    @log_exceptions(logger)
-    def _get_avg_score_against(self, player, opponent_id):
-        """
-        Get a player's average score against a specific opponent.
-        
-        Args:
-            player (dict): Player statistics dictionary
-            opponent_id (str): Opponent player ID
-            
-        Returns:
-            float: Average score
-        """
-        opponents_faced = player.get('opponents_faced', {})
-        if opponent_id in opponents_faced:
-            total_score = opponents_faced[opponent_id].get('total_score', 0)
-            matches = opponents_faced[opponent_id].get('matches', 0)
-            if matches > 0:
-                return total_score / matches
-        return 0
-    
     @log_exceptions(logger)
     def _get_player_recent_matches(self, player_id, matches, window_size=5):
         """
@@ -718,71 +674,37 @@ class FeatureEngineer:
         # Momentum is the difference between weighted and unweighted win rates
         return weighted_win_rate - unweighted_win_rate
     
-    @log_exceptions(logger)
-    def _calculate_home_advantage(self, matches):
+    def _calculate_player_consistency(self, scores):
         """
-        Calculate home court advantage.
+        Calculate a player's consistency (inverse of score variance).
         
         Args:
-            matches (list): List of match data dictionaries
+            scores (numpy.ndarray): The player's scores in previous matches
             
         Returns:
-            float: Home court advantage
+            float: Consistency
         """
-        if not matches:
+        if len(scores) < 2:
             return 0
         
-        home_wins = 0
-        
-        for match in matches:
-            home_score = match['homeScore']
-            away_score = match['awayScore']
-            
-            if home_score > away_score:
-                home_wins += 1
-        
-        return home_wins / len(matches)
+        return self._normalize_consistency(len(scores), np.var(scores))
     
-    @log_exceptions(logger)
-    def _calculate_player_consistency(self, player_id, matches):
+    @staticmethod
+    def _normalize_consistency(num_scores, variance):
         """
-        Calculate a player's consistency (inverse of score variance).
+        Convert a player's score variance into a consistency value.
         
         Args:
-            player_id (str): Player ID
-            matches (list): List of match data dictionaries
+            num_scores (int): Number of scores the variance was computed from
+            variance (float): Score variance
             
         Returns:
             float: Consistency
         """
-        player_matches = []
-        
-        for match in matches:
-            home_player_id = str(match['homePlayer']['id'])
-            away_player_id = str(match['awayPlayer']['id'])
-            
-            if home_player_id == player_id or away_player_id == player_id:
-                player_matches.append(match)
-        
-        if not player_matches or len(player_matches) < 2:
-            return 0
-        
-        scores = []
-        
-        for match in player_matches:
-            home_player_id = str(match['homePlayer']['id'])
-            away_player_id = str(match['awayPlayer']['id'])
-            
-            if home_player_id == player_id:
-                scores.append(match['homeScore'])
-            elif away_player_id == player_id:
-                scores.append(match['awayScore'])
-        
-        if not scores:
+        if num_scores < 2:
             return 0
         
         # Consistency is the inverse of variance (normalized to [0, 1])
-        variance = np.var(scores)
         if variance == 0:
             return 1  # Perfect consistency
         
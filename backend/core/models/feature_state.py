@@ -0,0 +1,247 @@
+"""
+Live feature state for scoring upcoming matches.
+
+The state is built once from completed match history and updated as new
+results arrive. It keeps exactly what the history-dependent features need:
+each player's most recent matches, running score moments per player and the
+league-wide home win count. Feature vectors for an unplayed fixture can then
+be produced in constant time instead of rescanning the whole history.
+"""
+
+import json
+from pathlib import Path
+
+from config.settings import FEATURE_STATE_FILE, FEATURE_STATE_WINDOW
+from config.logging_config import get_model_tuning_logger
+from utils.hashing import content_hash
+from utils.logging import log_execution_time, log_exceptions
+
+logger = get_model_tuning_logger()
+
+
+class FeatureState:
+    """
+    Accumulated history needed to extract features for upcoming matches.
+    """
+
+    def __init__(self, window=FEATURE_STATE_WINDOW):
+        """
+        Initialize an empty feature state.
+
+        Args:
+            window (int): Number of recent matches kept per player
+        """
+        self.window = window
+        self.recent = {}
+        self.score_moments = {}
+        self.home_wins = 0
+        self.total_matches = 0
+        self.match_ids = set()
+
+    @classmethod
+    @log_execution_time(logger)
+    @log_exceptions(logger)
+    def from_matches(cls, matches, window=FEATURE_STATE_WINDOW):
+        """
+        Build the feature state from completed matches.
+
+        Args:
+            matches (list): List of match data dictionaries
+            window (int): Number of recent matches kept per player
+
+        Returns:
+            FeatureState: Feature state
+        """
+        state = cls(window)
+        completed = [m for m in matches if 'homeScore' in m and 'awayScore' in m]
+        for match in sorted(completed, key=lambda m: m.get('fixtureStart') or ''):
+            state.update(match)
+
+        logger.info(f"Built feature state from {state.total_matches} matches for {len(state.recent)} players")
+        return state
+
+    def update(self, match):
+        """
+        Add a completed match to the state.
+
+        Args:
+            match (dict): Match data dictionary
+
+        Returns:
+            bool: True if the match was added, False if it was incomplete or already known
+        """
+        if 'homeScore' not in match or 'awayScore' not in match:
+            return False
+
+        match_id = match.get('id')
+        if match_id is not None:
+            if match_id in self.match_ids:
+                return False
+            self.match_ids.add(match_id)
+
+        home_score = match['homeScore']
+        away_score = match['awayScore']
+
+        # Keep only what the feature helpers read
+        entry = {
+            'id': match_id,
+            'homePlayer': {'id': match['homePlayer']['id']},
+            'awayPlayer': {'id': match['awayPlayer']['id']},
+            'homeScore': home_score,
+            'awayScore': away_score,
+            'fixtureStart': match.get('fixtureStart')
+        }
+
+        for player_id, score in ((str(match['homePlayer']['id']), home_score),
+                                 (str(match['awayPlayer']['id']), away_score)):
+            self._add_recent(player_id, entry)
+
+            moments = self.score_moments.setdefault(player_id, [0, 0, 0])
+            moments[0] += 1
+            moments[1] += score
+            moments[2] += score * score
+
+        self.total_matches += 1
+        if home_score > away_score:
+            self.home_wins += 1
+
+        return True
+
+    def recent_matches(self, *player_ids):
+        """
+        Get the recent matches of one or more players, without duplicates.
+
+        Args:
+            *player_ids (str): Player IDs
+
+        Returns:
+            list: Match data dictionaries
+        """
+        matches = []
+        seen = set()
+        for player_id in player_ids:
+            for match in self.recent.get(str(player_id), []):
+                key = match['id'] if match['id'] is not None else id(match)
+                if key not in seen:
+                    seen.add(key)
+                    matches.append(match)
+        return matches
+
+    def home_advantage(self):
+        """
+        Get the share of matches won by the home player.
+
+        Returns:
+            float: Home court advantage
+        """
+        if self.total_matches == 0:
+            return 0
+        return self.home_wins / self.total_matches
+
+    def score_variance(self, player_id):
+        """
+        Get the number of scores and the score variance of a player.
+
+        Args:
+            player_id (str): Player ID
+
+        Returns:
+            tuple: (number of scores, population variance)
+        """
+        count, total, total_squares = self.score_moments.get(str(player_id), (0, 0, 0))
+        if count == 0:
+            return 0, 0
+
+        # Scores are integers, so the numerator is exact and zero variance stays zero
+        return count, (count * total_squares - total * total) / (count * count)
+
+    def fingerprint(self, *player_ids):
+        """
+        Hash the parts of the state that features for the given players depend on.
+
+        Args:
+            *player_ids (str): Player IDs (default: every player)
+
+        Returns:
+            str: Content hash
+        """
+        player_ids = player_ids or sorted(self.recent)
+        return content_hash({
+            "window": self.window,
+            "home_advantage": [self.home_wins, self.total_matches],
+            "players": {
+                str(player_id): [
+                    [m['id'] for m in self.recent.get(str(player_id), [])],
+                    self.score_moments.get(str(player_id))
+                ]
+                for player_id in player_ids
+            }
+        })
+
+    @log_exceptions(logger)
+    def save(self, file_path=FEATURE_STATE_FILE):
+        """
+        Save the feature state to file.
+
+        Args:
+            file_path (str or Path): Output file
+        """
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "window": self.window,
+                "recent": self.recent,
+                "score_moments": self.score_moments,
+                "home_wins": self.home_wins,
+                "total_matches": self.total_matches,
+                "match_ids": sorted(self.match_ids, key=str)
+            }, f)
+        logger.info(f"Saved feature state to {file_path}")
+
+    @classmethod
+    @log_exceptions(logger)
+    def load(cls, file_path=FEATURE_STATE_FILE):
+        """
+        Load the feature state from file.
+
+        Args:
+            file_path (str or Path): Input file
+
+        Returns:
+            FeatureState: Feature state, or None if the file doesn't exist
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            logger.warning(f"Feature state file {file_path} not found")
+            return None
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        state = cls(data["window"])
+        state.recent = data["recent"]
+        state.score_moments = data["score_moments"]
+        state.home_wins = data["home_wins"]
+        state.total_matches = data["total_matches"]
+        state.match_ids = set(data["match_ids"])
+        return state
+
+    def _add_recent(self, player_id, entry):
+        """
+        Insert a match into a player's recent window, most recent first.
+
+        Args:
+            player_id (str): Player ID
+            entry (dict): Compact match data dictionary
+        """
+        recent = self.recent.setdefault(player_id, [])
+        start = entry['fixtureStart'] or ''
+
+        # Results normally arrive in order, so this is almost always position 0
+        position = 0
+        while position < len(recent) and (recent[position]['fixtureStart'] or '') > start:
+            position += 1
+
+        recent.insert(position, entry)
+        del recent[self.window:]
@@ -0,0 +1,181 @@
+"""
+Time-ordered match index for history-dependent features.
+
+Completed matches are sorted by date once, and each player gets a sorted
+list of their match dates with offsets into the sorted matches. "Matches
+before t" and "a player's last N matches before t" are then a bisect plus a
+slice instead of a scan over the whole history for every row.
+"""
+
+from bisect import bisect_left
+from itertools import accumulate
+
+import numpy as np
+
+from config.logging_config import get_model_tuning_logger
+from utils.logging import log_execution_time
+
+logger = get_model_tuning_logger()
+
+
+class MatchIndex:
+    """
+    Per-player, time-ordered index over completed matches.
+    """
+
+    def __init__(self, matches, parse_date):
+        """
+        Initialize the match index. The index is built on first use.
+
+        Args:
+            matches (list): List of match data dictionaries (incomplete matches are ignored)
+            parse_date (callable): Returns the date of a match data dictionary
+        """
+        self.source = matches
+        self.parse_date = parse_date
+        self.matches = None
+        self.dates = None
+        self.home_wins = None
+        self.players = None
+
+    def _ensure_built(self):
+        """
+        Build the index on first use.
+        """
+        if self.matches is None:
+            self._build()
+
+    @log_execution_time(logger)
+    def _build(self):
+        """
+        Sort the completed matches by date and index them per player.
+        """
+        completed = [
+            (self.parse_date(match), -position, match)
+            for position, match in enumerate(self.source)
+            if 'homeScore' in match and 'awayScore' in match
+        ]
+
+        # Matches on the same date are kept in reverse input order, so reading a
+        # player's matches newest first yields them in input order, like a stable
+        # descending sort by date
+        completed.sort(key=lambda entry: entry[:2])
+
+        self.matches = [match for _, _, match in completed]
+        self.dates = [date for date, _, _ in completed]
+        self.home_wins = [0] + list(accumulate(
+            1 if match['homeScore'] > match['awayScore'] else 0 for match in self.matches
+        ))
+
+        players = {}
+        for offset, match in enumerate(self.matches):
+            home_player_id = str(match['homePlayer']['id'])
+            away_player_id = str(match['awayPlayer']['id'])
+            for player_id, score in ((home_player_id, match['homeScore']), (away_player_id, match['awayScore'])):
+                dates, offsets, scores = players.setdefault(player_id, ([], [], []))
+                dates.append(self.dates[offset])
+                offsets.append(offset)
+                scores.append(score)
+
+        self.players = {
+            player_id: (dates, offsets, np.array(scores, dtype=float))
+            for player_id, (dates, offsets, scores) in players.items()
+        }
+
+        logger.info(f"Indexed {len(self.matches)} matches for {len(self.players)} players")
+
+    def count_before(self, date):
+        """
+        Count the completed matches played before a date.
+
+        Args:
+            date (datetime): Cutoff date (exclusive)
+
+        Returns:
+            int: Number of matches
+        """
+        self._ensure_built()
+        return bisect_left(self.dates, date)
+
+    def matches_before(self, date):
+        """
+        Get the completed matches played before a date.
+
+        Args:
+            date (datetime): Cutoff date (exclusive)
+
+        Returns:
+            list: Match data dictionaries, oldest first
+        """
+        return self.matches[:self.count_before(date)]
+
+    def player_matches_before(self, player_id, date):
+        """
+        Get all matches of a player played before a date.
+
+        Args:
+            player_id (str): Player ID
+            date (datetime): Cutoff date (exclusive)
+
+        Returns:
+            list: Match data dictionaries, oldest first
+        """
+        self._ensure_built()
+        if player_id not in self.players:
+            return []
+
+        dates, offsets, _ = self.players[player_id]
+        return [self.matches[offset] for offset in offsets[:bisect_left(dates, date)]]
+
+    def recent_matches(self, player_id, date, window_size):
+        """
+        Get the last matches of a player played before a date.
+
+        Args:
+            player_id (str): Player ID
+            date (datetime): Cutoff date (exclusive)
+            window_size (int): Number of recent matches to return
+
+        Returns:
+            list: Match data dictionaries, most recent first
+        """
+        self._ensure_built()
+        if player_id not in self.players or window_size <= 0:
+            return []
+
+        dates, offsets, _ = self.players[player_id]
+        end = bisect_left(dates, date)
+        return [self.matches[offset] for offset in reversed(offsets[max(0, end - window_size):end])]
+
+    def player_scores_before(self, player_id, date):
+        """
+        Get a player's scores in matches played before a date.
+
+        Args:
+            player_id (str): Player ID
+            date (datetime): Cutoff date (exclusive)
+
+        Returns:
+            numpy.ndarray: Scores, oldest first
+        """
+        self._ensure_built()
+        if player_id not in self.players:
+            return np.array([])
+
+        dates, _, scores = self.players[player_id]
+        return scores[:bisect_left(dates, date)]
+
+    def home_advantage(self, date):
+        """
+        Get the share of matches before a date won by the home player.
+
+        Args:
+            date (datetime): Cutoff date (exclusive)
+
+        Returns:
+            float: Home court advantage
+        """
+        count = self.count_before(date)
+        if count == 0:
+            return 0
+        return self.home_wins[count] / count
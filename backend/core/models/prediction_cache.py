@@ -0,0 +1,283 @@
+"""
+Prediction cache for the prediction models.
+
+Predictions are memoized in a bounded LRU that is mirrored to disk. Entries
+are keyed by the model version, the model's feature configuration, a
+fingerprint of both players' statistics, the teams and the fixture date, so
+a new best model or a change in either player's statistics simply misses the
+cache; entries for models that are no longer in use are pruned.
+
+A player's statistics include their whole match history, so their
+fingerprint is computed once per player statistics snapshot rather than
+once per key. Player statistics are rebuilt, never modified, once
+predictions are made from them.
+"""
+
+import copy
+import functools
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from config.settings import PREDICTION_CACHE_FILE, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_ENABLED
+from config.logging_config import get_model_tuning_logger
+from utils.hashing import content_hash
+
+logger = get_model_tuning_logger()
+
+# Number of player statistics snapshots whose player fingerprints are kept
+FINGERPRINT_SNAPSHOTS = 2
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predictions with on-disk persistence.
+    """
+
+    def __init__(self, cache_file=PREDICTION_CACHE_FILE, max_entries=PREDICTION_CACHE_SIZE):
+        """
+        Initialize the prediction cache.
+
+        Args:
+            cache_file (str or Path): File the cache is persisted to (None for memory only)
+            max_entries (int): Maximum number of cached predictions
+        """
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+
+    @staticmethod
+    def make_key(model, player_stats, match, feature_state=None):
+        """
+        Build the cache key for a prediction.
+
+        Args:
+            model (BaseModel): Model making the prediction
+            player_stats (dict): Player statistics dictionary
+            match (dict): Match data dictionary
+            feature_state (FeatureState): Live feature state the prediction is made from
+
+        Returns:
+            str: Cache key, or None if the prediction cannot be cached
+        """
+        home_player_id = str(match['homePlayer']['id'])
+        away_player_id = str(match['awayPlayer']['id'])
+
+        # Predictions without player stats are random fallbacks
+        if home_player_id not in player_stats or away_player_id not in player_stats:
+            return None
+
+        # Temporal features only depend on the fixture's calendar date
+        fixture_date = str(match.get('fixtureStart') or match.get('date') or match.get('startTime') or '')[:10]
+
+        return content_hash({
+            "model_type": model.__class__.__name__,
+            "model_id": model.model_id,
+            "training_time": model.model_info.get("training_time"),
+            "feature_config": content_hash(model.feature_engineer.feature_config),
+            "home_player": player_fingerprint(player_stats, home_player_id),
+            "away_player": player_fingerprint(player_stats, away_player_id),
+            "teams": [str(match['homeTeam']['id']), str(match['awayTeam']['id'])],
+            "fixture_date": fixture_date,
+            "feature_state": (feature_state.fingerprint(home_player_id, away_player_id)
+                              if feature_state is not None else None)
+        })
+
+    def get(self, key):
+        """
+        Look up a cached prediction.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            dict: Copy of the cached prediction, or None on a miss
+        """
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry["prediction"])
+
+    def put(self, key, model_id, prediction):
+        """
+        Store a prediction, evicting the least recently used entries if full.
+
+        Args:
+            key (str): Cache key
+            model_id (str): ID of the model that made the prediction
+            prediction (dict): Prediction results
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._entries[key] = {"model_id": str(model_id), "prediction": copy.deepcopy(prediction)}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def retain_models(self, model_ids):
+        """
+        Drop cached predictions made by models other than the given ones.
+
+        Args:
+            model_ids (iterable): IDs of the models in use
+
+        Returns:
+            int: Number of entries removed
+        """
+        model_ids = {str(model_id) for model_id in model_ids}
+        with self._lock:
+            self._ensure_loaded()
+            stale = [key for key, entry in self._entries.items() if entry["model_id"] not in model_ids]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._dirty = True
+                logger.info(f"Removed {len(stale)} cached predictions from retired models")
+            return len(stale)
+
+    def clear(self):
+        """
+        Remove every cached prediction.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            self._dirty = True
+
+    def save(self):
+        """
+        Write the cache to disk if it changed since it was loaded or last saved.
+        """
+        with self._lock:
+            if self.cache_file is None or not self._dirty:
+                return
+
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump([[key, entry] for key, entry in self._entries.items()], f)
+            self._dirty = False
+            logger.debug(f"Saved {len(self._entries)} cached predictions to {self.cache_file}")
+
+    def get_stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Entry count, hits and misses
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _ensure_loaded(self):
+        """
+        Load the cache from disk on first use. Must hold the lock.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if self.cache_file is None or not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                for key, entry in json.load(f)[-self.max_entries:]:
+                    self._entries[key] = entry
+            logger.info(f"Loaded {len(self._entries)} cached predictions from {self.cache_file}")
+        except (json.JSONDecodeError, UnicodeDecodeError, ValueError, TypeError) as e:
+            logger.error(f"Error loading prediction cache: {str(e)}")
+            self._entries.clear()
+
+
+# Player fingerprints of the latest player statistics snapshots, by snapshot id;
+# each snapshot is kept alongside so that its id cannot be reused by another dict
+_fingerprints = OrderedDict()
+_fingerprints_lock = threading.Lock()
+
+
+def player_fingerprint(player_stats, player_id):
+    """
+    Get the content hash of a player's statistics, computed once per player statistics snapshot.
+
+    Args:
+        player_stats (dict): Player statistics dictionary
+        player_id (str): Player ID
+
+    Returns:
+        str: Content hash of the player's statistics
+    """
+    with _fingerprints_lock:
+        snapshot = _fingerprints.get(id(player_stats))
+        if snapshot is None or snapshot[0] is not player_stats:
+            snapshot = _fingerprints[id(player_stats)] = (player_stats, {})
+            while len(_fingerprints) > FINGERPRINT_SNAPSHOTS:
+                _fingerprints.popitem(last=False)
+        _fingerprints.move_to_end(id(player_stats))
+        fingerprints = snapshot[1]
+
+    fingerprint = fingerprints.get(player_id)
+    if fingerprint is None:
+        # Racing threads compute the same hash, so the lock is not held while hashing
+        fingerprint = fingerprints[player_id] = content_hash(player_stats[player_id])
+    return fingerprint
+
+
+# Prediction cache shared by every model in the process
+_prediction_cache = None
+_prediction_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """
+    Get the process-wide prediction cache, creating it on first use.
+
+    Returns:
+        PredictionCache: Shared prediction cache, or None if caching is disabled
+    """
+    global _prediction_cache
+
+    if not PREDICTION_CACHE_ENABLED:
+        return None
+
+    with _prediction_cache_lock:
+        if _prediction_cache is None:
+            _prediction_cache = PredictionCache()
+        return _prediction_cache
+
+
+def memoize_prediction(predict):
+    """
+    Decorator to serve a model's predict(player_stats, match, feature_state) from the prediction cache.
+
+    Args:
+        predict (callable): Model predict method
+
+    Returns:
+        callable: Decorated method
+    """
+    @functools.wraps(predict)
+    def wrapper(self, player_stats, match, feature_state=None):
+        cache = self.prediction_cache
+        key = cache.make_key(self, player_stats, match, feature_state) if cache is not None else None
+        if key is None:
+            return predict(self, player_stats, match, feature_state=feature_state)
+
+        prediction = cache.get(key)
+        if prediction is None:
+            prediction = predict(self, player_stats, match, feature_state=feature_state)
+            cache.put(key, self.model_id, prediction)
+        return prediction
+    return wrapper
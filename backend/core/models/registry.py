@@ -12,6 +12,9 @@ from utils.logging import log_execution_time, log_exceptions
 
 logger = get_model_tuning_logger()
 
+# Registry field of the metrics of a model on the latest common holdout, stored by the tournament
+HOLDOUT_METRICS_KEY = "holdout_evaluation"
+
 
 class ModelRegistry:
     """
@@ -28,8 +31,22 @@ class ModelRegistry:
         """
         self.models_dir = Path(models_dir)
         self.registry_file = Path(registry_file)
+        self._loaded_version = None
         self.registry = self._load_registry()
 
+    def _file_version(self):
+        """
+        Get the modification time and size of the registry file.
+
+        Returns:
+            tuple: (mtime in nanoseconds, size), or None if the file does not exist
+        """
+        try:
+            stat = self.registry_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     @log_exceptions(logger)
     def _load_registry(self):
         """
@@ -38,6 +55,7 @@ class ModelRegistry:
         Returns:
             dict: Model registry
         """
+        self._loaded_version = self._file_version()
         if not self.registry_file.exists():
             logger.info(f"Registry file {self.registry_file} does not exist, creating new registry")
             return {"models": [], "best_model_id": None}
@@ -53,6 +71,31 @@ class ModelRegistry:
             logger.error(f"Error loading registry from {self.registry_file}: {str(e)}")
             return {"models": [], "best_model_id": None}
 
+    @log_exceptions(logger)
+    def reload(self):
+        """
+        Reload the registry from file, picking up models registered by other processes.
+
+        Returns:
+            dict: Model registry
+        """
+        self.registry = self._load_registry()
+        return self.registry
+
+    @log_exceptions(logger)
+    def reload_if_changed(self):
+        """
+        Reload the registry if its file changed since it was loaded.
+
+        Returns:
+            bool: True if the registry was reloaded
+        """
+        if self._file_version() == self._loaded_version:
+            return False
+
+        self.reload()
+        return True
+
     @log_execution_time(logger)
     @log_exceptions(logger)
     def save_registry(self):
@@ -115,19 +158,94 @@ class ModelRegistry:
     @log_exceptions(logger)
     def _update_best_model(self):
         """
-        Update the best model in the registry based on accuracy.
+        Update the best model in the registry.
+
+        Models compared on the latest common holdout are ranked by their holdout
+        metrics, so a model promoted by a tournament stays best until the next
+        tournament; without holdout metrics, models are ranked by their training
+        metrics.
         """
         if not self.registry["models"]:
             logger.info("No models in registry, cannot update best model")
             self.registry["best_model_id"] = None
             return
 
-        # Find model with highest accuracy
+        evaluated = [m for m in self.registry["models"] if m.get(HOLDOUT_METRICS_KEY)]
+        if evaluated:
+            # Only metrics measured on the same holdout are comparable
+            latest = max(m[HOLDOUT_METRICS_KEY].get("evaluated_at") or "" for m in evaluated)
+            candidates = [m for m in evaluated if (m[HOLDOUT_METRICS_KEY].get("evaluated_at") or "") == latest]
+            best_model = min(candidates, key=lambda m: self.holdout_rank_key(m[HOLDOUT_METRICS_KEY]))
+            logger.info(f"Updated best model to {best_model.get('model_id')} on the holdout evaluated at {latest}")
+        else:
+            best_model = self._best_by_training_metrics()
+
+        self.registry["best_model_id"] = best_model.get("model_id")
+
+    def _best_by_training_metrics(self):
+        """
+        Find the model with the highest training accuracy.
+
+        Returns:
+            dict: Model information
+        """
         best_model = max(self.registry["models"], key=lambda m: m.get("accuracy", 0))
-        best_model_id = best_model.get("model_id")
+        logger.info(f"Updated best model to {best_model.get('model_id')} with accuracy {best_model.get('accuracy', 0)}")
+        return best_model
+
+    @staticmethod
+    def holdout_rank_key(metrics):
+        """
+        Get the sort key ranking holdout metrics from best to worst.
+
+        Args:
+            metrics (dict): Holdout metrics of a model
+
+        Returns:
+            tuple: Sort key (highest accuracy, then lowest Brier score first)
+        """
+        return -metrics["accuracy"], metrics["brier_score"]
+
+    @log_exceptions(logger)
+    def set_best_model(self, model_id):
+        """
+        Set the best model explicitly, e.g. after comparing models on a common holdout.
+
+        Args:
+            model_id (str): Model ID
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not any(m.get("model_id") == model_id for m in self.registry.get("models", [])):
+            logger.error(f"Cannot set best model: model {model_id} not found in registry")
+            return False
+
+        logger.info(f"Setting best model to {model_id}")
+        self.registry["best_model_id"] = model_id
+        return self.save_registry()
+
+    @log_exceptions(logger)
+    def update_model_metrics(self, metrics_by_model, key):
+        """
+        Store metrics on registered models.
+
+        Args:
+            metrics_by_model (dict): Model ID -> metrics dictionary
+            key (str): Registry field the metrics are stored under
 
-        logger.info(f"Updated best model to {best_model_id} with accuracy {best_model.get('accuracy', 0)}")
-        self.registry["best_model_id"] = best_model_id
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        updated = 0
+        for model in self.registry.get("models", []):
+            metrics = metrics_by_model.get(model.get("model_id"))
+            if metrics is not None:
+                model[key] = metrics
+                updated += 1
+
+        logger.info(f"Updated {key} of {updated} models")
+        return self.save_registry()
 
     @log_exceptions(logger)
     def get_model_info(self, model_id):
@@ -238,22 +356,29 @@ class ScoreModelRegistry(ModelRegistry):
         """
         super().__init__(models_dir, registry_file)
 
-    @log_exceptions(logger)
-    def _update_best_model(self):
-        """
-        Update the best model in the registry based on mean absolute error (lower is better).
+    def _best_by_training_metrics(self):
         """
-        if not self.registry["models"]:
-            logger.info("No models in registry, cannot update best model")
-            self.registry["best_model_id"] = None
-            return
+        Find the model with the lowest training mean absolute error.
 
-        # Find model with lowest MAE
+        Returns:
+            dict: Model information
+        """
         best_model = min(self.registry["models"], key=lambda m: m.get("total_score_mae", float('inf')))
-        best_model_id = best_model.get("model_id")
+        logger.info(f"Updated best model to {best_model.get('model_id')} with MAE {best_model.get('total_score_mae', float('inf'))}")
+        return best_model
+
+    @staticmethod
+    def holdout_rank_key(metrics):
+        """
+        Get the sort key ranking holdout metrics from best to worst.
 
-        logger.info(f"Updated best model to {best_model_id} with MAE {best_model.get('total_score_mae', float('inf'))}")
-        self.registry["best_model_id"] = best_model_id
+        Args:
+            metrics (dict): Holdout metrics of a model
+
+        Returns:
+            float: Sort key (lowest total score mean absolute error first)
+        """
+        return metrics["total_score_mae"]
 
     @log_exceptions(logger)
     def add_model(self, model_id, model_path, info_path, total_score_mae):
@@ -16,8 +16,10 @@ from xgboost import XGBRegressor
 from config.settings import DEFAULT_RANDOM_STATE
 from config.logging_config import get_score_model_training_logger
 from utils.logging import log_execution_time, log_exceptions
+from utils.memory import memory_stage
 from core.models.base import BaseModel
 from core.models.feature_engineering import FeatureEngineer
+from core.models.prediction_cache import memoize_prediction
 
 logger = get_score_model_training_logger()
 
@@ -56,6 +58,71 @@ class ScorePredictionModel(BaseModel):
             "away_model": self.away_model
         }
 
+        # Initialize feature selectors
+        self.home_selector = None
+        self.away_selector = None
+
+    def _get_artifacts(self):
+        """
+        Get the fitted score models and feature selectors to persist.
+
+        Returns:
+            dict: Fitted objects
+        """
+        return {
+            "home_model": self.home_model,
+            "away_model": self.away_model,
+            "home_selector": self.home_selector,
+            "away_selector": self.away_selector
+        }
+
+    def _set_artifacts(self, artifacts):
+        """
+        Restore the fitted score models and feature selectors.
+
+        Models saved before the feature selectors were persisted contain only
+        the two score models.
+
+        Args:
+            artifacts (dict): Fitted objects
+        """
+        self.home_model = artifacts["home_model"]
+        self.away_model = artifacts["away_model"]
+        self.home_selector = artifacts.get("home_selector")
+        self.away_selector = artifacts.get("away_selector")
+        self.model = {
+            "home_model": self.home_model,
+            "away_model": self.away_model
+        }
+
+    def _feature_plan(self):
+        """
+        Get the feature columns the home and away models consume.
+
+        Returns:
+            tuple: (feature names selected by either selector, positions of the home model's
+                features in them, positions of the away model's features in them), or None
+                if the selectors are not available
+        """
+        if self.home_selector is None or self.away_selector is None:
+            return None
+
+        # The plan only changes when the selectors do
+        selectors = (self.home_selector, self.away_selector)
+        planned = getattr(self, "_planned_selectors", None)
+        if planned is None or planned[0] is not selectors[0] or planned[1] is not selectors[1]:
+            home_features = self.feature_engineer.selected_features(self.home_selector)
+            away_features = self.feature_engineer.selected_features(self.away_selector)
+            columns = [name for name in self.feature_engineer.feature_names
+                       if name in home_features or name in away_features]
+            self._feature_plan_cache = (
+                columns,
+                [columns.index(name) for name in home_features],
+                [columns.index(name) for name in away_features]
+            )
+            self._planned_selectors = selectors
+        return self._feature_plan_cache
+
     @log_exceptions(logger)
     def _create_models(self, random_state):
         """
@@ -144,7 +211,7 @@ class ScorePredictionModel(BaseModel):
 
     @log_execution_time(logger)
     @log_exceptions(logger)
-    def train(self, player_stats, matches, test_size=0.2):
+    def train(self, player_stats, matches, test_size=0.2, freeze_selectors=False, features=None):
         """
         Train the model on match data.
 
@@ -152,16 +219,29 @@ class ScorePredictionModel(BaseModel):
             player_stats (dict): Player statistics dictionary
             matches (list): List of match data dictionaries
             test_size (float): Proportion of data to use for testing
+            freeze_selectors (bool): Whether to keep the fitted feature selectors and
+                only extract the features they select
+            features (tuple): Features and labels already extracted from matches with every
+                enabled feature, as returned by extract_features (skips extraction)
 
         Returns:
             self: The trained model
         """
         logger.info(f"Training score prediction model with {len(matches)} matches")
 
+        # Only the selected features are needed when the selectors are frozen
+        plan = self._feature_plan() if freeze_selectors else None
+
         # Extract features and labels using the feature engineer
-        X, y_home, y_away = self.feature_engineer.extract_features(
-            player_stats, matches, for_score_prediction=True
-        )
+        if features is not None:
+            X, y_home, y_away = features
+            if plan and len(X):
+                X = X[:, self.feature_engineer.column_positions(plan[0])]
+        else:
+            with memory_stage("extract_features"):
+                X, y_home, y_away = self.feature_engineer.extract_features(
+                    player_stats, matches, for_score_prediction=True, columns=plan[0] if plan else None
+                )
 
         if len(X) == 0:
             logger.error("No valid features extracted from matches")
@@ -174,37 +254,49 @@ class ScorePredictionModel(BaseModel):
             X, y_home, y_away, test_size=test_size, random_state=self.random_state
         )
 
-        # Feature selection for home model
-        logger.info("Performing feature selection for home model")
-        home_selector = SelectFromModel(
-            XGBRegressor(n_estimators=100, random_state=self.random_state),
-            threshold="median"
-        )
-        X_train_home = home_selector.fit_transform(X_train, y_home_train)
-        X_test_home = home_selector.transform(X_test)
-
-        # Feature selection for away model
-        logger.info("Performing feature selection for away model")
-        away_selector = SelectFromModel(
-            XGBRegressor(n_estimators=100, random_state=self.random_state),
-            threshold="median"
-        )
-        X_train_away = away_selector.fit_transform(X_train, y_away_train)
-        X_test_away = away_selector.transform(X_test)
+        if plan:
+            logger.info(f"Using frozen feature selection ({len(plan[0])} features)")
+            home_selector, away_selector = self.home_selector, self.away_selector
+            _, home_columns, away_columns = plan
+            X_train_home, X_test_home = X_train[:, home_columns], X_test[:, home_columns]
+            X_train_away, X_test_away = X_train[:, away_columns], X_test[:, away_columns]
+        else:
+            # Feature selection for home model
+            logger.info("Performing feature selection for home model")
+            home_selector = SelectFromModel(
+                XGBRegressor(n_estimators=100, random_state=self.random_state),
+                threshold="median"
+            )
+            with memory_stage("home_feature_selection"):
+                X_train_home = home_selector.fit_transform(X_train, y_home_train)
+                X_test_home = home_selector.transform(X_test)
+
+            # Feature selection for away model
+            logger.info("Performing feature selection for away model")
+            away_selector = SelectFromModel(
+                XGBRegressor(n_estimators=100, random_state=self.random_state),
+                threshold="median"
+            )
+            with memory_stage("away_feature_selection"):
+                X_train_away = away_selector.fit_transform(X_train, y_away_train)
+                X_test_away = away_selector.transform(X_test)
 
         # Train home score model
         logger.info(f"Training home score model with {len(X_train_home)} samples")
-        self.home_model.fit(X_train_home, y_home_train)
+        with memory_stage("fit_home_model"):
+            self.home_model.fit(X_train_home, y_home_train)
 
         # Train away score model
         logger.info(f"Training away score model with {len(X_train_away)} samples")
-        self.away_model.fit(X_train_away, y_away_train)
+        with memory_stage("fit_away_model"):
+            self.away_model.fit(X_train_away, y_away_train)
 
         # Evaluate models
         logger.info("Evaluating models")
-        metrics = self._evaluate_models(
-            X_test_home, X_test_away, y_home_test, y_away_test
-        )
+        with memory_stage("evaluate"):
+            metrics = self._evaluate_models(
+                X_test_home, X_test_away, y_home_test, y_away_test
+            )
 
         # Store feature selectors
         self.home_selector = home_selector
@@ -221,10 +313,14 @@ class ScorePredictionModel(BaseModel):
         }
         self.model_info["num_samples"] = len(X)
         self.model_info["num_features"] = {
-            "original": X.shape[1],
+            "original": len(self.feature_engineer.feature_names),
             "home_selected": X_train_home.shape[1],
             "away_selected": X_train_away.shape[1]
         }
+        self.model_info["selected_features"] = {
+            "home": self.feature_engineer.selected_features(home_selector),
+            "away": self.feature_engineer.selected_features(away_selector)
+        }
 
         logger.info(f"Models trained with total score MAE: {metrics['total_score_mae']:.4f}")
         return self
@@ -241,18 +337,23 @@ class ScorePredictionModel(BaseModel):
         Returns:
             dict: Evaluation metrics
         """
-        # Extract features and labels using the feature engineer
+        plan = self._feature_plan()
+        if plan is None:
+            raise ValueError("Feature selectors not available")
+        columns, home_columns, away_columns = plan
+
+        # Extract the selected features and labels using the feature engineer
         X, y_home, y_away = self.feature_engineer.extract_features(
-            player_stats, matches, for_score_prediction=True
+            player_stats, matches, for_score_prediction=True, columns=columns
         )
 
         if len(X) == 0:
             logger.error("No valid features extracted from matches")
             raise ValueError("No valid features extracted from matches")
 
-        # Apply feature selection
-        X_home = self.home_selector.transform(X)
-        X_away = self.away_selector.transform(X)
+        # Split the selected features between the two models
+        X_home = X[:, home_columns]
+        X_away = X[:, away_columns]
 
         # Evaluate models
         return self._evaluate_models(X_home, X_away, y_home, y_away)
@@ -325,14 +426,37 @@ class ScorePredictionModel(BaseModel):
             "score_diff_r2": float(diff_r2)
         }
 
+    def predict_batch(self, X):
+        """
+        Predict the scores of many matches at once.
+
+        Args:
+            X (numpy.ndarray): Features with every enabled feature, as returned by extract_features
+
+        Returns:
+            tuple: Predicted home and away scores per row, rounded and non-negative
+        """
+        plan = self._feature_plan()
+        if plan is None:
+            raise ValueError("Feature selectors not available")
+        columns, home_columns, away_columns = plan
+
+        X = X[:, self.feature_engineer.column_positions(columns)]
+        home_scores = np.maximum(np.round(self.home_model.predict(X[:, home_columns])), 0).astype(int)
+        away_scores = np.maximum(np.round(self.away_model.predict(X[:, away_columns])), 0).astype(int)
+        return home_scores, away_scores
+
     @log_exceptions(logger)
-    def predict(self, player_stats, match):
+    @memoize_prediction
+    def predict(self, player_stats, match, feature_state=None):
         """
         Predict the score of a match.
 
         Args:
             player_stats (dict): Player statistics dictionary
             match (dict): Match data dictionary
+            feature_state (FeatureState): Live feature state, required to extract
+                features for matches that have not been played yet
 
         Returns:
             dict: Prediction results
@@ -355,16 +479,27 @@ class ScorePredictionModel(BaseModel):
 
         # Extract features using the feature engineer
         try:
-            X, _, _ = self.feature_engineer.extract_features(
-                player_stats, match_list, for_score_prediction=True
-            )
+            plan = self._feature_plan()
+            if plan is None:
+                raise ValueError("Feature selectors not available")
+            columns, home_columns, away_columns = plan
+
+            # Only compute the features either model consumes
+            if feature_state is not None:
+                X = self.feature_engineer.extract_live_features(
+                    player_stats, match, feature_state, columns=columns
+                )
+            else:
+                X, _, _ = self.feature_engineer.extract_features(
+                    player_stats, match_list, for_score_prediction=True, columns=columns
+                )
 
             if len(X) == 0:
                 raise ValueError("No features extracted")
 
-            # Apply feature selection
-            X_home = self.home_selector.transform(X)
-            X_away = self.away_selector.transform(X)
+            # Split the selected features between the two models
+            X_home = X[:, home_columns]
+            X_away = X[:, away_columns]
 
             # Make prediction
             home_score = self.home_model.predict(X_home)[0]
@@ -398,25 +533,3 @@ class ScorePredictionModel(BaseModel):
             "total_score": int(total_score),
             "score_diff": int(score_diff)
         }
-
-    @log_exceptions(logger)
-    def evaluate(self, player_stats, matches):
-        """
-        Evaluate the model on match data.
-
-        Args:
-            player_stats (dict): Player statistics dictionary
-            matches (list): List of match data dictionaries
-
-        Returns:
-            dict: Evaluation metrics
-        """
-        # Extract features and labels
-        X, y_home, y_away = self._extract_features(player_stats, matches)
-
-        if len(X) == 0:
-            logger.error("No valid features extracted from matches")
-            raise ValueError("No valid features extracted from matches")
-
-        # Evaluate models
-        return self._evaluate_models(X, y_home, y_away)
@@ -0,0 +1,267 @@
+"""
+Model comparison on a common holdout window.
+
+The metrics stored in the registries were measured at training time, on
+whatever data each model was trained on, so they are not comparable across
+models. The tournament scores every registered winner and score model on the
+same matches instead: point-in-time features for the holdout window are
+extracted once per feature configuration, and the models are loaded and
+scored with batched inference in a process pool, each worker loading only the
+models it scores. Models trained on matches inside the holdout window are
+favoured, so the window should start after the training data of the models
+being compared.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+
+from config.settings import MODEL_COMPARISON_HOLDOUT_DAYS, MODEL_COMPARISON_WORKERS
+from config.logging_config import get_model_tuning_logger
+from utils.hashing import content_hash
+from utils.logging import log_execution_time, log_exceptions
+from utils.time import get_current_time, format_datetime
+from core.models.feature_engineering import FeatureEngineer
+from core.models.registry import ModelRegistry, ScoreModelRegistry, HOLDOUT_METRICS_KEY
+from core.models.winner_prediction import WinnerPredictionModel
+from core.models.score_prediction import ScorePredictionModel
+
+logger = get_model_tuning_logger()
+
+# Model class per model type
+MODEL_CLASSES = {"winner": WinnerPredictionModel, "score": ScorePredictionModel}
+
+# Single-match predictions timed per model for the latency measurement
+LATENCY_SAMPLES = 20
+
+# Holdout data shared by the tasks of a worker process
+_worker_holdout = {}
+
+
+def _init_worker(features, labels):
+    """
+    Receive the holdout data in a worker process.
+
+    Args:
+        features (dict): Feature configuration key -> holdout features
+        labels (tuple): (home win labels, home scores, away scores)
+    """
+    _worker_holdout["features"] = features
+    _worker_holdout["labels"] = labels
+
+
+def _score_model(model_type, model_info, config_key, holdout=None):
+    """
+    Load a model and score it on the holdout.
+
+    Args:
+        model_type (str): "winner" or "score"
+        model_info (dict): Registry entry of the model
+        config_key (str): Key of the model's feature configuration
+        holdout (dict): Holdout data (default: the worker's holdout data)
+
+    Returns:
+        dict: Holdout metrics, or an "error" entry if the model could not be scored
+    """
+    holdout = holdout or _worker_holdout
+    X = holdout["features"][config_key]
+    y_winner, y_home, y_away = holdout["labels"]
+
+    try:
+        model = MODEL_CLASSES[model_type].load(model_info.get("model_path"), model_info.get("info_path"))
+    except Exception as e:
+        return {"error": f"Could not load model: {str(e)}"}
+
+    try:
+        # Batched inference over the whole holdout
+        batch_start = time.perf_counter()
+        predictions = model.predict_batch(X)
+        batch_seconds = time.perf_counter() - batch_start
+
+        # Single-match latency, as seen by the live predictions
+        single_times = []
+        for row in range(min(LATENCY_SAMPLES, len(X))):
+            single_start = time.perf_counter()
+            model.predict_batch(X[row:row + 1])
+            single_times.append(time.perf_counter() - single_start)
+    except Exception as e:
+        return {"error": f"Could not score model: {str(e)}"}
+
+    metrics = {
+        "matches": len(X),
+        "batch_ms_per_match": batch_seconds * 1000 / len(X),
+        "single_match_ms": float(np.median(single_times)) * 1000
+    }
+
+    if model_type == "winner":
+        probabilities = np.clip(predictions, 1e-15, 1 - 1e-15)
+        metrics["accuracy"] = float(np.mean((predictions > 0.5).astype(int) == y_winner))
+        metrics["brier_score"] = float(np.mean((predictions - y_winner) ** 2))
+        metrics["log_loss"] = float(-np.mean(y_winner * np.log(probabilities) +
+                                             (1 - y_winner) * np.log(1 - probabilities)))
+    else:
+        home_scores, away_scores = predictions
+        metrics["home_score_mae"] = float(np.mean(np.abs(home_scores - y_home)))
+        metrics["away_score_mae"] = float(np.mean(np.abs(away_scores - y_away)))
+        metrics["total_score_mae"] = float(np.mean(np.abs((home_scores + away_scores) - (y_home + y_away))))
+        metrics["winner_accuracy"] = float(np.mean((home_scores > away_scores).astype(int) == y_winner))
+
+    return metrics
+
+
+class ModelTournament:
+    """
+    Scores every registered model on a common holdout window.
+    """
+
+    def __init__(self, holdout_days=MODEL_COMPARISON_HOLDOUT_DAYS, workers=MODEL_COMPARISON_WORKERS,
+                 model_types=tuple(MODEL_CLASSES), winner_registry=None, score_registry=None):
+        """
+        Initialize the tournament.
+
+        Args:
+            holdout_days (float): Days of most recent matches in the holdout (when no start is given)
+            workers (int): Worker processes (1 to score in this process)
+            model_types (tuple): Models to compare ("winner" and/or "score")
+            winner_registry (ModelRegistry): Winner model registry (default: the configured registry)
+            score_registry (ScoreModelRegistry): Score model registry (default: the configured registry)
+        """
+        unknown = [model_type for model_type in model_types if model_type not in MODEL_CLASSES]
+        if unknown:
+            raise ValueError(f"Unknown model types: {', '.join(unknown)}")
+
+        self.holdout_days = holdout_days
+        self.workers = max(1, workers)
+        self.model_types = tuple(model_types)
+        self.registries = {}
+        if "winner" in self.model_types:
+            self.registries["winner"] = winner_registry or ModelRegistry()
+        if "score" in self.model_types:
+            self.registries["score"] = score_registry or ScoreModelRegistry()
+
+    @log_execution_time(logger)
+    @log_exceptions(logger)
+    def run(self, matches, start=None, end=None, promote=False):
+        """
+        Score the registered models on the holdout and store the metrics in the registries.
+
+        Args:
+            matches (list): List of match data dictionaries (history before the holdout
+                is used for the point-in-time features)
+            start (datetime): Start of the holdout (default: holdout_days before the last match)
+            end (datetime): End of the holdout, exclusive (default: after the last match)
+            promote (bool): Whether to make the best model on the holdout the registry's best model
+
+        Returns:
+            dict: Holdout window and the metrics of every model, ranked per model type
+        """
+        run_start = time.perf_counter()
+        feature_engineer = FeatureEngineer()
+
+        completed = [m for m in matches if 'homeScore' in m and 'awayScore' in m]
+        completed.sort(key=feature_engineer._parse_match_date)
+        dates = [feature_engineer._parse_match_date(m) for m in completed]
+        if not completed:
+            raise ValueError("No completed matches to compare the models on")
+
+        end = end or dates[-1] + timedelta(microseconds=1)
+        start = start or end - timedelta(days=self.holdout_days)
+        rows = [i for i, date in enumerate(dates) if start <= date < end]
+        if not rows:
+            raise ValueError(f"No completed matches between {start} and {end}")
+
+        # Every registered model with the key of its feature configuration
+        entries = []
+        configs = {}
+        for model_type, registry in self.registries.items():
+            for model_info in registry.list_models():
+                feature_config = FeatureEngineer(model_info.get("parameters", {}).get("feature_config")).feature_config
+                config_key = content_hash(feature_config)
+                configs[config_key] = feature_config
+                entries.append((model_type, model_info, config_key))
+
+        if not entries:
+            raise ValueError("No registered models to compare")
+
+        logger.info(f"Comparing {len(entries)} models on {len(rows)} matches with "
+                    f"{len(configs)} feature configurations")
+
+        # Point-in-time features of the holdout, once per feature configuration; matches
+        # after the holdout do not affect them, so they are left out
+        feature_start = time.perf_counter()
+        history = completed[:rows[-1] + 1]
+        features = {}
+        labels = None
+        for config_key, feature_config in configs.items():
+            X, y_home, y_away = FeatureEngineer(feature_config).extract_features(None, history, point_in_time=True)
+            features[config_key] = X[rows]
+            labels = ((y_home[rows] > y_away[rows]).astype(int), y_home[rows], y_away[rows])
+        feature_seconds = time.perf_counter() - feature_start
+
+        results = self._score(entries, features, labels)
+
+        evaluated_at = format_datetime(get_current_time())
+        window = {
+            "start": completed[rows[0]].get("fixtureStart"),
+            "end": completed[rows[-1]].get("fixtureStart"),
+            "matches": len(rows)
+        }
+        report = {"window": window, "models": {}, "best": {}}
+
+        for model_type, registry in self.registries.items():
+            scored = [
+                dict(metrics, model_id=model_info.get("model_id"))
+                for (entry_type, model_info, _), metrics in zip(entries, results)
+                if entry_type == model_type
+            ]
+            ranked = sorted((m for m in scored if "error" not in m), key=registry.holdout_rank_key)
+            report["models"][model_type] = ranked + [m for m in scored if "error" in m]
+
+            # Store the comparable metrics on every model that could be scored, on top of
+            # any models registered by other processes in the meantime
+            registry.reload()
+            registry.update_model_metrics({
+                m["model_id"]: dict({k: v for k, v in m.items() if k != "model_id"},
+                                    window=window, evaluated_at=evaluated_at)
+                for m in ranked
+            }, HOLDOUT_METRICS_KEY)
+
+            if ranked:
+                report["best"][model_type] = ranked[0]["model_id"]
+                if promote:
+                    registry.set_best_model(ranked[0]["model_id"])
+
+        report["timing"] = {
+            "feature_seconds": feature_seconds,
+            "total_seconds": time.perf_counter() - run_start
+        }
+
+        logger.info(f"Compared {len(entries)} models in {report['timing']['total_seconds']:.2f} seconds")
+        return report
+
+    def _score(self, entries, features, labels):
+        """
+        Score the models, spread over the worker processes.
+
+        Args:
+            entries (list): (model type, registry entry, feature configuration key) per model
+            features (dict): Feature configuration key -> holdout features
+            labels (tuple): (home win labels, home scores, away scores)
+
+        Returns:
+            list: Metrics per entry
+        """
+        workers = min(self.workers, len(entries))
+
+        if workers == 1:
+            holdout = {"features": features, "labels": labels}
+            return [_score_model(model_type, model_info, config_key, holdout)
+                    for model_type, model_info, config_key in entries]
+
+        logger.info(f"Scoring {len(entries)} models on {workers} processes")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(features, labels)) as executor:
+            return list(executor.map(_score_model, *zip(*entries)))
+
@@ -12,8 +12,10 @@ from xgboost import XGBClassifier
 from config.settings import DEFAULT_RANDOM_STATE
 from config.logging_config import get_model_tuning_logger
 from utils.logging import log_execution_time, log_exceptions
+from utils.memory import memory_stage
 from core.models.base import BaseModel
 from core.models.feature_engineering import FeatureEngineer
+from core.models.prediction_cache import memoize_prediction
 
 logger = get_model_tuning_logger()
 
@@ -60,9 +62,50 @@ class WinnerPredictionModel(BaseModel):
         # Initialize feature selector
         self.feature_selector = None
 
+    def _get_artifacts(self):
+        """
+        Get the fitted classifier and feature selector to persist.
+
+        Returns:
+            dict: Fitted objects
+        """
+        return {"model": self.model, "feature_selector": self.feature_selector}
+
+    def _set_artifacts(self, artifacts):
+        """
+        Restore the fitted classifier and feature selector.
+
+        Models saved before the feature selector was persisted contain only the classifier.
+
+        Args:
+            artifacts (object): Fitted objects
+        """
+        if isinstance(artifacts, dict) and "model" in artifacts:
+            self.model = artifacts["model"]
+            self.feature_selector = artifacts.get("feature_selector")
+        else:
+            self.model = artifacts
+
+    def _feature_columns(self):
+        """
+        Get the names of the feature columns the model consumes.
+
+        Returns:
+            list: Feature names kept by the fitted feature selector, or None if there is no selector
+        """
+        if self.feature_selector is None:
+            return None
+
+        # The plan only changes when the selector does
+        if getattr(self, "_planned_selector", None) is not self.feature_selector:
+            self._feature_plan = self.feature_engineer.selected_features(self.feature_selector)
+            self._planned_selector = self.feature_selector
+        return self._feature_plan
+
     @log_execution_time(logger)
     @log_exceptions(logger)
-    def train(self, player_stats, matches, test_size=0.2, min_samples=100, cv_folds=5):
+    def train(self, player_stats, matches, test_size=0.2, min_samples=100, cv_folds=5, freeze_selector=False,
+              features=None):
         """
         Train the model on match data.
 
@@ -72,16 +115,30 @@ class WinnerPredictionModel(BaseModel):
             test_size (float): Proportion of data to use for testing
             min_samples (int): Minimum number of samples required for training
             cv_folds (int): Number of cross-validation folds
+            freeze_selector (bool): Whether to keep the fitted feature selector and
+                only extract the features it selects
+            features (tuple): Features and labels already extracted from matches with every
+                enabled feature, as returned by extract_features (skips extraction)
 
         Returns:
             self: The trained model
         """
         logger.info(f"Training winner prediction model with {len(matches)} matches")
 
+        # Only the selected features are needed when the selector is frozen
+        freeze_selector = freeze_selector and self.feature_selector is not None
+        columns = self._feature_columns() if freeze_selector else None
+
         # Extract features and labels using the feature engineer
-        X, y = self.feature_engineer.extract_features(
-            player_stats, matches, for_score_prediction=False
-        )
+        if features is not None:
+            X, y = features
+            if columns is not None and len(X):
+                X = X[:, self.feature_engineer.column_positions(columns)]
+        else:
+            with memory_stage("extract_features"):
+                X, y = self.feature_engineer.extract_features(
+                    player_stats, matches, for_score_prediction=False, columns=columns
+                )
 
         if len(X) == 0:
             logger.error("No valid features extracted from matches")
@@ -95,17 +152,23 @@ class WinnerPredictionModel(BaseModel):
         logger.info(f"Extracted {len(X)} samples with {X.shape[1]} features")
 
         # Feature selection
-        logger.info("Performing feature selection")
-        self.feature_selector = SelectFromModel(
-            XGBClassifier(n_estimators=100, random_state=self.random_state),
-            threshold="median"
-        )
-        X_selected = self.feature_selector.fit_transform(X, y)
+        if freeze_selector:
+            logger.info(f"Using frozen feature selection ({len(columns)} features)")
+            X_selected = X
+        else:
+            logger.info("Performing feature selection")
+            self.feature_selector = SelectFromModel(
+                XGBClassifier(n_estimators=100, random_state=self.random_state),
+                threshold="median"
+            )
+            with memory_stage("feature_selection"):
+                X_selected = self.feature_selector.fit_transform(X, y)
 
         # Perform cross-validation
         logger.info(f"Performing {cv_folds}-fold cross-validation")
         cv = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=self.random_state)
-        cv_scores = cross_val_score(self.model, X_selected, y, cv=cv, scoring='accuracy')
+        with memory_stage("cross_validation"):
+            cv_scores = cross_val_score(self.model, X_selected, y, cv=cv, scoring='accuracy')
 
         logger.info(f"Cross-validation scores: {cv_scores}")
         logger.info(f"Mean CV accuracy: {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
@@ -117,11 +180,13 @@ class WinnerPredictionModel(BaseModel):
 
         # Train model with selected features
         logger.info(f"Training model with {len(X_train)} samples and {X_selected.shape[1]} selected features")
-        self.model.fit(X_train, y_train)
+        with memory_stage("fit"):
+            self.model.fit(X_train, y_train)
 
         # Evaluate model
         logger.info("Evaluating model")
-        metrics = self._evaluate_model(X_test, y_test)
+        with memory_stage("evaluate"):
+            metrics = self._evaluate_model(X_test, y_test)
 
         # Add cross-validation results to metrics
         metrics["cv_scores"] = cv_scores.tolist()
@@ -138,9 +203,10 @@ class WinnerPredictionModel(BaseModel):
         }
         self.model_info["num_samples"] = len(X)
         self.model_info["num_features"] = {
-            "original": X.shape[1],
+            "original": len(self.feature_engineer.feature_names),
             "selected": X_selected.shape[1]
         }
+        self.model_info["selected_features"] = self._feature_columns()
         self.model_info["validation_method"] = f"{cv_folds}-fold cross-validation"
 
         logger.info(f"Model trained with accuracy: {metrics['accuracy']:.4f}")
@@ -184,13 +250,16 @@ class WinnerPredictionModel(BaseModel):
         }
 
     @log_exceptions(logger)
-    def predict(self, player_stats, match):
+    @memoize_prediction
+    def predict(self, player_stats, match, feature_state=None):
         """
         Predict the winner of a match.
 
         Args:
             player_stats (dict): Player statistics dictionary
             match (dict): Match data dictionary
+            feature_state (FeatureState): Live feature state, required to extract
+                features for matches that have not been played yet
 
         Returns:
             dict: Prediction results
@@ -214,16 +283,23 @@ class WinnerPredictionModel(BaseModel):
 
         # Extract features using the feature engineer
         try:
-            X, _ = self.feature_engineer.extract_features(
-                player_stats, match_list, for_score_prediction=False
-            )
+            # Only compute the features the selector keeps
+            columns = self._feature_columns()
+            if feature_state is not None:
+                X = self.feature_engineer.extract_live_features(
+                    player_stats, match, feature_state, columns=columns
+                )
+            else:
+                X, _ = self.feature_engineer.extract_features(
+                    player_stats, match_list, for_score_prediction=False, columns=columns
+                )
 
             if len(X) == 0:
                 raise ValueError("No features extracted")
 
-            # Apply feature selection if available
-            if self.feature_selector is not None:
-                X_selected = self.feature_selector.transform(X)
+            # Feature selection was applied during extraction if available
+            if columns is not None:
+                X_selected = X
                 prediction_method = "model_with_feature_selection"
             else:
                 logger.warning("Feature selector not available, using raw features")
@@ -269,6 +345,21 @@ class WinnerPredictionModel(BaseModel):
             "prediction_method": prediction_method
         }
 
+    def predict_batch(self, X):
+        """
+        Predict the home win probability of many matches at once.
+
+        Args:
+            X (numpy.ndarray): Features with every enabled feature, as returned by extract_features
+
+        Returns:
+            numpy.ndarray: Home win probability per row
+        """
+        columns = self._feature_columns()
+        if columns is not None:
+            X = X[:, self.feature_engineer.column_positions(columns)]
+        return self.model.predict_proba(X)[:, 1]
+
     @log_exceptions(logger)
     def evaluate(self, player_stats, matches, min_samples=100, cv_folds=5):
         """
@@ -283,9 +374,10 @@ class WinnerPredictionModel(BaseModel):
         Returns:
             dict: Evaluation metrics
         """
-        # Extract features and labels using the feature engineer
+        # Extract the selected features and labels using the feature engineer
+        columns = self._feature_columns()
         X, y = self.feature_engineer.extract_features(
-            player_stats, matches, for_score_prediction=False
+            player_stats, matches, for_score_prediction=False, columns=columns
         )
 
         if len(X) == 0:
@@ -297,9 +389,9 @@ class WinnerPredictionModel(BaseModel):
             logger.warning(f"Insufficient samples for reliable evaluation: {len(X)} < {min_samples}")
             logger.warning("Evaluation results may not be statistically significant")
 
-        # Apply feature selection if available
-        if self.feature_selector is not None:
-            X_selected = self.feature_selector.transform(X)
+        # Feature selection was applied during extraction if available
+        if columns is not None:
+            X_selected = X
         else:
             logger.warning("Feature selector not available, using raw features")
             X_selected = X
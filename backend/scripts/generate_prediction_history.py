@@ -1,140 +1,60 @@
 """
 Script to generate prediction history.
+
+Backfills the prediction history with real predictions of the registry's
+best models for completed matches, using point-in-time features.
 """
 
-import json
+import argparse
 import sys
+from datetime import datetime
 from pathlib import Path
-import random
-from datetime import datetime, timedelta
 
 # Add the parent directory to the Python path so we can import our modules
 current_dir = Path(__file__).resolve().parent
 backend_dir = current_dir.parent
 sys.path.append(str(backend_dir))
 
-from config.settings import (
-    MATCH_HISTORY_FILE, PREDICTION_HISTORY_FILE
-)
+from config.settings import BACKFILL_WORKERS, BACKFILL_CHUNK_SIZE
 from config.logging_config import get_prediction_refresh_logger
+from core.data.fetchers.match_history import MatchHistoryFetcher
+from services.backfill_service import BackfillService
 
 logger = get_prediction_refresh_logger()
 
-def load_match_history():
-    """
-    Load match history from file.
-    
-    Returns:
-        list: List of match data dictionaries
-    """
-    with open(MATCH_HISTORY_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def generate_prediction_history(matches):
-    """
-    Generate prediction history for completed matches.
-    
-    Args:
-        matches (list): List of match data dictionaries
-        
-    Returns:
-        list: List of match predictions with results
-    """
-    prediction_history = []
-    
-    # Use only the most recent 100 matches
-    recent_matches = sorted(
-        matches,
-        key=lambda x: x.get('fixtureStart', ''),
-        reverse=True
-    )[:100]
-    
-    for match in recent_matches:
-        # Skip matches without scores
-        if 'homeScore' not in match or 'awayScore' not in match:
-            continue
-        
-        # Get actual result
-        result = match.get('result', 'home' if match['homeScore'] > match['awayScore'] else 'away')
-        
-        # Generate prediction (with slight bias towards correct prediction)
-        correct_prediction = random.random() < 0.7
-        predicted_winner = result if correct_prediction else ('away' if result == 'home' else 'home')
-        
-        # Generate confidence
-        confidence = random.uniform(0.55, 0.85)
-        
-        # Generate score prediction (with slight bias towards correct score)
-        home_score_error = random.randint(0, 10)
-        away_score_error = random.randint(0, 10)
-        
-        predicted_home_score = max(0, match['homeScore'] + (random.choice([-1, 1]) * home_score_error))
-        predicted_away_score = max(0, match['awayScore'] + (random.choice([-1, 1]) * away_score_error))
-        
-        # Generate prediction time (1 day before match)
-        match_time = datetime.fromisoformat(match['fixtureStart'].replace('Z', '+00:00'))
-        prediction_time = (match_time - timedelta(days=1)).isoformat()
-        
-        # Create prediction history object
-        prediction = {
-            "fixtureId": match.get('id'),
-            "homePlayer": match.get('homePlayer'),
-            "awayPlayer": match.get('awayPlayer'),
-            "homeTeam": match.get('homeTeam'),
-            "awayTeam": match.get('awayTeam'),
-            "fixtureStart": match.get('fixtureStart'),
-            "homeScore": match.get('homeScore'),
-            "awayScore": match.get('awayScore'),
-            "result": result,
-            "prediction": {
-                "home_win_probability": round(confidence if predicted_winner == 'home' else 1 - confidence, 2),
-                "away_win_probability": round(confidence if predicted_winner == 'away' else 1 - confidence, 2),
-                "predicted_winner": predicted_winner,
-                "confidence": round(confidence, 2)
-            },
-            "score_prediction": {
-                "home_score": predicted_home_score,
-                "away_score": predicted_away_score,
-                "total_score": predicted_home_score + predicted_away_score,
-                "score_diff": predicted_home_score - predicted_away_score
-            },
-            "generated_at": prediction_time,
-            "prediction_correct": predicted_winner == result,
-            "home_score_error": abs(predicted_home_score - match['homeScore']),
-            "away_score_error": abs(predicted_away_score - match['awayScore']),
-            "total_score_error": abs((predicted_home_score + predicted_away_score) - (match['homeScore'] + match['awayScore']))
-        }
-        
-        prediction_history.append(prediction)
-    
-    return prediction_history
-
-def save_prediction_history(prediction_history):
-    """
-    Save prediction history to file.
-    
-    Args:
-        prediction_history (list): List of match predictions with results
-    """
-    with open(PREDICTION_HISTORY_FILE, 'w', encoding='utf-8') as f:
-        json.dump(prediction_history, f, indent=2)
-    
-    logger.info(f"Saved {len(prediction_history)} prediction history entries to {PREDICTION_HISTORY_FILE}")
 
 def main():
     """
     Main function.
     """
+    parser = argparse.ArgumentParser(description="Backfill prediction history for completed matches")
+    parser.add_argument("--start", help="First fixture date to backfill (YYYY-MM-DD, default: all history)")
+    parser.add_argument("--end", help="Fixture date to stop before (YYYY-MM-DD, default: no limit)")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE, help="Matches predicted per chunk")
+    args = parser.parse_args()
+
     # Load match history
-    matches = load_match_history()
+    matches = MatchHistoryFetcher().load_from_file()
     logger.info(f"Loaded {len(matches)} matches from history")
-    
-    # Generate prediction history
-    prediction_history = generate_prediction_history(matches)
-    logger.info(f"Generated prediction history for {len(prediction_history)} matches")
-    
-    # Save prediction history
-    save_prediction_history(prediction_history)
+    if not matches:
+        print("No match history data found. Please fetch match history first.")
+        return
+
+    # Backfill prediction history
+    service = BackfillService(workers=args.workers, chunk_size=args.chunk_size)
+    summary = service.backfill(
+        matches,
+        start=datetime.strptime(args.start, "%Y-%m-%d") if args.start else None,
+        end=datetime.strptime(args.end, "%Y-%m-%d") if args.end else None
+    )
+
+    if summary is None:
+        print("Backfill failed, see prediction refresh log for details")
+    else:
+        print(f"Backfilled {summary['predictions']} predictions in {summary['seconds']:.1f} seconds")
+        if summary['predictions']:
+            print(f"Accuracy: {summary['accuracy']:.4f}, total score MAE: {summary['total_score_mae']:.2f}")
 
 if __name__ == "__main__":
     main()
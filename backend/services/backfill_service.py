@@ -0,0 +1,290 @@
+"""
+Backfill service for historical predictions.
+
+Runs the registry's models over completed matches in a date range and
+writes the predictions, with the actual outcomes attached, into the
+prediction history. Features are point-in-time, so each prediction only
+uses results from before its fixture, the way a live prediction would
+have. Features are extracted in one sweep over the history and the model
+inference is spread over a process pool in large vectorized chunks.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from config.settings import (
+    PREDICTION_HISTORY_FILE, PREDICTION_HISTORY_LOCK_FILE, BACKFILL_WORKERS, BACKFILL_CHUNK_SIZE
+)
+from config.logging_config import get_prediction_refresh_logger
+from utils.logging import log_execution_time, log_exceptions
+from utils.time import get_current_time, format_datetime
+from core.models.feature_engineering import FeatureEngineer
+from core.models.registry import ModelRegistry, ScoreModelRegistry
+from core.models.winner_prediction import WinnerPredictionModel
+from core.models.score_prediction import ScorePredictionModel
+from services.prediction_history import update_prediction_history
+
+logger = get_prediction_refresh_logger()
+
+# Prediction method recorded on backfilled predictions
+BACKFILL_PREDICTION_METHOD = "backfill_point_in_time"
+
+# Models loaded once per worker process
+_worker_models = {}
+
+
+def _load_models(winner_model_info, score_model_info):
+    """
+    Load the winner and score prediction models.
+
+    Args:
+        winner_model_info (dict): Registry entry of the winner prediction model
+        score_model_info (dict): Registry entry of the score prediction model
+
+    Returns:
+        tuple: (winner_model, score_model)
+    """
+    winner_model = WinnerPredictionModel.load(winner_model_info.get("model_path"), winner_model_info.get("info_path"))
+    score_model = ScorePredictionModel.load(score_model_info.get("model_path"), score_model_info.get("info_path"))
+    return winner_model, score_model
+
+
+def _init_worker(winner_model_info, score_model_info):
+    """
+    Load the models in a worker process.
+
+    Args:
+        winner_model_info (dict): Registry entry of the winner prediction model
+        score_model_info (dict): Registry entry of the score prediction model
+    """
+    _worker_models["models"] = _load_models(winner_model_info, score_model_info)
+
+
+def _predict_chunk(X_winner, X_score, models=None):
+    """
+    Predict a chunk of matches.
+
+    Args:
+        X_winner (numpy.ndarray): Winner model features
+        X_score (numpy.ndarray): Score model features
+        models (tuple): (winner_model, score_model) (default: the worker's models)
+
+    Returns:
+        tuple: Home win probabilities, home scores and away scores
+    """
+    winner_model, score_model = models or _worker_models["models"]
+    home_scores, away_scores = score_model.predict_batch(X_score)
+    return winner_model.predict_batch(X_winner), home_scores, away_scores
+
+
+class BackfillService:
+    """
+    Service for backfilling the prediction history.
+    """
+
+    def __init__(self, workers=BACKFILL_WORKERS, chunk_size=BACKFILL_CHUNK_SIZE,
+                 history_file=PREDICTION_HISTORY_FILE, history_lock_file=PREDICTION_HISTORY_LOCK_FILE):
+        """
+        Initialize the backfill service.
+
+        Args:
+            workers (int): Worker processes (1 to predict in this process)
+            chunk_size (int): Matches predicted per chunk
+            history_file (str or Path): Prediction history file
+            history_lock_file (str or Path): File locked while the prediction history is updated
+        """
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.history_file = Path(history_file)
+        self.history_lock_file = Path(history_lock_file)
+
+    @log_execution_time(logger)
+    @log_exceptions(logger)
+    def backfill(self, matches, start=None, end=None, winner_model_info=None, score_model_info=None):
+        """
+        Predict the completed matches in a date range and write them to the prediction history.
+
+        Backfilled predictions replace earlier backfilled predictions of the same
+        fixtures; predictions made live are kept.
+
+        Args:
+            matches (list): List of match data dictionaries (history before start is
+                used for the point-in-time features)
+            start (datetime): Start of the range (default: first match)
+            end (datetime): End of the range, exclusive (default: after the last match)
+            winner_model_info (dict): Registry entry of the winner model (default: best model)
+            score_model_info (dict): Registry entry of the score model (default: best model)
+
+        Returns:
+            dict: Backfill summary, or None if no models are available
+        """
+        run_start = time.perf_counter()
+        winner_model_info = winner_model_info or ModelRegistry().get_best_model_info()
+        score_model_info = score_model_info or ScoreModelRegistry().get_best_model_info()
+        if not winner_model_info or not score_model_info:
+            logger.error("No winner or score prediction model available for the backfill")
+            return None
+
+        # Point-in-time features for every completed match, per feature configuration
+        winner_engineer = FeatureEngineer(winner_model_info.get("parameters", {}).get("feature_config"))
+        score_engineer = FeatureEngineer(score_model_info.get("parameters", {}).get("feature_config"))
+
+        completed = [m for m in matches if 'homeScore' in m and 'awayScore' in m]
+        completed.sort(key=winner_engineer._parse_match_date)
+        dates = [winner_engineer._parse_match_date(m) for m in completed]
+        rows = [i for i, date in enumerate(dates) if (start is None or date >= start) and (end is None or date < end)]
+
+        if not rows:
+            logger.warning("No completed matches in the backfill range")
+            return {"predictions": 0, "seconds": time.perf_counter() - run_start}
+
+        # Matches after the range do not affect point-in-time features, so they are left out
+        history = completed[:rows[-1] + 1]
+        X_winner, _ = winner_engineer.extract_features(None, history, for_score_prediction=False, point_in_time=True)
+        if score_engineer.feature_config == winner_engineer.feature_config:
+            X_score = X_winner
+        else:
+            X_score, _, _ = score_engineer.extract_features(None, history, point_in_time=True)
+        X_winner, X_score = X_winner[rows], X_score[rows]
+        feature_seconds = time.perf_counter() - run_start
+
+        probabilities, home_scores, away_scores = self._predict(
+            X_winner, X_score, winner_model_info, score_model_info
+        )
+
+        generated_at = format_datetime(get_current_time())
+        predictions = [
+            self._history_entry(completed[row], probabilities[i], home_scores[i], away_scores[i],
+                                winner_model_info, score_model_info, generated_at)
+            for i, row in enumerate(rows)
+        ]
+        self._write_history(predictions)
+
+        correct = sum(1 for p in predictions if p["prediction_correct"])
+        summary = {
+            "predictions": len(predictions),
+            "start": completed[rows[0]].get("fixtureStart"),
+            "end": completed[rows[-1]].get("fixtureStart"),
+            "winner_model_id": winner_model_info.get("model_id"),
+            "score_model_id": score_model_info.get("model_id"),
+            "accuracy": correct / len(predictions),
+            "total_score_mae": float(np.mean([p["total_score_error"] for p in predictions])),
+            "feature_seconds": feature_seconds,
+            "seconds": time.perf_counter() - run_start
+        }
+        logger.info(f"Backfilled {summary['predictions']} predictions (accuracy {summary['accuracy']:.4f}, "
+                    f"total score MAE {summary['total_score_mae']:.2f}) in {summary['seconds']:.2f} seconds")
+        return summary
+
+    def _predict(self, X_winner, X_score, winner_model_info, score_model_info):
+        """
+        Predict all rows, in chunks spread over the worker processes.
+
+        Args:
+            X_winner (numpy.ndarray): Winner model features
+            X_score (numpy.ndarray): Score model features
+            winner_model_info (dict): Registry entry of the winner prediction model
+            score_model_info (dict): Registry entry of the score prediction model
+
+        Returns:
+            tuple: Home win probabilities, home scores and away scores
+        """
+        bounds = [(i, min(i + self.chunk_size, len(X_winner))) for i in range(0, len(X_winner), self.chunk_size)]
+        workers = min(self.workers, len(bounds))
+
+        if workers == 1:
+            models = _load_models(winner_model_info, score_model_info)
+            results = [_predict_chunk(X_winner[lo:hi], X_score[lo:hi], models) for lo, hi in bounds]
+        else:
+            logger.info(f"Predicting {len(X_winner)} matches in {len(bounds)} chunks on {workers} processes")
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(winner_model_info, score_model_info)) as executor:
+                results = list(executor.map(
+                    _predict_chunk, [X_winner[lo:hi] for lo, hi in bounds], [X_score[lo:hi] for lo, hi in bounds]
+                ))
+
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+
+    @staticmethod
+    def _history_entry(match, home_win_probability, home_score, away_score, winner_model_info, score_model_info,
+                       generated_at):
+        """
+        Create a prediction history entry with the outcome attached.
+
+        Args:
+            match (dict): Completed match data dictionary
+            home_win_probability (float): Predicted home win probability
+            home_score (int): Predicted home score
+            away_score (int): Predicted away score
+            winner_model_info (dict): Registry entry of the winner prediction model
+            score_model_info (dict): Registry entry of the score prediction model
+            generated_at (str): Time of the backfill
+
+        Returns:
+            dict: Prediction history entry
+        """
+        home_win_probability = float(home_win_probability)
+        away_win_probability = 1 - home_win_probability
+        predicted_winner = "home" if home_win_probability > away_win_probability else "away"
+        result = match.get('result', 'home' if match['homeScore'] > match['awayScore'] else 'away')
+        home_score = int(home_score)
+        away_score = int(away_score)
+
+        return {
+            "fixtureId": match.get('id'),
+            "homePlayer": match.get('homePlayer'),
+            "awayPlayer": match.get('awayPlayer'),
+            "homeTeam": match.get('homeTeam'),
+            "awayTeam": match.get('awayTeam'),
+            "fixtureStart": match.get('fixtureStart'),
+            "homeScore": match['homeScore'],
+            "awayScore": match['awayScore'],
+            "result": result,
+            "prediction": {
+                "home_win_probability": home_win_probability,
+                "away_win_probability": away_win_probability,
+                "predicted_winner": predicted_winner,
+                "confidence": max(home_win_probability, away_win_probability),
+                "prediction_method": BACKFILL_PREDICTION_METHOD
+            },
+            "score_prediction": {
+                "home_score": home_score,
+                "away_score": away_score,
+                "total_score": home_score + away_score,
+                "score_diff": home_score - away_score
+            },
+            "generated_at": generated_at,
+            "backfilled": True,
+            "winner_model_id": winner_model_info.get("model_id"),
+            "score_model_id": score_model_info.get("model_id"),
+            "prediction_correct": predicted_winner == result,
+            "home_score_error": abs(home_score - match['homeScore']),
+            "away_score_error": abs(away_score - match['awayScore']),
+            "total_score_error": abs((home_score + away_score) - (match['homeScore'] + match['awayScore']))
+        }
+
+    def _write_history(self, predictions):
+        """
+        Merge backfilled predictions into the prediction history.
+
+        Args:
+            predictions (list): Backfilled prediction history entries
+        """
+        fixture_ids = {str(p["fixtureId"]) for p in predictions}
+        replaced = 0
+
+        def superseded(entry):
+            nonlocal replaced
+            # Backfilling a range again replaces its earlier backfilled predictions
+            if entry.get("backfilled") and str(entry.get("fixtureId")) in fixture_ids:
+                replaced += 1
+                return True
+            return False
+
+        update_prediction_history(predictions, superseded, self.history_file, self.history_lock_file)
+
+        logger.info(f"Prediction history updated with {len(predictions)} backfilled predictions "
+                    f"({replaced} replaced)")
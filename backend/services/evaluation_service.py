@@ -0,0 +1,497 @@
+"""
+Evaluation service for predictions against actual results.
+
+Predictions in the prediction history are joined to completed fixtures in
+the match history by fixture ID, and running aggregates (hit rate, Brier
+score, calibration buckets and score errors) are kept overall, per model
+and per player. Each update only reads the history entries appended to the
+history journal since the previous update, from the byte offset it stopped
+at, and joins the predictions still waiting for a result; the aggregates
+are written to a small stats file that the API serves without touching the
+history.
+
+Each fixture is evaluated once per source ("live" or "backfill"), using the
+latest prediction of that source; a newer prediction replaces the older
+one's contribution. Once evaluated, a prediction is only kept as the
+contribution a replacement must subtract. Predictions of fixtures older
+than the match history window are dropped, as their results never arrive.
+"""
+
+import datetime
+import json
+import os
+import threading
+from pathlib import Path
+
+from config.settings import (
+    PREDICTION_HISTORY_FILE, PREDICTION_HISTORY_LOCK_FILE, EVALUATION_STATE_FILE, EVALUATION_STATS_FILE,
+    MATCH_HISTORY_DAYS
+)
+from config.logging_config import get_prediction_refresh_logger
+from utils.hashing import content_hash
+from utils.logging import log_execution_time, log_exceptions
+from utils.time import get_current_time, format_datetime, parse_datetime
+from services.prediction_history import history_journal_file, ensure_history_journal
+
+logger = get_prediction_refresh_logger()
+
+# Number of equal-width confidence buckets used for calibration
+CALIBRATION_BUCKETS = 10
+
+# Aggregate groups: overall per source, per winner model, per score model and per player
+AGGREGATE_GROUPS = ("overall", "winner_models", "score_models", "players")
+
+
+def _empty_aggregate():
+    """
+    Create an empty running aggregate.
+
+    Returns:
+        dict: Running sums
+    """
+    return {
+        "predictions": 0,
+        "correct": 0,
+        "brier": 0.0,
+        "calibration": [[0, 0.0, 0] for _ in range(CALIBRATION_BUCKETS)],
+        "score_predictions": 0,
+        "home_score_error": 0,
+        "away_score_error": 0,
+        "total_score_error": 0
+    }
+
+
+def _write_json(file_path, data):
+    """
+    Write JSON to a file atomically.
+
+    Args:
+        file_path (Path): Output file
+        data: JSON-serializable data
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = file_path.with_suffix(".tmp")
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temp_file, file_path)
+
+
+class PredictionEvaluator:
+    """
+    Incrementally joins predictions to results and maintains accuracy aggregates.
+    """
+
+    def __init__(self, history_file=PREDICTION_HISTORY_FILE, state_file=EVALUATION_STATE_FILE,
+                 stats_file=EVALUATION_STATS_FILE, history_lock_file=PREDICTION_HISTORY_LOCK_FILE,
+                 max_pending_days=MATCH_HISTORY_DAYS):
+        """
+        Initialize the evaluator.
+
+        Args:
+            history_file (str or Path): Prediction history file
+            state_file (str or Path): File the evaluation state is persisted to
+            stats_file (str or Path): File the aggregate statistics are written to
+            history_lock_file (str or Path): File locked while the prediction history is updated
+            max_pending_days (int): Days after its fixture started that a prediction waits for a result
+        """
+        self.history_file = Path(history_file)
+        self.journal_file = history_journal_file(history_file)
+        self.state_file = Path(state_file)
+        self.stats_file = Path(stats_file)
+        self.history_lock_file = Path(history_lock_file)
+        self.max_pending_days = max_pending_days
+
+    @log_execution_time(logger)
+    @log_exceptions(logger)
+    def update(self, match_history):
+        """
+        Evaluate new predictions and newly completed fixtures.
+
+        Args:
+            match_history (list): List of match data dictionaries
+
+        Returns:
+            dict: Aggregate statistics
+        """
+        # A history written before journals were kept gets one first
+        ensure_history_journal(self.history_file, self.history_lock_file)
+
+        state = self._load_state()
+        entries = self._read_journal(state)
+
+        # The journal is normally only appended to; if it was rewritten, start over
+        if entries is None:
+            logger.info("Prediction history journal was rewritten, rebuilding evaluation state")
+            state = self._empty_state()
+            entries = self._read_journal(state)
+
+        pending = state["pending"]
+        evaluated_records = state["evaluated"]
+        aggregates = state["aggregates"]
+        replaced = 0
+
+        for entry in entries:
+            record = self._prediction_record(entry)
+            if record is None:
+                continue
+            key = f"{record['fixture_id']}:{record['source']}"
+
+            # A newer prediction replaces the older one's contribution
+            contribution = evaluated_records.pop(key, None)
+            if contribution is not None:
+                self._apply(aggregates, contribution, -1)
+            if contribution is not None or key in pending:
+                replaced += 1
+            pending[key] = record
+
+        # Hash join of the predictions still waiting for a result against completed fixtures
+        evaluated = 0
+        if pending:
+            results = {
+                str(match.get('id')): match for match in match_history
+                if 'homeScore' in match and 'awayScore' in match
+            }
+            for key, record in list(pending.items()):
+                match = results.get(record["fixture_id"])
+                if match is not None:
+                    contribution = self._score_record(record, match)
+                    self._apply(aggregates, contribution, 1)
+                    self._name_players(aggregates, record)
+                    evaluated_records[key] = contribution
+                    del pending[key]
+                    evaluated += 1
+
+        expired = self._expire_pending(pending)
+
+        stats = self.summarize(state)
+        self._save_state(state)
+        _write_json(self.stats_file, stats)
+
+        logger.info(f"Evaluated {evaluated} predictions ({replaced} replaced, {expired} expired, "
+                    f"{stats['pending']} waiting for results)")
+        return stats
+
+    def _read_journal(self, state):
+        """
+        Read the history entries appended to the journal since the last update.
+
+        Only complete lines are read; the state's offset and tail are moved past them.
+
+        Args:
+            state (dict): Evaluation state
+
+        Returns:
+            list: New prediction history entries, or None if the journal was rewritten
+        """
+        offset = state["history_offset"]
+        tail = state["history_tail"]
+
+        try:
+            f = open(self.journal_file, 'rb')
+        except FileNotFoundError:
+            return [] if offset == 0 else None
+
+        with f:
+            size = f.seek(0, os.SEEK_END)
+            if offset > size:
+                return None
+            if tail is not None:
+                # The last line read must still be where it was
+                f.seek(tail[0])
+                if content_hash(f.read(offset - tail[0]).decode('utf-8', errors='replace')) != tail[1]:
+                    return None
+
+            f.seek(offset)
+            data = f.read(size - offset)
+
+        # A writer may be appending; leave its unfinished line for the next update
+        data = data[:data.rfind(b"\n") + 1]
+        entries = []
+        position = offset
+        for line in data.splitlines(keepends=True):
+            if line.strip():
+                entries.append(json.loads(line))
+                tail = [position, content_hash(line.decode('utf-8'))]
+            position += len(line)
+
+        state["history_offset"] = position
+        state["history_tail"] = tail
+        return entries
+
+    def _expire_pending(self, pending):
+        """
+        Drop the predictions of fixtures too old for their results to be in the match history.
+
+        Args:
+            pending (dict): Predictions waiting for a result, by key
+
+        Returns:
+            int: Number of predictions dropped
+        """
+        cutoff = get_current_time() - datetime.timedelta(days=self.max_pending_days)
+        expired = []
+        for key, record in pending.items():
+            if not record.get("fixture_start"):
+                continue
+            try:
+                if parse_datetime(record["fixture_start"]) < cutoff:
+                    expired.append(key)
+            except (ValueError, OverflowError):
+                continue
+
+        for key in expired:
+            del pending[key]
+        return len(expired)
+
+    @staticmethod
+    def _prediction_record(entry):
+        """
+        Extract what the evaluation needs from a prediction history entry.
+
+        Args:
+            entry (dict): Prediction history entry
+
+        Returns:
+            dict: Prediction record, or None if the entry has no winner prediction
+        """
+        prediction = entry.get("prediction") or {}
+        if entry.get("fixtureId") is None or "home_win_probability" not in prediction:
+            return None
+
+        score_prediction = entry.get("score_prediction") or {}
+        home_player = entry.get("homePlayer") or {}
+        away_player = entry.get("awayPlayer") or {}
+        home_win_probability = float(prediction["home_win_probability"])
+
+        return {
+            "fixture_id": str(entry["fixtureId"]),
+            "source": "backfill" if entry.get("backfilled") else "live",
+            "winner_model_id": str(entry.get("winner_model_id") or "unknown"),
+            "score_model_id": str(entry.get("score_model_id") or "unknown"),
+            "players": [[str(home_player.get("id")), home_player.get("name")],
+                        [str(away_player.get("id")), away_player.get("name")]],
+            "home_win_probability": home_win_probability,
+            "predicted_winner": prediction.get("predicted_winner") or ("home" if home_win_probability > 0.5 else "away"),
+            "confidence": float(prediction.get("confidence", max(home_win_probability, 1 - home_win_probability))),
+            "home_score": score_prediction.get("home_score"),
+            "away_score": score_prediction.get("away_score"),
+            "fixture_start": entry.get("fixtureStart")
+        }
+
+    @staticmethod
+    def _score_record(record, match):
+        """
+        Score a prediction record against the actual result of the fixture.
+
+        Args:
+            record (dict): Prediction record
+            match (dict): Completed match data dictionary
+
+        Returns:
+            dict: Contribution of the prediction to its aggregates
+        """
+        home_score = match['homeScore']
+        away_score = match['awayScore']
+        outcome = "home" if home_score > away_score else "away"
+
+        contribution = {
+            "source": record["source"],
+            "winner_model_id": record["winner_model_id"],
+            "score_model_id": record["score_model_id"],
+            "player_ids": [player_id for player_id, _ in record["players"]],
+            "confidence": record["confidence"],
+            "correct": record["predicted_winner"] == outcome,
+            "brier": (record["home_win_probability"] - (1 if outcome == "home" else 0)) ** 2
+        }
+
+        if record["home_score"] is not None and record["away_score"] is not None:
+            contribution["score_errors"] = [
+                abs(record["home_score"] - home_score),
+                abs(record["away_score"] - away_score),
+                abs(record["home_score"] + record["away_score"] - home_score - away_score)
+            ]
+        return contribution
+
+    @staticmethod
+    def _apply(aggregates, contribution, sign):
+        """
+        Add (or with sign -1, remove) an evaluated prediction to its aggregates.
+
+        Args:
+            aggregates (dict): Aggregates by group and key
+            contribution (dict): Contribution of the evaluated prediction
+            sign (int): 1 to add, -1 to remove
+        """
+        bucket = min(int(contribution["confidence"] * CALIBRATION_BUCKETS), CALIBRATION_BUCKETS - 1)
+        correct = 1 if contribution["correct"] else 0
+        keys = [
+            ("overall", contribution["source"]),
+            ("winner_models", contribution["winner_model_id"]),
+            ("score_models", contribution["score_model_id"])
+        ] + [("players", player_id) for player_id in contribution["player_ids"]]
+
+        for group, key in keys:
+            aggregate = aggregates[group].setdefault(key, _empty_aggregate())
+            aggregate["predictions"] += sign
+            aggregate["correct"] += sign * correct
+            aggregate["brier"] += sign * contribution["brier"]
+            calibration = aggregate["calibration"][bucket]
+            calibration[0] += sign
+            calibration[1] += sign * contribution["confidence"]
+            calibration[2] += sign * correct
+
+            if "score_errors" in contribution:
+                home_error, away_error, total_error = contribution["score_errors"]
+                aggregate["score_predictions"] += sign
+                aggregate["home_score_error"] += sign * home_error
+                aggregate["away_score_error"] += sign * away_error
+                aggregate["total_score_error"] += sign * total_error
+
+    @staticmethod
+    def _name_players(aggregates, record):
+        """
+        Record the names of a prediction's players in their aggregates.
+
+        Args:
+            aggregates (dict): Aggregates by group and key
+            record (dict): Prediction record
+        """
+        for player_id, name in record["players"]:
+            if name:
+                aggregates["players"][player_id]["name"] = name
+
+    @staticmethod
+    def _metrics(aggregate):
+        """
+        Derive the reported metrics from a running aggregate.
+
+        Args:
+            aggregate (dict): Running sums
+
+        Returns:
+            dict: Metrics
+        """
+        predictions = aggregate["predictions"]
+        score_predictions = aggregate["score_predictions"]
+        metrics = {
+            "predictions": predictions,
+            "accuracy": aggregate["correct"] / predictions if predictions else None,
+            "brier_score": aggregate["brier"] / predictions if predictions else None,
+            "calibration": [
+                {
+                    "confidence_range": [i / CALIBRATION_BUCKETS, (i + 1) / CALIBRATION_BUCKETS],
+                    "predictions": count,
+                    "avg_confidence": confidence / count,
+                    "accuracy": correct / count
+                }
+                for i, (count, confidence, correct) in enumerate(aggregate["calibration"]) if count
+            ],
+            "score_predictions": score_predictions,
+            "home_score_mae": aggregate["home_score_error"] / score_predictions if score_predictions else None,
+            "away_score_mae": aggregate["away_score_error"] / score_predictions if score_predictions else None,
+            "total_score_mae": aggregate["total_score_error"] / score_predictions if score_predictions else None
+        }
+        if "name" in aggregate:
+            metrics["name"] = aggregate["name"]
+        return metrics
+
+    def summarize(self, state):
+        """
+        Build the aggregate statistics from the evaluation state.
+
+        Args:
+            state (dict): Evaluation state
+
+        Returns:
+            dict: Metrics per group and key, and evaluation counts
+        """
+        stats = {
+            group: {key: self._metrics(aggregate) for key, aggregate in state["aggregates"][group].items()
+                    if aggregate["predictions"] > 0}
+            for group in AGGREGATE_GROUPS
+        }
+        stats["evaluated"] = len(state["evaluated"])
+        stats["pending"] = len(state["pending"])
+        stats["updated_at"] = format_datetime(get_current_time())
+        return stats
+
+    @staticmethod
+    def _empty_state():
+        """
+        Create an empty evaluation state.
+
+        Returns:
+            dict: Evaluation state
+        """
+        return {
+            "history_offset": 0,
+            "history_tail": None,
+            "pending": {},
+            "evaluated": {},
+            "aggregates": {group: {} for group in AGGREGATE_GROUPS}
+        }
+
+    def _load_state(self):
+        """
+        Load the evaluation state from file.
+
+        Returns:
+            dict: Evaluation state (empty if missing or unreadable)
+        """
+        if not self.state_file.exists():
+            return self._empty_state()
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"Error loading evaluation state: {str(e)}")
+            return self._empty_state()
+
+        # States written before the history journal offsets were kept are rebuilt
+        if "history_tail" not in state:
+            logger.info("Evaluation state predates the prediction history journal, rebuilding it")
+            return self._empty_state()
+        return state
+
+    def _save_state(self, state):
+        """
+        Save the evaluation state to file.
+
+        Args:
+            state (dict): Evaluation state
+        """
+        _write_json(self.state_file, state)
+
+
+# Stats file contents cached by modification time
+_stats_cache = {"mtime": None, "stats": None}
+_stats_cache_lock = threading.Lock()
+
+
+def load_evaluation_stats(stats_file=EVALUATION_STATS_FILE):
+    """
+    Load the aggregate statistics, re-reading the file only when it changes.
+
+    Args:
+        stats_file (str or Path): Aggregate statistics file
+
+    Returns:
+        dict: Aggregate statistics, or None if no evaluation has run yet
+    """
+    stats_file = Path(stats_file)
+    try:
+        mtime = stats_file.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    with _stats_cache_lock:
+        if _stats_cache["mtime"] != mtime:
+            try:
+                with open(stats_file, 'r', encoding='utf-8') as f:
+                    _stats_cache["stats"] = json.load(f)
+                _stats_cache["mtime"] = mtime
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                logger.error(f"Error loading evaluation stats: {str(e)}")
+                return None
+        return _stats_cache["stats"]
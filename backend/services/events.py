@@ -0,0 +1,196 @@
+"""
+Update events for the server-sent events channel of the API.
+
+The refresh pipelines publish what changed in every refresh to an event log:
+
+- "upcoming-matches": upcoming matches added, changed and removed
+- "predictions": predictions added, changed and removed
+- "history": entries added to the prediction history
+- "evaluation": the evaluation aggregates, when they changed
+
+Added and changed entries are sent whole, removed ones by fixture ID.
+Events are numbered consecutively, so a client that reconnects with the ID
+of the last event it received gets exactly the events it missed.
+
+The log is a JSON lines file in the output directory, appended to under a
+file lock, so events published by the worker running a refresh reach the
+clients of every worker. It keeps the last EVENTS_MAX events; a client that
+fell further behind must reload everything.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from config.settings import EVENTS_FILE, EVENTS_LOCK_FILE, EVENTS_MAX
+from config.logging_config import get_prediction_refresh_logger
+from utils.locking import FileLock
+from utils.logging import log_exceptions
+from utils.time import get_current_time, format_datetime
+
+logger = get_prediction_refresh_logger()
+
+
+def diff_fixtures(previous, current, key="fixtureId"):
+    """
+    Compare two lists of fixtures.
+
+    Args:
+        previous (list): Previous fixtures
+        current (list): Current fixtures
+        key (str): Fixture ID field
+
+    Returns:
+        dict: Added and changed fixtures of the current list, and IDs of removed fixtures
+    """
+    previous_by_id = {str(fixture.get(key)): fixture for fixture in previous}
+    current_ids = set()
+    changes = {"added": [], "changed": [], "removed": []}
+
+    for fixture in current:
+        fixture_id = str(fixture.get(key))
+        current_ids.add(fixture_id)
+        old = previous_by_id.get(fixture_id)
+        if old is None:
+            changes["added"].append(fixture)
+        elif old != fixture:
+            changes["changed"].append(fixture)
+
+    changes["removed"] = [fixture_id for fixture_id in previous_by_id if fixture_id not in current_ids]
+    return changes
+
+
+class EventLog:
+    """
+    Numbered events shared between processes through a file.
+    """
+
+    def __init__(self, log_file=EVENTS_FILE, lock_file=EVENTS_LOCK_FILE, max_events=EVENTS_MAX):
+        """
+        Initialize the event log.
+
+        Args:
+            log_file (str or Path): JSON lines file holding the events
+            lock_file (str or Path): File locked while publishing
+            max_events (int): Number of events kept for resuming clients
+        """
+        self.log_file = Path(log_file)
+        self.lock_file = Path(lock_file)
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._version = None
+        self._events = []
+
+    def _read(self):
+        """
+        Get the events in the log, reading the file again only if it changed. Must hold the lock.
+
+        Returns:
+            list: Events, oldest first
+        """
+        try:
+            stat = self.log_file.stat()
+        except FileNotFoundError:
+            self._version = None
+            self._events = []
+            return self._events
+
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if version != self._version:
+            events = []
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # The last line is still being written
+                        break
+            self._events = events
+            self._version = version
+        return self._events
+
+    def publish(self, event, data):
+        """
+        Append an event to the log.
+
+        Args:
+            event (str): Event type
+            data (dict): Event data
+
+        Returns:
+            int: ID of the event
+        """
+        with self._lock, FileLock(self.lock_file):
+            events = self._read()
+            entry = {
+                "id": events[-1]["id"] + 1 if events else 1,
+                "event": event,
+                "published_at": format_datetime(get_current_time()),
+                "data": data
+            }
+            line = json.dumps(entry) + "\n"
+
+            if len(events) >= 2 * self.max_events:
+                # Keep the newest events, replacing the file atomically under readers
+                temp_file = self.log_file.with_suffix(".tmp")
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    f.writelines(json.dumps(e) + "\n" for e in events[-(self.max_events - 1):])
+                    f.write(line)
+                os.replace(temp_file, self.log_file)
+            else:
+                self.log_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+
+        logger.info(f"Published {event} event {entry['id']}")
+        return entry["id"]
+
+    def last_id(self):
+        """
+        Get the ID of the newest event.
+
+        Returns:
+            int: Event ID, or 0 if the log is empty
+        """
+        with self._lock:
+            events = self._read()
+            return events[-1]["id"] if events else 0
+
+    def events_since(self, last_id):
+        """
+        Get the events published after an event.
+
+        Args:
+            last_id (int): ID of the last event the client received
+
+        Returns:
+            tuple: (events after it, oldest first; False if events the client
+                missed are no longer in the log, or the log was reset)
+        """
+        with self._lock:
+            events = self._read()
+
+        latest = events[-1]["id"] if events else 0
+        if last_id > latest or (events and last_id < events[0]["id"] - 1):
+            return events, False
+        return [event for event in events if event["id"] > last_id], True
+
+
+# Process-wide event log
+event_log = EventLog()
+
+
+@log_exceptions(logger, reraise=False)
+def publish_event(event, data):
+    """
+    Publish an event to the process-wide event log; failures are logged, not raised.
+
+    Args:
+        event (str): Event type
+        data (dict): Event data
+
+    Returns:
+        int: ID of the event, or None if it could not be published
+    """
+    return event_log.publish(event, data)
@@ -0,0 +1,394 @@
+"""
+Stage pipeline for the refresh process.
+
+A pipeline is a small DAG of stages. Each stage declares the artifacts it
+consumes and produces; the pipeline records a content hash of every
+artifact so that a stage whose inputs are unchanged since its last
+successful run is skipped. Stages whose inputs are ready run concurrently.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+from config.settings import PIPELINE_STATE_FILE
+from config.logging_config import get_prediction_refresh_logger
+from utils.hashing import content_hash
+from utils.logging import log_exceptions
+from utils.memory import is_tracking, memory_stage
+from utils.metrics import metrics, LONG_BUCKETS
+from utils.time import get_current_time, format_datetime
+
+logger = get_prediction_refresh_logger()
+
+# Pipeline metrics
+STAGE_RUNS = metrics.counter("refresh_stage_runs_total", "Pipeline stage outcomes", ("pipeline", "stage", "status"))
+STAGE_DURATION = metrics.histogram("refresh_stage_duration_seconds", "Duration of pipeline stages that ran",
+                                   ("pipeline", "stage"), buckets=LONG_BUCKETS)
+PIPELINE_DURATION = metrics.histogram("refresh_pipeline_duration_seconds", "Duration of pipeline runs",
+                                      ("pipeline", "status"), buckets=LONG_BUCKETS)
+
+
+class PipelineError(Exception):
+    """
+    Raised by a stage to abort the pipeline run.
+    """
+    pass
+
+
+class Stage:
+    """
+    A single unit of work in a pipeline.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), cacheable=True, restore=None, fingerprints=None):
+        """
+        Initialize the stage.
+
+        Args:
+            name (str): Stage name
+            func (callable): Called with the input artifacts as keyword arguments,
+                returns a dict of output artifacts
+            inputs (tuple): Names of the artifacts the stage consumes
+            outputs (tuple): Names of the artifacts the stage produces
+            cacheable (bool): Whether the stage may be skipped when its inputs are unchanged
+            restore (callable): Returns the stage's outputs from storage when it was skipped
+            fingerprints (dict): Optional per-output callables returning a hashable
+                representation of a value that is not JSON-serializable
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.cacheable = cacheable
+        self.restore = restore
+        self.fingerprints = fingerprints or {}
+
+    def fingerprint(self, output_name, value):
+        """
+        Compute the content hash of one of the stage's outputs.
+
+        Args:
+            output_name (str): Output artifact name
+            value: Output artifact value
+
+        Returns:
+            str: Content hash
+        """
+        fingerprint = self.fingerprints.get(output_name)
+        if fingerprint is not None:
+            value = fingerprint(value)
+        return content_hash(value)
+
+
+class _Deferred:
+    """
+    Placeholder for the outputs of a skipped stage, restored on first use.
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.values = None
+        self.lock = threading.Lock()
+
+    def resolve(self, output_name):
+        with self.lock:
+            if self.values is None:
+                if self.stage.restore is None:
+                    raise PipelineError(f"Stage {self.stage.name} was skipped and cannot restore its outputs")
+                logger.info(f"Restoring outputs of skipped stage {self.stage.name}")
+                self.values = self.stage.restore() or {}
+        if output_name not in self.values:
+            raise PipelineError(f"Stage {self.stage.name} did not restore output {output_name}")
+        return self.values[output_name]
+
+
+class PipelineResult:
+    """
+    Artifacts of a pipeline run. Outputs of skipped stages are restored on access.
+    """
+
+    def __init__(self, artifacts, report):
+        """
+        Initialize the result.
+
+        Args:
+            artifacts (dict): Artifact values or deferred placeholders, keyed by name
+            report (list): Stage reports
+        """
+        self._artifacts = artifacts
+        self.report = report
+
+    def __getitem__(self, name):
+        value = self._artifacts[name]
+        if isinstance(value, _Deferred):
+            return value.resolve(name)
+        return value
+
+    def __contains__(self, name):
+        return name in self._artifacts
+
+    def get(self, name, default=None):
+        """
+        Get an artifact, restoring it from storage if its stage was skipped.
+
+        Args:
+            name (str): Artifact name
+            default: Value returned if the artifact doesn't exist
+
+        Returns:
+            Artifact value or default
+        """
+        if name not in self._artifacts:
+            return default
+        return self[name]
+
+    def ran(self, stage_name):
+        """
+        Check whether a stage actually ran (rather than being skipped).
+
+        Args:
+            stage_name (str): Stage name
+
+        Returns:
+            bool: True if the stage ran
+        """
+        return any(r["stage"] == stage_name and r["status"] == "ran" for r in self.report)
+
+
+class Pipeline:
+    """
+    Runs a DAG of stages with content-hash short-circuiting.
+    """
+
+    def __init__(self, name, state_file=PIPELINE_STATE_FILE, max_workers=4):
+        """
+        Initialize the pipeline.
+
+        Args:
+            name (str): Pipeline name, used as the key in the state file
+            state_file (str or Path): File recording the hashes of the last successful runs
+            max_workers (int): Maximum number of stages run concurrently
+        """
+        self.name = name
+        self.state_file = Path(state_file)
+        self.max_workers = max_workers
+        self.stages = []
+        self.last_report = []
+        # time.perf_counter() value at the start of the last run
+        self.last_run_started = None
+
+    def add_stage(self, name, func, inputs=(), outputs=(), cacheable=True, restore=None, fingerprints=None):
+        """
+        Add a stage to the pipeline.
+
+        Args:
+            name (str): Stage name
+            func (callable): Stage function
+            inputs (tuple): Names of the artifacts the stage consumes
+            outputs (tuple): Names of the artifacts the stage produces
+            cacheable (bool): Whether the stage may be skipped when its inputs are unchanged
+            restore (callable): Returns the stage's outputs from storage when it was skipped
+            fingerprints (dict): Optional per-output fingerprint callables
+
+        Returns:
+            Pipeline: The pipeline, for chaining
+        """
+        self.stages.append(Stage(name, func, inputs, outputs, cacheable, restore, fingerprints))
+        return self
+
+    @log_exceptions(logger)
+    def run(self, force=False):
+        """
+        Run the pipeline.
+
+        Args:
+            force (bool): Whether to run every stage regardless of its recorded hashes
+
+        Returns:
+            PipelineResult: Artifacts produced by the run
+
+        Raises:
+            PipelineError: If a stage fails or the graph cannot be scheduled
+        """
+        self.last_run_started = time.perf_counter()
+        self.last_report = []
+        self._validate()
+
+        state = self._load_state()
+        stage_state = state.get(self.name, {})
+        new_stage_state = {}
+
+        artifacts = {}
+        hashes = {}
+        report = {}
+        pending = list(self.stages)
+        running = {}
+
+        # Memory accounting attributes allocations to stages only when they run one at a time
+        max_workers = 1 if is_tracking() else self.max_workers
+
+        logger.info(f"Running pipeline {self.name} with {len(self.stages)} stages")
+        run_start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                # Schedule every stage whose inputs are available; skipping a stage
+                # makes its outputs available at once, so keep going until no
+                # further stage becomes ready
+                ready = [s for s in pending if all(i in hashes for i in s.inputs)]
+                while ready:
+                    stage = ready.pop(0)
+                    pending.remove(stage)
+                    input_hash = content_hash({i: hashes[i] for i in stage.inputs})
+                    previous = stage_state.get(stage.name, {})
+
+                    if (not force and stage.cacheable and previous.get("input_hash") == input_hash
+                            and set(previous.get("output_hashes", {})) == set(stage.outputs)):
+                        logger.info(f"Skipping stage {stage.name} (inputs unchanged)")
+                        deferred = _Deferred(stage)
+                        for output_name in stage.outputs:
+                            artifacts[output_name] = deferred
+                            hashes[output_name] = previous["output_hashes"][output_name]
+                        new_stage_state[stage.name] = previous
+                        report[stage.name] = {"stage": stage.name, "status": "skipped", "duration": 0.0}
+                        STAGE_RUNS.inc(pipeline=self.name, stage=stage.name, status="skipped")
+                        ready = [s for s in pending if all(i in hashes for i in s.inputs)]
+                        continue
+
+                    inputs = {i: artifacts[i] for i in stage.inputs}
+                    future = executor.submit(self._run_stage, stage, inputs)
+                    running[future] = (stage, input_hash)
+
+                if not running:
+                    if pending:
+                        raise PipelineError(f"Pipeline {self.name} has stages with unsatisfiable inputs")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, input_hash = running.pop(future)
+                    try:
+                        outputs, duration = future.result()
+                    except Exception as e:
+                        report[stage.name] = {"stage": stage.name, "status": "failed", "error": str(e)}
+                        self.last_report = self._ordered_report(report)
+                        logger.error(f"Stage {stage.name} failed: {str(e)}")
+                        STAGE_RUNS.inc(pipeline=self.name, stage=stage.name, status="failed")
+                        PIPELINE_DURATION.observe(time.perf_counter() - run_start, pipeline=self.name, status="failed")
+                        for other in running:
+                            other.cancel()
+                        raise PipelineError(f"Stage {stage.name} failed: {str(e)}") from e
+
+                    output_hashes = {}
+                    for output_name in stage.outputs:
+                        if output_name not in outputs:
+                            raise PipelineError(f"Stage {stage.name} did not produce output {output_name}")
+                        artifacts[output_name] = outputs[output_name]
+                        output_hashes[output_name] = stage.fingerprint(output_name, outputs[output_name])
+                        hashes[output_name] = output_hashes[output_name]
+
+                    new_stage_state[stage.name] = {
+                        "input_hash": input_hash,
+                        "output_hashes": output_hashes,
+                        "last_run": format_datetime(get_current_time())
+                    }
+                    report[stage.name] = {"stage": stage.name, "status": "ran", "duration": duration}
+                    logger.info(f"Stage {stage.name} completed in {duration:.2f} seconds")
+                    STAGE_RUNS.inc(pipeline=self.name, stage=stage.name, status="ran")
+                    STAGE_DURATION.observe(duration, pipeline=self.name, stage=stage.name)
+
+        self.last_report = self._ordered_report(report)
+        PIPELINE_DURATION.observe(time.perf_counter() - run_start, pipeline=self.name, status="succeeded")
+
+        state[self.name] = new_stage_state
+        self._save_state(state)
+
+        return PipelineResult(artifacts, self.last_report)
+
+    def _run_stage(self, stage, inputs):
+        """
+        Resolve a stage's inputs and execute it.
+
+        Args:
+            stage (Stage): Stage to run
+            inputs (dict): Input artifacts, possibly deferred
+
+        Returns:
+            tuple: (outputs, duration in seconds)
+        """
+        resolved = {
+            name: value.resolve(name) if isinstance(value, _Deferred) else value
+            for name, value in inputs.items()
+        }
+
+        logger.info(f"Running stage {stage.name}")
+        start_time = time.perf_counter()
+        with memory_stage(f"{self.name}.{stage.name}"):
+            outputs = stage.func(**resolved) or {}
+        return outputs, time.perf_counter() - start_time
+
+    def _ordered_report(self, report):
+        """
+        Order the stage report by declaration order.
+
+        Args:
+            report (dict): Stage reports keyed by stage name
+
+        Returns:
+            list: Stage reports
+        """
+        return [report[s.name] for s in self.stages if s.name in report]
+
+    def _validate(self):
+        """
+        Check that stage names are unique and every artifact has a single producer.
+        """
+        names = set()
+        producers = {}
+        for stage in self.stages:
+            if stage.name in names:
+                raise PipelineError(f"Duplicate stage name {stage.name}")
+            names.add(stage.name)
+
+            for output_name in stage.outputs:
+                if output_name in producers:
+                    raise PipelineError(
+                        f"Artifact {output_name} is produced by both {producers[output_name]} and {stage.name}"
+                    )
+                producers[output_name] = stage.name
+
+        for stage in self.stages:
+            missing = [i for i in stage.inputs if i not in producers]
+            if missing:
+                raise PipelineError(f"Stage {stage.name} has inputs with no producer: {', '.join(missing)}")
+
+    def _load_state(self):
+        """
+        Load the recorded stage hashes.
+
+        Returns:
+            dict: Pipeline state keyed by pipeline name
+        """
+        if not self.state_file.exists():
+            return {}
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"Error loading pipeline state from {self.state_file}: {str(e)}")
+            return {}
+
+    def _save_state(self, state):
+        """
+        Save the recorded stage hashes.
+
+        Args:
+            state (dict): Pipeline state keyed by pipeline name
+        """
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
@@ -0,0 +1,147 @@
+"""
+Prediction history file shared by the refresh and backfill services.
+
+Writers read, modify and replace the whole history under a file lock, so a
+refresh and a backfill never drop each other's entries, and replace it
+atomically, so readers never see a partial history. A history that cannot
+be loaded is never overwritten.
+
+Every entry added to the history is also appended to a journal next to it,
+a JSON lines file, so that the evaluation can read the entries added since
+its last update without parsing the whole history. Entries are only removed
+from the history when added ones supersede them (same fixture, same
+source), so replaying the journal in order describes the history.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from config.settings import PREDICTION_HISTORY_FILE, PREDICTION_HISTORY_LOCK_FILE
+from config.logging_config import get_prediction_refresh_logger
+from utils.locking import FileLock
+
+logger = get_prediction_refresh_logger()
+
+
+class PredictionHistoryError(Exception):
+    """
+    Raised when the existing prediction history cannot be loaded.
+    """
+    pass
+
+
+def history_journal_file(history_file=PREDICTION_HISTORY_FILE):
+    """
+    Get the journal of a prediction history file.
+
+    Args:
+        history_file (str or Path): Prediction history file
+
+    Returns:
+        Path: JSON lines file of the entries added to the history, oldest first
+    """
+    return Path(history_file).with_suffix(".jsonl")
+
+
+def update_prediction_history(added, superseded=None, history_file=PREDICTION_HISTORY_FILE,
+                              lock_file=PREDICTION_HISTORY_LOCK_FILE):
+    """
+    Add entries to the prediction history.
+
+    Args:
+        added (list): Prediction history entries to append
+        superseded (callable): Returns True for existing entries that the added ones
+            supersede, which are removed (default: none)
+        history_file (str or Path): Prediction history file
+        lock_file (str or Path): File locked while the history is updated
+
+    Returns:
+        list: New history
+
+    Raises:
+        PredictionHistoryError: If the existing history cannot be loaded
+    """
+    history_file = Path(history_file)
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+
+    with FileLock(lock_file):
+        history = _load_history(history_file)
+        _ensure_journal(history_file, history)
+
+        if superseded is not None:
+            history = [entry for entry in history if not superseded(entry)]
+        history = history + list(added)
+
+        # Write to a temporary file first so readers never see a partial history
+        temp_file = history_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=2)
+        os.replace(temp_file, history_file)
+
+        with open(history_journal_file(history_file), 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in added)
+
+    return history
+
+
+def ensure_history_journal(history_file=PREDICTION_HISTORY_FILE, lock_file=PREDICTION_HISTORY_LOCK_FILE):
+    """
+    Create the journal of a prediction history written before journals were kept.
+
+    Args:
+        history_file (str or Path): Prediction history file
+        lock_file (str or Path): File locked while the history is updated
+
+    Raises:
+        PredictionHistoryError: If the existing history cannot be loaded
+    """
+    history_file = Path(history_file)
+    if history_journal_file(history_file).exists():
+        return
+
+    with FileLock(lock_file):
+        _ensure_journal(history_file, _load_history(history_file))
+
+
+def _load_history(history_file):
+    """
+    Load the prediction history. Must hold the lock.
+
+    Args:
+        history_file (Path): Prediction history file
+
+    Returns:
+        list: Prediction history entries
+
+    Raises:
+        PredictionHistoryError: If the history exists but cannot be loaded
+    """
+    if not history_file.exists():
+        return []
+
+    try:
+        with open(history_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise PredictionHistoryError(f"Error loading prediction history {history_file}, "
+                                     f"not overwriting it: {str(e)}") from e
+
+
+def _ensure_journal(history_file, history):
+    """
+    Write the journal of the history if it has none. Must hold the lock.
+
+    Args:
+        history_file (Path): Prediction history file
+        history (list): Prediction history entries
+    """
+    journal_file = history_journal_file(history_file)
+    if journal_file.exists():
+        return
+
+    logger.info(f"Writing prediction history journal {journal_file} from {len(history)} entries")
+    temp_file = journal_file.with_suffix(".jsonl.tmp")
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(entry) + "\n" for entry in history)
+    os.replace(temp_file, journal_file)
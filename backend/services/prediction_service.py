@@ -12,6 +12,9 @@ from utils.time import get_current_time, format_datetime, parse_datetime
 from core.models.registry import ModelRegistry, ScoreModelRegistry
 from core.models.winner_prediction import WinnerPredictionModel
 from core.models.score_prediction import ScorePredictionModel
+from core.models.prediction_cache import get_prediction_cache
+from core.models.feature_state import FeatureState
+from services.prediction_history import update_prediction_history
 
 logger = get_prediction_refresh_logger()
 
@@ -67,15 +70,18 @@ class PredictionService:
             score_model_info.get("info_path")
         )
         
+        # Load the live feature state used to score unplayed matches
+        feature_state = FeatureState.load()
+        
         # Generate predictions
         predictions = []
         
         for match in upcoming_matches:
             # Generate winner prediction
-            winner_prediction = winner_model.predict(player_stats, match)
+            winner_prediction = winner_model.predict(player_stats, match, feature_state=feature_state)
             
             # Generate score prediction
-            score_prediction = score_model.predict(player_stats, match)
+            score_prediction = score_model.predict(player_stats, match, feature_state=feature_state)
             
             # Create prediction object
             prediction = {
@@ -92,6 +98,12 @@ class PredictionService:
             
             predictions.append(prediction)
         
+        # Keep the prediction cache in line with the models in use
+        prediction_cache = get_prediction_cache()
+        if prediction_cache is not None:
+            prediction_cache.retain_models([winner_model.model_id, score_model.model_id])
+            prediction_cache.save()
+        
         logger.info(f"Generated {len(predictions)} predictions")
         return predictions
     
@@ -139,15 +151,6 @@ class PredictionService:
         logger.info("Updating prediction history")
         
         try:
-            # Load existing prediction history
-            history = []
-            if Path(PREDICTION_HISTORY_FILE).exists():
-                try:
-                    with open(PREDICTION_HISTORY_FILE, 'r', encoding='utf-8') as f:
-                        history = json.load(f)
-                except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                    logger.error(f"Error loading prediction history: {str(e)}")
-            
             # Add timestamp to predictions
             timestamped_predictions = []
             for prediction in predictions:
@@ -155,15 +158,8 @@ class PredictionService:
                 prediction_copy["saved_at"] = format_datetime(get_current_time())
                 timestamped_predictions.append(prediction_copy)
             
-            # Append new predictions to history
-            history.extend(timestamped_predictions)
-            
-            # Create directory if it doesn't exist
-            Path(PREDICTION_HISTORY_FILE).parent.mkdir(parents=True, exist_ok=True)
-            
-            # Save updated history
-            with open(PREDICTION_HISTORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2)
+            # Append new predictions to history, under the lock shared with the other writers
+            update_prediction_history(timestamped_predictions)
             
             logger.info(f"Prediction history updated with {len(timestamped_predictions)} new predictions")
             return True
@@ -0,0 +1,458 @@
+"""
+In-process refresh job queue.
+
+A single worker thread runs refresh jobs one at a time against a long-lived
+RefreshService, so loaded models and pipeline state are reused between
+runs. Refresh requests that arrive while a job is already queued are merged
+into that job instead of starting another refresh.
+
+With a lock file, jobs also wait for refreshes running in other processes,
+such as the other workers of the production server. With a jobs file, job
+records are also written to a JSON file shared by those processes, so the
+status of a job can be queried from any of them, and a request is merged
+into a job queued by any of them.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from pathlib import Path
+
+from config.logging_config import get_prediction_refresh_logger
+from utils.logging import log_exceptions
+from utils.instrumentation import dump_summary
+from utils.locking import FileLock, process_alive
+from utils.metrics import metrics, LONG_BUCKETS, GAUGE_MAX
+from utils.time import get_current_time, format_datetime
+
+logger = get_prediction_refresh_logger()
+
+# Refresh job metrics
+JOB_DURATION = metrics.histogram("refresh_job_duration_seconds", "Duration of refresh jobs", ("status",),
+                                 buckets=LONG_BUCKETS)
+LAST_SUCCESS = metrics.gauge("refresh_last_success_timestamp_seconds", "Unix time of the last successful refresh job",
+                             aggregate=GAUGE_MAX)
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_FINISHED = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class RefreshJob:
+    """
+    A single refresh run and its outcome.
+    """
+
+    def __init__(self, force=False):
+        """
+        Initialize the job.
+
+        Args:
+            force (bool): Whether to rerun pipeline stages whose inputs are unchanged
+        """
+        self.job_id = uuid.uuid4().hex
+        self.force = force
+        self.status = JOB_QUEUED
+        self.requests = 1
+        self.requested_at = format_datetime(get_current_time())
+        self.started_at = None
+        self.finished_at = None
+        self.duration = None
+        self.stages = []
+        self.changes = None
+        self.error = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        """
+        Get a JSON-serializable representation of the job.
+
+        Returns:
+            dict: Job information
+        """
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "force": self.force,
+            "requests": self.requests,
+            "requested_at": self.requested_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration": self.duration,
+            "stages": self.stages,
+            "changes": self.changes,
+            "error": self.error
+        }
+
+    @classmethod
+    def from_dict(cls, job_info):
+        """
+        Create a job from its JSON-serializable representation.
+
+        Args:
+            job_info (dict): Job information, as returned by to_dict
+
+        Returns:
+            RefreshJob: Job
+        """
+        job = cls(force=job_info.get("force", False))
+        for key in ("job_id", "status", "requests", "requested_at", "started_at", "finished_at", "duration",
+                    "stages", "changes", "error"):
+            if key in job_info:
+                setattr(job, key, job_info[key])
+        if job.status in JOB_FINISHED:
+            job.done.set()
+        return job
+
+
+class RefreshJobManager:
+    """
+    Single-flight refresh job queue with request coalescing.
+    """
+
+    def __init__(self, service_factory=None, max_finished_jobs=50, lock_file=None, jobs_file=None,
+                 poll_interval=1.0):
+        """
+        Initialize the job manager.
+
+        Args:
+            service_factory (callable): Returns the RefreshService used by the worker
+                (default: RefreshService)
+            max_finished_jobs (int): Number of finished jobs kept for status queries
+            lock_file (str or Path): File locked while a job runs, so that the job managers
+                of several processes never refresh at the same time (None for no lock)
+            jobs_file (str or Path): JSON file sharing job records with the job managers
+                of other processes (None to keep them in this process only)
+            poll_interval (float): Seconds between checks of a job queued by another process
+        """
+        self.service_factory = service_factory
+        self.max_finished_jobs = max_finished_jobs
+        self.lock_file = lock_file
+        self.jobs_file = jobs_file
+        self.poll_interval = poll_interval
+        self.service = None
+        self.jobs = OrderedDict()
+        self.running_job = None
+        self.queued_job = None
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def submit(self, force=False):
+        """
+        Request a refresh.
+
+        If a job is already waiting to run, in this process or, with a jobs file,
+        in another one, the request is merged into it. Otherwise a new job is
+        queued behind the running one (if any).
+
+        Args:
+            force (bool): Whether to rerun pipeline stages whose inputs are unchanged
+
+        Returns:
+            RefreshJob: The job that will serve this request
+        """
+        with self._condition:
+            if self.queued_job is not None:
+                job = self.queued_job
+                job.requests += 1
+                job.force = job.force or force
+                logger.info(f"Merged refresh request into queued job {job.job_id} ({job.requests} requests)")
+                self._save_job(job)
+                return job
+
+            job = self._merge_into_shared_job(force)
+            if job is not None:
+                return job
+
+            job = RefreshJob(force=force)
+            self.queued_job = job
+            self.jobs[job.job_id] = job
+            self._prune_jobs()
+            logger.info(f"Queued refresh job {job.job_id}")
+            self._save_job(job)
+
+            self._ensure_worker()
+            self._condition.notify()
+            return job
+
+    def get(self, job_id):
+        """
+        Get a job by ID.
+
+        Jobs of this process are returned as they are; jobs of other processes
+        as recorded in the jobs file. An unfinished job of a process that no
+        longer runs is reported as failed.
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            RefreshJob: The job, or None if unknown
+        """
+        with self._condition:
+            job = self.jobs.get(job_id)
+        if job is not None or self.jobs_file is None:
+            return job
+
+        job_info = self._read_jobs().get(job_id)
+        if job_info is None:
+            return None
+
+        job = RefreshJob.from_dict(job_info)
+        if job.status not in JOB_FINISHED and not process_alive(job_info.get("pid")):
+            job.status = JOB_FAILED
+            job.error = "The process running the refresh job exited"
+            job.done.set()
+        return job
+
+    def _merge_into_shared_job(self, force):
+        """
+        Merge a refresh request into a job queued by another process, if there is one.
+
+        The merged request is recorded in the job's record and picked up by its
+        process when the job starts. A thread of this process follows the job
+        through the jobs file, so that the returned job finishes with it.
+
+        Args:
+            force (bool): Whether to rerun pipeline stages whose inputs are unchanged
+
+        Returns:
+            RefreshJob: The job that will serve this request, or None if no other process has one queued
+        """
+        if self.jobs_file is None:
+            return None
+
+        with FileLock(Path(self.jobs_file).with_suffix(".lock")):
+            records = self._read_jobs()
+            record = next((record for record in records.values()
+                           if record["status"] == JOB_QUEUED and record["job_id"] not in self.jobs
+                           and process_alive(record.get("pid"))), None)
+            if record is None:
+                return None
+
+            record["merged_requests"] = record.get("merged_requests", 0) + 1
+            record["merged_force"] = record.get("merged_force", False) or force
+            self._write_jobs(records)
+
+        job = RefreshJob.from_dict(record)
+        job.requests += record["merged_requests"]
+        job.force = job.force or record["merged_force"]
+        logger.info(f"Merged refresh request into job {job.job_id} queued by process {record['pid']}")
+
+        threading.Thread(target=self._follow_shared_job, args=(job,), name="refresh-job-follower",
+                         daemon=True).start()
+        return job
+
+    def _follow_shared_job(self, job):
+        """
+        Poll the jobs file until a job of another process finishes, then finish the local copy.
+
+        Args:
+            job (RefreshJob): Local copy of the job
+        """
+        while True:
+            time.sleep(self.poll_interval)
+            shared = self.get(job.job_id)
+            if shared is None:
+                job.status = JOB_FAILED
+                job.error = "The refresh job is no longer recorded"
+            elif shared.done.is_set():
+                for key, value in shared.to_dict().items():
+                    setattr(job, key, value)
+            else:
+                continue
+
+            job.done.set()
+            return
+
+    def _ensure_worker(self):
+        """
+        Start the worker thread if it is not running. Must hold the condition lock.
+        """
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, name="refresh-worker", daemon=True)
+            self._worker.start()
+
+    def _prune_jobs(self):
+        """
+        Drop the oldest finished jobs beyond the retention limit. Must hold the condition lock.
+        """
+        finished = [job_id for job_id, job in self.jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
+
+    def _read_jobs(self):
+        """
+        Read the job records of the jobs file.
+
+        Returns:
+            dict: Job information by job ID, oldest first
+        """
+        try:
+            with open(self.jobs_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.warning(f"Error reading refresh jobs file {self.jobs_file}: {str(e)}")
+            return {}
+
+    @log_exceptions(logger, reraise=False)
+    def _save_job(self, job):
+        """
+        Record a job in the jobs file, if there is one.
+
+        The file is replaced atomically, so readers never need the lock.
+
+        Args:
+            job (RefreshJob): Job to record
+        """
+        if self.jobs_file is None:
+            return
+
+        with FileLock(Path(self.jobs_file).with_suffix(".lock")):
+            records = self._read_jobs()
+
+            # Take over the requests other processes merged into the job
+            record = records.get(job.job_id, {})
+            job.requests += record.get("merged_requests", 0)
+            job.force = job.force or record.get("merged_force", False)
+
+            records[job.job_id] = dict(job.to_dict(), pid=os.getpid())
+
+            # Drop the oldest finished jobs beyond the retention limit
+            finished = [job_id for job_id, record in records.items() if record["status"] in JOB_FINISHED]
+            for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+                del records[job_id]
+
+            self._write_jobs(records)
+
+    def _write_jobs(self, records):
+        """
+        Replace the jobs file atomically. Must hold the jobs file lock.
+
+        Args:
+            records (dict): Job information by job ID, oldest first
+        """
+        jobs_file = Path(self.jobs_file)
+        temp_file = jobs_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+        os.replace(temp_file, jobs_file)
+
+    def _work(self):
+        """
+        Worker loop: run queued jobs one at a time.
+        """
+        while True:
+            with self._condition:
+                while self.queued_job is None:
+                    self._condition.wait()
+                job = self.queued_job
+                self.queued_job = None
+                self.running_job = job
+
+            try:
+                self._run_job(job)
+            finally:
+                with self._condition:
+                    self.running_job = None
+
+    def _process_lock(self):
+        """
+        Get the lock that keeps refreshes of several processes apart.
+
+        Returns:
+            context manager: Lock on the lock file, or a no-op without one
+        """
+        if self.lock_file is None:
+            return nullcontext()
+        return FileLock(self.lock_file)
+
+    @log_exceptions(logger, reraise=False)
+    def _run_job(self, job):
+        """
+        Run a refresh job and record its outcome.
+
+        Args:
+            job (RefreshJob): Job to run
+        """
+        job.status = JOB_RUNNING
+        job.started_at = format_datetime(get_current_time())
+        start_time = time.perf_counter()
+        logger.info(f"Starting refresh job {job.job_id}")
+        # Also takes over requests merged into the job by other processes
+        self._save_job(job)
+
+        try:
+            if self.service is None:
+                self.service = self._create_service()
+
+            # Report only the stages of pipelines this job ran; a refresh that fails
+            # before its pipeline runs reports no stages
+            with self._process_lock():
+                success = self.service.refresh_data(force=job.force)
+                job.stages = self._stage_report("refresh_data", self.service.data_pipeline, start_time)
+                if success:
+                    success = self.service.refresh_predictions(force=job.force)
+                    job.stages += self._stage_report("refresh_predictions", self.service.prediction_pipeline,
+                                                     start_time)
+                    job.changes = self.service.last_change_set
+
+            job.status = JOB_SUCCEEDED if success else JOB_FAILED
+            if not success:
+                job.error = "Refresh failed, see prediction refresh log for details"
+
+        except Exception as e:
+            job.status = JOB_FAILED
+            job.error = str(e)
+            raise
+
+        finally:
+            job.duration = time.perf_counter() - start_time
+            job.finished_at = format_datetime(get_current_time())
+            self._save_job(job)
+            job.done.set()
+            logger.info(f"Refresh job {job.job_id} {job.status} in {job.duration:.2f} seconds")
+            JOB_DURATION.observe(job.duration, status=job.status)
+            if job.status == JOB_SUCCEEDED:
+                LAST_SUCCESS.set(time.time())
+            dump_summary(logger, title=f"Instrumentation summary of refresh job {job.job_id}")
+
+    def _create_service(self):
+        """
+        Create the refresh service used by the worker.
+
+        Returns:
+            RefreshService: Refresh service
+        """
+        if self.service_factory is not None:
+            return self.service_factory()
+
+        # Imported lazily so that creating the manager does not load the models
+        from services.refresh_service import RefreshService
+        return RefreshService()
+
+    @staticmethod
+    def _stage_report(pipeline_name, pipeline, since):
+        """
+        Tag a pipeline's stage report with the pipeline name.
+
+        Args:
+            pipeline_name (str): Pipeline name
+            pipeline (Pipeline): Pipeline that has just run
+            since (float): time.perf_counter() value at the start of the job
+
+        Returns:
+            list: Stage reports, empty if the pipeline has not run since the job started
+        """
+        if pipeline.last_run_started is None or pipeline.last_run_started < since:
+            return []
+        return [dict(report, pipeline=pipeline_name) for report in pipeline.last_report]
@@ -0,0 +1,175 @@
+"""
+Adaptive refresh scheduler.
+
+Refreshes are timed from the fixture calendar in upcoming_matches.json:
+frequent while fixtures are being played, right after scheduled fixtures
+are expected to finish, and backed off while the league is idle.
+"""
+
+import json
+import random
+import threading
+import time
+from pathlib import Path
+
+from config.settings import (
+    UPCOMING_MATCHES_FILE, REFRESH_INTERVAL, REFRESH_MIN_INTERVAL, REFRESH_MAX_INTERVAL,
+    REFRESH_DENSE_WINDOW, REFRESH_JITTER, FIXTURE_DURATION, FIXTURE_RESULT_DELAY
+)
+from config.logging_config import get_prediction_refresh_logger
+from utils.logging import log_exceptions
+from utils.time import parse_datetime
+
+logger = get_prediction_refresh_logger()
+
+
+class RefreshScheduler:
+    """
+    Triggers refresh jobs on a schedule derived from upcoming fixtures.
+    """
+
+    def __init__(self, job_manager, upcoming_matches_file=UPCOMING_MATCHES_FILE,
+                 refresh_interval=REFRESH_INTERVAL, min_interval=REFRESH_MIN_INTERVAL,
+                 max_interval=REFRESH_MAX_INTERVAL, dense_window=REFRESH_DENSE_WINDOW, jitter=REFRESH_JITTER,
+                 fixture_duration=FIXTURE_DURATION, result_delay=FIXTURE_RESULT_DELAY):
+        """
+        Initialize the scheduler.
+
+        Args:
+            job_manager (RefreshJobManager): Job queue that runs the refreshes
+            upcoming_matches_file (str or Path): Fixture calendar file
+            refresh_interval (int): Delay between refreshes in seconds without a calendar,
+                divided among the fixtures being played
+            min_interval (int): Shortest delay between refreshes in seconds
+            max_interval (int): Longest delay between refreshes in seconds
+            dense_window (int): Seconds ahead to look when measuring fixture density
+            jitter (float): Fraction of the delay added or removed at random (only added
+                when the refresh is timed for an expected result)
+            fixture_duration (int): Estimated length of a fixture in seconds
+            result_delay (int): Seconds after a fixture ends before its result is expected
+        """
+        self.job_manager = job_manager
+        self.upcoming_matches_file = Path(upcoming_matches_file)
+        self.refresh_interval = refresh_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.dense_window = dense_window
+        self.jitter = jitter
+        self.fixture_duration = fixture_duration
+        self.result_delay = result_delay
+        self.consecutive_failures = 0
+        self._fixture_starts = []
+        self._fixtures_mtime = None
+
+    @log_exceptions(logger)
+    def next_delay(self, now=None):
+        """
+        Compute the number of seconds until the next refresh.
+
+        Args:
+            now (float): Current Unix timestamp (default: time.time())
+
+        Returns:
+            float: Delay in seconds
+        """
+        now = time.time() if now is None else now
+        starts = self._load_fixture_starts()
+        result_expected = False
+
+        if not starts:
+            # No calendar to go on, fall back to the fixed interval
+            delay = self.refresh_interval
+        else:
+            # Fixtures being played or starting soon
+            window_end = now + self.dense_window
+            active = [s for s in starts if s + self.fixture_duration > now and s < window_end]
+
+            if active:
+                # The denser the window, the more often we refresh
+                delay = self.refresh_interval / (1 + len(active))
+            else:
+                # Idle: wake up shortly before the next fixture, or back off fully
+                future = [s for s in starts if s > now]
+                delay = future[0] - now - self.min_interval if future else self.max_interval
+
+            # Refresh right after the next fixture's result should be available
+            results_due = [s + self.fixture_duration + self.result_delay for s in starts]
+            results_due = [t - now for t in results_due if t > now]
+            if results_due and results_due[0] <= delay:
+                delay = results_due[0]
+                result_expected = True
+
+        # Back off exponentially after failed refreshes
+        if self.consecutive_failures:
+            delay = max(delay, self.min_interval * 2 ** self.consecutive_failures)
+
+        # Spread refreshes out so they do not line up with other clients, but never
+        # refresh before an expected result is due
+        delay *= 1 + random.uniform(0 if result_expected else -self.jitter, self.jitter)
+
+        return min(max(delay, self.min_interval), self.max_interval)
+
+    def run_forever(self, stop_event=None):
+        """
+        Run refreshes until the stop event is set.
+
+        Each refresh waits for the previous job to finish, so runs never overlap.
+
+        Args:
+            stop_event (threading.Event): Event that stops the loop (default: never stops)
+        """
+        stop_event = stop_event or threading.Event()
+
+        while not stop_event.is_set():
+            try:
+                delay = self.next_delay()
+                logger.info(f"Next scheduled refresh in {delay:.0f} seconds")
+                if stop_event.wait(delay):
+                    break
+
+                logger.info("Starting scheduled prediction refresh")
+                job = self.job_manager.submit()
+                job.done.wait()
+
+                if job.status == "succeeded":
+                    self.consecutive_failures = 0
+                else:
+                    self.consecutive_failures = min(self.consecutive_failures + 1, 10)
+                logger.info(f"Scheduled prediction refresh {job.status} (job {job.job_id})")
+
+            except Exception as e:
+                logger.error(f"Error in refresh cycle: {e}")
+                self.consecutive_failures = min(self.consecutive_failures + 1, 10)
+                stop_event.wait(self.min_interval)
+
+    def _load_fixture_starts(self):
+        """
+        Load sorted fixture start times, re-reading the calendar only when it changes.
+
+        Returns:
+            list: Fixture start times as Unix timestamps
+        """
+        if not self.upcoming_matches_file.exists():
+            return []
+
+        mtime = self.upcoming_matches_file.stat().st_mtime
+        if mtime == self._fixtures_mtime:
+            return self._fixture_starts
+
+        try:
+            with open(self.upcoming_matches_file, 'r', encoding='utf-8') as f:
+                matches = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"Error loading fixture calendar: {str(e)}")
+            return []
+
+        starts = []
+        for match in matches:
+            try:
+                starts.append(parse_datetime(match['fixtureStart']).timestamp())
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        self._fixture_starts = sorted(starts)
+        self._fixtures_mtime = mtime
+        return self._fixture_starts
@@ -15,11 +15,14 @@ sys.path.append(str(backend_dir))
 
 from config.settings import (
     MATCH_HISTORY_FILE, PLAYER_STATS_FILE, UPCOMING_MATCHES_FILE,
-    PREDICTIONS_FILE, PREDICTION_HISTORY_FILE, MATCH_HISTORY_DAYS,
-    UPCOMING_MATCHES_DAYS
+    PREDICTIONS_FILE, PREDICTION_STATE_FILE, FEATURE_STATE_FILE,
+    MATCH_HISTORY_DAYS, UPCOMING_MATCHES_DAYS
 )
 from config.logging_config import get_prediction_refresh_logger
+from utils.hashing import content_hash
 from utils.logging import log_execution_time, log_exceptions
+from utils.instrumentation import dump_summary
+from utils.metrics import metrics
 from utils.time import get_current_time, format_datetime
 from core.data.fetchers import TokenFetcher
 from core.data.fetchers.match_history import MatchHistoryFetcher
@@ -28,13 +31,29 @@ from core.data.processors.player_stats import PlayerStatsProcessor
 from core.models.registry import ModelRegistry, ScoreModelRegistry
 from core.models.winner_prediction import WinnerPredictionModel
 from core.models.score_prediction import ScorePredictionModel
+from core.models.prediction_cache import get_prediction_cache
+from core.models.feature_state import FeatureState
+from services.pipeline import Pipeline, PipelineError
+from services.evaluation_service import PredictionEvaluator, load_evaluation_stats
+from services.events import diff_fixtures, publish_event
+from services.prediction_history import update_prediction_history
 
 logger = get_prediction_refresh_logger()
 
+# Duration of single-match model predictions
+INFERENCE_DURATION = metrics.histogram("model_inference_duration_seconds", "Duration of single-match predictions",
+                                       ("model",), buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                                                            0.25, 0.5, 1))
+
 
 class RefreshService:
     """
     Service for refreshing data and predictions.
+
+    Both refreshes run as stage pipelines: a stage whose inputs have not
+    changed since its last successful run is skipped, and independent stages
+    (such as the two fetches) run concurrently. What changed is published to
+    the update event log (see services/events.py).
     """
 
     def __init__(self):
@@ -48,47 +67,82 @@ class RefreshService:
         self.player_stats_processor = PlayerStatsProcessor()
         self.winner_model_registry = ModelRegistry()
         self.score_model_registry = ScoreModelRegistry()
+        self.prediction_evaluator = PredictionEvaluator()
+        self._loaded_models = {}
+        self.last_change_set = None
+        self.data_pipeline = self._build_data_pipeline()
+        self.prediction_pipeline = self._build_prediction_pipeline()
+
+    def _build_data_pipeline(self):
+        """
+        Build the data refresh pipeline.
+
+        Returns:
+            Pipeline: token -> (match history -> player stats || feature state || evaluation)
+                || upcoming matches
+        """
+        pipeline = Pipeline("refresh_data")
+        pipeline.add_stage("token", self._fetch_token_stage, outputs=("token",), cacheable=False)
+        pipeline.add_stage("match_history", self._fetch_match_history_stage,
+                           inputs=("token",), outputs=("match_history",), cacheable=False)
+        pipeline.add_stage("upcoming_matches", self._fetch_upcoming_matches_stage,
+                           inputs=("token",), outputs=("upcoming_matches",), cacheable=False)
+        pipeline.add_stage("player_stats", self._calculate_player_stats_stage,
+                           inputs=("match_history",), outputs=("player_stats",),
+                           restore=lambda: {"player_stats": self.player_stats_processor.load_from_file()})
+        pipeline.add_stage("feature_state", self._build_feature_state_stage, inputs=("match_history",))
+        pipeline.add_stage("evaluate_predictions", self._evaluate_predictions_stage,
+                           inputs=("match_history",), cacheable=False)
+        return pipeline
+
+    def _build_prediction_pipeline(self):
+        """
+        Build the prediction refresh pipeline.
+
+        Returns:
+            Pipeline: (player stats || feature state || upcoming matches || model selection)
+                -> predict -> save
+        """
+        pipeline = Pipeline("refresh_predictions")
+        pipeline.add_stage("load_player_stats", self._load_player_stats_stage,
+                           outputs=("player_stats",), cacheable=False)
+        pipeline.add_stage("load_feature_state", self._load_feature_state_stage,
+                           outputs=("feature_state",), cacheable=False,
+                           fingerprints={"feature_state": lambda state: state.fingerprint() if state else None})
+        pipeline.add_stage("load_upcoming_matches", self._load_upcoming_matches_stage,
+                           outputs=("upcoming_matches",), cacheable=False)
+        pipeline.add_stage("select_models", self._select_models_stage,
+                           outputs=("winner_model_info", "score_model_info"), cacheable=False)
+        pipeline.add_stage("predict", self._predict_stage,
+                           inputs=("player_stats", "feature_state", "upcoming_matches",
+                                   "winner_model_info", "score_model_info"),
+                           outputs=("predictions", "prediction_changes"),
+                           restore=self._load_predictions)
+        pipeline.add_stage("save_predictions", self._save_predictions_stage,
+                           inputs=("predictions", "prediction_changes"))
+        pipeline.add_stage("update_prediction_history", self._update_prediction_history_stage,
+                           inputs=("predictions", "prediction_changes"))
+        return pipeline
 
     @log_execution_time(logger)
     @log_exceptions(logger)
-    def refresh_data(self):
+    def refresh_data(self, force=False):
         """
         Refresh all data (match history, upcoming matches, player stats).
 
+        Args:
+            force (bool): Whether to rerun stages whose inputs are unchanged
+
         Returns:
             bool: True if successful, False otherwise
         """
         logger.info("Starting data refresh")
 
         try:
-            # Get authentication token
-            token = self.token_fetcher.get_token()
-            if not token:
-                logger.error("Failed to retrieve authentication token")
-                return False
-
-            # Fetch match history
-            logger.info("Fetching match history")
-            matches = self.match_history_fetcher.fetch_match_history()
-            if not matches:
-                logger.error("Failed to fetch match history")
-                return False
-
-            # Calculate player statistics
-            logger.info("Calculating player statistics")
-            player_stats = self.player_stats_processor.calculate_player_stats(matches)
-            if not player_stats:
-                logger.error("Failed to calculate player statistics")
-                return False
-
-            # Fetch upcoming matches for the next 30 days
-            logger.info(f"Fetching upcoming matches for the next {UPCOMING_MATCHES_DAYS} days")
-            upcoming_matches = self.upcoming_matches_fetcher.fetch_upcoming_matches()
-            if not upcoming_matches:
-                logger.error("Failed to fetch upcoming matches")
-                return False
+            result = self.data_pipeline.run(force=force)
 
             # Log detailed information about the upcoming matches
+            upcoming_matches = result["upcoming_matches"]
             logger.info(f"Successfully fetched {len(upcoming_matches)} upcoming matches")
             for i, match in enumerate(upcoming_matches[:10]):  # Log first 10 matches for debugging
                 logger.info(f"Match {i+1}: ID={match.get('id')}, Start={match.get('fixtureStart')}, "
@@ -104,113 +158,24 @@ class RefreshService:
 
     @log_execution_time(logger)
     @log_exceptions(logger)
-    def refresh_predictions(self):
+    def refresh_predictions(self, force=False):
         """
         Refresh predictions for upcoming matches.
 
+        Args:
+            force (bool): Whether to rerun stages whose inputs are unchanged
+
         Returns:
             bool: True if successful, False otherwise
         """
         logger.info("Starting prediction refresh")
 
         try:
-            # Load player statistics
-            player_stats = self.player_stats_processor.load_from_file()
-            if not player_stats:
-                logger.error("Failed to load player statistics")
-                return False
-
-            # Load upcoming matches
-            upcoming_matches = self.upcoming_matches_fetcher.load_from_file()
-            if not upcoming_matches:
-                logger.error("Failed to load upcoming matches")
-                return False
-
-            # Get all winner prediction models
-            winner_models = self.winner_model_registry.list_models()
-            if not winner_models:
-                logger.error("No winner prediction models available")
-                return False
-
-            # Use the best model (highest accuracy)
-            best_winner_model_info = self.winner_model_registry.get_best_model_info()
-            if not best_winner_model_info:
-                # Fallback to most recent model if best model is not set
-                winner_models.sort(key=lambda x: x.get("model_id", 0), reverse=True)
-                best_winner_model_info = winner_models[0]
-
-            logger.info(f"Using winner prediction model {best_winner_model_info.get('model_id')} with accuracy {best_winner_model_info.get('accuracy')}")
-
-            # Load winner prediction model
-            try:
-                winner_model = WinnerPredictionModel.load(
-                    best_winner_model_info.get("model_path"),
-                    best_winner_model_info.get("info_path")
-                )
-                logger.info(f"Successfully loaded winner prediction model from {best_winner_model_info.get('model_path')}")
-            except Exception as e:
-                logger.error(f"Error loading winner prediction model: {str(e)}")
-                return False
-
-            # Get all score prediction models
-            score_models = self.score_model_registry.list_models()
-            if not score_models:
-                logger.error("No score prediction models available")
-                return False
-
-            # Use the best model (lowest MAE)
-            best_score_model_info = self.score_model_registry.get_best_model_info()
-            if not best_score_model_info:
-                # Fallback to most recent model if best model is not set
-                score_models.sort(key=lambda x: x.get("model_id", 0), reverse=True)
-                best_score_model_info = score_models[0]
-
-            logger.info(f"Using score prediction model {best_score_model_info.get('model_id')} with MAE {best_score_model_info.get('total_score_mae')}")
-
-            # Load score prediction model
-            try:
-                score_model = ScorePredictionModel.load(
-                    best_score_model_info.get("model_path"),
-                    best_score_model_info.get("info_path")
-                )
-                logger.info(f"Successfully loaded score prediction model from {best_score_model_info.get('model_path')}")
-            except Exception as e:
-                logger.error(f"Error loading score prediction model: {str(e)}")
-                return False
-
-            # Generate predictions
-            logger.info(f"Generating predictions for {len(upcoming_matches)} upcoming matches")
-            predictions = []
-
-            for match in upcoming_matches:
-                # Generate winner prediction
-                winner_prediction = winner_model.predict(player_stats, match)
-
-                # Generate score prediction
-                score_prediction = score_model.predict(player_stats, match)
-
-                # Create prediction object
-                prediction = {
-                    "fixtureId": match.get("id"),
-                    "homePlayer": match.get("homePlayer"),
-                    "awayPlayer": match.get("awayPlayer"),
-                    "homeTeam": match.get("homeTeam"),
-                    "awayTeam": match.get("awayTeam"),
-                    "fixtureStart": match.get("fixtureStart"),
-                    "prediction": winner_prediction,
-                    "score_prediction": score_prediction,
-                    "generated_at": format_datetime(get_current_time())
-                }
-
-                predictions.append(prediction)
-
-            # Save predictions
-            logger.info(f"Saving {len(predictions)} predictions")
-            with open(PREDICTIONS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(predictions, f, indent=2)
-
-            # Update prediction history
-            self._update_prediction_history(predictions)
+            result = self.prediction_pipeline.run(force=force)
+            if not result.ran("predict"):
+                logger.info("Predictions are up to date, nothing to regenerate")
+                changes = result["prediction_changes"]
+                self.last_change_set = {k: v for k, v in changes.items() if k != "dependencies"}
 
             logger.info("Prediction refresh completed successfully")
             return True
@@ -219,6 +184,468 @@ class RefreshService:
             logger.error(f"Error during prediction refresh: {str(e)}")
             return False
 
+    def _fetch_token_stage(self):
+        """
+        Get an authentication token.
+
+        Returns:
+            dict: {"token": token}
+        """
+        token = self.token_fetcher.get_token()
+        if not token:
+            raise PipelineError("Failed to retrieve authentication token")
+        return {"token": token}
+
+    def _fetch_match_history_stage(self, token):
+        """
+        Fetch match history from the H2H GG League API.
+
+        Args:
+            token (str): Authentication token
+
+        Returns:
+            dict: {"match_history": matches}
+        """
+        logger.info("Fetching match history")
+        matches = self.match_history_fetcher.fetch_match_history()
+        if not matches:
+            raise PipelineError("Failed to fetch match history")
+        return {"match_history": matches}
+
+    def _fetch_upcoming_matches_stage(self, token):
+        """
+        Fetch upcoming matches from the H2H GG League API.
+
+        Args:
+            token (str): Authentication token
+
+        Returns:
+            dict: {"upcoming_matches": matches}
+        """
+        logger.info(f"Fetching upcoming matches for the next {UPCOMING_MATCHES_DAYS} days")
+        previous_matches = self.upcoming_matches_fetcher.load_from_file()
+        upcoming_matches = self.upcoming_matches_fetcher.fetch_upcoming_matches()
+        if not upcoming_matches:
+            raise PipelineError("Failed to fetch upcoming matches")
+        self._publish_changes("upcoming-matches", diff_fixtures(previous_matches, upcoming_matches, key="id"))
+        return {"upcoming_matches": upcoming_matches}
+
+    def _calculate_player_stats_stage(self, match_history):
+        """
+        Calculate player statistics from match history.
+
+        Args:
+            match_history (list): List of match data dictionaries
+
+        Returns:
+            dict: {"player_stats": player_stats}
+        """
+        logger.info("Calculating player statistics")
+        player_stats = self.player_stats_processor.calculate_player_stats(match_history)
+        if not player_stats:
+            raise PipelineError("Failed to calculate player statistics")
+        return {"player_stats": player_stats}
+
+    def _build_feature_state_stage(self, match_history):
+        """
+        Build the live feature state from match history and save it.
+
+        Args:
+            match_history (list): List of match data dictionaries
+        """
+        logger.info("Building live feature state")
+        FeatureState.from_matches(match_history).save(FEATURE_STATE_FILE)
+
+    def _evaluate_predictions_stage(self, match_history):
+        """
+        Evaluate new predictions and newly completed fixtures against the results.
+
+        Args:
+            match_history (list): List of match data dictionaries
+        """
+        logger.info("Evaluating predictions against results")
+        previous_stats = load_evaluation_stats(self.prediction_evaluator.stats_file) or {}
+        stats = self.prediction_evaluator.update(match_history)
+
+        # The per-player breakdown is large and the update time always changes
+        summary = {key: value for key, value in stats.items() if key not in ("players", "updated_at")}
+        previous_summary = {key: value for key, value in previous_stats.items() if key not in ("players", "updated_at")}
+        if content_hash(summary) != content_hash(previous_summary):
+            publish_event("evaluation", dict(summary, updated_at=stats.get("updated_at")))
+
+    def _load_player_stats_stage(self):
+        """
+        Load player statistics from file.
+
+        Returns:
+            dict: {"player_stats": player_stats}
+        """
+        player_stats = self.player_stats_processor.load_from_file()
+        if not player_stats:
+            raise PipelineError("Failed to load player statistics")
+        return {"player_stats": player_stats}
+
+    def _load_feature_state_stage(self):
+        """
+        Load the live feature state from file.
+
+        Without it, predictions for upcoming matches fall back to heuristics.
+
+        Returns:
+            dict: {"feature_state": feature_state or None}
+        """
+        feature_state = FeatureState.load(FEATURE_STATE_FILE)
+        if feature_state is None:
+            logger.warning("Live feature state not available, predictions will use fallbacks")
+        return {"feature_state": feature_state}
+
+    def _load_upcoming_matches_stage(self):
+        """
+        Load upcoming matches from file.
+
+        Returns:
+            dict: {"upcoming_matches": upcoming_matches}
+        """
+        upcoming_matches = self.upcoming_matches_fetcher.load_from_file()
+        if not upcoming_matches:
+            raise PipelineError("Failed to load upcoming matches")
+        return {"upcoming_matches": upcoming_matches}
+
+    def _select_models_stage(self):
+        """
+        Select the winner and score prediction models to use.
+
+        Returns:
+            dict: {"winner_model_info": info, "score_model_info": info}
+        """
+        # Pick up models registered since the service was created
+        self.winner_model_registry.reload()
+        self.score_model_registry.reload()
+
+        # Get all winner prediction models
+        winner_models = self.winner_model_registry.list_models()
+        if not winner_models:
+            raise PipelineError("No winner prediction models available")
+
+        # Use the best model (highest accuracy)
+        best_winner_model_info = self.winner_model_registry.get_best_model_info()
+        if not best_winner_model_info:
+            # Fallback to most recent model if best model is not set
+            winner_models.sort(key=lambda x: x.get("model_id", 0), reverse=True)
+            best_winner_model_info = winner_models[0]
+
+        logger.info(f"Using winner prediction model {best_winner_model_info.get('model_id')} with accuracy {best_winner_model_info.get('accuracy')}")
+
+        # Get all score prediction models
+        score_models = self.score_model_registry.list_models()
+        if not score_models:
+            raise PipelineError("No score prediction models available")
+
+        # Use the best model (lowest MAE)
+        best_score_model_info = self.score_model_registry.get_best_model_info()
+        if not best_score_model_info:
+            # Fallback to most recent model if best model is not set
+            score_models.sort(key=lambda x: x.get("model_id", 0), reverse=True)
+            best_score_model_info = score_models[0]
+
+        logger.info(f"Using score prediction model {best_score_model_info.get('model_id')} with MAE {best_score_model_info.get('total_score_mae')}")
+
+        return {
+            "winner_model_info": best_winner_model_info,
+            "score_model_info": best_score_model_info
+        }
+
+    def _predict_stage(self, player_stats, feature_state, upcoming_matches, winner_model_info, score_model_info):
+        """
+        Generate predictions for upcoming matches whose dependencies changed.
+
+        Each prediction depends on the two models, both players' statistics and
+        live feature state, the teams, the fixture time and the models' feature
+        configuration. A
+        prediction whose dependencies hash to the same value as in the previous
+        refresh is carried over unchanged; only new or dirty fixtures are
+        recomputed, and fixtures that left the slate are dropped.
+
+        Args:
+            player_stats (dict): Player statistics dictionary
+            feature_state (FeatureState): Live feature state, or None if unavailable
+            upcoming_matches (list): List of upcoming match data dictionaries
+            winner_model_info (dict): Registry entry of the winner prediction model
+            score_model_info (dict): Registry entry of the score prediction model
+
+        Returns:
+            dict: {"predictions": predictions, "prediction_changes": change set}
+        """
+        previous_predictions = {
+            str(p.get("fixtureId")): p for p in self._load_predictions()["predictions"]
+        }
+        previous_dependencies = self._load_prediction_state()
+
+        player_fingerprints = {}
+        dependencies = {}
+        predictions = []
+        changes = {"added": [], "changed": [], "removed": [], "unchanged": []}
+        winner_model = score_model = None
+
+        for match in upcoming_matches:
+            fixture_id = str(match.get("id"))
+            dependency_hash = self._prediction_dependency_hash(
+                match, player_stats, feature_state, winner_model_info, score_model_info, player_fingerprints
+            )
+            dependencies[fixture_id] = dependency_hash
+
+            previous = previous_predictions.get(fixture_id)
+            if previous is not None and previous_dependencies.get(fixture_id) == dependency_hash:
+                predictions.append(previous)
+                changes["unchanged"].append(fixture_id)
+                continue
+
+            # Load the models only once something actually needs predicting
+            if winner_model is None:
+                winner_model, score_model = self._load_models(winner_model_info, score_model_info)
+
+            predictions.append(self._predict_match(winner_model, score_model, player_stats, feature_state, match))
+            changes["changed" if previous is not None else "added"].append(fixture_id)
+
+        if winner_model is not None:
+            self._persist_prediction_cache(winner_model, score_model)
+
+        changes["removed"] = [fixture_id for fixture_id in previous_predictions if fixture_id not in dependencies]
+        changes["dependencies"] = dependencies
+
+        logger.info(f"Predictions: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+                    f"{len(changes['removed'])} removed, {len(changes['unchanged'])} unchanged")
+        self.last_change_set = {k: v for k, v in changes.items() if k != "dependencies"}
+
+        return {"predictions": predictions, "prediction_changes": changes}
+
+    def _load_models(self, winner_model_info, score_model_info):
+        """
+        Load the winner and score prediction models.
+
+        Args:
+            winner_model_info (dict): Registry entry of the winner prediction model
+            score_model_info (dict): Registry entry of the score prediction model
+
+        Returns:
+            tuple: (winner_model, score_model)
+        """
+        # Load winner prediction model
+        try:
+            winner_model = self._load_model(WinnerPredictionModel, winner_model_info)
+        except Exception as e:
+            raise PipelineError(f"Error loading winner prediction model: {str(e)}")
+
+        # Load score prediction model
+        try:
+            score_model = self._load_model(ScorePredictionModel, score_model_info)
+        except Exception as e:
+            raise PipelineError(f"Error loading score prediction model: {str(e)}")
+
+        return winner_model, score_model
+
+    def _predict_match(self, winner_model, score_model, player_stats, feature_state, match):
+        """
+        Generate the prediction for a single upcoming match.
+
+        Args:
+            winner_model (WinnerPredictionModel): Winner prediction model
+            score_model (ScorePredictionModel): Score prediction model
+            player_stats (dict): Player statistics dictionary
+            feature_state (FeatureState): Live feature state, or None if unavailable
+            match (dict): Upcoming match data dictionary
+
+        Returns:
+            dict: Prediction
+        """
+        # Generate winner prediction
+        start_time = time.perf_counter()
+        winner_prediction = winner_model.predict(player_stats, match, feature_state=feature_state)
+        INFERENCE_DURATION.observe(time.perf_counter() - start_time, model="winner")
+
+        # Generate score prediction
+        start_time = time.perf_counter()
+        score_prediction = score_model.predict(player_stats, match, feature_state=feature_state)
+        INFERENCE_DURATION.observe(time.perf_counter() - start_time, model="score")
+
+        # Create prediction object
+        return {
+            "fixtureId": match.get("id"),
+            "homePlayer": match.get("homePlayer"),
+            "awayPlayer": match.get("awayPlayer"),
+            "homeTeam": match.get("homeTeam"),
+            "awayTeam": match.get("awayTeam"),
+            "fixtureStart": match.get("fixtureStart"),
+            "prediction": winner_prediction,
+            "score_prediction": score_prediction,
+            "winner_model_id": winner_model.model_id,
+            "score_model_id": score_model.model_id,
+            "generated_at": format_datetime(get_current_time())
+        }
+
+    @staticmethod
+    def _persist_prediction_cache(winner_model, score_model):
+        """
+        Drop cached predictions of retired models and save the prediction cache.
+
+        Args:
+            winner_model (WinnerPredictionModel): Winner prediction model in use
+            score_model (ScorePredictionModel): Score prediction model in use
+        """
+        cache = get_prediction_cache()
+        if cache is None:
+            return
+
+        cache.retain_models([winner_model.model_id, score_model.model_id])
+        cache.save()
+        logger.info(f"Prediction cache: {cache.get_stats()}")
+
+    @staticmethod
+    def _prediction_dependency_hash(match, player_stats, feature_state, winner_model_info, score_model_info,
+                                    player_fingerprints):
+        """
+        Hash everything a prediction for a match depends on.
+
+        Args:
+            match (dict): Upcoming match data dictionary
+            player_stats (dict): Player statistics dictionary
+            feature_state (FeatureState): Live feature state, or None if unavailable
+            winner_model_info (dict): Registry entry of the winner prediction model
+            score_model_info (dict): Registry entry of the score prediction model
+            player_fingerprints (dict): Cache of player statistics hashes, filled in as needed
+
+        Returns:
+            str: Dependency hash
+        """
+        player_ids = (str(match['homePlayer']['id']), str(match['awayPlayer']['id']))
+        for player_id in player_ids:
+            if player_id not in player_fingerprints:
+                player_fingerprints[player_id] = content_hash(player_stats.get(player_id))
+
+        return content_hash({
+            "winner_model_id": winner_model_info.get("model_id"),
+            "score_model_id": score_model_info.get("model_id"),
+            "winner_feature_config": winner_model_info.get("parameters", {}).get("feature_config"),
+            "score_feature_config": score_model_info.get("parameters", {}).get("feature_config"),
+            "players": [player_fingerprints[player_id] for player_id in player_ids],
+            "feature_state": feature_state.fingerprint(*player_ids) if feature_state is not None else None,
+            "teams": [match['homeTeam']['id'], match['awayTeam']['id']],
+            "fixture_start": match.get("fixtureStart")
+        })
+
+    def _load_model(self, model_class, model_info):
+        """
+        Load a model, reusing the instance from a previous refresh if it is still current.
+
+        Args:
+            model_class (type): Model class
+            model_info (dict): Registry entry of the model
+
+        Returns:
+            BaseModel: Loaded model
+        """
+        key = (model_class.__name__, model_info.get("model_id"), model_info.get("model_path"))
+        model = self._loaded_models.get(key)
+        if model is not None:
+            logger.info(f"Reusing loaded {model_class.__name__} {model_info.get('model_id')}")
+            return model
+
+        model = model_class.load(model_info.get("model_path"), model_info.get("info_path"))
+        logger.info(f"Successfully loaded {model_class.__name__} from {model_info.get('model_path')}")
+
+        # Keep only the current model of each type
+        self._loaded_models = {k: v for k, v in self._loaded_models.items() if k[0] != model_class.__name__}
+        self._loaded_models[key] = model
+        return model
+
+    def _save_predictions_stage(self, predictions, prediction_changes):
+        """
+        Save predictions and their dependency hashes to file.
+
+        Args:
+            predictions (list): List of prediction dictionaries
+            prediction_changes (dict): Change set produced by the predict stage
+        """
+        logger.info(f"Saving {len(predictions)} predictions")
+        with open(PREDICTIONS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(predictions, f, indent=2)
+
+        with open(PREDICTION_STATE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(prediction_changes.get("dependencies", {}), f, indent=2)
+
+        by_fixture = {str(p.get("fixtureId")): p for p in predictions}
+        self._publish_changes("predictions", {
+            "added": [by_fixture[fixture_id] for fixture_id in prediction_changes.get("added", [])],
+            "changed": [by_fixture[fixture_id] for fixture_id in prediction_changes.get("changed", [])],
+            "removed": prediction_changes.get("removed", [])
+        })
+
+    @staticmethod
+    def _publish_changes(event, changes):
+        """
+        Publish a change set to the update event log, unless nothing changed.
+
+        Args:
+            event (str): Event type
+            changes (dict): Added, changed and removed fixtures
+        """
+        if any(changes.values()):
+            publish_event(event, changes)
+
+    def _update_prediction_history_stage(self, predictions, prediction_changes):
+        """
+        Append new and changed predictions to the prediction history.
+
+        Args:
+            predictions (list): List of prediction dictionaries
+            prediction_changes (dict): Change set produced by the predict stage
+        """
+        updated = set(prediction_changes.get("added", [])) | set(prediction_changes.get("changed", []))
+        self._update_prediction_history([p for p in predictions if str(p.get("fixtureId")) in updated])
+
+    def _load_predictions(self):
+        """
+        Load the saved predictions, used when the predict stage is skipped.
+
+        Returns:
+            dict: {"predictions": predictions, "prediction_changes": change set}
+        """
+        predictions = []
+        if Path(PREDICTIONS_FILE).exists():
+            try:
+                with open(PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
+                    predictions = json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                logger.error(f"Error loading predictions: {str(e)}")
+
+        return {
+            "predictions": predictions,
+            "prediction_changes": {
+                "added": [],
+                "changed": [],
+                "removed": [],
+                "unchanged": [str(p.get("fixtureId")) for p in predictions],
+                "dependencies": self._load_prediction_state()
+            }
+        }
+
+    def _load_prediction_state(self):
+        """
+        Load the dependency hashes of the saved predictions.
+
+        Returns:
+            dict: Dependency hash keyed by fixture ID
+        """
+        if not Path(PREDICTION_STATE_FILE).exists():
+            return {}
+
+        try:
+            with open(PREDICTION_STATE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"Error loading prediction state: {str(e)}")
+            return {}
+
     @log_exceptions(logger)
     def _update_prediction_history(self, predictions):
         """
@@ -229,15 +656,6 @@ class RefreshService:
         """
         logger.info("Updating prediction history")
 
-        # Load existing prediction history
-        history = []
-        if Path(PREDICTION_HISTORY_FILE).exists():
-            try:
-                with open(PREDICTION_HISTORY_FILE, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                logger.error(f"Error loading prediction history: {str(e)}")
-
         # Add timestamp to predictions
         timestamped_predictions = []
         for prediction in predictions:
@@ -245,14 +663,11 @@ class RefreshService:
             prediction_copy["saved_at"] = format_datetime(get_current_time())
             timestamped_predictions.append(prediction_copy)
 
-        # Append new predictions to history
-        history.extend(timestamped_predictions)
-
-        # Save updated history
-        with open(PREDICTION_HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2)
+        # Append new predictions to history, under the lock shared with the backfill
+        update_prediction_history(timestamped_predictions)
 
         logger.info(f"Prediction history updated with {len(timestamped_predictions)} new predictions")
+        self._publish_changes("history", {"added": timestamped_predictions})
 
 
 @log_execution_time(logger)
@@ -266,14 +681,17 @@ def refresh_predictions():
     """
     service = RefreshService()
 
-    # Refresh data from H2H GG League API
-    if not service.refresh_data():
-        logger.error("Data refresh failed")
-        return False
+    try:
+        # Refresh data from H2H GG League API
+        if not service.refresh_data():
+            logger.error("Data refresh failed")
+            return False
 
-    # Refresh predictions
-    if not service.refresh_predictions():
-        logger.error("Prediction refresh failed")
-        return False
+        # Refresh predictions
+        if not service.refresh_predictions():
+            logger.error("Prediction refresh failed")
+            return False
 
-    return True
+        return True
+    finally:
+        dump_summary(logger, title="Instrumentation summary of refresh")
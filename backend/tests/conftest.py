@@ -0,0 +1,24 @@
+"""
+Shared setup of the test suite.
+
+The tests check the behaviour of the refresh engines on small hand-built
+inputs and write only to temporary directories:
+
+    pytest tests
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Settings are read at import, so keep the default output and models
+# directories of our modules away from the real ones before any of them load
+_work_dir = Path(tempfile.mkdtemp(prefix="2k_flash_tests_"))
+os.environ.setdefault("OUTPUT_DIR", str(_work_dir / "output"))
+os.environ.setdefault("MODELS_DIR", str(_work_dir / "models"))
+
+# Add the parent directory to the Python path so we can import our modules
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
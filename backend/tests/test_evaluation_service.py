@@ -0,0 +1,223 @@
+"""
+Tests of the prediction evaluation: incremental aggregates against a full rebuild.
+"""
+
+import json
+from datetime import timedelta
+
+import pytest
+
+from services.evaluation_service import PredictionEvaluator, load_evaluation_stats
+from services.prediction_history import history_journal_file
+from utils.time import get_current_time, format_datetime
+
+PLAYERS = [("1", "Alice"), ("2", "Bob"), ("3", "Carol"), ("4", "Dave")]
+
+
+def _entry(fixture_id, home_win_probability, home_score=60, away_score=55, model="winner-a", backfilled=False,
+           fixture_start=None):
+    """
+    Build a prediction history entry.
+
+    Args:
+        fixture_id (int): Fixture ID
+        home_win_probability (float): Predicted probability of a home win
+        home_score (int): Predicted home score
+        away_score (int): Predicted away score
+        model (str): Winner model ID
+        backfilled (bool): Whether the prediction was backfilled
+        fixture_start (str): Fixture start time
+
+    Returns:
+        dict: Prediction history entry
+    """
+    home, away = PLAYERS[fixture_id % 4], PLAYERS[(fixture_id + 1) % 4]
+    entry = {
+        "fixtureId": fixture_id,
+        "homePlayer": {"id": home[0], "name": home[1]},
+        "awayPlayer": {"id": away[0], "name": away[1]},
+        "prediction": {"home_win_probability": home_win_probability},
+        "score_prediction": {"home_score": home_score, "away_score": away_score},
+        "winner_model_id": model,
+        "score_model_id": "score-a"
+    }
+    if backfilled:
+        entry["backfilled"] = True
+    if fixture_start:
+        entry["fixtureStart"] = fixture_start
+    return entry
+
+
+def _result(fixture_id):
+    # Even fixtures are home wins
+    return {"id": fixture_id, "homeScore": 62 if fixture_id % 2 == 0 else 50, "awayScore": 54}
+
+
+def _write_history(path, history):
+    """
+    Write a history and its journal as the history writers leave them.
+    """
+    path.write_text(json.dumps(history), encoding="utf-8")
+    history_journal_file(path).write_text("".join(json.dumps(entry) + "\n" for entry in history), encoding="utf-8")
+
+
+def _evaluator(directory):
+    return PredictionEvaluator(directory / "history.json", directory / "state.json", directory / "stats.json",
+                               directory / "history.lock")
+
+
+def _normalized(stats):
+    """
+    Drop the timestamp and round away float summation order.
+    """
+    stats = {key: value for key, value in stats.items() if key != "updated_at"}
+    return json.loads(json.dumps(stats), parse_float=lambda value: round(float(value), 9))
+
+
+def _full_rebuild(tmp_path, history, match_history):
+    """
+    Evaluate a history from scratch with a fresh state.
+    """
+    rebuild_dir = tmp_path / "rebuild"
+    rebuild_dir.mkdir(exist_ok=True)
+    evaluator = _evaluator(rebuild_dir)
+    _write_history(evaluator.history_file, history)
+    return evaluator.update(match_history)
+
+
+@pytest.fixture
+def evaluator(tmp_path):
+    return _evaluator(tmp_path)
+
+
+def test_single_update_scores_predictions(evaluator, tmp_path):
+    history = [_entry(0, 0.8), _entry(1, 0.7), _entry(2, 0.4, backfilled=True), _entry(3, 0.3)]
+    _write_history(evaluator.history_file, history)
+
+    stats = evaluator.update([_result(fixture_id) for fixture_id in range(3)])
+
+    assert stats["evaluated"] == 3
+    assert stats["pending"] == 1
+    live = stats["overall"]["live"]
+    assert live["predictions"] == 2
+    # Fixture 0 is a home win predicted at 0.8, fixture 1 an away win predicted at 0.7
+    assert live["accuracy"] == 0.5
+    assert live["brier_score"] == pytest.approx((0.2 ** 2 + 0.7 ** 2) / 2)
+    assert live["home_score_mae"] == pytest.approx((2 + 10) / 2)
+    assert stats["overall"]["backfill"]["predictions"] == 1
+    assert stats["players"]["1"]["name"] == "Alice"
+    assert load_evaluation_stats(evaluator.stats_file)["evaluated"] == 3
+
+
+def test_incremental_updates_match_a_full_rebuild(evaluator, tmp_path):
+    history = [_entry(fixture_id, 0.3 + 0.05 * fixture_id) for fixture_id in range(10)]
+    results = [_result(fixture_id) for fixture_id in range(5)]
+    _write_history(evaluator.history_file, history)
+    evaluator.update(results)
+
+    # New predictions, newer predictions replacing evaluated and pending ones, and new results
+    history += [_entry(fixture_id, 0.6, model="winner-b") for fixture_id in range(10, 15)]
+    history += [_entry(3, 0.9, model="winner-b"), _entry(8, 0.2), _entry(4, 0.55, backfilled=True)]
+    results += [_result(fixture_id) for fixture_id in range(5, 12)]
+    _write_history(evaluator.history_file, history)
+    evaluator.update(results)
+
+    # Results arriving without new predictions
+    results += [_result(fixture_id) for fixture_id in range(12, 15)]
+    incremental = evaluator.update(results)
+
+    assert _normalized(incremental) == _normalized(_full_rebuild(tmp_path, history, results))
+    assert incremental["pending"] == 0
+    assert incremental["winner_models"]["winner-b"]["predictions"] == 6
+
+
+def test_unchanged_history_evaluates_nothing_twice(evaluator):
+    _write_history(evaluator.history_file, [_entry(0, 0.8), _entry(1, 0.7)])
+    results = [_result(0), _result(1)]
+
+    first = evaluator.update(results)
+    second = evaluator.update(results)
+
+    assert _normalized(first) == _normalized(second)
+    assert second["overall"]["live"]["predictions"] == 2
+
+
+@pytest.mark.parametrize("rewrite", ["truncated", "edited", "replaced"])
+def test_rewritten_history_matches_a_full_rebuild(evaluator, tmp_path, rewrite):
+    history = [_entry(fixture_id, 0.3 + 0.05 * fixture_id) for fixture_id in range(10)]
+    results = [_result(fixture_id) for fixture_id in range(10)]
+    _write_history(evaluator.history_file, history)
+    evaluator.update(results)
+
+    if rewrite == "truncated":
+        # Shorter than the evaluated offset
+        history = history[4:]
+    elif rewrite == "edited":
+        # Same length, the last evaluated entry changed
+        history[-1] = _entry(9, 0.1)
+    else:
+        # Longer, with an earlier entry removed and the evaluated tail different
+        history = history[1:] + [_entry(fixture_id, 0.5) for fixture_id in range(10, 13)]
+    _write_history(evaluator.history_file, history)
+
+    incremental = evaluator.update(results)
+
+    assert _normalized(incremental) == _normalized(_full_rebuild(tmp_path, history, results))
+
+
+def test_only_appended_entries_are_read(evaluator):
+    history = [_entry(fixture_id, 0.6) for fixture_id in range(4)]
+    _write_history(evaluator.history_file, history)
+    evaluator.update([])
+
+    # Garble the first journal line, keeping its length: it is never read again
+    journal = history_journal_file(evaluator.history_file)
+    lines = journal.read_text(encoding="utf-8").splitlines(keepends=True)
+    lines[0] = "x" * (len(lines[0]) - 1) + "\n"
+    appended = _entry(4, 0.6)
+    journal.write_text("".join(lines) + json.dumps(appended) + "\n", encoding="utf-8")
+    # An unfinished line being appended is left for the next update
+    with open(journal, 'a', encoding='utf-8') as f:
+        f.write('{"fixtureId": 5')
+
+    stats = evaluator.update([_result(fixture_id) for fixture_id in range(5)])
+
+    assert stats["evaluated"] == 5
+    assert stats["pending"] == 0
+
+
+def test_evaluated_predictions_are_kept_as_contributions(evaluator):
+    _write_history(evaluator.history_file, [_entry(0, 0.8), _entry(1, 0.7)])
+    evaluator.update([_result(0)])
+
+    state = json.loads(evaluator.state_file.read_text(encoding="utf-8"))
+
+    assert list(state["pending"]) == ["1:live"]
+    assert list(state["evaluated"]) == ["0:live"]
+    assert set(state["evaluated"]["0:live"]) == {"source", "winner_model_id", "score_model_id", "player_ids",
+                                                "confidence", "correct", "brier", "score_errors"}
+
+
+def test_predictions_of_fixtures_beyond_the_match_history_expire(evaluator):
+    now = get_current_time()
+    old = format_datetime(now - timedelta(days=evaluator.max_pending_days + 1))
+    recent = format_datetime(now - timedelta(days=1))
+    _write_history(evaluator.history_file, [_entry(0, 0.8, fixture_start=old), _entry(1, 0.7, fixture_start=recent),
+                                            _entry(2, 0.6, fixture_start=old)])
+
+    # Fixture 2 is old but its result is known
+    stats = evaluator.update([_result(2)])
+
+    assert stats["evaluated"] == 1
+    assert stats["pending"] == 1
+
+
+def test_history_without_a_journal_gets_one(evaluator):
+    history = [_entry(0, 0.8), _entry(1, 0.7)]
+    evaluator.history_file.write_text(json.dumps(history), encoding="utf-8")
+
+    stats = evaluator.update([_result(0), _result(1)])
+
+    assert stats["evaluated"] == 2
+    journal = history_journal_file(evaluator.history_file).read_text(encoding="utf-8")
+    assert [json.loads(line) for line in journal.splitlines()] == history
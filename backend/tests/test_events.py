@@ -0,0 +1,185 @@
+"""
+Tests of the update events: fixture diffs, the shared event log and the event stream.
+"""
+
+import json
+import threading
+
+import pytest
+
+from services.events import EventLog, diff_fixtures
+
+
+@pytest.fixture
+def event_log(tmp_path):
+    return EventLog(tmp_path / "events.jsonl", tmp_path / "events.lock", max_events=3)
+
+
+def _ids(events):
+    return [event["id"] for event in events]
+
+
+def test_diff_fixtures_reports_added_changed_and_removed():
+    previous = [{"fixtureId": 1, "score": 1}, {"fixtureId": 2, "score": 2}, {"fixtureId": 3, "score": 3}]
+    current = [{"fixtureId": 1, "score": 1}, {"fixtureId": 2, "score": 5}, {"fixtureId": 4, "score": 4}]
+
+    changes = diff_fixtures(previous, current)
+
+    # Removed fixtures are reported by ID, as a string
+    assert changes == {
+        "added": [{"fixtureId": 4, "score": 4}],
+        "changed": [{"fixtureId": 2, "score": 5}],
+        "removed": ["3"]
+    }
+    assert diff_fixtures(current, current) == {"added": [], "changed": [], "removed": []}
+
+
+def test_events_are_numbered_consecutively(event_log):
+    assert event_log.last_id() == 0
+    assert event_log.events_since(0) == ([], True)
+
+    ids = [event_log.publish("predictions", {"n": n}) for n in range(3)]
+
+    assert ids == [1, 2, 3]
+    assert event_log.last_id() == 3
+    events, complete = event_log.events_since(1)
+    assert complete
+    assert _ids(events) == [2, 3]
+    assert events[0]["event"] == "predictions" and events[0]["data"] == {"n": 1}
+
+
+def test_log_is_trimmed_to_the_newest_events(event_log):
+    sizes = []
+    for n in range(10):
+        event_log.publish("history", {"n": n})
+        with open(event_log.log_file, 'r', encoding='utf-8') as f:
+            sizes.append(sum(1 for _ in f))
+
+    # The file grows to twice the limit before it is cut back to the limit
+    assert max(sizes) <= 2 * event_log.max_events
+    assert sizes[6] == event_log.max_events
+    events, complete = event_log.events_since(7)
+    assert complete
+    assert _ids(events) == [8, 9, 10]
+    assert event_log.last_id() == 10
+
+
+def test_resuming_from_outside_the_log_is_incomplete(event_log):
+    for n in range(7):
+        event_log.publish("history", {"n": n})
+    events, _ = event_log.events_since(0)
+    oldest = events[0]["id"]
+    assert oldest > 1
+
+    # The event right before the oldest kept one can still be resumed from
+    events, complete = event_log.events_since(oldest - 1)
+    assert complete and events[0]["id"] == oldest
+
+    # Events the client missed are gone
+    events, complete = event_log.events_since(oldest - 2)
+    assert not complete
+    assert _ids(events)[-1] == 7
+
+    # The client is ahead of the log, which was reset
+    assert not event_log.events_since(8)[1]
+
+
+def test_events_published_through_another_log_are_seen(event_log):
+    other_process = EventLog(event_log.log_file, event_log.lock_file, max_events=3)
+
+    event_log.publish("predictions", {"n": 1})
+    other_process.publish("evaluation", {"n": 2})
+
+    assert event_log.last_id() == 2
+    assert [event["event"] for event in event_log.events_since(0)[0]] == ["predictions", "evaluation"]
+
+
+def test_concurrent_publishers_never_reuse_an_id(event_log):
+    publishers = [EventLog(event_log.log_file, event_log.lock_file, max_events=100) for _ in range(4)]
+    ids = []
+    lock = threading.Lock()
+
+    def publish(log):
+        for n in range(25):
+            event_id = log.publish("history", {"n": n})
+            with lock:
+                ids.append(event_id)
+
+    threads = [threading.Thread(target=publish, args=(log,)) for log in publishers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(ids) == list(range(1, 101))
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    from app import api
+
+    monkeypatch.setattr(api, "event_log", EventLog(tmp_path / "events.jsonl", tmp_path / "events.lock",
+                                                   max_events=3))
+    monkeypatch.setattr(api, "SSE_POLL_INTERVAL", 0)
+    return api
+
+
+def _parse(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n") if not line.startswith(":"))
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def test_stream_sends_the_events_after_the_last_event_id(api):
+    for n in range(3):
+        api.event_log.publish("upcoming-matches", {"n": n})
+
+    stream = api.stream_events(1)
+
+    assert next(stream).startswith("retry: ")
+    assert [_parse(next(stream)) for _ in range(2)] == [
+        {"id": "2", "event": "upcoming-matches", "data": {"n": 1}},
+        {"id": "3", "event": "upcoming-matches", "data": {"n": 2}}
+    ]
+
+
+def test_stream_resets_a_client_that_fell_behind(api):
+    for n in range(7):
+        api.event_log.publish("history", {"n": n})
+
+    stream = api.stream_events(1)
+    next(stream)
+    reset = _parse(next(stream))
+
+    # The client must reload everything; the reset carries the ID to resume from
+    assert reset == {"id": "7", "event": "reset", "data": {"last_event_id": 7}}
+    api.event_log.publish("history", {"n": 7})
+    assert _parse(next(stream))["id"] == "8"
+
+
+def test_stream_resets_a_client_ahead_of_the_log(api):
+    api.event_log.publish("history", {"n": 0})
+
+    stream = api.stream_events(5)
+    next(stream)
+
+    assert _parse(next(stream)) == {"id": "1", "event": "reset", "data": {"last_event_id": 1}}
+
+
+def test_streams_beyond_the_limit_are_refused(api, monkeypatch):
+    monkeypatch.setattr(api, "event_streams", threading.BoundedSemaphore(1))
+    client = api.app.test_client()
+
+    stream = client.get("/api/events")
+    refused = client.get("/api/events")
+
+    assert stream.status_code == 200
+    assert refused.status_code == 503
+    assert int(refused.headers["Retry-After"]) > 0
+
+    # Closing the stream frees its slot
+    stream.close()
+    again = client.get("/api/events")
+    assert again.status_code == 200
+    again.close()
@@ -0,0 +1,72 @@
+"""
+Tests of the best model selection: holdout metrics of a tournament over training metrics.
+"""
+
+import pytest
+
+from core.models.registry import ModelRegistry, ScoreModelRegistry, HOLDOUT_METRICS_KEY
+
+
+def _winner(model_id, accuracy):
+    return {"model_id": model_id, "accuracy": accuracy, "model_type": "WinnerPredictionModel"}
+
+
+def _holdout(accuracy, brier_score, evaluated_at="2026-10-18T12:00:00"):
+    return {"accuracy": accuracy, "brier_score": brier_score, "evaluated_at": evaluated_at}
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(tmp_path, tmp_path / "registry.json")
+
+
+def test_best_model_without_holdout_metrics_has_the_highest_accuracy(registry):
+    registry.register_model(_winner("a", 0.6))
+    registry.register_model(_winner("b", 0.9))
+
+    assert registry.registry["best_model_id"] == "b"
+
+
+def test_promoted_model_stays_best_when_models_change(registry):
+    registry.register_model(_winner("a", 0.9))
+    registry.register_model(_winner("b", 0.6))
+    registry.update_model_metrics({"a": _holdout(0.55, 0.24), "b": _holdout(0.6, 0.23)}, HOLDOUT_METRICS_KEY)
+    registry.set_best_model("b")
+
+    # A new model with a higher training accuracy has not been compared on the holdout yet
+    registry.register_model(_winner("c", 0.95))
+    assert registry.registry["best_model_id"] == "b"
+
+    registry.remove_model("a")
+    assert registry.registry["best_model_id"] == "b"
+
+    # Reloading from disk keeps the promotion
+    assert ModelRegistry(registry.models_dir, registry.registry_file).registry["best_model_id"] == "b"
+
+
+def test_only_the_latest_holdout_is_ranked(registry):
+    registry.register_model(_winner("a", 0.9))
+    registry.register_model(_winner("b", 0.6))
+    registry.register_model(_winner("c", 0.7))
+    registry.update_model_metrics({"a": _holdout(0.7, 0.2, "2026-10-01T12:00:00"),
+                                   "b": _holdout(0.6, 0.23), "c": _holdout(0.58, 0.22)}, HOLDOUT_METRICS_KEY)
+    registry.set_best_model("b")
+
+    # Model a scored better on an older holdout, which is not comparable
+    registry.remove_model("b")
+    assert registry.registry["best_model_id"] == "c"
+
+
+def test_score_models_are_ranked_by_holdout_mae(tmp_path):
+    registry = ScoreModelRegistry(tmp_path, tmp_path / "score_registry.json")
+    registry.add_model("a", "a.pkl", "a.json", 5.0)
+    registry.add_model("b", "b.pkl", "b.json", 8.0)
+    assert registry.registry["best_model_id"] == "a"
+
+    registry.update_model_metrics({"a": {"total_score_mae": 9.0, "evaluated_at": "2026-10-18T12:00:00"},
+                                   "b": {"total_score_mae": 7.5, "evaluated_at": "2026-10-18T12:00:00"}},
+                                  HOLDOUT_METRICS_KEY)
+    registry.set_best_model("b")
+    registry.add_model("c", "c.pkl", "c.json", 4.0)
+
+    assert registry.registry["best_model_id"] == "b"
@@ -0,0 +1,227 @@
+"""
+Tests of the refresh stage pipeline: hash-based stage skipping and failures.
+"""
+
+import json
+import time
+
+import pytest
+
+from services.pipeline import Pipeline, PipelineError
+
+
+def _statuses(pipeline):
+    return {report["stage"]: report["status"] for report in pipeline.last_report}
+
+
+def _build_pipeline(state_file, source, calls):
+    """
+    Build a load -> double -> total pipeline over a mutable source list.
+
+    Args:
+        state_file (Path): Pipeline state file
+        source (list): Numbers loaded by the first stage
+        calls (list): Receives the name of every stage function and restore called
+
+    Returns:
+        Pipeline: Pipeline
+    """
+    def load():
+        calls.append("load")
+        return {"raw": list(source)}
+
+    def double(raw):
+        calls.append("double")
+        return {"doubled": [value * 2 for value in raw]}
+
+    def restore_double():
+        calls.append("restore double")
+        return {"doubled": [value * 2 for value in source]}
+
+    def total(doubled):
+        calls.append("total")
+        return {"total": sum(doubled)}
+
+    def restore_total():
+        calls.append("restore total")
+        return {"total": sum(value * 2 for value in source)}
+
+    def count(doubled):
+        calls.append("count")
+        return {"count": len(doubled)}
+
+    pipeline = Pipeline("test", state_file=state_file, max_workers=2)
+    pipeline.add_stage("load", load, outputs=("raw",), cacheable=False)
+    pipeline.add_stage("double", double, inputs=("raw",), outputs=("doubled",), restore=restore_double)
+    pipeline.add_stage("total", total, inputs=("doubled",), outputs=("total",), restore=restore_total)
+    pipeline.add_stage("count", count, inputs=("doubled",), outputs=("count",), cacheable=False)
+    return pipeline
+
+
+def test_first_run_runs_every_stage(tmp_path):
+    calls = []
+    pipeline = _build_pipeline(tmp_path / "state.json", [1, 2, 3], calls)
+
+    result = pipeline.run()
+
+    assert result["total"] == 12
+    assert result["count"] == 3
+    assert sorted(calls) == ["count", "double", "load", "total"]
+    assert set(_statuses(pipeline).values()) == {"ran"}
+
+
+def test_unchanged_inputs_skip_stages_and_restore_on_use(tmp_path):
+    source = [1, 2, 3]
+    calls = []
+    pipeline = _build_pipeline(tmp_path / "state.json", source, calls)
+    pipeline.run()
+    calls.clear()
+
+    result = pipeline.run()
+
+    assert _statuses(pipeline) == {"load": "ran", "double": "skipped", "total": "skipped", "count": "ran"}
+    assert not result.ran("double")
+    # The non-cacheable consumer needed the skipped stage's output, restored once
+    assert calls.count("restore double") == 1
+    assert "double" not in calls and "total" not in calls
+    # Outputs of skipped stages are restored only when read
+    assert "restore total" not in calls
+    assert result["total"] == 12
+    assert "restore total" in calls
+
+
+def test_changed_input_reruns_downstream_stages(tmp_path):
+    source = [1, 2, 3]
+    calls = []
+    pipeline = _build_pipeline(tmp_path / "state.json", source, calls)
+    pipeline.run()
+
+    source.append(4)
+    result = pipeline.run()
+
+    assert set(_statuses(pipeline).values()) == {"ran"}
+    assert result["total"] == 20
+
+
+def test_unchanged_output_skips_the_stages_after_it(tmp_path):
+    source = [1, 5]
+    calls = []
+    pipeline = Pipeline("maximum", state_file=tmp_path / "state.json")
+    pipeline.add_stage("load", lambda: {"raw": list(source)}, outputs=("raw",), cacheable=False)
+    pipeline.add_stage("maximum", lambda raw: {"maximum": max(raw)}, inputs=("raw",), outputs=("maximum",))
+    pipeline.add_stage("report", lambda maximum: calls.append("report") or {"report": f"max {maximum}"},
+                       inputs=("maximum",), outputs=("report",), restore=lambda: {"report": "max 5"})
+    pipeline.run()
+
+    # The input of maximum changed, its output did not
+    source[0] = 2
+    result = pipeline.run()
+
+    assert _statuses(pipeline) == {"load": "ran", "maximum": "ran", "report": "skipped"}
+    assert calls == ["report"]
+    assert result["report"] == "max 5"
+
+
+def test_force_runs_every_stage(tmp_path):
+    calls = []
+    pipeline = _build_pipeline(tmp_path / "state.json", [1, 2, 3], calls)
+    pipeline.run()
+
+    pipeline.run(force=True)
+
+    assert set(_statuses(pipeline).values()) == {"ran"}
+
+
+def test_state_is_kept_per_pipeline_in_the_state_file(tmp_path):
+    state_file = tmp_path / "state.json"
+    pipeline = _build_pipeline(state_file, [1, 2, 3], [])
+    pipeline.run()
+
+    with open(state_file, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    assert set(state) == {"test"}
+    assert set(state["test"]) == {"load", "double", "total", "count"}
+    assert set(state["test"]["double"]["output_hashes"]) == {"doubled"}
+
+
+def test_failed_stage_cancels_queued_stages_and_keeps_state(tmp_path):
+    state_file = tmp_path / "state.json"
+    ran = []
+
+    def fail():
+        raise ValueError("boom")
+
+    def slow():
+        # Takes the only worker until the failure has been handled
+        time.sleep(0.2)
+        ran.append("slow")
+        return {"b": 1}
+
+    def queued():
+        ran.append("queued")
+        return {"c": 1}
+
+    def downstream(a):
+        ran.append("downstream")
+        return {"d": a}
+
+    pipeline = Pipeline("failing", state_file=state_file, max_workers=1)
+    pipeline.add_stage("fail", fail, outputs=("a",))
+    pipeline.add_stage("slow", slow, outputs=("b",))
+    pipeline.add_stage("queued", queued, outputs=("c",))
+    pipeline.add_stage("downstream", downstream, inputs=("a",), outputs=("d",))
+
+    with pytest.raises(PipelineError, match="Stage fail failed: boom"):
+        pipeline.run()
+
+    assert "queued" not in ran
+    assert "downstream" not in ran
+    assert pipeline.last_report[0] == {"stage": "fail", "status": "failed", "error": "boom"}
+    # A failed run records nothing, so the next run starts from scratch
+    assert not state_file.exists()
+
+
+def test_failed_run_does_not_skip_on_the_next_run(tmp_path):
+    state_file = tmp_path / "state.json"
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("first attempt fails")
+        return {"value": 1}
+
+    pipeline = Pipeline("flaky", state_file=state_file)
+    pipeline.add_stage("flaky", flaky, outputs=("value",))
+
+    with pytest.raises(PipelineError):
+        pipeline.run()
+    result = pipeline.run()
+
+    assert result["value"] == 1
+    assert _statuses(pipeline) == {"flaky": "ran"}
+
+
+def test_missing_output_fails_the_run(tmp_path):
+    pipeline = Pipeline("incomplete", state_file=tmp_path / "state.json")
+    pipeline.add_stage("empty", lambda: {}, outputs=("value",))
+
+    with pytest.raises(PipelineError, match="did not produce output value"):
+        pipeline.run()
+
+
+def test_invalid_graphs_are_rejected(tmp_path):
+    pipeline = Pipeline("invalid", state_file=tmp_path / "state.json")
+    pipeline.add_stage("a", lambda: {"x": 1}, outputs=("x",))
+    pipeline.add_stage("b", lambda: {"x": 2}, outputs=("x",))
+    with pytest.raises(PipelineError, match="produced by both a and b"):
+        pipeline.run()
+
+    pipeline = Pipeline("orphan", state_file=tmp_path / "state.json")
+    pipeline.add_stage("a", lambda: {"x": 1}, outputs=("x",))
+    pipeline.run()
+    pipeline.add_stage("b", lambda y: {"z": y}, inputs=("y",), outputs=("z",))
+    with pytest.raises(PipelineError, match="no producer: y"):
+        pipeline.run()
+    # The report of the previous run is not mistaken for this one's
+    assert pipeline.last_report == []
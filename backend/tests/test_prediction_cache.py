@@ -0,0 +1,78 @@
+"""
+Tests of the prediction cache keys: player fingerprints memoized per player stats snapshot.
+"""
+
+import copy
+
+import pytest
+
+from core.models import prediction_cache
+from core.models.prediction_cache import PredictionCache
+
+
+class _FakeFeatureEngineer:
+    feature_config = {"window": 5}
+
+
+class _FakeModel:
+    model_id = "winner-a"
+    model_info = {"training_time": "2026-01-01T00:00:00"}
+    feature_engineer = _FakeFeatureEngineer()
+
+
+MATCH = {
+    "homePlayer": {"id": 1}, "awayPlayer": {"id": 2},
+    "homeTeam": {"id": 10}, "awayTeam": {"id": 20},
+    "fixtureStart": "2026-10-18T12:00:00"
+}
+
+
+@pytest.fixture
+def player_stats():
+    return {
+        str(player_id): {"total_matches": 3, "match_history": [{"id": n, "score": 60 + n} for n in range(3)]}
+        for player_id in (1, 2)
+    }
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """
+    Record the player stats entries hashed for fingerprints.
+    """
+    entries = []
+    content_hash = prediction_cache.content_hash
+
+    def recording_hash(obj):
+        if isinstance(obj, dict) and "match_history" in obj:
+            entries.append(obj)
+        return content_hash(obj)
+
+    monkeypatch.setattr(prediction_cache, "content_hash", recording_hash)
+    return entries
+
+
+def test_players_are_hashed_once_per_snapshot(player_stats, hashed):
+    keys = {PredictionCache.make_key(_FakeModel(), player_stats, MATCH) for _ in range(5)}
+
+    assert len(keys) == 1
+    assert len(hashed) == 2
+
+
+def test_changed_stats_in_a_new_snapshot_change_the_key(player_stats, hashed):
+    key = PredictionCache.make_key(_FakeModel(), player_stats, MATCH)
+
+    same = copy.deepcopy(player_stats)
+    changed = copy.deepcopy(player_stats)
+    changed["2"]["match_history"].append({"id": 3, "score": 70})
+
+    assert PredictionCache.make_key(_FakeModel(), same, MATCH) == key
+    assert PredictionCache.make_key(_FakeModel(), changed, MATCH) != key
+    # Each snapshot hashes its players once
+    assert len(hashed) == 6
+
+
+def test_players_without_stats_are_not_cached(player_stats):
+    del player_stats["2"]
+
+    assert PredictionCache.make_key(_FakeModel(), player_stats, MATCH) is None
@@ -0,0 +1,61 @@
+"""
+Tests of the prediction history writers: locked, atomic updates and the history journal.
+"""
+
+import json
+import threading
+
+import pytest
+
+from services.prediction_history import PredictionHistoryError, history_journal_file, update_prediction_history
+
+
+@pytest.fixture
+def files(tmp_path):
+    return tmp_path / "prediction_history.json", tmp_path / "prediction_history.lock"
+
+
+def test_concurrent_writers_keep_every_entry(files):
+    history_file, lock_file = files
+
+    def append(writer):
+        for n in range(20):
+            update_prediction_history([{"fixtureId": f"{writer}-{n}"}], history_file=history_file,
+                                      lock_file=lock_file)
+
+    threads = [threading.Thread(target=append, args=(writer,)) for writer in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(history_file, 'r', encoding='utf-8') as f:
+        history = json.load(f)
+    assert len(history) == 80
+    assert not history_file.with_suffix(".tmp").exists()
+
+
+def test_unreadable_history_is_not_overwritten(files):
+    history_file, lock_file = files
+    history_file.write_text('[{"fixtureId": 1}, {"fixtu', encoding="utf-8")
+
+    with pytest.raises(PredictionHistoryError, match="not overwriting it"):
+        update_prediction_history([{"fixtureId": 2}], history_file=history_file, lock_file=lock_file)
+
+    assert history_file.read_text(encoding="utf-8") == '[{"fixtureId": 1}, {"fixtu'
+
+
+def test_added_entries_are_journaled(files):
+    history_file, lock_file = files
+    history_file.write_text(json.dumps([{"fixtureId": 1, "backfilled": True}, {"fixtureId": 2}]), encoding="utf-8")
+
+    history = update_prediction_history([{"fixtureId": 1, "backfilled": True, "n": 2}],
+                                        superseded=lambda entry: entry.get("backfilled"),
+                                        history_file=history_file, lock_file=lock_file)
+
+    assert history == [{"fixtureId": 2}, {"fixtureId": 1, "backfilled": True, "n": 2}]
+    # The journal starts from the history it found and only ever grows
+    journal = history_journal_file(history_file).read_text(encoding="utf-8")
+    assert [json.loads(line) for line in journal.splitlines()] == [
+        {"fixtureId": 1, "backfilled": True}, {"fixtureId": 2}, {"fixtureId": 1, "backfilled": True, "n": 2}
+    ]
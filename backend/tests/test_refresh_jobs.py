@@ -0,0 +1,222 @@
+"""
+Tests of the refresh job queue: single-flight runs, request merging and shared job records.
+"""
+
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from services.refresh_jobs import RefreshJobManager, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+
+# Seconds to wait for a background job before failing the test
+TIMEOUT = 10
+
+
+class _FakePipeline:
+    def __init__(self, name):
+        self.name = name
+        self.last_report = []
+        self.last_run_started = None
+
+    def run(self):
+        self.last_run_started = time.perf_counter()
+        self.last_report = [{"stage": self.name, "status": "ran", "duration": 0.0}]
+
+
+class _FakeRefreshService:
+    """
+    Refresh service that records its runs and can be held in refresh_data.
+    """
+
+    def __init__(self, fail=False, fail_before_pipeline=False):
+        self.fail = fail
+        self.fail_before_pipeline = fail_before_pipeline
+        self.runs = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        self.data_pipeline = _FakePipeline("fetch")
+        self.prediction_pipeline = _FakePipeline("predict")
+        self.last_change_set = {"predictions": 0}
+
+    def refresh_data(self, force=False):
+        self.runs.append(force)
+        self.started.set()
+        assert self.release.wait(TIMEOUT)
+        if self.fail_before_pipeline:
+            return False
+        self.data_pipeline.run()
+        if self.fail:
+            raise RuntimeError("API unavailable")
+        return True
+
+    def refresh_predictions(self, force=False):
+        self.prediction_pipeline.run()
+        return True
+
+
+def _wait_for(job):
+    assert job.done.wait(TIMEOUT), f"job {job.job_id} did not finish"
+    return job
+
+
+def test_job_runs_and_reports_stages():
+    service = _FakeRefreshService()
+    manager = RefreshJobManager(service_factory=lambda: service)
+
+    job = _wait_for(manager.submit())
+
+    assert job.status == JOB_SUCCEEDED
+    assert [(stage["pipeline"], stage["stage"]) for stage in job.stages] == [
+        ("refresh_data", "fetch"), ("refresh_predictions", "predict")
+    ]
+    assert job.changes == {"predictions": 0}
+    assert job.duration is not None
+    assert manager.get(job.job_id) is job
+
+
+def test_requests_made_while_a_job_waits_are_merged_into_it():
+    service = _FakeRefreshService()
+    service.release.clear()
+    manager = RefreshJobManager(service_factory=lambda: service)
+
+    running = manager.submit()
+    assert service.started.wait(TIMEOUT)
+    assert running.status == JOB_RUNNING
+
+    queued = manager.submit()
+    merged = manager.submit(force=True)
+    also_merged = manager.submit()
+
+    assert merged is queued and also_merged is queued
+    assert queued is not running
+    assert queued.requests == 3
+    assert queued.force
+
+    service.release.set()
+    _wait_for(running)
+    _wait_for(queued)
+
+    # Four requests, two refreshes, one at a time; the merged job runs forced
+    assert service.runs == [False, True]
+    assert running.status == JOB_SUCCEEDED and queued.status == JOB_SUCCEEDED
+
+    # With nothing waiting, the next request starts a new job
+    later = _wait_for(manager.submit())
+    assert later is not queued
+    assert service.runs == [False, True, False]
+
+
+def test_failed_refresh_fails_the_job_and_keeps_the_worker():
+    service = _FakeRefreshService(fail=True)
+    manager = RefreshJobManager(service_factory=lambda: service)
+
+    job = _wait_for(manager.submit())
+
+    assert job.status == JOB_FAILED
+    assert job.error == "API unavailable"
+
+    service.fail = False
+    assert _wait_for(manager.submit()).status == JOB_SUCCEEDED
+
+
+def test_refresh_failing_before_its_pipeline_reports_no_stages():
+    service = _FakeRefreshService()
+    manager = RefreshJobManager(service_factory=lambda: service)
+    assert _wait_for(manager.submit()).stages
+
+    # The pipelines still hold the report of the previous job
+    service.fail_before_pipeline = True
+    job = _wait_for(manager.submit())
+
+    assert job.status == JOB_FAILED
+    assert job.stages == []
+
+
+def test_finished_jobs_beyond_the_limit_are_dropped():
+    manager = RefreshJobManager(service_factory=_FakeRefreshService, max_finished_jobs=2)
+
+    jobs = [_wait_for(manager.submit()) for _ in range(4)]
+
+    # Pruned when the next job is queued, so the newest may exceed the limit by one
+    assert manager.get(jobs[0].job_id) is None
+    assert manager.get(jobs[-1].job_id) is jobs[-1]
+
+
+def test_job_records_are_shared_through_the_jobs_file(tmp_path):
+    jobs_file = tmp_path / "refresh_jobs.json"
+    worker = RefreshJobManager(service_factory=_FakeRefreshService, jobs_file=jobs_file)
+    other_worker = RefreshJobManager(service_factory=_FakeRefreshService, jobs_file=jobs_file)
+
+    job = _wait_for(worker.submit(force=True))
+    shared = other_worker.get(job.job_id)
+
+    assert shared is not job
+    assert shared.to_dict() == job.to_dict()
+    assert shared.done.is_set()
+    assert other_worker.get("unknown") is None
+
+
+def test_unfinished_job_of_an_exited_process_is_reported_failed(tmp_path):
+    jobs_file = tmp_path / "refresh_jobs.json"
+    service = _FakeRefreshService()
+    service.release.clear()
+    worker = RefreshJobManager(service_factory=lambda: service, jobs_file=jobs_file)
+    job = worker.submit()
+    assert service.started.wait(TIMEOUT)
+
+    other_worker = RefreshJobManager(jobs_file=jobs_file)
+    assert other_worker.get(job.job_id).status == JOB_RUNNING
+
+    # Pretend the job's worker process exited mid-run
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    records = worker._read_jobs()
+    records[job.job_id]["pid"] = exited.pid
+    jobs_file.write_text(json.dumps(records), encoding="utf-8")
+
+    stale = other_worker.get(job.job_id)
+    assert stale.status == JOB_FAILED
+    assert stale.error == "The process running the refresh job exited"
+
+    service.release.set()
+    _wait_for(job)
+
+
+def test_requests_are_merged_into_a_job_queued_by_another_process(tmp_path):
+    jobs_file = tmp_path / "refresh_jobs.json"
+    service = _FakeRefreshService()
+    service.release.clear()
+    worker = RefreshJobManager(service_factory=lambda: service, jobs_file=jobs_file)
+    other_service = _FakeRefreshService()
+    other_worker = RefreshJobManager(service_factory=lambda: other_service, jobs_file=jobs_file,
+                                     poll_interval=0.01)
+
+    running = worker.submit()
+    assert service.started.wait(TIMEOUT)
+    queued = worker.submit()
+
+    merged = other_worker.submit(force=True)
+
+    assert merged.job_id == queued.job_id
+    assert merged.requests == 2 and merged.force
+    assert not merged.done.is_set()
+
+    service.release.set()
+    _wait_for(running)
+    _wait_for(queued)
+    _wait_for(merged)
+
+    # The queued job took over the merged request; the other process ran nothing
+    assert service.runs == [False, True]
+    assert other_service.runs == []
+    assert queued.requests == 2
+    assert merged.status == JOB_SUCCEEDED
+    assert merged.to_dict() == queued.to_dict()
+
+    # Without a queued job, the other process queues its own
+    own = _wait_for(other_worker.submit())
+    assert own.job_id not in (running.job_id, queued.job_id)
+    assert other_service.runs == [False]
@@ -0,0 +1,196 @@
+"""
+Tests of the adaptive refresh scheduler: delays from the fixture calendar, backoff and clamping.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from services.refresh_jobs import RefreshJob
+from services.refresh_scheduler import RefreshScheduler
+
+# Fixed clock of the tests
+NOW = 1_750_000_000.0
+
+REFRESH_INTERVAL = 3600
+MIN_INTERVAL = 300
+MAX_INTERVAL = 3 * 3600
+FIXTURE_DURATION = 1200
+RESULT_DELAY = 120
+
+
+def _scheduler(tmp_path, fixture_starts=None, jitter=0.0, **kwargs):
+    """
+    Create a scheduler over a calendar of fixtures starting at the given offsets from NOW.
+
+    Args:
+        tmp_path (Path): Directory of the calendar file
+        fixture_starts (list): Fixture start offsets in seconds, or None for no calendar
+        jitter (float): Fraction of the delay added or removed at random
+
+    Returns:
+        RefreshScheduler: Scheduler
+    """
+    calendar = tmp_path / "upcoming_matches.json"
+    if fixture_starts is not None:
+        fixtures = [{"fixtureId": i, "fixtureStart": datetime.fromtimestamp(NOW + offset, timezone.utc).isoformat()}
+                    for i, offset in enumerate(fixture_starts)]
+        calendar.write_text(json.dumps(fixtures), encoding="utf-8")
+
+    options = dict(refresh_interval=REFRESH_INTERVAL, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, dense_window=3600, jitter=jitter,
+                   fixture_duration=FIXTURE_DURATION, result_delay=RESULT_DELAY)
+    options.update(kwargs)
+    return RefreshScheduler(None, upcoming_matches_file=calendar, **options)
+
+
+def test_without_calendar_the_fixed_interval_is_used(tmp_path):
+    assert _scheduler(tmp_path).next_delay(NOW) == REFRESH_INTERVAL
+
+
+def test_dense_fixtures_are_clamped_to_the_minimum_interval(tmp_path):
+    # 20 fixtures being played: REFRESH_INTERVAL / 21 is below the minimum
+    scheduler = _scheduler(tmp_path, [-60] * 20)
+
+    assert scheduler.next_delay(NOW) == MIN_INTERVAL
+
+
+def test_few_active_fixtures_divide_the_interval(tmp_path):
+    # Two fixtures starting within the dense window, results due much later
+    scheduler = _scheduler(tmp_path, [1800, 2400])
+
+    assert scheduler.next_delay(NOW) == pytest.approx(REFRESH_INTERVAL / 3)
+
+
+def test_refresh_is_due_when_a_result_is_expected(tmp_path):
+    # Started 1000 seconds ago: its result is expected 320 seconds from now
+    scheduler = _scheduler(tmp_path, [-1000])
+
+    assert scheduler.next_delay(NOW) == pytest.approx(FIXTURE_DURATION + RESULT_DELAY - 1000)
+
+
+def test_idle_league_wakes_up_before_the_next_fixture(tmp_path):
+    scheduler = _scheduler(tmp_path, [2 * 3600 + 600])
+
+    assert scheduler.next_delay(NOW) == pytest.approx(2 * 3600 + 600 - MIN_INTERVAL)
+
+
+def test_idle_league_backs_off_to_the_maximum_interval(tmp_path):
+    assert _scheduler(tmp_path, [2 * 86400]).next_delay(NOW) == MAX_INTERVAL
+    assert _scheduler(tmp_path, [-86400]).next_delay(NOW) == MAX_INTERVAL
+
+
+@pytest.mark.parametrize("failures, expected", [
+    (0, REFRESH_INTERVAL),
+    # The backoff only ever lengthens the delay
+    (1, REFRESH_INTERVAL),
+    (3, REFRESH_INTERVAL),
+    (4, MIN_INTERVAL * 2 ** 4),
+    (5, MIN_INTERVAL * 2 ** 5),
+    # ... and never beyond the maximum interval
+    (6, MAX_INTERVAL),
+    (10, MAX_INTERVAL)
+])
+def test_failures_back_off_exponentially_up_to_the_maximum(tmp_path, failures, expected):
+    scheduler = _scheduler(tmp_path)
+    scheduler.consecutive_failures = failures
+
+    assert scheduler.next_delay(NOW) == expected
+
+
+def test_backoff_lengthens_short_delays(tmp_path):
+    scheduler = _scheduler(tmp_path, [-60] * 20)
+    scheduler.consecutive_failures = 2
+
+    assert scheduler.next_delay(NOW) == MIN_INTERVAL * 2 ** 2
+
+
+def test_jitter_stays_within_its_fraction(tmp_path):
+    scheduler = _scheduler(tmp_path, jitter=0.1)
+
+    delays = [scheduler.next_delay(NOW) for _ in range(200)]
+
+    assert all(REFRESH_INTERVAL * 0.9 <= delay <= REFRESH_INTERVAL * 1.1 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_jitter_never_leaves_the_interval_bounds(tmp_path):
+    # Dense fixtures sit at the minimum, an idle league at the maximum
+    dense = _scheduler(tmp_path, [-60] * 20, jitter=0.5)
+    idle = _scheduler(tmp_path / "idle", jitter=0.5, refresh_interval=MAX_INTERVAL)
+
+    assert all(MIN_INTERVAL <= dense.next_delay(NOW) for _ in range(200))
+    assert all(idle.next_delay(NOW) <= MAX_INTERVAL for _ in range(200))
+
+
+def test_jitter_never_refreshes_before_an_expected_result(tmp_path):
+    scheduler = _scheduler(tmp_path, [-1000], jitter=0.5)
+    result_due = FIXTURE_DURATION + RESULT_DELAY - 1000
+
+    delays = [scheduler.next_delay(NOW) for _ in range(200)]
+
+    assert all(result_due <= delay <= result_due * 1.5 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_calendar_is_reread_when_it_changes(tmp_path):
+    scheduler = _scheduler(tmp_path, [2 * 86400])
+    assert scheduler.next_delay(NOW) == MAX_INTERVAL
+
+    calendar = tmp_path / "upcoming_matches.json"
+    start = datetime.fromtimestamp(NOW - 1000, timezone.utc).isoformat()
+    calendar.write_text(json.dumps([{"fixtureId": 1, "fixtureStart": start}, {"fixtureId": 2}]), encoding="utf-8")
+    # Make the change visible on file systems with coarse modification times
+    os.utime(calendar, (NOW, NOW))
+
+    assert scheduler.next_delay(NOW) == pytest.approx(FIXTURE_DURATION + RESULT_DELAY - 1000)
+
+
+class _ScriptedJobManager:
+    """
+    Job manager whose jobs finish at once with scripted outcomes.
+    """
+
+    def __init__(self, scheduler, outcomes, stop_event):
+        self.scheduler = scheduler
+        self.outcomes = list(outcomes)
+        self.stop_event = stop_event
+        self.failures_at_submit = []
+
+    def submit(self, force=False):
+        self.failures_at_submit.append(self.scheduler.consecutive_failures)
+        outcome = self.outcomes.pop(0)
+        if not self.outcomes:
+            self.stop_event.set()
+        if outcome == "error":
+            raise RuntimeError("queue unavailable")
+
+        job = RefreshJob(force=force)
+        job.status = outcome
+        job.done.set()
+        return job
+
+
+def test_run_forever_counts_consecutive_failures(tmp_path):
+    scheduler = _scheduler(tmp_path, min_interval=0.001, max_interval=0.01)
+    stop_event = threading.Event()
+    manager = _ScriptedJobManager(scheduler, ["failed", "error", "succeeded", "failed", "failed"], stop_event)
+    scheduler.job_manager = manager
+
+    scheduler.run_forever(stop_event)
+
+    assert manager.failures_at_submit == [0, 1, 2, 0, 1]
+    assert scheduler.consecutive_failures == 2
+
+
+def test_run_forever_caps_the_failure_count(tmp_path):
+    scheduler = _scheduler(tmp_path, min_interval=0.001, max_interval=0.01)
+    scheduler.consecutive_failures = 10
+    stop_event = threading.Event()
+    scheduler.job_manager = _ScriptedJobManager(scheduler, ["failed", "error"], stop_event)
+
+    scheduler.run_forever(stop_event)
+
+    assert scheduler.consecutive_failures == 10
@@ -0,0 +1,46 @@
+"""
+Content hashing utility functions for the 2K Flash application.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+
+def content_hash(obj):
+    """
+    Compute a stable hash of a JSON-serializable object.
+
+    Dictionaries are hashed with sorted keys so that equal content always
+    produces the same hash regardless of insertion order.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        str: Hex-encoded SHA-256 digest
+    """
+    payload = json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def file_hash(file_path, chunk_size=1024 * 1024):
+    """
+    Compute the hash of a file's contents.
+
+    Args:
+        file_path (str or Path): File path
+        chunk_size (int): Number of bytes to read at a time
+
+    Returns:
+        str: Hex-encoded SHA-256 digest, or None if the file doesn't exist
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        return None
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
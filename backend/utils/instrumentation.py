@@ -0,0 +1,216 @@
+"""
+Instrumentation utility functions for the 2K Flash application.
+
+The timing and exception decorators in utils.logging behave according to the
+INSTRUMENTATION setting, read once when a function is decorated:
+
+- "log": log one line per call (the default)
+- "aggregate": record call counts, errors and perf_counter_ns durations per
+  function in in-memory histograms, summarized by dump_summary
+- "off": no timing wrapper at all; exceptions are still logged, not counted
+
+Histogram buckets are powers of two of nanoseconds, so recording a call is
+an integer bit_length and a few additions under a lock.
+"""
+
+import threading
+
+from config.settings import INSTRUMENTATION
+
+# Instrumentation modes
+INSTRUMENTATION_OFF = "off"
+INSTRUMENTATION_LOG = "log"
+INSTRUMENTATION_AGGREGATE = "aggregate"
+INSTRUMENTATION_MODES = (INSTRUMENTATION_OFF, INSTRUMENTATION_LOG, INSTRUMENTATION_AGGREGATE)
+
+# Number of power-of-two duration buckets (2^63 ns is about 292 years)
+HISTOGRAM_BUCKETS = 64
+
+# Percentiles reported in the summary
+SUMMARY_PERCENTILES = (50, 95, 99)
+
+
+def get_mode():
+    """
+    Get the configured instrumentation mode.
+
+    Returns:
+        str: "off", "log" or "aggregate" (unknown values fall back to "log")
+    """
+    mode = INSTRUMENTATION.lower()
+    return mode if mode in INSTRUMENTATION_MODES else INSTRUMENTATION_LOG
+
+
+class FunctionStats:
+    """
+    Call count, errors and duration histogram of one function.
+    """
+
+    __slots__ = ("name", "calls", "errors", "total_ns", "max_ns", "histogram")
+
+    def __init__(self, name):
+        """
+        Initialize empty statistics.
+
+        Args:
+            name (str): Qualified function name
+        """
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def percentile_ns(self, percentile):
+        """
+        Estimate a duration percentile from the histogram.
+
+        Args:
+            percentile (float): Percentile between 0 and 100
+
+        Returns:
+            int: Upper bound of the bucket holding the percentile, in nanoseconds
+        """
+        if self.calls == 0:
+            return 0
+
+        threshold = self.calls * percentile / 100
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= threshold and count:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        """
+        Summarize the statistics.
+
+        Returns:
+            dict: Calls, errors and durations in milliseconds
+        """
+        summary = {
+            "function": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.total_ns / self.calls / 1e6 if self.calls else 0,
+            "max_ms": self.max_ns / 1e6
+        }
+        for percentile in SUMMARY_PERCENTILES:
+            summary[f"p{percentile}_ms"] = self.percentile_ns(percentile) / 1e6
+        return summary
+
+
+class Instrumentation:
+    """
+    In-memory registry of per-function statistics.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty registry.
+        """
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name):
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats.setdefault(name, FunctionStats(name))
+        return stats
+
+    def record_call(self, name, elapsed_ns):
+        """
+        Record a completed call.
+
+        Args:
+            name (str): Qualified function name
+            elapsed_ns (int): Duration in nanoseconds
+        """
+        with self._lock:
+            stats = self._get(name)
+            stats.calls += 1
+            stats.total_ns += elapsed_ns
+            if elapsed_ns > stats.max_ns:
+                stats.max_ns = elapsed_ns
+            stats.histogram[min(elapsed_ns.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def record_error(self, name):
+        """
+        Record a call that raised an exception.
+
+        Args:
+            name (str): Qualified function name
+        """
+        with self._lock:
+            self._get(name).errors += 1
+
+    def summary(self):
+        """
+        Summarize every instrumented function, slowest in total first.
+
+        Returns:
+            list: Function summaries
+        """
+        with self._lock:
+            summaries = [stats.summary() for stats in self._stats.values()]
+        return sorted(summaries, key=lambda s: s["total_ms"], reverse=True)
+
+    def reset(self):
+        """
+        Discard all recorded statistics.
+        """
+        with self._lock:
+            self._stats = {}
+
+
+# Process-wide instrumentation registry
+instrumentation = Instrumentation()
+
+
+def qualified_name(func):
+    """
+    Get the name a function's statistics are recorded under.
+
+    Args:
+        func (callable): Function
+
+    Returns:
+        str: Module and qualified name
+    """
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def dump_summary(logger, title="Instrumentation summary", limit=30, reset=True):
+    """
+    Log the aggregated statistics, in aggregate mode only.
+
+    Args:
+        logger (logging.Logger): Logger to use
+        title (str): Heading of the summary
+        limit (int): Maximum number of functions listed
+        reset (bool): Whether to start a new aggregation period afterwards
+
+    Returns:
+        list: Function summaries (empty unless in aggregate mode)
+    """
+    if get_mode() != INSTRUMENTATION_AGGREGATE:
+        return []
+
+    summaries = instrumentation.summary()
+    if reset:
+        instrumentation.reset()
+    if not summaries:
+        return summaries
+
+    lines = [f"{title} ({len(summaries)} functions):",
+             f"{'Function':<70} {'Calls':>9} {'Errors':>6} {'Total ms':>11} {'Mean ms':>9} "
+             f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Max ms':>9}"]
+    for s in summaries[:limit]:
+        lines.append(f"{s['function'][-70:]:<70} {s['calls']:>9} {s['errors']:>6} {s['total_ms']:>11.2f} "
+                     f"{s['mean_ms']:>9.3f} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f} "
+                     f"{s['max_ms']:>9.3f}")
+    logger.info("\n".join(lines))
+    return summaries
@@ -0,0 +1,117 @@
+"""
+Inter-process lock utility functions for the 2K Flash application.
+"""
+
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def process_alive(pid):
+    """
+    Check whether a process is still running.
+
+    Args:
+        pid (int): Process ID
+
+    Returns:
+        bool: False if the process is known to have exited
+    """
+    if not pid or os.name != "posix":
+        # Signal 0 terminates the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class FileLock:
+    """
+    Advisory lock on a file, held by at most one process at a time.
+
+    The operating system releases the lock when the holding process exits,
+    so a crashed holder never leaves it stale.
+    """
+
+    def __init__(self, lock_file):
+        """
+        Initialize the lock.
+
+        Args:
+            lock_file (str or Path): File to lock (created if missing)
+        """
+        self.lock_file = Path(lock_file)
+        self._fd = None
+
+    @property
+    def locked(self):
+        """
+        Check whether this process holds the lock.
+
+        Returns:
+            bool: True if the lock is held
+        """
+        return self._fd is not None
+
+    def acquire(self, blocking=True):
+        """
+        Acquire the lock.
+
+        Args:
+            blocking (bool): Whether to wait for the lock
+
+        Returns:
+            bool: True if the lock was acquired, False if another process holds it
+        """
+        if self._fd is not None:
+            raise RuntimeError(f"Lock {self.lock_file} is already held")
+
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            if blocking:
+                raise
+            return False
+
+        # Record the holder for whoever inspects the file
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode("ascii"))
+        self._fd = fd
+        return True
+
+    def release(self):
+        """
+        Release the lock.
+        """
+        if self._fd is None:
+            return
+
+        fd, self._fd = self._fd, None
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
@@ -7,10 +7,17 @@ import traceback
 import functools
 import time
 
+from utils.instrumentation import (
+    INSTRUMENTATION_OFF, INSTRUMENTATION_AGGREGATE, get_mode, instrumentation, qualified_name
+)
+
 
 def log_execution_time(logger):
     """
     Decorator to log the execution time of a function.
+
+    With instrumentation off the function is returned unwrapped; in aggregate
+    mode the duration is recorded in the function's histogram instead of logged.
     
     Args:
         logger (logging.Logger): Logger to use
@@ -19,6 +26,24 @@ def log_execution_time(logger):
         function: Decorated function
     """
     def decorator(func):
+        mode = get_mode()
+        if mode == INSTRUMENTATION_OFF:
+            return func
+
+        if mode == INSTRUMENTATION_AGGREGATE:
+            name = qualified_name(func)
+            perf_counter_ns = time.perf_counter_ns
+            record_call = instrumentation.record_call
+
+            @functools.wraps(func)
+            def aggregating_wrapper(*args, **kwargs):
+                start_time = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    record_call(name, perf_counter_ns() - start_time)
+            return aggregating_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             start_time = time.time()
@@ -34,6 +59,9 @@ def log_execution_time(logger):
 def log_exceptions(logger, reraise=True):
     """
     Decorator to log exceptions raised by a function.
+
+    Exceptions are logged in every instrumentation mode; in aggregate mode
+    they are also counted.
     
     Args:
         logger (logging.Logger): Logger to use
@@ -43,11 +71,16 @@ def log_exceptions(logger, reraise=True):
         function: Decorated function
     """
     def decorator(func):
+        count_errors = get_mode() == INSTRUMENTATION_AGGREGATE
+        name = qualified_name(func)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except Exception as e:
+                if count_errors:
+                    instrumentation.record_error(name)
                 logger.error(f"Exception in {func.__name__}: {str(e)}")
                 logger.debug(f"Traceback: {traceback.format_exc()}")
                 if reraise:
@@ -0,0 +1,319 @@
+"""
+Memory accounting utility functions for the 2K Flash application.
+
+A MemoryTracker records, at every stage boundary, a tracemalloc snapshot
+and the process's resident set size (RSS). For each stage it reports:
+
+- the traced Python allocations at the start and end of the stage and their
+  peak while it ran (the peak of nested stages counts towards their parent)
+- the RSS at the start and end of the stage and the process's peak RSS so far
+- the allocation sites that grew the most between the two snapshots, i.e.
+  what the stage left allocated
+
+Code marks its stages with the memory_stage context manager, which does
+nothing unless a tracker is active, so the boundaries can stay in place:
+
+    with memory_stage("extract_features"):
+        X, y = feature_engineer.extract_features(player_stats, matches)
+
+tracemalloc is process-wide, so stages are only attributed correctly when
+they run one at a time; the refresh pipeline runs its stages sequentially
+while a tracker is active.
+
+Tracing slows allocation-heavy code down, and the snapshots themselves take
+memory, so RSS readings under a tracker overstate the untraced process; they
+are still comparable between stages and between runs.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config.settings import PROFILE_DIR, MEMORY_TOP_N, MEMORY_TRACE_FRAMES
+
+# Allocations made by the tracker itself or the import machinery are not reported
+IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# Tracker the memory_stage boundaries report to
+_active_tracker = None
+
+
+def current_rss():
+    """
+    Get the resident set size of this process.
+
+    Returns:
+        int: RSS in bytes, or None if it cannot be read on this platform
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss():
+    """
+    Get the peak resident set size of this process so far.
+
+    Returns:
+        int: Peak RSS in bytes, or None if it cannot be read on this platform
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def _megabytes(value):
+    """
+    Convert bytes to megabytes for reports.
+
+    Args:
+        value (int): Bytes, or None
+
+    Returns:
+        float: Megabytes, or None
+    """
+    return None if value is None else round(value / 2 ** 20, 2)
+
+
+class _OpenStage:
+    """
+    Measurements of a stage that has not finished yet.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        # Read before the snapshot, which is itself traced while the stage is open
+        self.traced_start, _ = tracemalloc.get_traced_memory()
+        self.rss_start = current_rss()
+        self.snapshot = tracemalloc.take_snapshot().filter_traces(IGNORED_TRACES)
+        tracemalloc.reset_peak()
+        self.peak = self.traced_start
+        self.start_time = time.perf_counter()
+
+
+class MemoryTracker:
+    """
+    Records tracemalloc snapshots and RSS readings at stage boundaries.
+    """
+
+    def __init__(self, top_n=MEMORY_TOP_N, frames=MEMORY_TRACE_FRAMES):
+        """
+        Initialize the tracker.
+
+        Args:
+            top_n (int): Allocation sites reported per stage
+            frames (int): Stack frames recorded per allocation
+        """
+        self.top_n = top_n
+        self.frames = frames
+        self.stages = []
+        self._open = []
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        self.rss_start = None
+        self.peak_traced = 0
+
+    def start(self):
+        """
+        Start tracing allocations and make this the active tracker.
+
+        Raises:
+            ValueError: If another tracker is already active
+        """
+        global _active_tracker
+
+        if _active_tracker is not None:
+            raise ValueError("Another memory tracker is already active")
+
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(self.frames)
+        tracemalloc.reset_peak()
+        self.rss_start = current_rss()
+        _active_tracker = self
+
+    def stop(self):
+        """
+        Stop tracing allocations.
+        """
+        global _active_tracker
+
+        _active_tracker = None
+        self.peak_traced = max(self.peak_traced, tracemalloc.get_traced_memory()[1])
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measure a stage.
+
+        Args:
+            name (str): Stage name (nested stages are reported as "parent/child")
+        """
+        with self._lock:
+            if self._open:
+                # The parent's peak so far, before the peak is reset for this stage
+                parent = self._open[-1]
+                parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1])
+                name = f"{parent.name}/{name}"
+            self.peak_traced = max(self.peak_traced, tracemalloc.get_traced_memory()[1])
+            open_stage = _OpenStage(name)
+            self._open.append(open_stage)
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._close(open_stage)
+
+    def _close(self, open_stage):
+        """
+        Take the end-of-stage readings of a stage and record it.
+
+        Args:
+            open_stage (_OpenStage): Stage that finished
+        """
+        duration = time.perf_counter() - open_stage.start_time
+        traced_end, traced_peak = tracemalloc.get_traced_memory()
+        open_stage.peak = max(open_stage.peak, traced_peak)
+        rss_end = current_rss()
+        snapshot = tracemalloc.take_snapshot().filter_traces(IGNORED_TRACES)
+
+        self._open.remove(open_stage)
+        self.peak_traced = max(self.peak_traced, open_stage.peak)
+        if self._open:
+            self._open[-1].peak = max(self._open[-1].peak, open_stage.peak)
+
+        grown = [stat for stat in snapshot.compare_to(open_stage.snapshot, "traceback") if stat.size_diff > 0]
+        grown.sort(key=lambda stat: stat.size_diff, reverse=True)
+        top_sites = []
+        for stat in grown[:self.top_n]:
+            frame = stat.traceback[0]
+            top_sites.append({
+                "site": f"{frame.filename}:{frame.lineno}",
+                "traceback": [f"{f.filename}:{f.lineno}" for f in stat.traceback] if len(stat.traceback) > 1 else None,
+                "size_diff_mb": _megabytes(stat.size_diff),
+                "count_diff": stat.count_diff,
+                "size_mb": _megabytes(stat.size)
+            })
+
+        self.stages.append({
+            "stage": open_stage.name,
+            "duration": duration,
+            "traced_start_mb": _megabytes(open_stage.traced_start),
+            "traced_end_mb": _megabytes(traced_end),
+            "traced_peak_mb": _megabytes(open_stage.peak),
+            "traced_peak_increase_mb": _megabytes(open_stage.peak - open_stage.traced_start),
+            "rss_start_mb": _megabytes(open_stage.rss_start),
+            "rss_end_mb": _megabytes(rss_end),
+            "rss_peak_mb": _megabytes(max(filter(None, (peak_rss(), rss_end)), default=None)),
+            "top_allocations": top_sites
+        })
+
+    def report(self):
+        """
+        Get the measurements of every finished stage.
+
+        Returns:
+            dict: Process totals and the stages in the order they finished
+        """
+        return {
+            "rss_start_mb": _megabytes(self.rss_start),
+            "rss_end_mb": _megabytes(current_rss()),
+            "rss_peak_mb": _megabytes(peak_rss()),
+            "traced_peak_mb": _megabytes(self.peak_traced),
+            "stages": self.stages
+        }
+
+    def table(self):
+        """
+        Format the stage measurements as a table.
+
+        Returns:
+            str: Table
+        """
+        report = self.report()
+        lines = [f"RSS {report['rss_start_mb']} MB at start, {report['rss_end_mb']} MB at end, "
+                 f"{report['rss_peak_mb']} MB peak; traced peak {report['traced_peak_mb']} MB",
+                 f"{'Stage':<50} {'Seconds':>8} {'Traced MB':>10} {'Peak MB':>9} {'+Peak MB':>9} "
+                 f"{'RSS MB':>9} {'RSS peak':>9}"]
+        for stage in report["stages"]:
+            lines.append(f"{stage['stage'][-50:]:<50} {stage['duration']:>8.2f} {stage['traced_end_mb']:>10} "
+                         f"{stage['traced_peak_mb']:>9} {stage['traced_peak_increase_mb']:>9} "
+                         f"{stage['rss_end_mb']:>9} {stage['rss_peak_mb']:>9}")
+            for site in stage["top_allocations"]:
+                lines.append(f"    {site['size_diff_mb']:>+9} MB {site['count_diff']:>+9} blocks  {site['site']}")
+        return "\n".join(lines) + "\n"
+
+
+def is_tracking():
+    """
+    Check whether a memory tracker is active.
+
+    Returns:
+        bool: True while a tracker is active
+    """
+    return _active_tracker is not None
+
+
+@contextmanager
+def memory_stage(name):
+    """
+    Mark a stage boundary for the active memory tracker, if any.
+
+    Args:
+        name (str): Stage name
+    """
+    tracker = _active_tracker
+    if tracker is None:
+        yield
+        return
+
+    with tracker.stage(name):
+        yield
+
+
+def save_memory_report(tracker, name, output_dir=PROFILE_DIR):
+    """
+    Write a memory report to files.
+
+    Args:
+        tracker (MemoryTracker): Stopped tracker
+        name (str): Base name of the files
+        output_dir (str or Path): Output directory
+
+    Returns:
+        list: Paths of the written files
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    base = output_dir / f"{name}_memory_{int(time.time())}"
+
+    json_path = base.with_suffix(".json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(tracker.report(), f, indent=2)
+
+    table_path = base.with_suffix(".txt")
+    table_path.write_text(tracker.table(), encoding="utf-8")
+    return [json_path, table_path]
@@ -0,0 +1,558 @@
+"""
+Metrics utility functions for the 2K Flash application.
+
+A lightweight in-process metrics registry with counters, gauges and latency
+histograms, rendered in the Prometheus text exposition format. Metrics are
+created once at module level with the registry's get-or-create methods and
+updated with label values as keyword arguments:
+
+    REQUESTS = metrics.counter("http_requests_total", "HTTP requests", ("method", "status"))
+    REQUESTS.inc(method="GET", status="200")
+
+Under the multi-worker production server every worker has its own registry.
+SharedMetrics writes each worker's registry to a directory shared by the
+workers and merges them into the metrics of the whole server.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from config.logging_config import get_api_logger
+from utils.locking import process_alive
+
+logger = get_api_logger()
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Buckets for long-running work such as refreshes, in seconds
+LONG_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+# Merging of gauges over processes: sum over running processes, or maximum over all processes
+GAUGE_SUM = "sum"
+GAUGE_MAX = "max"
+
+
+def _escape(value):
+    """
+    Escape a label value for the text format.
+
+    Args:
+        value: Label value
+
+    Returns:
+        str: Escaped label value
+    """
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    """
+    Format a sample value for the text format.
+
+    Args:
+        value (float): Sample value
+
+    Returns:
+        str: Formatted value
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    """
+    Base class of metrics: a family of samples keyed by label values.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name, description, labelnames=()):
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): Metric name
+            description (str): Help text
+            labelnames (tuple): Label names
+        """
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def options(self):
+        """
+        Get the constructor options of the metric beyond name, description and label names.
+
+        Returns:
+            dict: Options
+        """
+        return {}
+
+    def snapshot(self):
+        """
+        Get a JSON-serializable copy of the metric.
+
+        Returns:
+            dict: Type, help text, label names, options and samples
+        """
+        with self._lock:
+            values = [[list(key), list(value) if isinstance(value, list) else value]
+                      for key, value in self._values.items()]
+        return {
+            "type": self.type_name,
+            "description": self.description,
+            "labelnames": list(self.labelnames),
+            "options": self.options(),
+            "values": values
+        }
+
+    def merge(self, values, live=True):
+        """
+        Add the samples of another process's snapshot of the metric.
+
+        Args:
+            values (list): (label values, value) pairs of the snapshot
+            live (bool): Whether the process is still running
+        """
+        with self._lock:
+            for key, value in values:
+                key = tuple(key)
+                self._values[key] = self._values.get(key, 0) + value
+
+    def _key(self, labels):
+        """
+        Get the sample key of a set of label values.
+
+        Args:
+            labels (dict): Label values
+
+        Returns:
+            tuple: Label values in label name order
+        """
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_string(self, key, extra=()):
+        """
+        Format label values for a sample line.
+
+        Args:
+            key (tuple): Label values
+            extra (tuple): Additional (name, value) pairs
+
+        Returns:
+            str: Label string including braces, or "" without labels
+        """
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def _samples(self):
+        """
+        Get the sample lines of the metric.
+
+        Returns:
+            list: (suffix, label string, value) tuples
+        """
+        with self._lock:
+            return [("", self._label_string(key), value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        """
+        Render the metric in the text format.
+
+        Returns:
+            list: Lines
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_format_value(value)}" for suffix, labels, value in self._samples())
+        return lines
+
+    def get(self, **labels):
+        """
+        Get the current value of a sample.
+
+        Args:
+            **labels: Label values
+
+        Returns:
+            Sample value, or None if it has not been set
+        """
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing count.
+    """
+
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        """
+        Increase the counter.
+
+        Args:
+            amount (float): Non-negative increment
+            **labels: Label values
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name, description, labelnames=(), aggregate=GAUGE_SUM):
+        """
+        Initialize the gauge.
+
+        Args:
+            name (str): Metric name
+            description (str): Help text
+            labelnames (tuple): Label names
+            aggregate (str): How the gauges of several processes are merged:
+                GAUGE_SUM (running processes only) or GAUGE_MAX
+        """
+        super().__init__(name, description, labelnames)
+        self.aggregate = aggregate
+
+    def options(self):
+        return {"aggregate": self.aggregate}
+
+    def merge(self, values, live=True):
+        if self.aggregate == GAUGE_MAX:
+            with self._lock:
+                for key, value in values:
+                    key = tuple(key)
+                    self._values[key] = max(self._values.get(key, value), value)
+        elif live:
+            super().merge(values, live)
+
+    def set(self, value, **labels):
+        """
+        Set the gauge.
+
+        Args:
+            value (float): New value
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        """
+        Increase (or with a negative amount, decrease) the gauge.
+
+        Args:
+            amount (float): Increment
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    """
+    Distribution of observations over cumulative buckets.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): Metric name
+            description (str): Help text
+            labelnames (tuple): Label names
+            buckets (tuple): Upper bounds of the buckets, ascending
+        """
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def options(self):
+        return {"buckets": list(self.buckets)}
+
+    def merge(self, values, live=True):
+        with self._lock:
+            for key, counts in values:
+                key = tuple(key)
+                merged = self._values.get(key)
+                if merged is None:
+                    self._values[key] = list(counts)
+                else:
+                    self._values[key] = [a + b for a, b in zip(merged, counts)]
+
+    def observe(self, value, **labels):
+        """
+        Record an observation.
+
+        Args:
+            value (float): Observed value (seconds for latencies)
+            **labels: Label values
+        """
+        key = self._key(labels)
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # Per-bucket counts, then the +Inf count, the sum and the total count
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            counts[bucket] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for key, counts in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    samples.append(("_bucket", self._label_string(key, (("le", _format_value(float(bound))),)),
+                                    cumulative))
+                samples.append(("_sum", self._label_string(key), counts[-2]))
+                samples.append(("_count", self._label_string(key), counts[-1]))
+        return samples
+
+    def get(self, **labels):
+        """
+        Get the observation count and sum of a sample.
+
+        Args:
+            **labels: Label values
+
+        Returns:
+            tuple: (count, sum), or None if nothing has been observed
+        """
+        with self._lock:
+            counts = self._values.get(self._key(labels))
+            return None if counts is None else (counts[-1], counts[-2])
+
+
+class MetricsRegistry:
+    """
+    Registry of the process's metrics.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty registry.
+        """
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    # Metric classes by type name, for merging snapshots
+    METRIC_CLASSES = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}
+
+    def _get_or_create(self, metric_class, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric {name} is already registered as a {metric.type_name}")
+            return metric
+
+    def counter(self, name, description, labelnames=()):
+        """
+        Get or create a counter.
+
+        Args:
+            name (str): Metric name
+            description (str): Help text
+            labelnames (tuple): Label names
+
+        Returns:
+            Counter: Counter
+        """
+        return self._get_or_create(Counter, name, description, labelnames)
+
+    def gauge(self, name, description, labelnames=(), aggregate=GAUGE_SUM):
+        """
+        Get or create a gauge.
+
+        Args:
+            name (str): Metric name
+            description (str): Help text
+            labelnames (tuple): Label names
+            aggregate (str): How the gauges of several processes are merged (GAUGE_SUM or GAUGE_MAX)
+
+        Returns:
+            Gauge: Gauge
+        """
+        return self._get_or_create(Gauge, name, description, labelnames, aggregate=aggregate)
+
+    def histogram(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Get or create a histogram.
+
+        Args:
+            name (str): Metric name
+            description (str): Help text
+            labelnames (tuple): Label names
+            buckets (tuple): Upper bounds of the buckets
+
+        Returns:
+            Histogram: Histogram
+        """
+        return self._get_or_create(Histogram, name, description, labelnames, buckets)
+
+    def snapshot(self):
+        """
+        Get a JSON-serializable copy of every metric.
+
+        Returns:
+            dict: Metric snapshots by name
+        """
+        with self._lock:
+            registered = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in registered}
+
+    def merge(self, snapshot, live=True):
+        """
+        Add another process's metrics to this registry.
+
+        Counters and histograms are summed. Gauges are summed over running
+        processes, or take the maximum over all processes.
+
+        Args:
+            snapshot (dict): Metric snapshots by name, as returned by snapshot
+            live (bool): Whether the process is still running
+        """
+        for name, info in snapshot.items():
+            metric_class = self.METRIC_CLASSES[info["type"]]
+            metric = self._get_or_create(metric_class, name, info["description"], tuple(info["labelnames"]),
+                                         **info["options"])
+            metric.merge(info["values"], live)
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text
+        """
+        with self._lock:
+            registered = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in registered:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class SharedMetrics:
+    """
+    Metrics of several processes, exchanged through a directory.
+
+    Every process writes a snapshot of its registry to a file named after
+    its process ID, periodically and before it renders. Rendering merges
+    the snapshots of all processes, including exited ones, so counters do
+    not drop when a worker is replaced.
+    """
+
+    def __init__(self, registry, directory, interval=5):
+        """
+        Initialize the shared metrics.
+
+        Args:
+            registry (MetricsRegistry): Registry of this process
+            directory (str or Path): Directory shared by the processes
+            interval (float): Seconds between snapshots written in the background
+        """
+        self.registry = registry
+        self.directory = Path(directory)
+        self.interval = interval
+        self._thread = None
+
+    def clear(self):
+        """
+        Remove the snapshots of earlier processes, before the processes start.
+        """
+        if self.directory.exists():
+            for snapshot_file in self.directory.glob("*.json"):
+                snapshot_file.unlink()
+
+    def write(self):
+        """
+        Write the snapshot of this process, replacing its previous snapshot atomically.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        snapshot_file = self.directory / f"{os.getpid()}.json"
+        temp_file = snapshot_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.registry.snapshot(), f)
+        os.replace(temp_file, snapshot_file)
+
+    def start(self):
+        """
+        Start writing snapshots of this process in the background.
+
+        Returns:
+            threading.Thread: Writer thread
+        """
+        self._thread = threading.Thread(target=self._write_periodically, name="metrics-writer", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _write_periodically(self):
+        """
+        Write snapshots of this process every interval.
+        """
+        while True:
+            try:
+                self.write()
+            except OSError as e:
+                logger.error(f"Error writing metrics snapshot: {str(e)}")
+            time.sleep(self.interval)
+
+    def render(self):
+        """
+        Render the merged metrics of all processes in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text
+        """
+        self.write()
+
+        merged = MetricsRegistry()
+        for snapshot_file in sorted(self.directory.glob("*.json")):
+            try:
+                with open(snapshot_file, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Skipping metrics snapshot {snapshot_file}: {str(e)}")
+                continue
+            merged.merge(snapshot, live=process_alive(int(snapshot_file.stem)))
+        return merged.render()
+
+
+# Process-wide metrics registry
+metrics = MetricsRegistry()
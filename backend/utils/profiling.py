@@ -0,0 +1,272 @@
+"""
+Profiling utility functions for the 2K Flash application.
+
+Two profilers are available:
+
+- "sampling": a background thread samples the stacks of every busy thread
+  at a fixed interval. Low overhead, and the samples are written as
+  collapsed stacks ("frame;frame;frame count" lines) that flamegraph.pl,
+  speedscope or inferno render directly.
+- "cprofile": deterministic profiling of the calling thread with cProfile,
+  written as a .prof file (pstats, snakeviz, gprof2dot).
+
+Both produce a top-N table of the most expensive functions.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from config.settings import PROFILE_DIR, PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_N
+
+# Available profilers
+PROFILERS = ("sampling", "cprofile")
+
+# Innermost frames in these modules mean a thread is idle (waiting on a lock, queue or socket)
+IDLE_MODULES = ("threading.py", "queue.py", "selectors.py", "socketserver.py")
+
+
+def _frame_label(code):
+    """
+    Get the label of a stack frame.
+
+    Args:
+        code (code): Code object of the frame
+
+    Returns:
+        str: "function (file:line)"
+    """
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all busy threads from a background thread.
+    """
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_time = None
+
+    def start(self):
+        """
+        Start sampling.
+        """
+        self._stop.clear()
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.duration = time.perf_counter() - self._start_time
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or os.path.basename(frame.f_code.co_filename) in IDLE_MODULES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """
+        Get the samples as collapsed stacks.
+
+        Returns:
+            str: One "root;...;leaf count" line per distinct stack
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, limit=PROFILE_TOP_N):
+        """
+        Get the functions seen in the most samples.
+
+        Args:
+            limit (int): Number of functions
+
+        Returns:
+            list: Dictionaries with the function, its own samples and the samples
+                it was on the stack for, most on the stack first
+        """
+        # Samples are taken slightly less often than the interval, so time them by the measured rate
+        seconds_per_sample = self.duration / self.samples if self.samples else self.interval
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+
+        return [
+            {
+                "function": function,
+                "self_samples": own[function],
+                "total_samples": count,
+                "self_seconds": own[function] * seconds_per_sample,
+                "total_seconds": count * seconds_per_sample
+            }
+            for function, count in total.most_common(limit)
+        ]
+
+    def table(self, limit=PROFILE_TOP_N):
+        """
+        Format the top functions as a table.
+
+        Args:
+            limit (int): Number of functions
+
+        Returns:
+            str: Table
+        """
+        lines = [f"{self.samples} samples every {self.interval * 1000:.1f} ms over {self.duration:.2f} seconds",
+                 f"{'Total s':>9} {'Self s':>9}  Function"]
+        for row in self.top(limit):
+            lines.append(f"{row['total_seconds']:>9.3f} {row['self_seconds']:>9.3f}  {row['function']}")
+        return "\n".join(lines) + "\n"
+
+
+class CProfileProfiler:
+    """
+    Deterministic profiler of the calling thread.
+    """
+
+    def __init__(self):
+        """
+        Initialize the profiler.
+        """
+        self.profile = cProfile.Profile()
+        self.duration = 0.0
+        self._start_time = None
+
+    def start(self):
+        """
+        Start profiling.
+        """
+        self._start_time = time.perf_counter()
+        self.profile.enable()
+
+    def stop(self):
+        """
+        Stop profiling.
+        """
+        self.profile.disable()
+        self.duration = time.perf_counter() - self._start_time
+
+    def top(self, limit=PROFILE_TOP_N):
+        """
+        Get the functions with the most cumulative time.
+
+        Args:
+            limit (int): Number of functions
+
+        Returns:
+            list: Dictionaries with the function, its calls, own time and cumulative time
+        """
+        stats = pstats.Stats(self.profile)
+        rows = []
+        for (filename, line, name), (_, calls, own_time, cumulative_time, _) in stats.stats.items():
+            rows.append({
+                "function": f"{name} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "self_seconds": own_time,
+                "total_seconds": cumulative_time
+            })
+        rows.sort(key=lambda row: row["total_seconds"], reverse=True)
+        return rows[:limit]
+
+    def table(self, limit=PROFILE_TOP_N):
+        """
+        Format the top functions as a table.
+
+        Args:
+            limit (int): Number of functions
+
+        Returns:
+            str: Table
+        """
+        output = io.StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
+
+
+def create_profiler(profiler="sampling", interval=PROFILE_SAMPLE_INTERVAL):
+    """
+    Create a profiler.
+
+    Args:
+        profiler (str): "sampling" or "cprofile"
+        interval (float): Seconds between samples of the sampling profiler
+
+    Returns:
+        SamplingProfiler or CProfileProfiler: Profiler
+    """
+    if profiler == "sampling":
+        return SamplingProfiler(interval)
+    if profiler == "cprofile":
+        return CProfileProfiler()
+    raise ValueError(f"Unknown profiler {profiler}, expected one of {', '.join(PROFILERS)}")
+
+
+def save_profile(profiler, name, output_dir=PROFILE_DIR, limit=PROFILE_TOP_N):
+    """
+    Write a finished profile to files.
+
+    Args:
+        profiler (SamplingProfiler or CProfileProfiler): Stopped profiler
+        name (str): Base name of the files
+        output_dir (str or Path): Output directory
+        limit (int): Number of functions in the top-N table
+
+    Returns:
+        list: Paths of the written files
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    base = output_dir / f"{name}_{int(time.time())}"
+    paths = []
+
+    if isinstance(profiler, SamplingProfiler):
+        collapsed_path = base.with_suffix(".collapsed")
+        collapsed_path.write_text(profiler.collapsed(), encoding="utf-8")
+        paths.append(collapsed_path)
+    else:
+        prof_path = base.with_suffix(".prof")
+        profiler.profile.dump_stats(str(prof_path))
+        paths.append(prof_path)
+
+    table_path = base.with_suffix(".txt")
+    table_path.write_text(profiler.table(limit), encoding="utf-8")
+    paths.append(table_path)
+    return paths
@@ -0,0 +1,127 @@
+"""
+JSON file snapshot utility functions for the 2K Flash application.
+
+The API serves the same few output files on every request. A snapshot keeps
+a file's parsed content in memory and parses the file again only when its
+modification time or size changes, so a request in between costs one stat
+call. Snapshots loaded before the production server forks its workers are
+shared by them copy-on-write until the file changes.
+
+Snapshot data is shared between requests and must not be modified.
+"""
+
+import json
+import threading
+from pathlib import Path
+
+from config.logging_config import get_data_fetcher_logger
+
+logger = get_data_fetcher_logger()
+
+
+class JsonSnapshots:
+    """
+    Parsed JSON files, re-read when they change on disk.
+    """
+
+    def __init__(self):
+        """
+        Initialize the snapshots.
+        """
+        self._snapshots = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def load(self, file_path, default=None):
+        """
+        Get the parsed content of a file.
+
+        A file that cannot be parsed, e.g. because it is being rewritten,
+        is served from its previous snapshot if there is one.
+
+        Args:
+            file_path (str or Path): JSON file
+            default: Value returned if the file does not exist
+
+        Returns:
+            The parsed content, or the default
+
+        Raises:
+            ValueError: If the file cannot be parsed and there is no previous snapshot
+        """
+        path = Path(file_path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return default
+
+        key = str(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot[0] == version:
+            return snapshot[1]
+
+        # Parse each changed file once, however many requests are waiting for it
+        with self._lock:
+            file_lock = self._locks.setdefault(key, threading.Lock())
+        with file_lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and snapshot[0] == version:
+                return snapshot[1]
+
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                if snapshot is None:
+                    raise ValueError(f"Error parsing {path}: {str(e)}")
+                logger.warning(f"Serving the previous snapshot of {path}, which cannot be parsed: {str(e)}")
+                return snapshot[1]
+
+            self._snapshots[key] = (version, data)
+            logger.debug(f"Loaded snapshot of {path}")
+            return data
+
+    def preload(self, file_paths):
+        """
+        Load snapshots of files ahead of the first request.
+
+        Args:
+            file_paths (list): JSON files
+
+        Returns:
+            int: Number of files loaded
+        """
+        loaded = 0
+        for file_path in file_paths:
+            try:
+                if self.load(file_path) is not None:
+                    loaded += 1
+            except ValueError as e:
+                logger.error(str(e))
+        return loaded
+
+    def clear(self):
+        """
+        Drop every snapshot.
+        """
+        with self._lock:
+            self._snapshots = {}
+
+
+# Process-wide snapshots
+snapshots = JsonSnapshots()
+
+
+def load_json_snapshot(file_path, default=None):
+    """
+    Get the parsed content of a file from the process-wide snapshots.
+
+    Args:
+        file_path (str or Path): JSON file
+        default: Value returned if the file does not exist
+
+    Returns:
+        The parsed content, or the default
+    """
+    return snapshots.load(file_path, default)